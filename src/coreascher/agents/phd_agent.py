@@ -10,53 +10,60 @@
 import json
 import logging
 from pathlib import Path
-from typing import Dict, List, Optional
-from loguru import logger
+from typing import Dict, List, Optional, Union
 from crewai import Agent
 from crewai.project import CrewBase
-from coreascher.tools.custom_tool import TestTool
+from coreascher.agents.pool import get_agent_pool, pool_key
+from coreascher.monitoring.profiling import profiled
+from coreascher.tools.custom_tool import LiteratureSearch, TestTool
+from coreascher.tools.paper_table import PaperTable
+from coreascher.tools.shared_store import SharedStore
+from coreascher.tools.term_cache import contains_cjk, get_term_cache
 
 
-# 设置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
+# Agent配置，相同配置的Agent实例在进程内复用
+AGENT_CONFIG = {
+    "role": "计算机科学博士生",
+    "goal": "执行文献检索和综述撰写任务",
+    "backstory": """您是一位计算机科学专业的博士生，
+                擅长阅读和理解计算机领域的文献，
+                能够提炼出与研究主题高度相关的内容。
+                您负责文献检索、分析和论文写作工作。""",
+    "verbose": True,
+    "allow_delegation": True,
+    "memory": True,
+    "max_iterations": 3,
+}
+_POOL_KEY = pool_key("phd", AGENT_CONFIG)
+
 @CrewBase
 class PhDAgent:
     """博士生代理，负责文献检索和论文写作"""
     
     def __init__(self) -> None:
         """初始化博士生代理"""
-        super().__init__()
         
         # 确保存储目录存在
         self.store_dir = Path("data/phd")
         self.store_dir.mkdir(parents=True, exist_ok=True)
         
         
-        # 初始化知识库
-        self.knowledge_base = {}
+        # 知识库保存在磁盘上，同一目录下的多个进程共享；知识库不是缓存，条目不过期
+        self.knowledge_base = SharedStore(self.store_dir / "knowledge.sqlite3", ttl_seconds=0)
     
     def phd_agent(self) -> Agent:
-        """获取Agent实例"""
-        return Agent(
-            role="计算机科学博士生",
-            goal="执行文献检索和综述撰写任务",
-            backstory="""您是一位计算机科学专业的博士生，
-                擅长阅读和理解计算机领域的文献，
-                能够提炼出与研究主题高度相关的内容。
-                您负责文献检索、分析和论文写作工作。""",
-            verbose=True,
-            allow_delegation=True,
-            memory=True,
-            max_iterations=3,
-            tools=[TestTool()] 
-        )
+        """构建Agent实例"""
+        return Agent(**AGENT_CONFIG, tools=[TestTool()])
+
+    def _execute(self, prompt: str):
+        """租借池中的Agent实例执行提示"""
+        with get_agent_pool().lease(_POOL_KEY, self.phd_agent) as agent:
+            return agent.execute(prompt)
     
-    def search_literature(self, keywords: List[str], top_k: int = 30) -> List[Dict]:
+    @profiled()
+    def search_literature(self, keywords: List[str], top_k: int = 30) -> PaperTable:
         """根据关键词搜索相关文献
         
         Args:
@@ -64,55 +71,54 @@ class PhDAgent:
             top_k: 每个关键词返回的结果数量
             
         Returns:
-            文献检索结果列表
+            文献检索结果，按 entry_id 去重后的论文表
         """
+        results = PaperTable()
         if not keywords:
             logger.error("关键词列表不能为空")
-            return []
+            return results
             
-        results = []
+        search_tool = LiteratureSearch()
+        term_cache = get_term_cache()
         
         try:
             for keyword in keywords:
-                # 使用搜索工具
-                semantic_results = TestTool._run({"query": keyword})
+                # 规范化关键词，未收录英文对照的中文关键词无法在arXiv检索
+                query = term_cache.canonicalize(keyword)
+                if contains_cjk(query):
+                    logger.warning(f"跳过缺少英文对照的关键词: {keyword}")
+                    continue
                 
-                # 解析结果
                 try:
-                    result_list = json.loads(semantic_results)
-                    results.extend(result_list[:top_k])
-                except json.JSONDecodeError as e:
-                    logger.error(f"解析搜索结果失败: {str(e)}")
+                    results.extend(search_tool.search(query, max_results=top_k))
+                except Exception as e:
+                    logger.error(f"检索关键词 {keyword} 失败: {str(e)}")
                     continue
-                
-                # 获取详细信息
-                for result in results:
-                    if paper_id := result.get("paper_id"):
-                        try:
-                            paper_details = self.paper_query_tool._run({"paper_id": paper_id})
-                            details = json.loads(paper_details)
-                            result.update(details)
-                        except Exception as e:
-                            logger.error(f"获取论文详情失败: {str(e)}")
-                            continue
         except Exception as e:
             logger.error(f"文献搜索过程出错: {str(e)}")
+        finally:
+            term_cache.save()
             
         return results
     
-    def analyze_literature(self, papers: List[Dict]) -> Dict:
+    @profiled()
+    def analyze_literature(self, papers: Union[PaperTable, List[Dict]]) -> Dict:
         """分析文献内容，提取关键信息
         
         Args:
-            papers: 文献列表
+            papers: 文献列表或论文表
             
         Returns:
             分析结果字典
         """
         try:
+            if isinstance(papers, PaperTable):
+                papers_json = papers.to_json(indent=None)
+            else:
+                papers_json = json.dumps(papers, ensure_ascii=False)
             prompt = f"""
             请分析以下文献内容，提取关键信息：
-            文献内容：{json.dumps(papers, ensure_ascii=False)}
+            文献内容：{papers_json}
             
             请提供以下分析：
             {{
@@ -121,11 +127,12 @@ class PhDAgent:
                 "future_directions": ["方向1", "方向2"]
             }}
             """
-            return self.phd_agent().execute(prompt)
+            return self._execute(prompt)
         except Exception as e:
             logger.error(f"分析文献时出错: {str(e)}")
             return {}
     
+    @profiled()
     def write_draft(self, analysis: Dict, outline: Dict) -> str:
         """根据文献分析和大纲撰写论文初稿
         
@@ -149,11 +156,12 @@ class PhDAgent:
             3. 使用学术写作风格
             4. 确保内容的连贯性和逻辑性
             """
-            return self.phd_agent().execute(prompt)
+            return self._execute(prompt)
         except Exception as e:
             logger.error(f"撰写论文时出错: {str(e)}")
             return ""
     
+    @profiled()
     def revise_draft(self, draft: str, feedback: Dict) -> str:
         """根据反馈修改论文
         
@@ -177,11 +185,12 @@ class PhDAgent:
             3. 确保修改后内容的连贯性
             4. 标注修改的部分
             """
-            return self.phd_agent().execute(prompt)
+            return self._execute(prompt)
         except Exception as e:
             logger.error(f"修改论文时出错: {str(e)}")
             return ""
     
+    @profiled()
     def add_to_knowledge_base(self, paper_id: str, content: Dict) -> bool:
         """将文献添加到知识库
         
@@ -193,12 +202,13 @@ class PhDAgent:
             是否添加成功
         """
         try:
-            self.knowledge_base[paper_id] = content
+            self.knowledge_base.put("knowledge", paper_id, content)
             return True
         except Exception as e:
             logger.error(f"添加到知识库时出错: {str(e)}")
             return False
     
+    @profiled()
     def get_from_knowledge_base(self, paper_id: str) -> Optional[Dict]:
         """从知识库获取文献
         
@@ -208,4 +218,4 @@ class PhDAgent:
         Returns:
             文献内容，如果不存在则返回None
         """
-        return self.knowledge_base.get(paper_id) 
\ No newline at end of file
+        return self.knowledge_base.get("knowledge", paper_id) 
\ No newline at end of file
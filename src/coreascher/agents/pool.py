@@ -0,0 +1,113 @@
+"""
+Agent实例池模块
+
+该模块缓存已构建的crewAI Agent实例，负责：
+1. 按Agent配置缓存实例，相同配置只在首次使用时构建
+2. 以租借方式分配实例，同一实例同一时刻只被一个线程使用
+3. 统计实例复用情况
+
+crewAI 的 Agent 在执行任务时会修改自身的执行器和工具状态，不能被多个线程同时使用。
+池中每个配置维护一组空闲实例，并发租借时才会构建额外的实例。
+"""
+
+import json
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional
+
+
+def pool_key(name: str, config: Dict[str, Any]) -> Hashable:
+    """根据Agent名称和配置生成池键
+
+    Args:
+        name: Agent名称，如 phd
+        config: 构建Agent使用的配置
+
+    Returns:
+        可哈希的池键
+    """
+    return name, json.dumps(config, ensure_ascii=False, sort_keys=True, default=repr)
+
+
+class AgentPool:
+    """线程安全的Agent实例池"""
+
+    def __init__(self, max_idle: int = 4) -> None:
+        """初始化实例池
+
+        Args:
+            max_idle: 每个配置最多保留的空闲实例数
+        """
+        self.max_idle = max_idle
+        self._idle: Dict[Hashable, List[Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def acquire(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """取出一个空闲实例，没有空闲实例时调用 factory 构建
+
+        Args:
+            key: 池键，见 pool_key
+            factory: 构建Agent实例的函数
+
+        Returns:
+            Agent实例，使用完毕后需调用 release 归还
+        """
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                self.hits += 1
+                return idle.pop()
+            self.misses += 1
+        # 构建Agent较慢，不在锁内进行
+        return factory()
+
+    def release(self, key: Hashable, agent: Any) -> None:
+        """归还实例，空闲实例已满时直接丢弃"""
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle:
+                idle.append(agent)
+
+    @contextmanager
+    def lease(self, key: Hashable, factory: Callable[[], Any]) -> Iterator[Any]:
+        """租借一个实例，退出上下文时自动归还"""
+        agent = self.acquire(key, factory)
+        try:
+            yield agent
+        finally:
+            self.release(key, agent)
+
+    def clear(self) -> None:
+        """清空实例池和统计"""
+        with self._lock:
+            self._idle.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """获取实例池统计信息"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "configs": len(self._idle),
+                "idle": sum(len(idle) for idle in self._idle.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+_default_pool: Optional[AgentPool] = None
+_default_lock = threading.Lock()
+
+
+def get_agent_pool() -> AgentPool:
+    """获取进程内共享的Agent实例池"""
+    global _default_pool
+    if _default_pool is None:
+        with _default_lock:
+            if _default_pool is None:
+                _default_pool = AgentPool()
+    return _default_pool
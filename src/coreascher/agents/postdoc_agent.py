@@ -12,49 +12,48 @@ import logging
 import os
 from pathlib import Path
 from typing import Dict, List, Optional, Any
-from loguru import logger
 from crewai import Agent
 from crewai.project import CrewBase
-from dotenv import load_dotenv
-
-# 加载环境变量
-load_dotenv()
-
-# 设置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from coreascher.agents.pool import get_agent_pool, pool_key
+from coreascher.monitoring.profiling import profiled
 logger = logging.getLogger(__name__)
 
+# Agent配置，相同配置的Agent实例在进程内复用
+AGENT_CONFIG = {
+    "role": "计算机科学博士后研究员",
+    "goal": "将研究计划转化为具体任务并整合研究成果",
+    "backstory": """您是一位计算机科学领域的博士后研究员，
+                擅长将高水平的研究计划转化为具体的实验设计。
+                您负责理解和完善研究框架，分配研究任务，
+                并确保最终的论文符合学术规范。""",
+    "verbose": True,
+    "allow_delegation": False,
+    "memory": True,
+    "max_iterations": 3,
+}
+_POOL_KEY = pool_key("postdoc", AGENT_CONFIG)
+
 @CrewBase
 class PostDocAgent:
     """博士后代理，负责研究框架完善和论文整合"""
     
     def __init__(self) -> None:
         """初始化博士后代理"""
-        super().__init__()
         
         # 确保存储目录存在
         self.store_dir = Path("data/postdoc")
         self.store_dir.mkdir(parents=True, exist_ok=True)
     
     def postdoc_agent(self) -> Agent:
-        """获取Agent实例"""
-        return Agent(
-            role="计算机科学博士后研究员",
-            goal="将研究计划转化为具体任务并整合研究成果",
-            backstory="""您是一位计算机科学领域的博士后研究员，
-                擅长将高水平的研究计划转化为具体的实验设计。
-                您负责理解和完善研究框架，分配研究任务，
-                并确保最终的论文符合学术规范。""",
-            verbose=True,
-            allow_delegation=False,
-            memory=True,
-            max_iterations=3,
-            tools=[]
-        )
+        """构建Agent实例"""
+        return Agent(**AGENT_CONFIG, tools=[])
+
+    def _execute(self, prompt: str):
+        """租借池中的Agent实例执行提示"""
+        with get_agent_pool().lease(_POOL_KEY, self.postdoc_agent) as agent:
+            return agent.execute(prompt)
     
+    @profiled()
     def analyze_framework(self, framework: Dict) -> Dict:
         """分析研究框架并提出完善建议
         
@@ -85,7 +84,7 @@ class PostDocAgent:
                 }}
             }}
             """
-            result = self.postdoc_agent().execute(prompt)
+            result = self._execute(prompt)
             try:
                 return json.loads(result)
             except json.JSONDecodeError as e:
@@ -95,6 +94,7 @@ class PostDocAgent:
             logger.error(f"分析框架时出错: {str(e)}")
             return {}
             
+    @profiled()
     def assign_tasks(self, task: str) -> Dict:
         """为研究任务生成具体的搜索关键词和要求
         
@@ -122,11 +122,12 @@ class PostDocAgent:
                 "expected_outcomes": ["预期结果1", "预期结果2"]
             }}
             """
-            return self.postdoc_agent().execute(prompt)
+            return self._execute(prompt)
         except Exception as e:
             logger.error(f"分配任务时出错: {str(e)}")
             return {}
             
+    @profiled()
     def integrate_paper(self, content: str) -> Dict:
         """整合论文段落，确保内容连贯
         
@@ -158,7 +159,7 @@ class PostDocAgent:
                 ]
             }}
             """
-            return self.postdoc_agent().execute(prompt)
+            return self._execute(prompt)
         except Exception as e:
             logger.error(f"整合论文时出错: {str(e)}")
             return {} 
\ No newline at end of file
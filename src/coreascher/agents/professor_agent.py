@@ -11,43 +11,48 @@ import json
 import logging
 from typing import Dict, List, Optional
 from pathlib import Path
-from loguru import logger
 from crewai import Agent
 from crewai.project import CrewBase
+from coreascher.agents.pool import get_agent_pool, pool_key
+from coreascher.monitoring.profiling import profiled
+from coreascher.service.reuse import get_topic_index, reuse_enabled
 
-# 设置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
+# Agent配置，相同配置的Agent实例在进程内复用
+AGENT_CONFIG = {
+    "role": "研究教授",
+    "goal": "指导和评审研究工作",
+    "backstory": """作为一位经验丰富的研究教授，您专注于帮助研究生完成高质量的研究工作。
+                您擅长制定研究框架、评审论文并提供建设性的反馈。""",
+    "verbose": True,
+    "allow_delegation": False,
+    "memory": True,
+    "max_iterations": 5,
+}
+_POOL_KEY = pool_key("professor", AGENT_CONFIG)
+
 @CrewBase
 class ProfessorAgent:
     """教授代理，负责研究指导和评审"""
     
     def __init__(self) -> None:
         """初始化教授代理"""
-        super().__init__()
         
         # 确保存储目录存在
         self.store_dir = Path("data/professor")
         self.store_dir.mkdir(parents=True, exist_ok=True)
     
     def professor_agent(self) -> Agent:
-        """获取Agent实例"""
-        return Agent(
-            role="研究教授",
-            goal="指导和评审研究工作",
-            backstory="""作为一位经验丰富的研究教授，您专注于帮助研究生完成高质量的研究工作。
-                您擅长制定研究框架、评审论文并提供建设性的反馈。""",
-            verbose=True,
-            allow_delegation=False,
-            memory=True,
-            max_iterations=5,
-            tools=[]
-        )
+        """构建Agent实例"""
+        return Agent(**AGENT_CONFIG, tools=[])
+
+    def _execute(self, prompt: str):
+        """租借池中的Agent实例执行提示"""
+        with get_agent_pool().lease(_POOL_KEY, self.professor_agent) as agent:
+            return agent.execute(prompt)
     
+    @profiled()
     def create_framework(self, topic: str) -> Dict:
         """创建研究框架
         
@@ -63,6 +68,17 @@ class ProfessorAgent:
         if not topic:
             logger.error("研究主题不能为空")
             raise ValueError("研究主题不能为空")
+
+        if reuse_enabled():
+            # 相近主题已有研究框架时直接沿用
+            match = get_topic_index().lookup(topic)
+            framework = ((match or {}).get("outputs") or {}).get("create_research_framework")
+            if framework:
+                try:
+                    logger.info(f"沿用相近主题「{match['topic']}」的研究框架（相似度 {match['score']}）")
+                    return json.loads(framework)
+                except json.JSONDecodeError:
+                    logger.warning(f"相近主题「{match['topic']}」的研究框架不是JSON，重新制定")
             
         try:
             prompt = f"""
@@ -80,7 +96,7 @@ class ProfessorAgent:
                 "expected_outcomes": ["预期成果1", "预期成果2"]
             }}
             """
-            result = self.professor_agent().execute(prompt)
+            result = self._execute(prompt)
             try:
                 return json.loads(result)
             except json.JSONDecodeError as e:
@@ -90,6 +106,7 @@ class ProfessorAgent:
             logger.error(f"创建研究框架时出错: {str(e)}")
             return {}
     
+    @profiled()
     def review_paper(self, paper: str) -> Dict:
         """评审论文
         
@@ -133,11 +150,12 @@ class ProfessorAgent:
                 "recommendations": ["建议1", "建议2"]
             }}
             """
-            return self.professor_agent().execute(prompt)
+            return self._execute(prompt)
         except Exception as e:
             logger.error(f"评审论文时出错: {str(e)}")
             return {}
     
+    @profiled()
     def provide_guidance(self, question: str) -> Dict:
         """提供研究指导
         
@@ -171,7 +189,7 @@ class ProfessorAgent:
                 "references": ["参考资料1", "参考资料2"]
             }}
             """
-            return self.professor_agent().execute(prompt)
+            return self._execute(prompt)
         except Exception as e:
             logger.error(f"提供指导意见时出错: {str(e)}")
             return {} 
\ No newline at end of file
@@ -11,43 +11,49 @@ import json
 import logging
 from pathlib import Path
 from typing import Dict, List, Optional
-from loguru import logger
 from crewai import Agent
-from crewai.project import CrewBase, agent
+from crewai.project import CrewBase
+from coreascher.agents.pool import get_agent_pool, pool_key
+from coreascher.monitoring.profiling import profiled
 
-# 设置日志
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Agent配置，相同配置的Agent实例在进程内复用
+AGENT_CONFIG = {
+    "role": "严谨的评审人",
+    "goal": "评估综述质量并提供改进建议",
+    "backstory": """您是一位严谨的评审人，
+                希望您的评审能给研究课题带来启发。
+                您注重论文的学术价值、创新性和规范性，
+                能够提供专业、建设性的修改意见。""",
+    "verbose": True,
+    "allow_delegation": False,
+    "memory": True,
+    "max_iterations": 3,
+}
+_POOL_KEY = pool_key("reviewer", AGENT_CONFIG)
+
 @CrewBase
 class ReviewerAgent:
     """评审人代理，负责论文评审和质量把控"""
     
     def __init__(self) -> None:
         """初始化评审人代理"""
-        super().__init__()
         
         # 确保存储目录存在
         self.store_dir = Path("data/reviewer")
         self.store_dir.mkdir(parents=True, exist_ok=True)
     
-    @agent
     def reviewer_agent(self) -> Agent:
-        """获取Agent实例"""
-        return Agent(
-            role="严谨的评审人",
-            goal="评估综述质量并提供改进建议",
-            backstory="""您是一位严谨的评审人，
-                希望您的评审能给研究课题带来启发。
-                您注重论文的学术价值、创新性和规范性，
-                能够提供专业、建设性的修改意见。""",
-            verbose=True,
-            allow_delegation=False,
-            memory=True,
-            max_iterations=3,
-            tools=[]
-        )
+        """构建Agent实例"""
+        return Agent(**AGENT_CONFIG, tools=[])
+
+    def _execute(self, prompt: str):
+        """租借池中的Agent实例执行提示"""
+        with get_agent_pool().lease(_POOL_KEY, self.reviewer_agent) as agent:
+            return agent.execute(prompt)
     
+    @profiled()
     def evaluate_paper(self, paper: str) -> Dict:
         """评估论文质量
         
@@ -90,11 +96,12 @@ class ReviewerAgent:
                 "recommendation": "接受/修改后接受/拒绝"
             }}
             """
-            return self.reviewer_agent().execute(prompt)
+            return self._execute(prompt)
         except Exception as e:
             logger.error(f"评估论文时出错: {str(e)}")
             return {}
     
+    @profiled()
     def provide_suggestions(self, evaluation: Dict) -> Dict:
         """提供修改建议
         
@@ -132,11 +139,12 @@ class ReviewerAgent:
                 "priority_order": ["建议1", "建议2"]  # 建议的优先顺序
             }}
             """
-            return self.reviewer_agent().execute(prompt)
+            return self._execute(prompt)
         except Exception as e:
             logger.error(f"提供修改建议时出错: {str(e)}")
             return {}
     
+    @profiled()
     def check_revision(self, original: str, revised: str, suggestions: Dict) -> Dict:
         """检查修改情况
         
@@ -180,11 +188,12 @@ class ReviewerAgent:
                 "next_steps": ["后续步骤1", "后续步骤2"]
             }}
             """
-            return self.reviewer_agent().execute(prompt)
+            return self._execute(prompt)
         except Exception as e:
             logger.error(f"检查修改情况时出错: {str(e)}")
             return {}
     
+    @profiled()
     def final_review(self, paper: str) -> Dict:
         """进行最终评审
         
@@ -225,7 +234,7 @@ class ReviewerAgent:
                 }}
             }}
             """
-            return self.reviewer_agent().execute(prompt)
+            return self._execute(prompt)
         except Exception as e:
             logger.error(f"进行最终评审时出错: {str(e)}")
             return {}
@@ -0,0 +1,243 @@
+"""
+确定性模拟LLM模块
+
+该模块提供离线运行Crew所需的模拟组件，负责：
+1. 按任务返回预设或模板生成的回复，同样的输入总是得到同样的输出
+2. 模拟可配置的调用延迟和token用量，并发出与真实LLM一致的crewAI事件（stream=True 时逐行发出流式片段）
+3. 提供离线的arXiv客户端，返回按检索词生成的确定性论文
+"""
+
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+from crewai import BaseLLM
+from pydantic import Field, PrivateAttr
+
+from coreascher.tools.chunk_store import estimate_tokens
+
+# 默认的最终答案模板
+DEFAULT_TEMPLATE = "【{task}】由{agent}完成。{filler}"
+
+# 补齐输出长度时使用的文本
+_FILLER_WORDS = (
+    "large language models retrieval augmented generation benchmark evaluation "
+    "transformer attention alignment reasoning survey dataset"
+).split()
+
+
+def _final_answer(text: str) -> str:
+    return f"Thought: I now can give a great answer\nFinal Answer: {text}"
+
+
+def _prompt_text(messages: Union[str, List[Dict[str, Any]]]) -> str:
+    if isinstance(messages, str):
+        return messages
+    return "\n".join(str(message.get("content", "")) for message in messages)
+
+
+class FakeLLM(BaseLLM):
+    """确定性的模拟LLM
+
+    回复按任务名称从 responses 中依次取出，取完后重复最后一条；没有预设回复的任务
+    使用 template 生成最终答案。预设回复为 dict 时表示一次工具调用，
+    形如 {"tool": "LiteratureSearch", "input": {"query": "..."}}。
+    """
+
+    model: str = "fake/deterministic"
+    responses: Dict[str, List[Union[str, Dict[str, Any]]]] = Field(default_factory=dict)
+    template: str = DEFAULT_TEMPLATE
+    latency: float = 0.0
+    per_token_latency: float = 0.0
+    jitter: float = 0.0
+    output_tokens: int = 64
+    input_tokens: Optional[int] = None
+    seed: Optional[int] = 0
+
+    _calls: Dict[str, int] = PrivateAttr(default_factory=dict)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _total_calls: int = PrivateAttr(default=0)
+
+    def __init__(self, **data: Any) -> None:
+        data.setdefault("model", "fake/deterministic")
+        super().__init__(**data)
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None, **kwargs) -> str:
+        """生成一次确定性回复"""
+        task = getattr(from_task, "name", None) or "task"
+        agent = getattr(from_agent, "role", None) or "agent"
+        index = self._call_index(task, from_task, messages)
+        with self._lock:
+            self._total_calls += 1
+
+        with _call_scope():
+            self._emit("started", messages=messages, from_task=from_task, from_agent=from_agent)
+            response = self._response(task, agent, index, self._scripted(task, from_task))
+            prompt_tokens = self.input_tokens if self.input_tokens is not None else estimate_tokens(_prompt_text(messages))
+            completion_tokens = estimate_tokens(response)
+            if self.stream:
+                self._stream(response, task, index, from_task, from_agent)
+            else:
+                self._sleep(task, index, completion_tokens)
+            usage = {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "successful_requests": 1,
+            }
+            if hasattr(self, "_track_token_usage_internal"):
+                self._track_token_usage_internal(usage)
+            self._emit("completed", response=response, messages=messages, usage=usage,
+                       from_task=from_task, from_agent=from_agent)
+        return response
+
+    def _call_index(self, task: str, from_task: Any, messages: Any) -> int:
+        """本次调用的回复序号，默认按任务名称依次计数"""
+        with self._lock:
+            index = self._calls.get(task, 0)
+            self._calls[task] = index + 1
+        return index
+
+    def _scripted(self, task: str, from_task: Any) -> Optional[List[Union[str, Dict[str, Any]]]]:
+        """任务的预设回复"""
+        return self.responses.get(task)
+
+    def _response(self, task: str, agent: str, index: int,
+                  scripted: Optional[List[Union[str, Dict[str, Any]]]] = None) -> str:
+        if scripted:
+            item = scripted[min(index, len(scripted) - 1)]
+            if isinstance(item, dict):
+                return (f"Thought: 需要调用{item['tool']}\nAction: {item['tool']}\n"
+                        f"Action Input: {json.dumps(item.get('input', {}), ensure_ascii=False)}")
+            return _final_answer(item)
+        filler = " ".join(_FILLER_WORDS[i % len(_FILLER_WORDS)] for i in range(max(0, self.output_tokens - 16)))
+        return _final_answer(self.template.format(task=task, agent=agent, index=index, filler=filler))
+
+    def _delay(self, task: str, index: int, completion_tokens: int) -> float:
+        """计算模拟的调用延迟，抖动由任务名和调用序号确定"""
+        delay = self.latency + self.per_token_latency * completion_tokens
+        if self.jitter:
+            digest = hashlib.md5(f"{self.seed}:{task}:{index}".encode("utf-8")).hexdigest()
+            delay += random.Random(int(digest[:8], 16)).uniform(0, self.jitter)
+        return delay
+
+    def _sleep(self, task: str, index: int, completion_tokens: int) -> None:
+        """模拟调用延迟"""
+        delay = self._delay(task, index, completion_tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _stream(self, response: str, task: str, index: int, from_task: Any, from_agent: Any) -> None:
+        """逐行发出流式片段，固定延迟在首个片段之前，其余延迟按token数分摊到各片段"""
+        if self.latency > 0:
+            time.sleep(self.latency)
+        chunks = response.splitlines(keepends=True)
+        spread = self._delay(task, index, estimate_tokens(response)) - self.latency
+        total_tokens = max(1, sum(estimate_tokens(chunk) for chunk in chunks))
+        for chunk in chunks:
+            if spread > 0:
+                time.sleep(spread * estimate_tokens(chunk) / total_tokens)
+            if hasattr(self, "_emit_stream_chunk_event"):
+                self._emit_stream_chunk_event(chunk=chunk, from_task=from_task, from_agent=from_agent)
+
+    def _emit(self, phase: str, **kwargs) -> None:
+        """发出与真实LLM一致的调用事件，供运行指标和预算控制使用"""
+        try:
+            if phase == "started" and hasattr(self, "_emit_call_started_event"):
+                self._emit_call_started_event(
+                    messages=kwargs["messages"], from_task=kwargs["from_task"], from_agent=kwargs["from_agent"]
+                )
+            elif phase == "completed" and hasattr(self, "_emit_call_completed_event"):
+                from crewai.events.types.llm_events import LLMCallType
+                self._emit_call_completed_event(
+                    response=kwargs["response"], call_type=LLMCallType.LLM_CALL,
+                    from_task=kwargs["from_task"], from_agent=kwargs["from_agent"],
+                    messages=kwargs["messages"], usage=kwargs["usage"],
+                )
+        except ImportError:
+            pass
+
+    def supports_function_calling(self) -> bool:
+        """使用ReAct文本格式，便于预设工具调用"""
+        return False
+
+    def supports_stop_words(self) -> bool:
+        return False
+
+    def get_context_window_size(self) -> int:
+        return 128000
+
+    @property
+    def call_count(self) -> int:
+        """已处理的调用总数"""
+        return self._total_calls
+
+    def reset(self) -> None:
+        """清空调用计数，使下一次运行得到同样的回复序列"""
+        with self._lock:
+            self._calls.clear()
+            self._total_calls = 0
+
+
+def _call_scope():
+    """建立LLM调用作用域，使起止事件共享同一个call_id"""
+    try:
+        from crewai.llms.base_llm import llm_call_context
+    except ImportError:
+        from contextlib import nullcontext
+        return nullcontext()
+    return llm_call_context()
+
+
+class FakeArxivClient:
+    """离线arXiv客户端，按检索词生成确定性的论文"""
+
+    def __init__(self, latency: float = 0.0, results_per_query: Optional[int] = None) -> None:
+        """初始化离线客户端
+
+        Args:
+            latency: 每次检索的模拟延迟（秒）
+            results_per_query: 每次检索返回的论文数，默认等于检索的 max_results
+        """
+        self.latency = latency
+        self.results_per_query = results_per_query
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def results(self, search: Any) -> Iterator[SimpleNamespace]:
+        """按检索词生成论文，与 arxiv.Client.results 的返回格式一致"""
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        query = str(search.query)
+        count = self.results_per_query or int(search.max_results or 10)
+        digest = hashlib.md5(query.encode("utf-8")).hexdigest()
+        base = datetime(2020, 1, 1, tzinfo=timezone.utc)
+        for i in range(count):
+            paper_id = f"{int(digest[:4], 16) % 2400 + 2000}.{int(digest[4:9], 16) % 100000 + i:05d}"
+            yield SimpleNamespace(
+                title=f"{query} study {i + 1}",
+                authors=[SimpleNamespace(name=f"Author {j + 1}") for j in range(3)],
+                summary=f"We study {query}. " + " ".join(_FILLER_WORDS),
+                published=base + timedelta(days=(int(digest[9:13], 16) + 37 * i) % 1800),
+                pdf_url=f"http://arxiv.org/pdf/{paper_id}v1",
+                entry_id=f"http://arxiv.org/abs/{paper_id}v1",
+                journal_ref=("NeurIPS", "ICML", "ICLR", "AAAI", None)[i % 5],
+                comment=None,
+                primary_category="cs.CL",
+            )
+
+
+def install_offline_tools(agents: Sequence[Any], client: FakeArxivClient) -> None:
+    """将Agent持有的文献检索工具切换为离线客户端"""
+    for agent in agents:
+        for tool in getattr(agent, "tools", None) or []:
+            if hasattr(tool, "client"):
+                tool.client = client
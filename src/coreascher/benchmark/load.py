@@ -0,0 +1,348 @@
+"""
+多主题并发负载测试模块
+
+该模块按设定的到达速率并发提交多个研究主题的文献综述请求，负责：
+1. 以泊松到达（或一次性全部到达）的方式生成请求，经与HTTP服务相同的任务队列和综述执行器执行
+2. 使用模拟LLM和离线arXiv客户端运行完整的文献综述Crew，每个请求使用独立的工作目录
+3. 统计吞吐量（每小时综述数）、排队与端到端延迟分位数、缓存命中率、Crew池和调度器统计以及峰值内存
+
+用于在上线前确定工作线程池大小并找出并发下的争用点。
+
+用法：
+    python -m coreascher.benchmark.load [--requests N] [--concurrency N] [--rate 每秒请求数] [--latency 秒]
+                                        [--pool-size N] [--llm-concurrency N] [--no-llm-cache]
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from pydantic import Field
+
+from coreascher.benchmark.fake_llm import FakeArxivClient, FakeLLM
+from coreascher.benchmark.pipeline import DEFAULT_INPUTS, percentile
+from coreascher.monitoring.logs import setup_logging
+from coreascher.service.jobs import SUCCEEDED, JobQueue, ReviewRunner
+from coreascher.service.scheduler import configure_scheduler
+from coreascher.tools.llm_cache import CachedLLM, LLMResponseCache
+from coreascher.tools.search_cache import get_search_cache
+
+logger = logging.getLogger(__name__)
+
+# 默认研究主题及其检索关键词
+DEFAULT_TOPICS: List[Tuple[str, str]] = [
+    ("检索增强生成", "retrieval augmented generation, hallucination"),
+    ("大语言模型推理", "chain of thought, large language model reasoning"),
+    ("图神经网络", "graph neural network, message passing"),
+    ("多模态大模型", "vision language model, multimodal instruction tuning"),
+    ("代码生成", "code generation, program synthesis"),
+    ("模型压缩", "quantization, knowledge distillation"),
+    ("强化学习对齐", "reinforcement learning from human feedback, preference optimization"),
+    ("智能体规划", "llm agent, tool use planning"),
+]
+
+# RSS 采样间隔（秒）
+RSS_SAMPLE_INTERVAL = 0.05
+
+
+def topic_request(topic: str, keywords: str) -> Tuple[Dict[str, str], Dict[str, List[Any]]]:
+    """生成一个主题的任务输入和模拟LLM预设回复
+
+    文献检索任务按关键词逐个调用检索工具，相同关键词的请求可以命中检索缓存。
+
+    Returns:
+        (任务输入, 预设回复)
+    """
+    inputs = dict(DEFAULT_INPUTS, topic=topic, keywords=keywords)
+    queries = [keyword.strip() for keyword in keywords.split(",") if keyword.strip()]
+    responses = {
+        "search_literature": [
+            {"tool": "LiteratureSearch", "input": {"query": query}} for query in queries
+        ] + [f"检索到与「{topic}」相关的文献，详见检索结果。"],
+    }
+    return inputs, responses
+
+
+def arrival_offsets(count: int, rate: Optional[float], seed: int = 0) -> List[float]:
+    """生成请求的到达时刻（相对开始的秒数）
+
+    Args:
+        count: 请求数
+        rate: 平均到达速率（每秒请求数），为空或0时所有请求在开始时同时到达
+        seed: 随机种子
+
+    Returns:
+        单调不减的到达时刻列表
+    """
+    if not rate:
+        return [0.0] * count
+    rng = random.Random(seed)
+    offsets, now = [], 0.0
+    for _ in range(count):
+        offsets.append(now)
+        now += rng.expovariate(rate)
+    return offsets
+
+
+def current_rss_mb() -> Optional[float]:
+    """读取当前进程的常驻内存（MB），不支持的平台返回None"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def peak_rss_mb() -> Optional[float]:
+    """进程生命周期内的峰值常驻内存（MB），不支持的平台返回None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以KB为单位，macOS 以字节为单位
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class RssSampler:
+    """后台采样常驻内存，记录测试期间的峰值"""
+
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL) -> None:
+        self.interval = interval
+        self.start_mb = current_rss_mb()
+        self.peak_mb = self.start_mb
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            rss = current_rss_mb()
+            if rss is not None and (self.peak_mb is None or rss > self.peak_mb):
+                self.peak_mb = rss
+
+    def __enter__(self) -> "RssSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def _distribution(values: Sequence[float]) -> Dict[str, float]:
+    return {
+        "p50": round(percentile(list(values), 0.5), 4),
+        "p90": round(percentile(list(values), 0.9), 4),
+        "p95": round(percentile(list(values), 0.95), 4),
+        "p99": round(percentile(list(values), 0.99), 4),
+        "max": round(max(values), 4) if values else 0.0,
+    }
+
+
+class TopicLLM(FakeLLM):
+    """多个主题的请求共用的模拟LLM
+
+    服务中所有任务共用一个LLM：按任务描述中的检索关键词选择对应主题的预设回复，
+    回复序号按对话中已有的LLM回复数确定，并发运行的Crew和回复缓存都不影响回复顺序。
+    """
+
+    topic_responses: Dict[str, Dict[str, List[Any]]] = Field(default_factory=dict)
+
+    def _call_index(self, task: str, from_task: Any, messages: Any) -> int:
+        if isinstance(messages, str):
+            return 0
+        return sum(1 for message in messages if message.get("role") == "assistant")
+
+    def _scripted(self, task: str, from_task: Any) -> Optional[List[Any]]:
+        description = getattr(from_task, "description", "") or ""
+        for keywords, responses in self.topic_responses.items():
+            if keywords in description:
+                return responses.get(task)
+        return super()._scripted(task, from_task)
+
+
+class LoadTestRunner(ReviewRunner):
+    """负载测试使用的综述执行器，可关闭Agent记忆
+
+    记忆会调用嵌入服务并写入本地向量库，离线负载测试默认不使用。
+    """
+
+    def __init__(self, memory: bool = False, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.memory = memory
+
+    def _build_crew(self) -> Tuple[Any, Any]:
+        crew_base, crew = super()._build_crew()
+        if not self.memory:
+            for agent in crew.agents:
+                agent.memory = False
+        return crew_base, crew
+
+
+def _seconds_between(start: Optional[str], end: Optional[str]) -> float:
+    if not start or not end:
+        return 0.0
+    return (datetime.fromisoformat(end) - datetime.fromisoformat(start)).total_seconds()
+
+
+def run_load_test(requests: int = 20, concurrency: int = 4, rate: Optional[float] = None,
+                  topics: Optional[Sequence[Tuple[str, str]]] = None, latency: float = 0.0,
+                  jitter: float = 0.0, output_tokens: int = 64, search_latency: float = 0.0,
+                  seed: int = 0, workdir: Optional[Path] = None, pool_size: Optional[int] = None,
+                  llm_concurrency: Optional[int] = None, search_concurrency: Optional[int] = None,
+                  llm_cache: bool = True, memory: bool = False) -> Dict[str, Any]:
+    """运行多主题并发负载测试
+
+    请求与HTTP服务一样经 JobQueue 和 ReviewRunner 执行：每个请求使用独立的工作目录，
+    Crew从实例池租借，LLM调用和检索由调度器分配并发额度。
+
+    Args:
+        requests: 请求总数，按顺序轮流使用各研究主题
+        concurrency: 工作线程数，即同时运行的Crew数上限
+        rate: 平均到达速率（每秒请求数），为空时所有请求同时到达
+        topics: (研究主题, 逗号分隔的关键词) 列表，默认为 DEFAULT_TOPICS
+        latency: 每次LLM调用的模拟延迟（秒）
+        jitter: LLM延迟的最大随机抖动（秒）
+        output_tokens: 模板回复的目标token数
+        search_latency: 每次arXiv检索的模拟延迟（秒）
+        seed: 到达时刻和抖动的随机种子
+        workdir: 各请求工作目录的根目录，默认使用临时目录
+        pool_size: 预先构建的Crew数，默认等于工作线程数（与服务相同），为0时不使用实例池
+        llm_concurrency: 所有请求合计的LLM调用并发上限，为None时取环境变量
+        search_concurrency: 所有请求合计的arXiv检索并发上限，为None时取环境变量
+        llm_cache: 是否在请求之间共享LLM回复缓存
+        memory: 是否保留Agent记忆
+
+    Returns:
+        负载测试结果字典
+    """
+    topics = list(topics or DEFAULT_TOPICS)
+    client = FakeArxivClient(latency=search_latency)
+    cache = get_search_cache()
+    cache.clear()
+    offsets = arrival_offsets(requests, rate, seed)
+    requests_by_topic = [topic_request(topic, keywords) for topic, keywords in topics]
+    llm = TopicLLM(topic_responses={inputs["keywords"]: responses for inputs, responses in requests_by_topic},
+                   latency=latency, jitter=jitter, output_tokens=output_tokens, seed=seed)
+    response_cache = LLMResponseCache() if llm_cache else None
+    scheduler = configure_scheduler(llm=llm_concurrency, search=search_concurrency)
+
+    with tempfile.TemporaryDirectory(prefix="coreascher-load-") as tmp:
+        runner = LoadTestRunner(llm=llm, client=client, workspace_root=Path(workdir or tmp), scheduler=scheduler,
+                                pool_size=concurrency if pool_size is None else pool_size, memory=memory)
+        if response_cache is not None:
+            # 与批量综述相同，缓存包在调度包装之外，命中的调用不占用额度
+            runner.llm = CachedLLM(runner.llm, response_cache)
+        runner.warm()
+        jobs = JobQueue(workers=concurrency, runner=runner, scheduler=scheduler).start()
+        try:
+            with RssSampler() as sampler:
+                started = time.perf_counter()
+                submitted = []
+                for index, offset in enumerate(offsets):
+                    delay = started + offset - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    inputs, _ = requests_by_topic[index % len(topics)]
+                    submitted.append(jobs.submit(inputs["topic"], {k: v for k, v in inputs.items() if k != "topic"}))
+                for job in submitted:
+                    job.done.wait()
+                elapsed = time.perf_counter() - started
+            queue_stats = jobs.stats()
+        finally:
+            jobs.stop()
+            runner.close()
+
+    completed = [job for job in submitted if job.status == SUCCEEDED]
+    for job in submitted:
+        if job.status != SUCCEEDED:
+            logger.error(f"负载测试请求 {job.id}（{job.topic}）失败: {job.error}")
+    process_peak = peak_rss_mb()
+    return {
+        "requests": requests,
+        "completed": len(completed),
+        "failed": requests - len(completed),
+        "concurrency": concurrency,
+        "arrival_rate": rate,
+        "topics": len(topics),
+        "elapsed_seconds": round(elapsed, 4),
+        "reviews_per_hour": round(len(completed) / elapsed * 3600, 1) if elapsed else 0.0,
+        "latency_seconds": _distribution([_seconds_between(job.submitted_at, job.finished_at) for job in completed]),
+        "queue_wait_seconds": _distribution([_seconds_between(job.submitted_at, job.started_at) for job in completed]),
+        "service_seconds": _distribution([_seconds_between(job.started_at, job.finished_at) for job in completed]),
+        "llm_calls": sum(job.result["metrics"]["llm_calls"] for job in completed),
+        "arxiv_requests": client.calls,
+        "search_cache": cache.stats(),
+        "llm_cache": response_cache.stats() if response_cache is not None else None,
+        "crew_pool": queue_stats["crew_pool"],
+        "scheduler": queue_stats["scheduler"],
+        "memory_mb": {
+            "start_rss": round(sampler.start_mb, 1) if sampler.start_mb is not None else None,
+            "peak_rss": round(sampler.peak_mb, 1) if sampler.peak_mb is not None else None,
+            "process_peak_rss": round(process_peak, 1) if process_peak is not None else None,
+        },
+    }
+
+
+def _load_topics(path: Path) -> List[Tuple[str, str]]:
+    """读取主题文件，每行为 "研究主题<TAB>关键词1, 关键词2"，只有主题时以主题作为关键词"""
+    topics = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if not line.strip() or line.startswith("#"):
+            continue
+        topic, _, keywords = line.partition("\t")
+        topics.append((topic.strip(), keywords.strip() or topic.strip()))
+    return topics
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="使用模拟LLM对文献综述流水线进行多主题并发负载测试")
+    parser.add_argument("--requests", type=int, default=20, help="请求总数")
+    parser.add_argument("--concurrency", type=int, default=4, help="工作线程数")
+    parser.add_argument("--rate", type=float, default=None, help="平均到达速率（每秒请求数），默认所有请求同时到达")
+    parser.add_argument("--topics-file", type=Path, default=None,
+                        help="主题文件，每行为 研究主题<TAB>逗号分隔的关键词")
+    parser.add_argument("--latency", type=float, default=0.0, help="每次LLM调用的模拟延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="LLM延迟的最大随机抖动（秒）")
+    parser.add_argument("--output-tokens", type=int, default=64, help="模板回复的目标token数")
+    parser.add_argument("--search-latency", type=float, default=0.0, help="每次arXiv检索的模拟延迟（秒）")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--workdir", type=Path, default=None, help="各请求工作目录的根目录，默认使用临时目录")
+    parser.add_argument("--pool-size", type=int, default=None, help="预先构建的Crew数，默认等于工作线程数")
+    parser.add_argument("--llm-concurrency", type=int, default=None, help="所有请求合计的LLM调用并发上限")
+    parser.add_argument("--search-concurrency", type=int, default=None, help="所有请求合计的arXiv检索并发上限")
+    parser.add_argument("--no-llm-cache", action="store_true", help="不在请求之间共享LLM回复缓存")
+    parser.add_argument("--memory", action="store_true", help="保留Agent记忆")
+    parser.add_argument("--output", type=Path, default=None, help="结果JSON输出路径")
+    args = parser.parse_args(argv)
+
+    setup_logging(logging.WARNING)
+    result = run_load_test(
+        requests=args.requests, concurrency=args.concurrency, rate=args.rate,
+        topics=_load_topics(args.topics_file) if args.topics_file else None,
+        latency=args.latency, jitter=args.jitter, output_tokens=args.output_tokens,
+        search_latency=args.search_latency, seed=args.seed, workdir=args.workdir, pool_size=args.pool_size,
+        llm_concurrency=args.llm_concurrency, search_concurrency=args.search_concurrency,
+        llm_cache=not args.no_llm_cache, memory=args.memory,
+    )
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text, encoding="utf-8")
+    print(text)
+    return 1 if result["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+"""
+离线端到端基准测试模块
+
+该模块使用模拟LLM和离线arXiv客户端完整运行文献综述Crew，负责：
+1. 在不访问网络的情况下重复执行整条流水线
+2. 统计墙钟时间、模拟LLM耗时、工具耗时和编排开销
+3. 比较串行与并发运行、冷缓存与热缓存下的表现
+
+用法：
+    python -m coreascher.benchmark.pipeline [--runs N] [--concurrency N] [--latency 秒] [--cold]
+"""
+
+import argparse
+import json
+import logging
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from coreascher.benchmark.fake_llm import FakeArxivClient, FakeLLM, install_offline_tools
+from coreascher.monitoring import profiling
+from coreascher.monitoring.logs import setup_logging
+from coreascher.monitoring.metrics import RunMetrics
+from coreascher.monitoring.trace import TraceRecorder
+from coreascher.tools.search_cache import get_search_cache
+
+logger = logging.getLogger(__name__)
+
+# 基准测试使用的任务输入
+DEFAULT_INPUTS = {
+    "topic": "大语言模型检索增强生成",
+    "keywords": "retrieval augmented generation, large language model",
+    "research_design": "综述检索增强生成的方法、评测与挑战",
+    "paper_draft": "检索增强生成通过外部知识缓解大模型幻觉问题。",
+}
+
+# 预设回复：文献检索任务先调用两次检索工具再给出答案
+DEFAULT_RESPONSES = {
+    "search_literature": [
+        {"tool": "LiteratureSearch", "input": {"query": "retrieval augmented generation"}},
+        {"tool": "LiteratureSearch", "input": {"query": "large language model", "min_year": 2022}},
+        "检索到与各研究任务相关的文献，详见检索结果。",
+    ],
+}
+
+
+def percentile(values: List[float], q: float) -> float:
+    """计算分位数，values 为空时返回0"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def offline_runner():
+    """创建使用模拟LLM和离线arXiv客户端的综述执行器
+
+    可作为批量综述多进程模式的 runner_factory，在不访问网络的情况下演练批量运行。
+    """
+    from coreascher.service.jobs import ReviewRunner
+
+    return ReviewRunner(llm=FakeLLM(responses=DEFAULT_RESPONSES), client=FakeArxivClient())
+
+
+def run_once(llm: FakeLLM, client: FakeArxivClient, inputs: Optional[Dict[str, str]] = None,
+             memory: bool = False, trace_dir: Optional[Path] = None,
+             workspace: Optional[Path] = None) -> Dict[str, Any]:
+    """离线执行一次完整的文献综述Crew
+
+    Args:
+        llm: 模拟LLM
+        client: 离线arXiv客户端
+        inputs: 任务输入，默认为 DEFAULT_INPUTS
+        memory: 是否保留Agent记忆，记忆会额外调用LLM并写入本地存储
+        trace_dir: 时间线输出目录，为None时不记录时间线
+        workspace: 任务输出文件的写入目录，为None时写入当前目录
+
+    Returns:
+        本次运行的指标汇总，附带 bench_wall_seconds 和 overhead_seconds
+    """
+    from coreascher.crew import LiteratureReviewCrew
+    from coreascher.service.jobs import redirect_outputs
+
+    started = time.perf_counter()
+    crew = LiteratureReviewCrew(llm=llm).literature_review_crew()
+    crew.verbose = False
+    for agent in crew.agents:
+        agent.verbose = False
+        if not memory:
+            agent.memory = False
+    if workspace is not None:
+        redirect_outputs(crew, Path(workspace))
+    install_offline_tools(crew.agents, client)
+    profiling.profile_crew(crew)
+    metrics = RunMetrics().attach(crew)
+    trace = TraceRecorder(metrics.run_id).attach(crew) if trace_dir is not None else None
+    try:
+        crew.kickoff(inputs=inputs or DEFAULT_INPUTS)
+    finally:
+        metrics.detach()
+        if trace is not None:
+            trace.detach()
+            trace.export(trace_dir)
+    wall = time.perf_counter() - started
+
+    summary = metrics.summary()
+    llm_seconds = sum(stage["llm_seconds"] for stage in summary["stages"])
+    tool_seconds = sum(stage["tool_seconds"] for stage in summary["stages"])
+    summary["bench_wall_seconds"] = round(wall, 4)
+    summary["overhead_seconds"] = round(max(0.0, wall - llm_seconds - tool_seconds), 4)
+    return summary
+
+
+def run_benchmark(runs: int = 5, concurrency: int = 1, latency: float = 0.0, jitter: float = 0.0,
+                  output_tokens: int = 64, search_latency: float = 0.0, cold: bool = False,
+                  seed: int = 0, memory: bool = False, workdir: Optional[Path] = None,
+                  trace_dir: Optional[Path] = None) -> Dict[str, Any]:
+    """重复执行离线流水线并汇总结果
+
+    Args:
+        runs: 运行次数
+        concurrency: 同时运行的Crew数
+        latency: 每次LLM调用的模拟延迟（秒）
+        jitter: LLM延迟的最大随机抖动（秒），由 seed 确定
+        output_tokens: 模板回复的目标token数
+        search_latency: 每次arXiv检索的模拟延迟（秒）
+        cold: 是否在每次运行前清空检索缓存
+        seed: 抖动随机种子
+        memory: 是否保留Agent记忆
+        workdir: 各次运行输出目录的根目录，第 i 次运行的任务输出写在 <workdir>/run-<i>/ 下，默认使用临时目录
+        trace_dir: 时间线输出目录，为None时不记录时间线
+
+    Returns:
+        基准测试结果字典
+    """
+    client = FakeArxivClient(latency=search_latency)
+    cache = get_search_cache()
+    cache.clear()
+
+    with tempfile.TemporaryDirectory(prefix="coreascher-bench-") as tmp:
+        root = Path(workdir or tmp)
+
+        def one(index: int) -> Dict[str, Any]:
+            if cold:
+                cache.clear()
+            llm = FakeLLM(responses=DEFAULT_RESPONSES, latency=latency, jitter=jitter,
+                          output_tokens=output_tokens, seed=seed + index)
+            # 每次运行写各自的输出目录，并发运行互不覆盖，也不需要切换进程的工作目录
+            return run_once(llm, client, memory=memory, trace_dir=trace_dir, workspace=root / f"run-{index}")
+
+        started = time.perf_counter()
+        if concurrency <= 1:
+            results = [one(i) for i in range(runs)]
+        else:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                results = list(executor.map(one, range(runs)))
+        elapsed = time.perf_counter() - started
+
+    walls = [result["bench_wall_seconds"] for result in results]
+    overheads = [result["overhead_seconds"] for result in results]
+    return {
+        "runs": runs,
+        "concurrency": concurrency,
+        "latency": latency,
+        "cold_cache": cold,
+        "memory": memory,
+        "elapsed_seconds": round(elapsed, 4),
+        "runs_per_minute": round(runs / elapsed * 60, 2) if elapsed else 0.0,
+        "wall_seconds": {
+            "mean": round(statistics.mean(walls), 4),
+            "p50": round(percentile(walls, 0.5), 4),
+            "p95": round(percentile(walls, 0.95), 4),
+            "max": round(max(walls), 4),
+        },
+        "overhead_seconds": {
+            "mean": round(statistics.mean(overheads), 4),
+            "p95": round(percentile(overheads, 0.95), 4),
+        },
+        "llm_calls": sum(result["llm_calls"] for result in results),
+        "tool_calls": sum(result["tool_calls"] for result in results),
+        "arxiv_requests": client.calls,
+        "search_cache": cache.stats(),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="使用模拟LLM离线运行文献综述流水线基准测试")
+    parser.add_argument("--runs", type=int, default=5, help="运行次数")
+    parser.add_argument("--concurrency", type=int, default=1, help="同时运行的Crew数")
+    parser.add_argument("--latency", type=float, default=0.0, help="每次LLM调用的模拟延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="LLM延迟的最大随机抖动（秒）")
+    parser.add_argument("--output-tokens", type=int, default=64, help="模板回复的目标token数")
+    parser.add_argument("--search-latency", type=float, default=0.0, help="每次arXiv检索的模拟延迟（秒）")
+    parser.add_argument("--cold", action="store_true", help="每次运行前清空检索缓存")
+    parser.add_argument("--seed", type=int, default=0, help="抖动随机种子")
+    parser.add_argument("--memory", action="store_true", help="保留Agent记忆")
+    parser.add_argument("--workdir", type=Path, default=None, help="各次运行输出目录的根目录，默认使用临时目录")
+    parser.add_argument("--trace-dir", type=Path, default=None, help="为每次运行导出Chrome时间线到该目录")
+    parser.add_argument("--profile-dir", type=Path, default=None,
+                        help="按任务和Agent方法分阶段剖析，pstats 和折叠栈文件写入该目录")
+    parser.add_argument("--output", type=Path, default=None, help="结果JSON输出路径")
+    args = parser.parse_args(argv)
+
+    setup_logging(logging.WARNING)
+    if args.profile_dir is not None:
+        profiling.enable_profiling(args.profile_dir.resolve())
+    result = run_benchmark(
+        runs=args.runs, concurrency=args.concurrency, latency=args.latency, jitter=args.jitter,
+        output_tokens=args.output_tokens, search_latency=args.search_latency, cold=args.cold, seed=args.seed,
+        memory=args.memory, workdir=args.workdir, trace_dir=args.trace_dir,
+    )
+    if args.profile_dir is not None:
+        profiling.dump_profiles()
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text, encoding="utf-8")
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,338 @@
+"""
+性能回归门禁模块
+
+该模块重复运行一组基准测试，并与仓库中保存的基线结果比较，负责：
+1. 测量检索层、无LLM的完整流水线、命令行冷启动和内存占用等指标
+2. 对耗时类指标使用多次试验的中位数和 Mann-Whitney U 检验，只有超出容差且差异显著时才判定回归
+3. 对token数、调用次数等确定性指标按容差直接比较，并输出逐项对比表
+
+用法：
+    python -m coreascher.benchmark.regression                # 与基线比较，出现回归时返回1
+    python -m coreascher.benchmark.regression --update       # 重新测量并写入基线
+    python -m coreascher.benchmark.regression --tolerance latency=0.25,memory=0.1
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import unicodedata
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from coreascher.monitoring.logs import setup_logging
+
+logger = logging.getLogger(__name__)
+
+# 仓库中保存的基线文件
+DEFAULT_BASELINE = Path(__file__).resolve().parents[3] / "benchmarks" / "baseline.json"
+
+# 各类指标的默认容差（相对基线中位数的增幅）
+DEFAULT_TOLERANCES = {"latency": 0.25, "memory": 0.15, "count": 0.0}
+
+# 耗时类指标的绝对噪声下限，增幅小于该值时不判定回归
+MIN_DELTA = {"latency": 0.002, "memory": 0.5, "count": 0.0}
+
+# 显著性水平
+ALPHA = 0.05
+
+# 可选的基准测试套件
+SUITES = ("search", "pipeline", "startup", "memory")
+
+_CHECK_PASSED = "通过"
+_CHECK_REGRESSED = "回归"
+_CHECK_IMPROVED = "改善"
+_CHECK_MISSING = "无基线"
+
+
+def mann_whitney_p(baseline: Sequence[float], current: Sequence[float]) -> float:
+    """单侧 Mann-Whitney U 检验，返回"当前样本系统性大于基线"的p值
+
+    使用带并列校正的正态近似，样本量较小时结果偏保守。
+    """
+    n1, n2 = len(baseline), len(current)
+    if not n1 or not n2:
+        return 1.0
+    ranked = sorted([(value, 0) for value in baseline] + [(value, 1) for value in current])
+    ranks = [0.0] * len(ranked)
+    ties = 0.0
+    i = 0
+    while i < len(ranked):
+        j = i
+        while j + 1 < len(ranked) and ranked[j + 1][0] == ranked[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        size = j - i + 1
+        ties += size ** 3 - size
+        i = j + 1
+    rank_sum = sum(rank for rank, (_, group) in zip(ranks, ranked) if group == 1)
+    u = rank_sum - n2 * (n2 + 1) / 2
+    mean = n1 * n2 / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1))) if n > 1 else 0.0
+    if variance <= 0:
+        return 0.0 if u > mean else 1.0
+    z = (u - mean - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def _repeat(trials: int, measure: Callable[[], float]) -> List[float]:
+    return [round(measure(), 6) for _ in range(trials)]
+
+
+def _search_suite(trials: int) -> Dict[str, Dict[str, Any]]:
+    """检索层：离线客户端下的冷缓存与热缓存检索耗时"""
+    from coreascher.benchmark.fake_llm import FakeArxivClient
+    from coreascher.tools.custom_tool import LiteratureSearch
+    from coreascher.tools.search_cache import get_search_cache
+
+    tool = LiteratureSearch(client=FakeArxivClient())
+    cache = get_search_cache()
+    queries = ["retrieval augmented generation", "graph neural network", "knowledge distillation"]
+
+    def search(cold: bool) -> float:
+        if cold:
+            cache.clear()
+        started = time.perf_counter()
+        for query in queries:
+            tool.search(query, max_results=30)
+        return time.perf_counter() - started
+
+    search(True)
+    result = {
+        "search.cold_seconds": {"kind": "latency", "samples": _repeat(trials, lambda: search(True))},
+        "search.warm_seconds": {"kind": "latency", "samples": _repeat(trials, lambda: search(False))},
+    }
+    cache.clear()
+    return result
+
+
+def _pipeline_once(trace_memory: bool = False) -> Dict[str, Any]:
+    from coreascher.benchmark.fake_llm import FakeArxivClient, FakeLLM
+    from coreascher.benchmark.pipeline import DEFAULT_RESPONSES, run_once
+    from coreascher.tools.search_cache import get_search_cache
+
+    get_search_cache().clear()
+    llm = FakeLLM(responses=DEFAULT_RESPONSES)
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        with tempfile.TemporaryDirectory(prefix="coreascher-regression-") as tmp:
+            summary = run_once(llm, FakeArxivClient(), workspace=Path(tmp))
+        if trace_memory:
+            summary["peak_alloc_mb"] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    return summary
+
+
+def _pipeline_suite(trials: int) -> Dict[str, Dict[str, Any]]:
+    """无LLM的完整流水线：编排开销、LLM调用次数和token数"""
+    _pipeline_once()
+    runs = [_pipeline_once() for _ in range(trials)]
+    return {
+        "pipeline.wall_seconds": {"kind": "latency", "samples": [run["bench_wall_seconds"] for run in runs]},
+        "pipeline.overhead_seconds": {"kind": "latency", "samples": [run["overhead_seconds"] for run in runs]},
+        "pipeline.llm_calls": {"kind": "count", "samples": [run["llm_calls"] for run in runs]},
+        "pipeline.input_tokens": {"kind": "count", "samples": [run["input_tokens"] for run in runs]},
+        "pipeline.output_tokens": {"kind": "count", "samples": [run["output_tokens"] for run in runs]},
+    }
+
+
+def _startup_suite(trials: int) -> Dict[str, Dict[str, Any]]:
+    """命令行冷启动耗时，每次试验在新的子进程中运行"""
+    from coreascher.benchmark.startup import FAST_COMMANDS, time_command
+
+    return {
+        f"startup.{name}_seconds": {
+            "kind": "latency",
+            "samples": [round(time_command(args, 1)["median_ms"] / 1000, 6) for _ in range(trials)],
+        }
+        for name, args in FAST_COMMANDS.items()
+    }
+
+
+def _memory_suite(trials: int) -> Dict[str, Dict[str, Any]]:
+    """一次完整流水线运行中Python对象分配的峰值内存"""
+    return {
+        "memory.pipeline_peak_alloc_mb": {
+            "kind": "memory",
+            "samples": [round(_pipeline_once(trace_memory=True)["peak_alloc_mb"], 3) for _ in range(trials)],
+        },
+    }
+
+
+_SUITE_RUNNERS = {
+    "search": _search_suite,
+    "pipeline": _pipeline_suite,
+    "startup": _startup_suite,
+    "memory": _memory_suite,
+}
+
+
+def run_suites(suites: Sequence[str] = SUITES, trials: int = 5) -> Dict[str, Dict[str, Any]]:
+    """运行基准测试套件
+
+    Args:
+        suites: 要运行的套件名称
+        trials: 每个指标的重复试验次数
+
+    Returns:
+        指标名到 {"kind", "samples"} 的字典
+
+    Raises:
+        ValueError: 套件名称无效时
+    """
+    unknown = [suite for suite in suites if suite not in _SUITE_RUNNERS]
+    if unknown:
+        raise ValueError(f"未知的基准测试套件: {', '.join(unknown)}")
+    metrics: Dict[str, Dict[str, Any]] = {}
+    for suite in suites:
+        metrics.update(_SUITE_RUNNERS[suite](trials))
+    return metrics
+
+
+def compare(baseline: Dict[str, Dict[str, Any]], current: Dict[str, Dict[str, Any]],
+            tolerances: Optional[Dict[str, float]] = None, alpha: float = ALPHA) -> List[Dict[str, Any]]:
+    """逐项比较当前结果与基线
+
+    耗时和内存类指标只有在中位数增幅超过容差和噪声下限、且检验显著时才判定为回归；
+    计数类指标是确定性的，中位数增幅超过容差即判定为回归。
+
+    Returns:
+        每个指标的比较结果列表
+    """
+    tolerances = dict(DEFAULT_TOLERANCES, **(tolerances or {}))
+    rows = []
+    for name, entry in current.items():
+        kind = entry["kind"]
+        now = statistics.median(entry["samples"])
+        row = {"metric": name, "kind": kind, "current": now, "baseline": None, "change": None,
+               "p_value": None, "status": _CHECK_MISSING}
+        base_entry = baseline.get(name)
+        if base_entry:
+            base = statistics.median(base_entry["samples"])
+            limit = base * (1 + tolerances.get(kind, 0.0))
+            row["baseline"] = base
+            row["change"] = (now - base) / base if base else (0.0 if now == base else math.inf)
+            exceeded = now > limit and now - base > MIN_DELTA.get(kind, 0.0)
+            if kind != "count":
+                row["p_value"] = mann_whitney_p(base_entry["samples"], entry["samples"])
+                exceeded = exceeded and row["p_value"] < alpha
+            if exceeded:
+                row["status"] = _CHECK_REGRESSED
+            elif now < base * (1 - tolerances.get(kind, 0.0)) and now < base:
+                row["status"] = _CHECK_IMPROVED
+            else:
+                row["status"] = _CHECK_PASSED
+        rows.append(row)
+    return rows
+
+
+def _pad(text: str, width: int, left: bool = False) -> str:
+    """按终端显示宽度补齐，中文字符占两列"""
+    display = sum(2 if unicodedata.east_asian_width(char) in ("W", "F") else 1 for char in text)
+    padding = " " * max(0, width - display)
+    return text + padding if left else padding + text
+
+
+def format_report(rows: List[Dict[str, Any]]) -> str:
+    """将比较结果格式化为对比表"""
+    def number(value: Optional[float]) -> str:
+        if value is None:
+            return "-"
+        return f"{value:.4f}" if isinstance(value, float) and not value.is_integer() else f"{value:g}"
+
+    def line(metric: str, base: str, now: str, change: str, p_value: str, status: str) -> str:
+        return (f"{_pad(metric, 34, left=True)}{_pad(base, 12)}{_pad(now, 12)}"
+                f"{_pad(change, 10)}{_pad(p_value, 8)}  {status}")
+
+    lines = [line("指标", "基线", "当前", "变化", "p值", "结果")]
+    for row in rows:
+        change = "-" if row["change"] is None else f"{row['change']:+.1%}"
+        p_value = "-" if row["p_value"] is None else f"{row['p_value']:.3f}"
+        lines.append(line(row["metric"], number(row["baseline"]), number(row["current"]),
+                          change, p_value, row["status"]))
+    regressions = [row["metric"] for row in rows if row["status"] == _CHECK_REGRESSED]
+    lines.append(f"发现 {len(regressions)} 项回归: {', '.join(regressions)}" if regressions else "未发现回归")
+    return "\n".join(lines)
+
+
+def load_baseline(path: Path) -> Dict[str, Dict[str, Any]]:
+    """读取基线文件，不存在时返回空字典"""
+    if not path.exists():
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f).get("metrics", {})
+
+
+def save_baseline(path: Path, metrics: Dict[str, Dict[str, Any]], trials: int) -> None:
+    """写入基线文件，保留未重新测量的指标"""
+    merged = load_baseline(path)
+    merged.update(metrics)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {"python": sys.version.split()[0], "platform": sys.platform, "trials": trials,
+            "metrics": dict(sorted(merged.items()))}
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def _parse_tolerances(spec: Optional[str]) -> Dict[str, float]:
+    """解析容差参数，可以是单个数值（作用于耗时和内存）或 kind=value 列表"""
+    if not spec:
+        return {}
+    try:
+        return {"latency": float(spec), "memory": float(spec)}
+    except ValueError:
+        pass
+    tolerances = {}
+    for item in spec.split(","):
+        kind, sep, value = item.partition("=")
+        if not sep or kind.strip() not in DEFAULT_TOLERANCES:
+            raise argparse.ArgumentTypeError(f"容差格式应为 latency=0.2,memory=0.1,count=0: {item}")
+        tolerances[kind.strip()] = float(value)
+    return tolerances
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="运行基准测试并与保存的基线比较，发现性能回归时返回1")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="基线文件路径")
+    parser.add_argument("--suite", action="append", choices=SUITES, default=None,
+                        help="只运行指定套件，可重复指定，默认运行全部")
+    parser.add_argument("--trials", type=int, default=5, help="每个指标的重复试验次数")
+    parser.add_argument("--tolerance", type=_parse_tolerances, default=None,
+                        help="容差，如 0.2 或 latency=0.2,memory=0.1,count=0")
+    parser.add_argument("--alpha", type=float, default=ALPHA, help="显著性水平")
+    parser.add_argument("--update", action="store_true", help="重新测量并写入基线")
+    parser.add_argument("--output", type=Path, default=None, help="比较结果JSON输出路径")
+    args = parser.parse_args(argv)
+
+    setup_logging(logging.WARNING)
+    current = run_suites(args.suite or SUITES, args.trials)
+    if args.update:
+        save_baseline(args.baseline, current, args.trials)
+        print(f"基线已写入: {args.baseline}")
+        return 0
+
+    rows = compare(load_baseline(args.baseline), current, args.tolerance, args.alpha)
+    print(format_report(rows))
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps({"rows": rows, "current": current}, ensure_ascii=False, indent=2),
+                               encoding="utf-8")
+    return 1 if any(row["status"] == _CHECK_REGRESSED for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+启动耗时基准测试模块
+
+该模块在全新的子进程中测量命令行和核心模块的冷启动耗时，负责：
+1. 多次运行 coreascher --help、validate 等不需要LLM的子命令，统计中位数和最大值
+2. 使用 python -X importtime 统计模块的累计导入耗时
+3. 超过阈值时返回非零退出码，可作为持续集成中的性能门禁
+
+用法：
+    python -m coreascher.benchmark.startup [--repeat N] [--max-ms 200]
+"""
+
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Sequence
+
+# 需要满足冷启动阈值的命令
+FAST_COMMANDS = {
+    "help": ["-m", "coreascher.cli", "--help"],
+    "validate": ["-m", "coreascher.cli", "validate"],
+}
+
+# 统计导入耗时的模块，不设阈值，仅供对比
+IMPORT_TARGETS = ("coreascher.cli", "coreascher.main", "coreascher.tools.custom_tool", "coreascher.crew")
+
+_IMPORTTIME_PATTERN = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\| (\s*)(\S+)")
+
+
+def time_command(args: Sequence[str], repeat: int = 5) -> Dict[str, float]:
+    """在子进程中重复运行Python命令并统计耗时
+
+    Args:
+        args: 传给Python解释器的参数
+        repeat: 重复次数
+
+    Returns:
+        包含中位数、最小值和最大值（毫秒）的字典
+
+    Raises:
+        RuntimeError: 命令执行失败时
+    """
+    samples: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = subprocess.run([sys.executable, *args], capture_output=True, text=True)
+        samples.append((time.perf_counter() - started) * 1000)
+        if result.returncode != 0:
+            raise RuntimeError(f"命令执行失败: {' '.join(args)}\n{result.stderr}")
+    return {
+        "median_ms": round(statistics.median(samples), 1),
+        "min_ms": round(min(samples), 1),
+        "max_ms": round(max(samples), 1),
+    }
+
+
+def import_time(module: str) -> Dict[str, object]:
+    """使用 -X importtime 统计模块的累计导入耗时
+
+    Returns:
+        包含累计耗时（毫秒）和耗时最多的直接依赖的字典
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        return {"error": result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "导入失败"}
+    # 子模块先于父模块输出，每遇到一个顶层模块就结算它的直接依赖
+    children: Dict[str, int] = {}
+    direct: Dict[str, int] = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_PATTERN.match(line)
+        if not match:
+            continue
+        cumulative, depth, name = int(match.group(2)), len(match.group(3)) // 2, match.group(4)
+        if depth == 1:
+            children[name] = cumulative
+        elif depth == 0:
+            if name == module:
+                total, direct = cumulative, children
+            children = {}
+    heaviest = sorted(direct.items(), key=lambda item: item[1], reverse=True)[:5]
+    return {
+        "cumulative_ms": round(total / 1000, 1),
+        "heaviest": {name: round(us / 1000, 1) for name, us in heaviest},
+    }
+
+
+def run_startup_benchmark(repeat: int = 5, max_ms: Optional[float] = 200.0) -> Dict[str, object]:
+    """运行启动耗时基准测试
+
+    Args:
+        repeat: 每条命令的重复次数
+        max_ms: 快速命令的冷启动中位数阈值（毫秒），为None时不检查
+
+    Returns:
+        基准测试结果，passed 表示是否全部满足阈值
+    """
+    # 先运行一次，使字节码缓存就绪
+    subprocess.run([sys.executable, "-c", "import coreascher.cli"], capture_output=True)
+    baseline = time_command(["-c", "pass"], repeat)
+    commands = {name: time_command(args, repeat) for name, args in FAST_COMMANDS.items()}
+    failures = [
+        name for name, stats in commands.items()
+        if max_ms is not None and stats["median_ms"] > max_ms
+    ]
+    return {
+        "python_ms": baseline,
+        "commands": commands,
+        "imports": {module: import_time(module) for module in IMPORT_TARGETS},
+        "max_ms": max_ms,
+        "failures": failures,
+        "passed": not failures,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="测量 coreascher 命令行的冷启动耗时")
+    parser.add_argument("--repeat", type=int, default=5, help="每条命令的重复次数")
+    parser.add_argument("--max-ms", type=float, default=200.0, help="快速命令冷启动中位数阈值（毫秒）")
+    args = parser.parse_args(argv)
+
+    result = run_startup_benchmark(args.repeat, args.max_ms)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0 if result["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
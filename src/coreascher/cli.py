@@ -0,0 +1,282 @@
+"""
+命令行入口模块
+
+该模块提供轻量的 coreascher 命令，负责：
+1. 解析 run、train、replay、test、serve、batch 和 validate 子命令
+2. 只在子命令真正执行时才导入 crewAI、工具和LLM等重依赖
+3. 在不导入 crewAI 的情况下校验 agents.yaml 和 tasks.yaml
+
+用法：
+    coreascher run --topic "大语言模型" --input keywords="RAG, LLM"
+    coreascher validate
+"""
+
+import argparse
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# 配置文件所在目录
+CONFIG_DIR = Path(__file__).parent / "config"
+
+# 任务配置中不是任务的顶层键
+_NON_TASK_KEYS = ("run_budget",)
+
+
+def _parse_inputs(pairs: Optional[List[str]]) -> Dict[str, str]:
+    """将 key=value 形式的参数解析为任务输入字典"""
+    inputs = {}
+    for pair in pairs or []:
+        key, sep, value = pair.partition("=")
+        if not sep or not key:
+            raise argparse.ArgumentTypeError(f"输入参数格式应为 key=value: {pair}")
+        inputs[key.strip()] = value
+    return inputs
+
+
+def _setup(verbose: bool, quiet: bool = False) -> None:
+    """配置日志并加载 .env 中的环境变量"""
+    from dotenv import load_dotenv
+
+    from coreascher.monitoring.logs import CREW_VERBOSE_ENV, setup_logging
+
+    load_dotenv()
+    setup_logging(logging.DEBUG if verbose else None)
+    if quiet:
+        os.environ[CREW_VERBOSE_ENV] = "0"
+
+
+def validate_config(config_dir: Path = CONFIG_DIR) -> List[str]:
+    """校验Agent和任务配置
+
+    Args:
+        config_dir: 包含 agents.yaml 和 tasks.yaml 的目录
+
+    Returns:
+        错误信息列表，为空表示校验通过
+    """
+    import yaml
+
+    from coreascher.monitoring.budget import Budget
+    from coreascher.monitoring.deadline import CALL_TIMEOUT_KEY, TIMEOUT_KEY, check_timeout
+
+    errors: List[str] = []
+    try:
+        with open(config_dir / "agents.yaml", encoding="utf-8") as f:
+            agents = yaml.safe_load(f) or {}
+        with open(config_dir / "tasks.yaml", encoding="utf-8") as f:
+            tasks = yaml.safe_load(f) or {}
+    except (OSError, yaml.YAMLError) as e:
+        return [f"读取配置失败: {str(e)}"]
+
+    def check_budget(owner: str, config) -> None:
+        try:
+            Budget.from_config(config)
+        except (TypeError, ValueError) as e:
+            errors.append(f"{owner} 的预算配置无效: {str(e)}")
+
+    def check_deadline(owner: str, config, key: str = TIMEOUT_KEY) -> None:
+        error = check_timeout(owner, (config or {}).get(key) if isinstance(config, dict) else None)
+        if error:
+            errors.append(error)
+
+    for name, config in agents.items():
+        for field in ("role", "goal", "backstory"):
+            if not (config or {}).get(field):
+                errors.append(f"Agent {name} 缺少 {field}")
+        check_budget(f"Agent {name}", (config or {}).get("budget"))
+
+    for name, config in tasks.items():
+        if name in _NON_TASK_KEYS:
+            check_budget(name, config)
+            check_deadline(name, config)
+            check_deadline(name, config, CALL_TIMEOUT_KEY)
+            continue
+        config = config or {}
+        for field in ("description", "expected_output"):
+            if not config.get(field):
+                errors.append(f"任务 {name} 缺少 {field}")
+        agent = config.get("agent")
+        if agent and agent not in agents:
+            errors.append(f"任务 {name} 引用了不存在的Agent: {agent}")
+        context = config.get("context")
+        if context is not None:
+            if not isinstance(context, list):
+                errors.append(f"任务 {name} 的 context 应为任务名列表")
+            else:
+                errors.extend(
+                    f"任务 {name} 的 context 引用了不存在的任务: {item}"
+                    for item in context if item not in tasks
+                )
+        check_budget(f"任务 {name}", config.get("budget"))
+        check_deadline(f"任务 {name}", config)
+    return errors
+
+
+def _cmd_run(args: argparse.Namespace) -> int:
+    from coreascher import main as app
+
+    if args.profile is not None:
+        from coreascher.monitoring.profiling import enable_profiling
+
+        enable_profiling(Path(args.profile) if args.profile else app.PROFILE_DIR)
+    app.run(topic=args.topic, extra_inputs=args.inputs)
+    return 0
+
+
+def _cmd_train(args: argparse.Namespace) -> int:
+    from coreascher import main as app
+
+    app.train(args.n_iterations, args.filename, topic=args.topic, extra_inputs=args.inputs)
+    return 0
+
+
+def _cmd_replay(args: argparse.Namespace) -> int:
+    from coreascher import main as app
+
+    app.replay(args.task_id)
+    return 0
+
+
+def _cmd_test(args: argparse.Namespace) -> int:
+    from coreascher import main as app
+
+    app.test(args.n_iterations, args.model, topic=args.topic, extra_inputs=args.inputs)
+    return 0
+
+
+def _cmd_serve(args: argparse.Namespace) -> int:
+    from coreascher.service.server import serve
+
+    serve(args.host, args.port, args.workers, args.llm_concurrency, args.search_concurrency)
+    return 0
+
+
+def _cmd_batch(args: argparse.Namespace) -> int:
+    from coreascher.service.batch import load_topics, run_batch
+
+    try:
+        topics = load_topics(args.topics_file)
+    except (OSError, ValueError) as e:
+        print(f"错误: {str(e)}", file=sys.stderr)
+        return 1
+    runner = runner_factory = None
+    if args.offline:
+        from coreascher.benchmark.pipeline import offline_runner
+
+        runner, runner_factory = offline_runner(), offline_runner
+    summary = run_batch(topics, args.output_dir, args.parallel, runner=runner, cache_llm=not args.no_llm_cache,
+                        processes=args.processes, shared_cache=args.shared_cache, runner_factory=runner_factory)
+    print(f"完成 {summary['succeeded']}/{summary['topics']} 个主题，耗时 {summary['elapsed_seconds']} 秒，"
+          f"结果写入 {args.output_dir}")
+    return 1 if summary["failed"] else 0
+
+
+def _cmd_validate(args: argparse.Namespace) -> int:
+    errors = validate_config(args.config_dir)
+    for error in errors:
+        print(f"错误: {error}", file=sys.stderr)
+    if not errors:
+        print("配置校验通过")
+    return 1 if errors else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """构建命令行解析器"""
+    parser = argparse.ArgumentParser(prog="coreascher", description="基于 CrewAI 的文献综述助手")
+    parser.add_argument("-v", "--verbose", action="store_true", help="输出调试日志")
+    parser.add_argument("-q", "--quiet", action="store_true", help="关闭crewAI的Agent详细输出")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_inputs(sub: argparse.ArgumentParser) -> None:
+        sub.add_argument("--topic", default=None, help="研究主题")
+        sub.add_argument("--input", dest="inputs", action="append", default=None, metavar="KEY=VALUE",
+                         help="额外的任务输入，如 keywords=RAG，可重复指定")
+
+    def add_io_archive(sub: argparse.ArgumentParser) -> None:
+        group = sub.add_mutually_exclusive_group()
+        group.add_argument("--record", type=Path, default=None, metavar="ARCHIVE",
+                           help="录制运行中的全部LLM调用和arXiv检索到归档文件")
+        group.add_argument("--replay-from", type=Path, default=None, metavar="ARCHIVE",
+                           help="从归档回放外部调用，归档中没有的调用照常执行并补录")
+
+    run = subparsers.add_parser("run", help="运行文献综述Crew")
+    add_inputs(run)
+    run.add_argument("--profile", nargs="?", const="", default=None, metavar="DIR",
+                     help="按任务和Agent方法分阶段剖析，输出 pstats 和折叠栈文件，默认目录 output/profiles")
+    run.add_argument("--reuse", action="store_true", help="主题与历史主题相近时沿用已有的研究框架和检索结果")
+    add_io_archive(run)
+    run.set_defaults(handler=_cmd_run, needs_setup=True)
+
+    train = subparsers.add_parser("train", help="训练Crew")
+    train.add_argument("n_iterations", type=int, help="训练迭代次数")
+    train.add_argument("filename", help="训练结果文件名")
+    add_inputs(train)
+    train.set_defaults(handler=_cmd_train, needs_setup=True)
+
+    replay = subparsers.add_parser("replay", help="从指定任务重放Crew执行")
+    replay.add_argument("task_id", help="任务ID")
+    replay.set_defaults(handler=_cmd_replay, needs_setup=True)
+
+    test = subparsers.add_parser("test", help="测试Crew执行效果")
+    test.add_argument("n_iterations", type=int, help="测试迭代次数")
+    test.add_argument("model", help="评估使用的模型名称")
+    add_inputs(test)
+    test.set_defaults(handler=_cmd_test, needs_setup=True)
+
+    serve = subparsers.add_parser("serve", help="启动综述HTTP服务，排队执行提交的研究主题")
+    serve.add_argument("--host", default="127.0.0.1", help="监听地址")
+    serve.add_argument("--port", type=int, default=8000, help="监听端口")
+    serve.add_argument("--workers", type=int, default=2, help="同时运行的Crew数")
+    serve.add_argument("--llm-concurrency", type=int, default=None,
+                       help="所有任务合计的LLM调用并发上限，按优先级和租户公平分配（默认不限制）")
+    serve.add_argument("--search-concurrency", type=int, default=None,
+                       help="所有任务合计的arXiv检索并发上限（默认不限制）")
+    serve.add_argument("--reuse", action="store_true", help="主题与历史主题相近时沿用已有的研究框架和检索结果")
+    serve.set_defaults(handler=_cmd_serve, needs_setup=True)
+
+    batch = subparsers.add_parser("batch", help="批量生成主题文件中各研究主题的综述")
+    batch.add_argument("topics_file", type=Path, help="主题文件（.txt 每行一个主题，或 .jsonl）")
+    batch.add_argument("--parallel", type=int, default=2, help="同时运行的Crew数")
+    batch.add_argument("--output-dir", type=Path, default=Path("output/batch"), help="输出目录")
+    batch.add_argument("--no-llm-cache", action="store_true", help="不在主题之间共享LLM回复缓存")
+    batch.add_argument("--processes", type=int, default=0,
+                       help="工作进程数，大于0时每个进程运行一个Crew，进程之间通过共享存储共享缓存")
+    batch.add_argument("--shared-cache", type=Path, default=None,
+                       help="多进程模式下共享存储的路径（默认 data/cache/shared.sqlite3）")
+    batch.add_argument("--offline", action="store_true", help="使用模拟LLM和离线arXiv客户端演练批量运行")
+    batch.add_argument("--reuse", action="store_true", help="主题与历史主题相近时沿用已有的研究框架和检索结果")
+    add_io_archive(batch)
+    batch.set_defaults(handler=_cmd_batch, needs_setup=True)
+
+    validate = subparsers.add_parser("validate", help="校验 agents.yaml 和 tasks.yaml")
+    validate.add_argument("--config-dir", type=Path, default=CONFIG_DIR, help="配置文件目录")
+    validate.set_defaults(handler=_cmd_validate, needs_setup=False)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行入口"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if hasattr(args, "inputs"):
+        try:
+            args.inputs = _parse_inputs(args.inputs)
+        except argparse.ArgumentTypeError as e:
+            parser.error(str(e))
+    if args.needs_setup:
+        _setup(args.verbose, args.quiet)
+    if getattr(args, "reuse", False):
+        os.environ["COREASCHER_REUSE"] = "1"
+    # 通过环境变量传递，多进程批量模式的工作进程同样录制或回放
+    if getattr(args, "record", None):
+        os.environ["COREASCHER_RECORD"] = str(args.record)
+    if getattr(args, "replay_from", None):
+        os.environ["COREASCHER_REPLAY"] = str(args.replay_from)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,16 +5,14 @@
 """
 
 import logging
-import os
-from typing import Dict, List, Optional
-from crewai import Crew, Task, Agent, Process, LLM
+from typing import Optional
+from crewai import Crew, Task, Agent, Process
+from crewai.llms.base_llm import BaseLLM
 from crewai.project import CrewBase, agent, crew, task
-from coreascher.tools.custom_tool import LiteratureSearch
+from coreascher.monitoring.logs import crew_verbose
+from coreascher.service.stream import enable_streaming, stream_enabled
+from coreascher.tools.custom_tool import KnowledgeBaseSearch, LiteratureSearch
 
-llm = LLM(model="openai/glm-4-plus")
-
-# 设置日志
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -24,6 +22,16 @@ class LiteratureReviewCrew:
     """文献综述Crew，协调多个Agent完成综述任务"""
     agents_config = "config/agents.yaml"
     tasks_config = "config/tasks.yaml"
+
+    def __init__(self, llm: Optional[BaseLLM] = None) -> None:
+        """初始化文献综述Crew
+
+        Args:
+            llm: 所有Agent使用的LLM，默认使用环境变量中配置的模型
+        """
+        self.llm = llm
+        self.verbose = crew_verbose()
+
     # def __init__(self) -> None:
     #     """初始化文献综述Crew"""
     #     super().__init__()
@@ -54,7 +62,8 @@ class LiteratureReviewCrew:
         """创建教授Agent"""
         return Agent(
             config=self.agents_config['professor'],
-            verbose=True,
+            llm=self.llm,
+            verbose=self.verbose,
             allow_delegation=False
         )
     @agent   
@@ -62,7 +71,8 @@ class LiteratureReviewCrew:
         """创建博士后Agent"""
         return Agent(
             config=self.agents_config['postdoc'],
-            verbose=True,
+            llm=self.llm,
+            verbose=self.verbose,
             allow_delegation=False
         )
     @agent   
@@ -70,53 +80,21 @@ class LiteratureReviewCrew:
         """创建博士生Agent"""
         return Agent(
             config=self.agents_config['phd'],
-            verbose=True,
+            llm=self.llm,
+            verbose=self.verbose,
             allow_delegation=True,
-            tools=[LiteratureSearch()]           
+            tools=[LiteratureSearch(), KnowledgeBaseSearch()]
         )
         
-    # @agent 
-    # def reviewer(self) -> Agent:
-    #     """创建评审人Agent"""
-    #     return Agent(
-    #         config=self.agents_config['reviewer'],
-    #         verbose=True,
-    #         allow_delegation=False
-    #     )
-    
-    create_research_framework = Task(
-        description = "请为以下研究主题生成一个详细的研究框架: 主题: {topic} 框架应包含： 1. 研究背景 2. 研究目标 3. 研究内容 4. 技术路线 5. 预期成果",
-        expected_output = "一个包含完整研究框架的JSON格式结果，包括： - 各章节标题 - 章节内容概述 - 技术路线图",
-        agent = professor
-    )
-    
-    analyze_framework = Task(
-        description = "分析研究框架并提出完善建议",
-        expected_output = "一个包含完整研究框架的JSON格式结果，包括： - 各章节标题 - 章节内容概述 - 技术路线图",
-        agent = postdoc,
-        context = create_research_framework
-    )
-    
-    keyword_tasks = Task(
-        description = "根据研究框架，为研究任务生成具体的搜索关键词和要求",
-        expected_output = "keywords: [关键词列表],requirements: [研究任务] ",
-        agent = postdoc,
-        context = analyze_framework
-    )
-    
-    search_literature = Task(
-        description = "根据postdoc_agent给出的关键词调用摘要检索工具搜索相关文献摘要，结合postdoc_agent给出的研究任务，判断文献内容是否与研究任务相关，如果相关则保存至知识库中，不相关则继续搜索下一篇文献。每个研究任务搜索十篇相关文献。",
-        expected_output = "文献搜索结果",
-        agent = phd,
-        tools = [LiteratureSearch()],
-        context = keyword_tasks
-    )
-    
-    literature_review = Task(
-        description = "根据每个章节的研究任务和知识库中的论文，撰写符合学术用语的高质量论文综述段落。严禁使用知识库外的文献。按照文章内用`<sup>number</sup>`，文章末尾用【标题+所在会议/期刊名称+年份+chunk序号】的规则来进行综述撰写。",
-        expected_output = "文献综述",
-        agent = phd,
-    )
+    @agent
+    def reviewer(self) -> Agent:
+        """创建评审人Agent"""
+        return Agent(
+            config=self.agents_config['reviewer'],
+            llm=self.llm,
+            verbose=self.verbose,
+            allow_delegation=False
+        )
     
     @task
     def create_research_framework(self) -> Task:
@@ -248,9 +226,13 @@ class LiteratureReviewCrew:
     @crew
     def literature_review_crew(self) -> Crew:
         """创建文献综述Crew"""
-        return Crew(
+        crew = Crew(
             agents=[self.professor(), self.postdoc(), self.phd()],
-            tasks=[self.create_research_framework, self.analyze_framework, self.keyword_tasks, self.search_literature, self.literature_review, self.integrate_paper],
+            tasks=[self.create_research_framework(), self.analyze_framework(), self.keyword_tasks(), self.search_literature(), self.literature_review(), self.integrate_paper()],
             process=Process.sequential,
-            verbose=True
+            verbose=self.verbose
         )
+        if stream_enabled():
+            # 综述章节随生成逐个推送，缩短首个章节到达的时间
+            enable_streaming(crew)
+        return crew
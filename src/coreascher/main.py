@@ -115,53 +115,156 @@
 
 import sys
 import warnings
-
-from coreascher.crew import literature_review_crew
+from pathlib import Path
+from typing import Dict, List, Optional
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
-def run():
+# 运行指标输出目录
+METRICS_DIR = Path("output/metrics")
+
+# 运行时间线输出目录，设置环境变量 COREASCHER_TRACE=1 后启用
+TRACE_DIR = Path("output/traces")
+
+# 分阶段剖析默认输出目录，设置环境变量 COREASCHER_PROFILE=1 或目录路径后启用
+PROFILE_DIR = Path("output/profiles")
+
+# 文献综述逐章节写出的文件，任务结束后替换为完整综述
+REVIEW_STREAM_FILE = Path("output/literature_review.md")
+
+# 运行超过期限时保存已完成任务输出的文件
+PARTIAL_RESULT_FILE = Path("output/partial_result.json")
+
+# 默认研究主题
+DEFAULT_TOPIC = "AI LLMs"
+
+
+# 任务模板中其他变量的默认值，关键词默认使用研究主题
+DEFAULT_INPUTS = {"research_design": "无", "paper_draft": "无"}
+
+
+def _inputs(topic: Optional[str] = None, extra: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    inputs = dict(DEFAULT_INPUTS, topic=topic or DEFAULT_TOPIC)
+    inputs.update(extra or {})
+    inputs.setdefault("keywords", inputs["topic"])
+    return inputs
+
+
+def _build_crew():
+    # crewAI 和工具依赖较重，真正执行Crew时才导入
+    from coreascher.crew import LiteratureReviewCrew
+
+    return LiteratureReviewCrew().literature_review_crew()
+
+
+def run(topic: Optional[str] = None, extra_inputs: Optional[Dict[str, str]] = None):
     """
     Run the crew.
     """
-    inputs = {
-        'topic': 'AI LLMs'
-    }
-    literature_review_crew().crew().kickoff(inputs=inputs)
+    from coreascher.crew import LiteratureReviewCrew
+    from coreascher.monitoring.budget import BudgetEnforcer
+    from coreascher.monitoring import profiling
+    from coreascher.monitoring.deadline import DeadlineGuard, RunCancelled
+    from coreascher.monitoring.metrics import RunMetrics
+    from coreascher.monitoring.trace import TraceRecorder, tracing_enabled
+    from coreascher.service.reuse import TopicReuse, reuse_enabled
+    from coreascher.service.stream import SectionStream
+    from coreascher.tools.io_archive import recorder_from_env
+    from coreascher.tools.shared_store import atomic_write_json
+    from coreascher.tools.term_cache import get_term_cache
+
+    inputs = _inputs(topic, extra_inputs)
+    if not profiling.profiling_enabled():
+        profiling.enable_from_env()
+    crew_base = LiteratureReviewCrew()
+    crew = crew_base.literature_review_crew()
+    reuse = TopicReuse() if reuse_enabled() else None
+    if reuse is not None:
+        inputs = reuse.apply(crew, inputs)
+    profiling.profile_crew(crew)
+    metrics = RunMetrics().attach(crew)
+    budget = BudgetEnforcer.from_config(metrics, crew_base.agents_config, crew_base.tasks_config).attach(crew)
+    guard = DeadlineGuard.from_config(metrics, crew_base.tasks_config).attach(crew)
+    recorder = recorder_from_env()
+    if recorder is not None:
+        recorder.attach(crew)
+    trace = TraceRecorder(metrics.run_id).attach(crew) if tracing_enabled() else None
+    stream = SectionStream(path=REVIEW_STREAM_FILE).attach(crew)
+    try:
+        output = crew.kickoff(inputs=inputs)
+        if reuse is not None:
+            reuse.record(output)
+        for task_output in getattr(output, "tasks_output", None) or []:
+            if getattr(task_output, "name", None) == stream.task:
+                stream.finish(task_output.raw)
+    except Exception as e:
+        if not guard.token.cancelled:
+            raise
+        # 已完成任务的输出写入部分结果文件，不随运行中止而丢失
+        partial = {"reason": guard.token.reason, "tasks": guard.salvage(crew)}
+        atomic_write_json(PARTIAL_RESULT_FILE, partial)
+        raise RunCancelled(f"{guard.token.reason}，已完成任务的输出已保存到 {PARTIAL_RESULT_FILE}", partial) from e
+    finally:
+        stream.detach()
+        if recorder is not None:
+            recorder.detach()
+        guard.detach()
+        budget.detach()
+        metrics.detach()
+        metrics.export(METRICS_DIR)
+        get_term_cache().save()
+        if trace is not None:
+            trace.detach()
+            trace.export(TRACE_DIR)
+        if profiling.profiling_enabled():
+            profiling.dump_profiles()
 
 
-def train():
+def train(n_iterations: Optional[int] = None, filename: Optional[str] = None,
+          topic: Optional[str] = None, extra_inputs: Optional[Dict[str, str]] = None):
     """
     Train the crew for a given number of iterations.
     """
-    inputs = {
-        "topic": "AI LLMs"
-    }
+    inputs = _inputs(topic, extra_inputs)
+    n_iterations = n_iterations if n_iterations is not None else int(sys.argv[1])
+    filename = filename or sys.argv[2]
     try:
-        literature_review_crew().crew().train(n_iterations=int(sys.argv[1]), filename=sys.argv[2], inputs=inputs)
+        _build_crew().train(n_iterations=n_iterations, filename=filename, inputs=inputs)
 
     except Exception as e:
         raise Exception(f"An error occurred while training the crew: {e}")
 
-def replay():
+def replay(task_id: Optional[str] = None):
     """
     Replay the crew execution from a specific task.
     """
     try:
-        literature_review_crew().crew().replay(task_id=sys.argv[1])
+        _build_crew().replay(task_id=task_id or sys.argv[1])
 
     except Exception as e:
         raise Exception(f"An error occurred while replaying the crew: {e}")
 
-def test():
+def test(n_iterations: Optional[int] = None, model_name: Optional[str] = None,
+         topic: Optional[str] = None, extra_inputs: Optional[Dict[str, str]] = None):
     """
     Test the crew execution and returns the results.
     """
-    inputs = {
-        "topic": "AI LLMs"
-    }
+    inputs = _inputs(topic, extra_inputs)
+    n_iterations = n_iterations if n_iterations is not None else int(sys.argv[1])
+    model_name = model_name or sys.argv[2]
     try:
-        literature_review_crew().crew().test(n_iterations=int(sys.argv[1]), openai_model_name=sys.argv[2], inputs=inputs)
+        _build_crew().test(n_iterations=n_iterations, openai_model_name=model_name, inputs=inputs)
 
     except Exception as e:
-        raise Exception(f"An error occurred while replaying the crew: {e}")
\ No newline at end of file
+        raise Exception(f"An error occurred while replaying the crew: {e}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行入口，见 coreascher.cli"""
+    from coreascher.cli import main as cli_main
+
+    return cli_main(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
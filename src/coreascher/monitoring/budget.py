@@ -0,0 +1,300 @@
+"""
+运行预算控制模块
+
+该模块根据 agents.yaml 和 tasks.yaml 中声明的预算约束Crew运行，负责：
+1. 解析按Agent、按任务和整次运行声明的token、LLM调用次数和墙钟时间上限
+2. 基于运行指标实时检查用量
+3. 用量接近上限时切换到更便宜的模型
+4. 超出上限时停止文献检索，并让Agent基于已有结果给出最终答案
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from coreascher.monitoring.metrics import RunMetrics, StageStats
+
+logger = logging.getLogger(__name__)
+
+# 超出预算时可执行的降级动作
+DEGRADE_ACTIONS = ("fallback_model", "stop_search", "finish")
+
+# 未声明 on_exceed 时的默认降级动作
+DEFAULT_ON_EXCEED = ("stop_search", "finish")
+
+# tasks.yaml 中整次运行预算的键名
+RUN_BUDGET_KEY = "run_budget"
+
+
+class Budget:
+    """单个Agent、任务或整次运行的预算"""
+
+    def __init__(self, max_tokens: Optional[int] = None, max_llm_calls: Optional[int] = None,
+                 max_wall_seconds: Optional[float] = None, fallback_model: Optional[str] = None,
+                 degrade_at: float = 0.8, on_exceed: Optional[List[str]] = None) -> None:
+        """初始化预算
+
+        Args:
+            max_tokens: 输入输出token总数上限
+            max_llm_calls: LLM调用次数上限
+            max_wall_seconds: 墙钟时间上限（秒）
+            fallback_model: 用量达到 degrade_at 比例时切换到的模型
+            degrade_at: 切换模型的用量比例
+            on_exceed: 超出上限时依次执行的降级动作
+
+        Raises:
+            ValueError: 降级动作不受支持时
+        """
+        self.max_tokens = max_tokens
+        self.max_llm_calls = max_llm_calls
+        self.max_wall_seconds = max_wall_seconds
+        self.fallback_model = fallback_model
+        self.degrade_at = degrade_at
+        self.on_exceed = tuple(on_exceed) if on_exceed is not None else DEFAULT_ON_EXCEED
+        unknown = [action for action in self.on_exceed if action not in DEGRADE_ACTIONS]
+        if unknown:
+            raise ValueError(f"不支持的降级动作: {unknown}")
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> Optional["Budget"]:
+        """从配置字典创建预算，未声明预算时返回None"""
+        if not config:
+            return None
+        on_exceed = config.get("on_exceed")
+        if isinstance(on_exceed, str):
+            on_exceed = [on_exceed]
+        return cls(
+            max_tokens=config.get("max_tokens"),
+            max_llm_calls=config.get("max_llm_calls"),
+            max_wall_seconds=config.get("max_wall_seconds"),
+            fallback_model=config.get("fallback_model"),
+            degrade_at=config.get("degrade_at", 0.8),
+            on_exceed=on_exceed,
+        )
+
+    def ratio(self, usage: Dict[str, float]) -> Tuple[float, str]:
+        """计算用量占预算的最大比例
+
+        Args:
+            usage: RunMetrics.usage 返回的用量字典
+
+        Returns:
+            (最大比例, 说明)，未设置任何上限时比例为0
+        """
+        worst, reason = 0.0, ""
+        for field, limit in (("tokens", self.max_tokens), ("llm_calls", self.max_llm_calls),
+                             ("wall_seconds", self.max_wall_seconds)):
+            if not limit:
+                continue
+            value = usage[field]
+            if value / limit > worst:
+                worst = value / limit
+                reason = f"{field} {round(value, 1)}/{limit}"
+        return worst, reason
+
+
+class BudgetEnforcer:
+    """挂接在运行指标上的预算控制器"""
+
+    def __init__(self, metrics: RunMetrics, run_budget: Optional[Budget] = None,
+                 agent_budgets: Optional[Dict[str, Budget]] = None,
+                 task_budgets: Optional[Dict[str, Budget]] = None,
+                 check_interval: float = 1.0) -> None:
+        """初始化预算控制器
+
+        Args:
+            metrics: 本次运行的指标采集器
+            run_budget: 整次运行的预算
+            agent_budgets: 按Agent角色的预算
+            task_budgets: 按任务名称的预算
+            check_interval: 后台检查墙钟时间的间隔（秒）
+        """
+        self.metrics = metrics
+        self.run_budget = run_budget
+        self.agent_budgets = agent_budgets or {}
+        self.task_budgets = task_budgets or {}
+        self.check_interval = check_interval
+        self.actions: List[Dict[str, Any]] = []
+        self._agents: Dict[str, Any] = {}
+        self._task_agents: Dict[str, str] = {}
+        self._applied: set = set()
+        self._restore_on_task_end: Dict[str, List[Tuple[Any, str, Any]]] = {}
+        self._originals: List[Tuple[Any, str, Any]] = []
+        self._fallback_llms: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(cls, metrics: RunMetrics, agents_config: Dict[str, Dict],
+                    tasks_config: Dict[str, Dict], **kwargs) -> "BudgetEnforcer":
+        """从 agents.yaml 和 tasks.yaml 的配置创建预算控制器
+
+        Agent预算写在Agent配置的 budget 字段下，按角色生效；任务预算写在任务配置的
+        budget 字段下；整次运行的预算写在 tasks.yaml 顶层的 run_budget 字段下。
+        """
+        agent_budgets = {}
+        for name, config in agents_config.items():
+            budget = Budget.from_config(config.get("budget"))
+            if budget is not None:
+                agent_budgets[config.get("role", name)] = budget
+        task_budgets = {}
+        for name, config in tasks_config.items():
+            if name == RUN_BUDGET_KEY or not isinstance(config, dict):
+                continue
+            budget = Budget.from_config(config.get("budget"))
+            if budget is not None:
+                task_budgets[name] = budget
+        run_budget = Budget.from_config(tasks_config.get(RUN_BUDGET_KEY))
+        return cls(metrics, run_budget, agent_budgets, task_budgets, **kwargs)
+
+    # ===== crewAI 集成 =====
+
+    def attach(self, crew: Any) -> "BudgetEnforcer":
+        """挂接到Crew，开始实时检查预算
+
+        Args:
+            crew: crewAI Crew 实例，需已挂接同一个 RunMetrics
+
+        Returns:
+            预算控制器自身，便于链式调用
+        """
+        for agent in crew.agents:
+            self._agents[agent.role] = agent
+        for task in crew.tasks:
+            if task.agent is not None:
+                self._task_agents[getattr(task, "name", None) or str(task.id)] = task.agent.role
+        self.metrics.add_listener(self.check)
+        if self.run_budget or any(budget.max_wall_seconds for budget in
+                                  list(self.agent_budgets.values()) + list(self.task_budgets.values())):
+            self._stop.clear()
+            self._watchdog = threading.Thread(target=self._watch, name="budget-watchdog", daemon=True)
+            self._watchdog.start()
+        return self
+
+    def detach(self) -> None:
+        """停止检查并恢复被修改的Agent和工具属性"""
+        self.metrics.remove_listener(self.check)
+        self._stop.set()
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=self.check_interval * 2)
+            self._watchdog = None
+        with self._lock:
+            for restores in self._restore_on_task_end.values():
+                self._originals.extend(restores)
+            self._restore_on_task_end.clear()
+            for owner, attribute, original in reversed(self._originals):
+                setattr(owner, attribute, original)
+            self._originals.clear()
+
+    def _watch(self) -> None:
+        """后台线程：没有新事件时也能按墙钟时间触发降级"""
+        while not self._stop.wait(self.check_interval):
+            self.check()
+
+    # ===== 预算检查 =====
+
+    def check(self, stats: Optional[StageStats] = None) -> None:
+        """检查全部预算，对超出的范围执行降级动作
+
+        Args:
+            stats: 刚被更新的阶段指标，由 RunMetrics 传入
+        """
+        with self._lock:
+            if stats is not None and stats.ended_at is not None:
+                self._restore_task(stats.task)
+            now = time.time()
+            if self.run_budget is not None:
+                self._evaluate("run", "run", self.run_budget, self.metrics.usage(now=now), list(self._agents))
+            for role, budget in self.agent_budgets.items():
+                self._evaluate("agent", role, budget, self.metrics.usage(agent=role, now=now), [role])
+            for task, budget in self.task_budgets.items():
+                role = self._task_agents.get(task)
+                self._evaluate("task", task, budget, self.metrics.usage(task=task, now=now),
+                               [role] if role else [])
+
+    def _evaluate(self, scope: str, name: str, budget: Budget, usage: Dict[str, float],
+                  roles: List[str]) -> None:
+        ratio, reason = budget.ratio(usage)
+        if budget.fallback_model and ratio >= budget.degrade_at:
+            self._apply(scope, name, "fallback_model", reason, roles, budget)
+        if ratio >= 1.0:
+            for action in budget.on_exceed:
+                self._apply(scope, name, action, reason, roles, budget)
+
+    def _apply(self, scope: str, name: str, action: str, reason: str,
+               roles: List[str], budget: Budget) -> None:
+        """对范围内的Agent执行一次降级动作，同一范围的同一动作只执行一次"""
+        key = (scope, name, action)
+        if key in self._applied:
+            return
+        if action == "fallback_model" and not budget.fallback_model:
+            return
+        self._applied.add(key)
+        logger.warning(f"{scope} 预算 {name} 达到上限（{reason}），执行降级: {action}")
+        self.actions.append({
+            "scope": scope, "name": name, "action": action, "reason": reason, "at": time.time(),
+        })
+        restores = self._restore_on_task_end.setdefault(name, []) if scope == "task" else self._originals
+        for role in roles:
+            agent = self._agents.get(role)
+            if agent is None:
+                continue
+            try:
+                if action == "fallback_model":
+                    self._switch_model(agent, budget.fallback_model)
+                elif action == "stop_search":
+                    self._stop_search(agent, f"{scope} 预算 {name} 已用尽", restores)
+                elif action == "finish":
+                    self._finish(agent, restores)
+            except Exception as e:
+                logger.error(f"执行降级动作失败: {str(e)}")
+
+    def _remember(self, owner: Any, attribute: str, restores: Optional[List] = None) -> None:
+        (self._originals if restores is None else restores).append((owner, attribute, getattr(owner, attribute)))
+
+    def _switch_model(self, agent: Any, model: str) -> None:
+        """将Agent和其执行器切换到备用模型"""
+        llm = self._fallback_llms.get(model)
+        if llm is None:
+            from crewai import LLM
+            llm = self._fallback_llms[model] = LLM(model=model)
+        self._remember(agent, "llm")
+        agent.llm = llm
+        executor = getattr(agent, "agent_executor", None)
+        if executor is not None:
+            self._remember(executor, "llm")
+            executor.llm = llm
+
+    def _stop_search(self, agent: Any, reason: str, restores: List) -> None:
+        """停止Agent持有的文献检索工具
+
+        与 _finish 相同，任务预算停止的检索在任务结束后恢复。
+        """
+        for tool in getattr(agent, "tools", None) or []:
+            if hasattr(tool, "stop_reason") and not tool.stop_reason:
+                self._remember(tool, "stop_reason", restores)
+                tool.stop_reason = reason
+
+    def _finish(self, agent: Any, restores: List) -> None:
+        """让Agent在下一步直接基于已有结果给出最终答案
+
+        任务预算只影响当前任务，任务结束后恢复；Agent和运行预算对后续任务同样生效。
+        """
+        executor = getattr(agent, "agent_executor", None)
+        if executor is not None:
+            restores.append((executor, "max_iter", executor.max_iter))
+            executor.max_iter = 0
+        if restores is self._originals:
+            self._remember(agent, "max_iter")
+            agent.max_iter = 0
+
+    def _restore_task(self, task: str) -> None:
+        for owner, attribute, original in reversed(self._restore_on_task_end.pop(task, [])):
+            setattr(owner, attribute, original)
+
+    def summary(self) -> Dict[str, Any]:
+        """生成预算执行记录"""
+        with self._lock:
+            return {"actions": list(self.actions)}
@@ -0,0 +1,318 @@
+"""
+运行期限与取消模块
+
+该模块为Crew运行设置硬性的时间上限，负责：
+1. 按任务和整次运行声明的期限，期限一到立即取消运行
+2. 为每次LLM调用和arXiv检索设置单次调用的超时
+3. 协作式取消：取消后正在等待的LLM调用和检索立即返回，之后的调用不再发起
+4. 运行被取消时收集已完成任务的输出，作为部分结果保留
+
+预算（budget.py）在用量接近上限时让Agent尽快收尾，依赖Agent继续推理；
+LLM服务无响应时Agent不会再推进，只能由这里的期限中断。
+任务期限写在 tasks.yaml 中任务的 timeout_seconds 字段下；整次运行的期限和单次调用超时
+写在 run_budget 的 timeout_seconds 和 call_timeout_seconds 字段下，单次调用超时也可用
+环境变量 COREASCHER_CALL_TIMEOUT 设置。
+"""
+
+import contextvars
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from coreascher.monitoring.budget import RUN_BUDGET_KEY
+from coreascher.monitoring.metrics import RunMetrics, StageStats
+
+logger = logging.getLogger(__name__)
+
+# 任务和整次运行期限的配置键
+TIMEOUT_KEY = "timeout_seconds"
+CALL_TIMEOUT_KEY = "call_timeout_seconds"
+
+# 单次调用超时的环境变量和默认值（秒）
+CALL_TIMEOUT_ENV = "COREASCHER_CALL_TIMEOUT"
+DEFAULT_CALL_TIMEOUT = 300.0
+
+
+class RunCancelled(TimeoutError):
+    """运行被取消或超过期限
+
+    继承 TimeoutError：crewAI 对 TimeoutError 不重试任务，取消后不会再次执行。
+    由执行器抛出时 result 为收集到的部分结果。
+    """
+
+    def __init__(self, reason: str, result: Optional[Dict[str, Any]] = None) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.result = result
+
+
+class CallTimeout(Exception):
+    """单次LLM调用或检索超时，crewAI 会按Agent的重试次数重新执行任务"""
+
+
+def call_timeout_from_env() -> float:
+    """单次调用超时，取环境变量 COREASCHER_CALL_TIMEOUT"""
+    try:
+        return float(os.getenv(CALL_TIMEOUT_ENV, DEFAULT_CALL_TIMEOUT))
+    except ValueError:
+        return DEFAULT_CALL_TIMEOUT
+
+
+def check_timeout(owner: str, value: Any) -> Optional[str]:
+    """校验期限配置，返回错误信息，有效时返回None"""
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+        return f"{owner} 的期限应为正数（秒）: {value}"
+    return None
+
+
+class CancelToken:
+    """协作式取消标记，取消后所有等待中的调用被唤醒"""
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+        self._waiters: set = set()
+        self._lock = threading.Lock()
+        self.reason: Optional[str] = None
+
+    def cancel(self, reason: str = "运行已取消") -> None:
+        """取消运行，只记录第一次取消的原因"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            waiters = list(self._waiters)
+        for waiter in waiters:
+            waiter.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def check(self) -> None:
+        """已取消时抛出 RunCancelled"""
+        if self._event.is_set():
+            raise RunCancelled(self.reason or "运行已取消")
+
+    def subscribe(self, waiter: threading.Event) -> None:
+        """取消时设置 waiter，已取消时立即设置"""
+        with self._lock:
+            self._waiters.add(waiter)
+            if self._event.is_set():
+                waiter.set()
+
+    def unsubscribe(self, waiter: threading.Event) -> None:
+        with self._lock:
+            self._waiters.discard(waiter)
+
+
+class DeadlineGuard:
+    """挂接在Crew上的期限控制器
+
+    任务开始时间来自 RunMetrics 的任务开始事件。后台线程检查期限，到期后取消运行；
+    LLM调用和检索在单独的线程中执行，调用方最多等待单次调用超时，期间运行被取消时立即返回。
+    """
+
+    def __init__(self, metrics: RunMetrics, task_timeouts: Optional[Dict[str, float]] = None,
+                 run_timeout: Optional[float] = None, call_timeout: Optional[float] = None,
+                 token: Optional[CancelToken] = None, check_interval: float = 0.5) -> None:
+        """初始化期限控制器
+
+        Args:
+            metrics: 本次运行的指标采集器
+            task_timeouts: 按任务名称的期限（秒）
+            run_timeout: 整次运行的期限（秒）
+            call_timeout: 单次LLM调用或检索的超时（秒），默认取环境变量或300秒
+            token: 取消标记，可由外部（如服务的取消接口）触发，默认新建
+            check_interval: 后台检查期限的间隔（秒）
+        """
+        self.metrics = metrics
+        self.task_timeouts = task_timeouts or {}
+        self.run_timeout = run_timeout
+        self.call_timeout = call_timeout if call_timeout is not None else call_timeout_from_env()
+        self.token = token or CancelToken()
+        self.check_interval = check_interval
+        self.started_at: Optional[float] = None
+        self.timeouts = 0
+        self._running: Dict[str, float] = {}
+        self._originals: List[Tuple[Any, str, Any]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(cls, metrics: RunMetrics, tasks_config: Dict[str, Dict], **kwargs) -> "DeadlineGuard":
+        """从 tasks.yaml 的配置创建期限控制器"""
+        task_timeouts = {
+            name: float(config[TIMEOUT_KEY]) for name, config in tasks_config.items()
+            if name != RUN_BUDGET_KEY and isinstance(config, dict) and config.get(TIMEOUT_KEY)
+        }
+        run_config = tasks_config.get(RUN_BUDGET_KEY) or {}
+        kwargs.setdefault("run_timeout", run_config.get(TIMEOUT_KEY))
+        if run_config.get(CALL_TIMEOUT_KEY) and os.getenv(CALL_TIMEOUT_ENV) is None:
+            kwargs.setdefault("call_timeout", float(run_config[CALL_TIMEOUT_KEY]))
+        return cls(metrics, task_timeouts, **kwargs)
+
+    # ===== crewAI 集成 =====
+
+    def attach(self, crew: Any) -> "DeadlineGuard":
+        """挂接到Crew：包装各Agent及其记忆的LLM，为检索工具设置期限，并启动后台检查
+
+        Args:
+            crew: crewAI Crew 实例，需已挂接同一个 RunMetrics
+
+        Returns:
+            期限控制器自身，便于链式调用
+        """
+        from coreascher.tools.llm_cache import GuardedLLM, wrap_memory_llms
+
+        self.started_at = time.time()
+        for agent in crew.agents:
+            if agent.llm is not None and not isinstance(agent.llm, GuardedLLM):
+                self._originals.append((agent, "llm", agent.llm))
+                agent.llm = self._guard_llm(agent.llm)
+            for tool in getattr(agent, "tools", None) or []:
+                if hasattr(tool, "deadline"):
+                    self._originals.append((tool, "deadline", tool.deadline))
+                    tool.deadline = self
+        # 记忆的保存和检索直接调用记忆自己的LLM，同样受期限约束
+        for memory, original in wrap_memory_llms(crew, self._guard_llm, GuardedLLM):
+            self._originals.append((memory, "_llm_instance", original))
+        self.metrics.add_listener(self.on_stage)
+        self._stop.clear()
+        self._watchdog = threading.Thread(target=self._watch, name="deadline-watchdog", daemon=True)
+        self._watchdog.start()
+        return self
+
+    def detach(self) -> None:
+        """停止检查并恢复被修改的Agent和工具属性"""
+        self.metrics.remove_listener(self.on_stage)
+        self._stop.set()
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=self.check_interval * 2)
+            self._watchdog = None
+        for owner, attribute, original in reversed(self._originals):
+            setattr(owner, attribute, original)
+        self._originals.clear()
+
+    def _guard_llm(self, llm: Any) -> Any:
+        """为LLM加上期限包装"""
+        from coreascher.tools.llm_cache import GuardedLLM
+
+        self._limit_provider(llm)
+        return GuardedLLM(llm, self)
+
+    def _limit_provider(self, llm: Any) -> None:
+        """把单次调用超时传给最内层的LLM，尚未创建HTTP客户端时，放弃等待的请求也会在超时后中止"""
+        while getattr(llm, "inner", None) is not None:
+            llm = llm.inner
+        if "timeout" in getattr(type(llm), "model_fields", {}) and getattr(llm, "timeout", None) is None:
+            self._originals.append((llm, "timeout", None))
+            llm.timeout = self.call_timeout
+
+    def on_stage(self, stats: StageStats) -> None:
+        """RunMetrics 监听器：记录任务开始和结束"""
+        with self._lock:
+            if stats.ended_at is not None:
+                self._running.pop(stats.task, None)
+            elif stats.started_at is not None:
+                self._running.setdefault(stats.task, stats.started_at)
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.check_interval):
+            self.check()
+
+    # ===== 期限检查 =====
+
+    def _deadlines(self) -> List[Tuple[float, str]]:
+        """当前生效的期限 (截止时刻, 说明)"""
+        deadlines = []
+        if self.run_timeout and self.started_at is not None:
+            deadlines.append((self.started_at + self.run_timeout, f"运行超过期限 {self.run_timeout} 秒"))
+        with self._lock:
+            running = list(self._running.items())
+        for task, started in running:
+            timeout = self.task_timeouts.get(task)
+            if timeout:
+                deadlines.append((started + timeout, f"任务 {task} 超过期限 {timeout} 秒"))
+        return deadlines
+
+    def check(self) -> None:
+        """有期限已到时取消运行"""
+        now = time.time()
+        for deadline, reason in self._deadlines():
+            if now >= deadline and not self.token.cancelled:
+                logger.warning(f"{reason}，取消运行")
+                self.token.cancel(reason)
+
+    def call(self, compute: Callable[[], Any], what: str = "调用") -> Any:
+        """在单独的线程中执行一次外部调用，超时或取消时不再等待
+
+        放弃等待后调用线程在调用返回后自行结束，其结果被丢弃。
+
+        Args:
+            compute: 发起调用的函数
+            what: 异常信息中的调用说明
+
+        Returns:
+            compute 的返回值
+
+        Raises:
+            RunCancelled: 运行已取消或期限已到
+            CallTimeout: 超过单次调用超时
+        """
+        self.token.check()
+        outcome: Dict[str, Any] = {}
+        finished = threading.Event()
+        wake = threading.Event()
+        context = contextvars.copy_context()
+
+        def run() -> None:
+            try:
+                outcome["value"] = context.run(compute)
+            except BaseException as e:
+                outcome["error"] = e
+            finally:
+                finished.set()
+                wake.set()
+
+        self.token.subscribe(wake)
+        try:
+            threading.Thread(target=run, name="guarded-call", daemon=True).start()
+            if not wake.wait(self.call_timeout):
+                with self._lock:
+                    self.timeouts += 1
+                raise CallTimeout(f"{what}超过 {self.call_timeout} 秒未返回")
+        finally:
+            self.token.unsubscribe(wake)
+        if not finished.is_set():
+            self.token.check()
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome.get("value")
+
+    def salvage(self, crew: Any) -> Dict[str, str]:
+        """收集已完成任务的输出
+
+        Returns:
+            {任务名: 输出}，按任务顺序排列
+        """
+        outputs = {}
+        for task in crew.tasks:
+            output = getattr(task, "output", None)
+            raw = getattr(output, "raw", None) if output is not None else None
+            if raw:
+                outputs[getattr(task, "name", None) or str(task.id)] = raw
+        return outputs
+
+    def summary(self) -> Dict[str, Any]:
+        """期限执行情况"""
+        return {
+            "cancelled": self.token.cancelled,
+            "reason": self.token.reason,
+            "call_timeouts": self.timeouts,
+        }
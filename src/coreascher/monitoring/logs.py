@@ -0,0 +1,182 @@
+"""
+日志配置模块
+
+该模块统一配置整个应用的日志输出，负责：
+1. 通过队列把日志记录交给后台线程格式化和写出，调用方只合并消息参数并入队
+2. 在后台线程中截断超长的提示词和工具输出
+3. 按组件（日志记录器名称前缀）分别设置日志级别
+
+替代各入口中分散的 logging.basicConfig 调用。组件级别可通过环境变量设置：
+    COREASCHER_LOG_LEVEL=INFO
+    COREASCHER_LOG_LEVELS="coreascher.tools=DEBUG,crewai=WARNING"
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+# 默认日志格式
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# 单条日志消息的最大字符数，超出部分被截断
+DEFAULT_MAX_PAYLOAD = 4000
+
+# 全局日志级别和组件日志级别的环境变量
+LEVEL_ENV = "COREASCHER_LOG_LEVEL"
+COMPONENT_LEVELS_ENV = "COREASCHER_LOG_LEVELS"
+
+# 额外写入的日志文件路径的环境变量
+LOG_FILE_ENV = "COREASCHER_LOG_FILE"
+
+# 控制crewAI控制台详细输出的环境变量
+CREW_VERBOSE_ENV = "COREASCHER_CREW_VERBOSE"
+
+# 日志队列的最大长度，队列满时丢弃新日志而不是阻塞调用方
+QUEUE_SIZE = 10000
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.Handler] = None
+_setup_lock = threading.Lock()
+
+
+class TruncatingFormatter(logging.Formatter):
+    """截断超长消息的格式化器"""
+
+    def __init__(self, fmt: str = LOG_FORMAT, max_payload: int = DEFAULT_MAX_PAYLOAD) -> None:
+        super().__init__(fmt)
+        self.max_payload = max_payload
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        message = record.message
+        if self.max_payload and len(message) > self.max_payload:
+            record.message = (f"{message[:self.max_payload]}"
+                              f"…（已截断 {len(message) - self.max_payload} 个字符）")
+        return super().formatMessage(record)
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """入队前只合并消息参数的队列处理器
+
+    与标准 QueueHandler 一样在调用线程中把参数合并进消息，参数之后被修改也不影响日志内容；
+    时间、格式和截断等其余格式化推迟到后台线程。异常堆栈同样在调用线程中渲染成文本，避免跨线程持有栈帧。
+    """
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def parse_levels(spec: Optional[str]) -> Dict[str, int]:
+    """解析 "组件=级别,组件=级别" 形式的组件日志级别
+
+    Raises:
+        ValueError: 级别名称无效时
+    """
+    levels: Dict[str, int] = {}
+    for item in (spec or "").split(","):
+        name, sep, level = item.strip().partition("=")
+        if not sep:
+            continue
+        value = logging.getLevelName(level.strip().upper())
+        if not isinstance(value, int):
+            raise ValueError(f"无效的日志级别: {item.strip()}")
+        levels[name.strip()] = value
+    return levels
+
+
+def setup_logging(level: Union[int, str, None] = None, levels: Optional[Dict[str, Union[int, str]]] = None,
+                  log_file: Optional[Path] = None, max_payload: int = DEFAULT_MAX_PAYLOAD) -> None:
+    """配置应用日志，重复调用会替换之前的配置
+
+    Args:
+        level: 根日志级别，默认读取 COREASCHER_LOG_LEVEL，未设置时为 INFO
+        levels: 组件日志级别，会覆盖 COREASCHER_LOG_LEVELS 中的同名组件
+        log_file: 额外写入的日志文件，按 10MB 滚动，默认读取 COREASCHER_LOG_FILE
+        max_payload: 单条消息的最大字符数，为0时不截断
+    """
+    global _listener, _queue_handler
+    with _setup_lock:
+        shutdown_logging()
+        root = logging.getLogger()
+        root.setLevel(level or os.getenv(LEVEL_ENV, "INFO").upper())
+
+        formatter = TruncatingFormatter(LOG_FORMAT, max_payload)
+        handlers: List[logging.Handler] = [logging.StreamHandler(sys.stderr)]
+        log_file = log_file or os.getenv(LOG_FILE_ENV) or None
+        if log_file is not None:
+            Path(log_file).parent.mkdir(parents=True, exist_ok=True)
+            handlers.append(logging.handlers.RotatingFileHandler(
+                log_file, maxBytes=10 * 1024 * 1024, backupCount=3, encoding="utf-8"
+            ))
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        log_queue: queue.Queue = queue.Queue(QUEUE_SIZE)
+        _queue_handler = LazyQueueHandler(log_queue)
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(_queue_handler)
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+
+        component_levels = parse_levels(os.getenv(COMPONENT_LEVELS_ENV))
+        component_levels.update(levels or {})
+        for name, component_level in component_levels.items():
+            logging.getLogger(name).setLevel(component_level)
+
+
+def shutdown_logging() -> None:
+    """停止后台写出线程并写出队列中剩余的日志"""
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _restart_after_fork() -> None:
+    # fork 出的子进程没有后台写出线程，用新的队列重新启动，写出到同样的目标
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    handlers = _listener.handlers
+    log_queue: queue.Queue = queue.Queue(QUEUE_SIZE)
+    root = logging.getLogger()
+    if _queue_handler is not None:
+        root.removeHandler(_queue_handler)
+    _queue_handler = LazyQueueHandler(log_queue)
+    root.addHandler(_queue_handler)
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def crew_verbose() -> bool:
+    """crewAI是否输出详细的控制台日志，由 COREASCHER_CREW_VERBOSE 控制，默认开启"""
+    return os.getenv(CREW_VERBOSE_ENV, "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+atexit.register(shutdown_logging)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_after_fork)
@@ -0,0 +1,464 @@
+"""
+运行指标采集模块
+
+该模块为文献综述Crew提供按任务和Agent划分的运行指标，负责：
+1. 通过任务回调、步骤回调和crewAI事件记录任务起止时间
+2. 统计每个任务和Agent的LLM调用次数、输入输出token数
+3. 统计工具调用次数、耗时和缓存命中
+4. 导出JSON汇总和Prometheus文本格式指标文件
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from coreascher.tools.shared_store import atomic_write_json, atomic_write_text
+
+logger = logging.getLogger(__name__)
+
+# 未关联到具体任务或Agent时使用的名称
+UNKNOWN = "unknown"
+
+
+class StageStats:
+    """单个任务与Agent组合的指标"""
+
+    __slots__ = (
+        "task", "agent", "started_at", "ended_at", "steps", "llm_calls", "llm_seconds",
+        "input_tokens", "output_tokens", "tool_calls", "tool_seconds", "tool_cache_hits", "tools",
+    )
+
+    def __init__(self, task: str, agent: str) -> None:
+        self.task = task
+        self.agent = agent
+        self.started_at: Optional[float] = None
+        self.ended_at: Optional[float] = None
+        self.steps = 0
+        self.llm_calls = 0
+        self.llm_seconds = 0.0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.tool_calls = 0
+        self.tool_seconds = 0.0
+        self.tool_cache_hits = 0
+        self.tools: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0])
+
+    @property
+    def wall_seconds(self) -> float:
+        if self.started_at is None or self.ended_at is None:
+            return 0.0
+        return self.ended_at - self.started_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "task": self.task,
+            "agent": self.agent,
+            "wall_seconds": round(self.wall_seconds, 4),
+            "steps": self.steps,
+            "llm_calls": self.llm_calls,
+            "llm_seconds": round(self.llm_seconds, 4),
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "tool_calls": self.tool_calls,
+            "tool_seconds": round(self.tool_seconds, 4),
+            "tool_cache_hits": self.tool_cache_hits,
+            "tools": {
+                name: {"calls": int(calls), "seconds": round(seconds, 4)}
+                for name, (calls, seconds) in self.tools.items()
+            },
+        }
+
+
+def _usage_tokens(usage: Optional[Dict[str, Any]]) -> Tuple[int, int]:
+    """从LLM返回的usage字典中取出输入和输出token数"""
+    if not usage:
+        return 0, 0
+    input_tokens = usage.get("prompt_tokens", usage.get("input_tokens", 0)) or 0
+    output_tokens = usage.get("completion_tokens", usage.get("output_tokens", 0)) or 0
+    return int(input_tokens), int(output_tokens)
+
+
+class RunMetrics:
+    """一次Crew运行的指标采集器"""
+
+    def __init__(self, run_id: Optional[str] = None) -> None:
+        """初始化采集器
+
+        Args:
+            run_id: 运行ID，默认随机生成
+        """
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.started_at: Optional[float] = None
+        self.ended_at: Optional[float] = None
+        self._stages: Dict[Tuple[str, str], StageStats] = {}
+        self._task_names: Dict[str, str] = {}
+        self._agent_roles: Dict[str, str] = {}
+        self._task_agents: Dict[str, str] = {}
+        self._llm_started: Dict[str, float] = {}
+        self._originals: List[Tuple[Any, str, Any]] = []
+        self._listeners: List[Callable[[StageStats], None]] = []
+        self._lock = threading.RLock()
+
+    # ===== 记录接口 =====
+
+    def add_listener(self, listener: Callable[[StageStats], None]) -> None:
+        """注册指标更新监听器，每次记录后以被更新的阶段指标调用"""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[StageStats], None]) -> None:
+        """移除指标更新监听器"""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, stats: StageStats) -> None:
+        for listener in list(self._listeners):
+            try:
+                listener(stats)
+            except Exception as e:
+                logger.error(f"指标监听器执行失败: {str(e)}")
+
+    def stage(self, task: Optional[str], agent: Optional[str]) -> StageStats:
+        """获取任务与Agent组合的指标，不存在时创建"""
+        task = task or UNKNOWN
+        agent = agent or self._task_agents.get(task, UNKNOWN)
+        key = (task, agent)
+        stats = self._stages.get(key)
+        if stats is None:
+            with self._lock:
+                stats = self._stages.setdefault(key, StageStats(task, agent))
+        return stats
+
+    def record_task_start(self, task: str, agent: Optional[str] = None, at: Optional[float] = None) -> None:
+        """记录任务开始"""
+        at = at if at is not None else time.time()
+        if agent:
+            self._task_agents[task] = agent
+        stats = self.stage(task, agent)
+        if stats.started_at is None or at < stats.started_at:
+            stats.started_at = at
+        if self.started_at is None or at < self.started_at:
+            self.started_at = at
+        self._notify(stats)
+
+    def record_task_end(self, task: str, agent: Optional[str] = None, at: Optional[float] = None) -> None:
+        """记录任务结束"""
+        at = at if at is not None else time.time()
+        stats = self.stage(task, agent)
+        if stats.ended_at is None or at > stats.ended_at:
+            stats.ended_at = at
+        if self.ended_at is None or at > self.ended_at:
+            self.ended_at = at
+        self._notify(stats)
+
+    def record_step(self, task: Optional[str], agent: Optional[str]) -> None:
+        """记录一次Agent推理步骤"""
+        with self._lock:
+            stats = self.stage(task, agent)
+            stats.steps += 1
+        self._notify(stats)
+
+    def record_llm_call(self, task: Optional[str], agent: Optional[str], input_tokens: int = 0,
+                        output_tokens: int = 0, seconds: float = 0.0) -> None:
+        """记录一次LLM调用"""
+        with self._lock:
+            stats = self.stage(task, agent)
+            stats.llm_calls += 1
+            stats.input_tokens += input_tokens
+            stats.output_tokens += output_tokens
+            stats.llm_seconds += seconds
+        self._notify(stats)
+
+    def record_tool_call(self, task: Optional[str], agent: Optional[str], tool: str,
+                         seconds: float = 0.0, from_cache: bool = False) -> None:
+        """记录一次工具调用"""
+        with self._lock:
+            stats = self.stage(task, agent)
+            stats.tool_calls += 1
+            stats.tool_seconds += seconds
+            stats.tool_cache_hits += int(from_cache)
+            entry = stats.tools[tool]
+            entry[0] += 1
+            entry[1] += seconds
+        self._notify(stats)
+
+    def usage(self, task: Optional[str] = None, agent: Optional[str] = None,
+              now: Optional[float] = None) -> Dict[str, float]:
+        """统计某个任务、某个Agent或整次运行的实时用量
+
+        Args:
+            task: 任务名称，为None时不按任务过滤
+            agent: Agent角色，为None时不按Agent过滤
+            now: 计算进行中任务耗时所用的当前时间
+
+        Returns:
+            包含 tokens、llm_calls 和 wall_seconds 的字典
+        """
+        now = now if now is not None else time.time()
+        with self._lock:
+            stages = [
+                stats for stats in self._stages.values()
+                if (task is None or stats.task == task) and (agent is None or stats.agent == agent)
+            ]
+        tokens = sum(stats.input_tokens + stats.output_tokens for stats in stages)
+        llm_calls = sum(stats.llm_calls for stats in stages)
+        if task is None and agent is None:
+            wall = (now - self.started_at) if self.started_at is not None else 0.0
+        else:
+            wall = sum(
+                (stats.ended_at or now) - stats.started_at
+                for stats in stages if stats.started_at is not None
+            )
+        return {"tokens": tokens, "llm_calls": llm_calls, "wall_seconds": max(0.0, wall)}
+
+    # ===== crewAI 集成 =====
+
+    def attach(self, crew: Any) -> "RunMetrics":
+        """挂接到Crew，包装任务回调和步骤回调并订阅crewAI事件
+
+        Args:
+            crew: crewAI Crew 实例
+
+        Returns:
+            采集器自身，便于链式调用
+        """
+        for task in crew.tasks:
+            name = getattr(task, "name", None) or str(task.id)
+            role = task.agent.role if task.agent is not None else None
+            self._task_names[str(task.id)] = name
+            if role:
+                self._task_agents[name] = role
+            self._originals.append((task, "callback", task.callback))
+            task.callback = self._wrap_task_callback(name, role, task.callback)
+        for agent in crew.agents:
+            self._agent_roles[str(agent.id)] = agent.role
+            self._originals.append((agent, "step_callback", agent.step_callback))
+            agent.step_callback = self._wrap_step_callback(agent.role, agent.step_callback)
+        _EventRouter.get().register(self)
+        return self
+
+    def detach(self) -> None:
+        """取消事件订阅并恢复原有回调"""
+        _EventRouter.get().unregister(self)
+        for owner, attribute, original in reversed(self._originals):
+            setattr(owner, attribute, original)
+        self._originals.clear()
+
+    def owns(self, event: Any) -> bool:
+        """判断事件是否属于本次运行"""
+        return (getattr(event, "task_id", None) in self._task_names
+                or getattr(event, "agent_id", None) in self._agent_roles)
+
+    def _wrap_task_callback(self, name: str, role: Optional[str], callback: Optional[Callable]) -> Callable:
+        def task_callback(output: Any) -> Any:
+            self.record_task_end(name, role)
+            if callback is not None:
+                return callback(output)
+            return None
+        return task_callback
+
+    def _wrap_step_callback(self, role: str, callback: Optional[Callable]) -> Callable:
+        def step_callback(step: Any) -> Any:
+            self.record_step(self._current_task(role), role)
+            if callback is not None:
+                return callback(step)
+            return None
+        return step_callback
+
+    def _current_task(self, role: str) -> Optional[str]:
+        """找到该Agent正在执行的任务"""
+        running = [
+            stats for stats in self._stages.values()
+            if stats.agent == role and stats.started_at is not None and stats.ended_at is None
+        ]
+        return running[-1].task if running else None
+
+    def _task_of(self, event: Any) -> Optional[str]:
+        task_id = getattr(event, "task_id", None)
+        return self._task_names.get(task_id) or getattr(event, "task_name", None)
+
+    def _agent_of(self, event: Any) -> Optional[str]:
+        agent_id = getattr(event, "agent_id", None)
+        return self._agent_roles.get(agent_id) or getattr(event, "agent_role", None)
+
+    def handle_event(self, event: Any) -> None:
+        """处理一条crewAI事件"""
+        kind = getattr(event, "type", "")
+        at = event.timestamp.timestamp()
+        if kind == "task_started":
+            task = self._task_of(event)
+            if task:
+                self.record_task_start(task, self._agent_of(event), at)
+        elif kind == "task_completed":
+            task = self._task_of(event)
+            if task:
+                self.record_task_end(task, self._agent_of(event), at)
+        elif kind == "llm_call_started":
+            self._llm_started[event.call_id] = at
+        elif kind in ("llm_call_completed", "llm_call_failed"):
+            started = self._llm_started.pop(event.call_id, at)
+            input_tokens, output_tokens = _usage_tokens(getattr(event, "usage", None))
+            self.record_llm_call(self._task_of(event), self._agent_of(event),
+                                 input_tokens, output_tokens, max(0.0, at - started))
+        elif kind == "tool_usage_finished":
+            seconds = (event.finished_at - event.started_at).total_seconds()
+            self.record_tool_call(self._task_of(event), self._agent_of(event), event.tool_name,
+                                  seconds, bool(getattr(event, "from_cache", False)))
+
+    # ===== 导出 =====
+
+    def summary(self) -> Dict[str, Any]:
+        """生成指标汇总
+
+        Returns:
+            包含整体、按任务和按Agent统计的字典
+        """
+        with self._lock:
+            stages = [stats.to_dict() for stats in self._stages.values()]
+
+        def aggregate(key: str) -> Dict[str, Dict[str, Any]]:
+            totals: Dict[str, Dict[str, Any]] = {}
+            for stage in stages:
+                entry = totals.setdefault(stage[key], {
+                    "wall_seconds": 0.0, "steps": 0, "llm_calls": 0, "llm_seconds": 0.0,
+                    "input_tokens": 0, "output_tokens": 0, "tool_calls": 0, "tool_seconds": 0.0,
+                })
+                for field in entry:
+                    entry[field] += stage[field]
+            return totals
+
+        wall = (self.ended_at - self.started_at) if self.started_at and self.ended_at else 0.0
+        return {
+            "run_id": self.run_id,
+            "wall_seconds": round(wall, 4),
+            "llm_calls": sum(stage["llm_calls"] for stage in stages),
+            "input_tokens": sum(stage["input_tokens"] for stage in stages),
+            "output_tokens": sum(stage["output_tokens"] for stage in stages),
+            "tool_calls": sum(stage["tool_calls"] for stage in stages),
+            "tasks": aggregate("task"),
+            "agents": aggregate("agent"),
+            "stages": stages,
+        }
+
+    def to_prometheus(self) -> str:
+        """生成Prometheus文本格式指标"""
+        summary = self.summary()
+        metrics = (
+            ("wall_seconds", "gauge", "任务墙钟耗时（秒）"),
+            ("llm_calls", "counter", "LLM调用次数"),
+            ("llm_seconds", "counter", "LLM调用耗时（秒）"),
+            ("input_tokens", "counter", "LLM输入token数"),
+            ("output_tokens", "counter", "LLM输出token数"),
+            ("tool_calls", "counter", "工具调用次数"),
+            ("tool_seconds", "counter", "工具调用耗时（秒）"),
+        )
+
+        def escape(value: str) -> str:
+            return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+        lines = [
+            "# HELP coreascher_run_wall_seconds 整次运行墙钟耗时（秒）",
+            "# TYPE coreascher_run_wall_seconds gauge",
+            f'coreascher_run_wall_seconds{{run="{escape(self.run_id)}"}} {summary["wall_seconds"]}',
+        ]
+        for field, kind, help_text in metrics:
+            name = f"coreascher_stage_{field}" + ("_total" if kind == "counter" else "")
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for stage in summary["stages"]:
+                labels = f'run="{escape(self.run_id)}",task="{escape(stage["task"])}",agent="{escape(stage["agent"])}"'
+                lines.append(f"{name}{{{labels}}} {stage[field]}")
+        lines.append("# HELP coreascher_tool_calls_by_tool_total 按工具统计的调用次数")
+        lines.append("# TYPE coreascher_tool_calls_by_tool_total counter")
+        for stage in summary["stages"]:
+            for tool, entry in stage["tools"].items():
+                labels = (f'run="{escape(self.run_id)}",task="{escape(stage["task"])}",'
+                          f'agent="{escape(stage["agent"])}",tool="{escape(tool)}"')
+                lines.append(f"coreascher_tool_calls_by_tool_total{{{labels}}} {entry['calls']}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, directory: Path) -> Tuple[Path, Path]:
+        """将指标写入目录
+
+        Args:
+            directory: 输出目录
+
+        Returns:
+            (JSON汇总路径, Prometheus指标路径)
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        json_path = directory / f"metrics_{self.run_id}.json"
+        prom_path = directory / f"metrics_{self.run_id}.prom"
+        # 两个文件都原子替换，读者（如 Prometheus textfile collector）不会读到写了一半的文件
+        atomic_write_json(json_path, self.summary())
+        atomic_write_text(prom_path, self.to_prometheus())
+        logger.info(f"运行指标已写入: {json_path}")
+        return json_path, prom_path
+
+
+class _EventRouter:
+    """将crewAI事件分发给对应运行的采集器，事件总线上只注册一次"""
+
+    _instance: Optional["_EventRouter"] = None
+    _instance_lock = threading.Lock()
+
+    EVENT_TYPES = (
+        "TaskStartedEvent", "TaskCompletedEvent", "LLMCallStartedEvent",
+        "LLMCallCompletedEvent", "LLMCallFailedEvent", "ToolUsageFinishedEvent",
+    )
+
+    def __init__(self) -> None:
+        self._collectors: List[Any] = []
+        self._subscribed: set = set()
+        self._lock = threading.Lock()
+        try:
+            import crewai.events as events
+        except ImportError:  # crewAI 0.x
+            import crewai.utilities.events as events
+        self._events = events
+        self._subscribe(self.EVENT_TYPES)
+
+    def _subscribe(self, names: Tuple[str, ...]) -> None:
+        for name in names:
+            if name not in self._subscribed and hasattr(self._events, name):
+                self._events.crewai_event_bus.on(getattr(self._events, name))(self._dispatch)
+                self._subscribed.add(name)
+
+    @classmethod
+    def get(cls) -> "_EventRouter":
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def register(self, collector: Any) -> None:
+        """注册采集器；采集器可用 EXTRA_EVENT_TYPES 声明额外需要的事件（如流式输出的分块）"""
+        with self._lock:
+            self._subscribe(getattr(collector, "EXTRA_EVENT_TYPES", ()))
+            self._collectors.append(collector)
+
+    def unregister(self, collector: Any) -> None:
+        with self._lock:
+            if collector in self._collectors:
+                self._collectors.remove(collector)
+
+    def _dispatch(self, source: Any, event: Any) -> None:
+        name = type(event).__name__
+        with self._lock:
+            collectors = [collector for collector in self._collectors
+                          if name in self.EVENT_TYPES or name in getattr(collector, "EXTRA_EVENT_TYPES", ())]
+        if not collectors:
+            return
+        owners = [collector for collector in collectors if collector.owns(event)]
+        if not owners and len(collectors) == 1:
+            owners = collectors
+        for collector in owners:
+            try:
+                collector.handle_event(event)
+            except Exception as e:
+                logger.error(f"处理运行事件失败: {str(e)}")
@@ -0,0 +1,307 @@
+"""
+分阶段性能剖析模块
+
+该模块为任务和Agent方法提供内置的cProfile剖析，负责：
+1. 通过环境变量 COREASCHER_PROFILE 或命令行参数启用剖析模式
+2. 按阶段名称分别累计剖析数据，嵌套阶段之间互不重复计时
+3. 为每个阶段导出 pstats 文件和可用于火焰图的折叠栈文件
+
+未启用剖析时 profile_stage 只检查一个模块级布尔值，返回共享的空上下文。
+Python 3.12 起 cProfile 基于进程范围的 sys.monitoring，同一时刻只能有一个剖析器处于启用状态：
+多个线程（并发任务、批量和服务的工作线程）同时进入阶段时，只剖析先进入的线程，
+其余线程的阶段照常执行但不计时，跳过的次数在导出时记入日志。
+"""
+
+import cProfile
+import functools
+import logging
+import os
+import pstats
+import re
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 启用剖析并指定输出目录的环境变量
+PROFILE_ENV = "COREASCHER_PROFILE"
+
+# 环境变量取值为 1/true 等时使用的默认输出目录
+DEFAULT_PROFILE_DIR = Path("output/profiles")
+
+# 折叠栈的最大深度
+MAX_STACK_DEPTH = 64
+
+_enabled = False
+_output_dir: Optional[Path] = None
+_profiles: Dict[Tuple[str, int], cProfile.Profile] = {}
+_profiles_lock = threading.Lock()
+_local = threading.local()
+# cProfile 的剖析器是否为进程范围（Python 3.12 起基于 sys.monitoring）
+_PROCESS_WIDE = sys.version_info >= (3, 12)
+# 当前正在剖析的线程，仅在剖析器为进程范围时使用
+_owner: Optional[int] = None
+_skipped = 0
+_STAGE_NAME_PATTERN = re.compile(r"[^\w.-]+")
+
+
+class _NullStage:
+    """剖析未启用时的空阶段"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+
+_NULL_STAGE = _NullStage()
+
+
+def enable_profiling(directory: Optional[Path] = None) -> Path:
+    """启用剖析模式
+
+    Args:
+        directory: 剖析文件输出目录，默认为 output/profiles
+
+    Returns:
+        输出目录
+    """
+    global _enabled, _output_dir
+    _output_dir = Path(directory) if directory else DEFAULT_PROFILE_DIR
+    _enabled = True
+    return _output_dir
+
+
+def disable_profiling() -> None:
+    """关闭剖析模式并丢弃未导出的数据"""
+    global _enabled, _skipped
+    _enabled = False
+    with _profiles_lock:
+        _profiles.clear()
+        _skipped = 0
+
+
+def profiling_enabled() -> bool:
+    """当前是否处于剖析模式"""
+    return _enabled
+
+
+def enable_from_env() -> bool:
+    """根据环境变量 COREASCHER_PROFILE 启用剖析
+
+    取值为 1/true/yes/on 时输出到默认目录，其他非空取值视为输出目录。
+    """
+    value = os.getenv(PROFILE_ENV, "").strip()
+    if not value or value.lower() in ("0", "false", "no", "off"):
+        return False
+    enable_profiling(None if value.lower() in ("1", "true", "yes", "on") else Path(value))
+    return True
+
+
+class _Stage:
+    """剖析阶段：进入时暂停外层阶段，退出时恢复
+
+    线程的阶段栈中以None表示未剖析的阶段，其中嵌套的阶段同样不剖析。
+    """
+
+    __slots__ = ("name", "profile", "outer", "owner")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def _skip(self) -> None:
+        global _skipped
+        with _profiles_lock:
+            _skipped += 1
+        self.profile = None
+
+    def __enter__(self) -> None:
+        global _owner
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        self.outer = stack[-1] if stack else None
+        self.owner = False
+        self.profile = None
+        if stack and self.outer is None:
+            stack.append(None)
+            return
+        ident = threading.get_ident()
+        with _profiles_lock:
+            # 进程范围的剖析器已被其他线程的阶段占用
+            busy = not stack and _PROCESS_WIDE and _owner not in (None, ident)
+            if not busy:
+                if not stack and _PROCESS_WIDE:
+                    _owner = ident
+                    self.owner = True
+                key = (self.name, ident)
+                self.profile = _profiles.get(key)
+                if self.profile is None:
+                    self.profile = _profiles[key] = cProfile.Profile()
+        if busy:
+            self._skip()
+            stack.append(None)
+            return
+        if self.outer is not None:
+            self.outer.disable()
+        try:
+            self.profile.enable()
+        except ValueError:
+            # 其他剖析工具（如外部的 cProfile 或调试器）已占用 sys.monitoring
+            if self.outer is not None:
+                self.outer.enable()
+            self._release()
+            self._skip()
+        stack.append(self.profile)
+
+    def _release(self) -> None:
+        global _owner
+        if self.owner:
+            with _profiles_lock:
+                _owner = None
+            self.owner = False
+
+    def __exit__(self, *exc_info) -> None:
+        _local.stack.pop()
+        if self.profile is not None:
+            self.profile.disable()
+            if self.outer is not None:
+                self.outer.enable()
+        self._release()
+
+
+def profile_stage(name: str):
+    """剖析一个命名阶段
+
+    同名阶段的多次执行会累计到一起；嵌套阶段执行期间外层阶段暂停计时。
+
+    Args:
+        name: 阶段名称，如 task:search_literature 或 PhDAgent.search_literature
+
+    Returns:
+        上下文管理器
+    """
+    if not _enabled:
+        return _NULL_STAGE
+    return _Stage(name)
+
+
+def profiled(name: Optional[str] = None) -> Callable:
+    """方法剖析装饰器，阶段名默认为 类名.方法名"""
+    def decorator(func: Callable) -> Callable:
+        stage = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Stage(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def profile_crew(crew: Any) -> None:
+    """为Crew中每个Agent的任务执行包上按任务命名的剖析阶段"""
+    if not _enabled:
+        return
+    for agent in crew.agents:
+        execute_task = agent.execute_task
+
+        def wrapper(task, *args, _execute_task=execute_task, **kwargs):
+            with _Stage(f"task:{getattr(task, 'name', None) or 'unknown'}"):
+                return _execute_task(task, *args, **kwargs)
+        # Agent 是 pydantic 模型，绕过字段校验设置实例属性
+        object.__setattr__(agent, "execute_task", wrapper)
+
+
+def _merged_stats() -> Dict[str, pstats.Stats]:
+    """按阶段名合并各线程的剖析数据"""
+    with _profiles_lock:
+        items = list(_profiles.items())
+    merged: Dict[str, pstats.Stats] = {}
+    for (name, _), profile in items:
+        try:
+            stats = pstats.Stats(profile)
+        except TypeError:
+            # 阶段从未真正执行过
+            continue
+        if name in merged:
+            merged[name].add(stats)
+        else:
+            merged[name] = stats
+    return merged
+
+
+def _label(func: Tuple[str, int, str]) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name
+    return f"{name} ({Path(filename).name}:{line})"
+
+
+def collapsed_stacks(stats: pstats.Stats) -> List[str]:
+    """由调用图近似还原折叠栈
+
+    cProfile 只记录调用者与被调用者之间的边，这里沿调用边从根函数向下展开，
+    按边的累计耗时占被调用函数总累计耗时的比例分摊子调用的耗时。
+
+    Returns:
+        形如 "根;子;孙 微秒数" 的折叠栈行
+    """
+    entries = stats.stats
+    children: Dict[Tuple, List[Tuple[Tuple, float, float]]] = {}
+    for func, (_, _, _, cumulative, callers) in entries.items():
+        for caller, edge in callers.items():
+            children.setdefault(caller, []).append((func, edge[2], edge[3]))
+    roots = [func for func, value in entries.items() if not any(caller in entries for caller in value[4])]
+
+    lines: Dict[str, float] = {}
+
+    def walk(func: Tuple, path: List[str], self_time: float, cumulative: float, seen: frozenset) -> None:
+        stack = path + [_label(func)]
+        key = ";".join(stack)
+        lines[key] = lines.get(key, 0.0) + self_time
+        total = entries[func][3]
+        if total <= 0 or len(stack) >= MAX_STACK_DEPTH:
+            return
+        scale = min(1.0, cumulative / total)
+        for child, child_self, child_cumulative in children.get(func, ()):
+            if child in seen:
+                continue
+            walk(child, stack, child_self * scale, child_cumulative * scale, seen | {child})
+
+    for root in roots:
+        walk(root, [], entries[root][2], entries[root][3], frozenset([root]))
+    return [f"{key} {int(value * 1e6)}" for key, value in lines.items() if int(value * 1e6) > 0]
+
+
+def dump_profiles(directory: Optional[Path] = None) -> List[Path]:
+    """导出每个阶段的 pstats 文件和折叠栈文件
+
+    Args:
+        directory: 输出目录，默认为启用剖析时指定的目录
+
+    Returns:
+        写入的文件路径列表
+    """
+    directory = Path(directory or _output_dir or DEFAULT_PROFILE_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    written: List[Path] = []
+    for name, stats in _merged_stats().items():
+        stem = _STAGE_NAME_PATTERN.sub("_", name)
+        pstats_path = directory / f"{stem}.pstats"
+        stats.dump_stats(str(pstats_path))
+        folded_path = directory / f"{stem}.folded"
+        with open(folded_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(collapsed_stacks(stats)) + "\n")
+        written.extend([pstats_path, folded_path])
+    if _skipped:
+        logger.info(f"剖析器同一时刻只能由一个线程使用，{_skipped} 个并发阶段未剖析")
+    logger.info(f"剖析结果已写入: {directory}（{len(written) // 2} 个阶段）")
+    return written
@@ -0,0 +1,289 @@
+"""
+运行时间线追踪模块
+
+该模块将一次Crew运行记录为嵌套的时间片段，负责：
+1. 通过crewAI事件记录任务、LLM调用和工具调用的起止时间
+2. 提供 trace_span 埋点接口，记录缓存查询、arXiv请求等内部步骤
+3. 按任务划分轨道，使并发执行的任务显示在不同轨道上
+4. 导出可在 Perfetto 或 chrome://tracing 中打开的 Chrome trace-event JSON
+
+未启用追踪时 trace_span 只做一次列表判空，返回共享的空上下文。
+"""
+
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from coreascher.monitoring.metrics import _EventRouter
+
+logger = logging.getLogger(__name__)
+
+# 未关联到任务的片段所在的轨道
+CREW_TRACK = "crew"
+
+_active: List["TraceRecorder"] = []
+_active_lock = threading.Lock()
+_current: contextvars.ContextVar[Optional["TraceRecorder"]] = contextvars.ContextVar(
+    "coreascher_trace_recorder", default=None
+)
+
+
+class _NullSpan:
+    """追踪未启用时的空片段"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> Dict[str, Any]:
+        return {}
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """埋点片段，退出时写入记录器"""
+
+    __slots__ = ("recorder", "name", "cat", "args", "start")
+
+    def __init__(self, recorder: "TraceRecorder", name: str, cat: str, args: Dict[str, Any]) -> None:
+        self.recorder = recorder
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self) -> Dict[str, Any]:
+        self.start = time.time()
+        return self.args
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self.args["error"] = f"{exc_type.__name__}: {exc}"
+        self.recorder.add_span(self.name, self.cat, self.start, time.time(),
+                               self.recorder.track_for_current_thread(), self.args)
+
+
+def trace_span(name: str, cat: str = "app", **args: Any):
+    """记录一个埋点片段
+
+    用法::
+
+        with trace_span("search_cache.get", cat="cache") as span:
+            span["hit"] = cached is not None
+
+    Args:
+        name: 片段名称
+        cat: 片段类别
+        args: 附加在片段上的参数
+
+    Returns:
+        上下文管理器，进入时返回可继续补充参数的字典
+    """
+    if not _active:
+        return _NULL_SPAN
+    recorder = _current.get()
+    if recorder is None:
+        with _active_lock:
+            if len(_active) != 1:
+                return _NULL_SPAN
+            recorder = _active[0]
+    return _Span(recorder, name, cat, args)
+
+
+class TraceRecorder:
+    """一次Crew运行的时间线记录器"""
+
+    def __init__(self, run_id: str) -> None:
+        """初始化记录器
+
+        Args:
+            run_id: 运行ID，与运行指标保持一致
+        """
+        self.run_id = run_id
+        self._events: List[Dict[str, Any]] = []
+        self._tracks: Dict[str, int] = {CREW_TRACK: 0}
+        self._task_names: Dict[str, str] = {}
+        self._agent_roles: Dict[str, str] = {}
+        self._task_agents: Dict[str, str] = {}
+        self._task_started: Dict[str, float] = {}
+        self._llm_started: Dict[str, float] = {}
+        self._token: Optional[contextvars.Token] = None
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    # ===== 片段记录 =====
+
+    def track(self, name: str) -> int:
+        """获取轨道编号，不存在时创建"""
+        with self._lock:
+            return self._tracks.setdefault(name, len(self._tracks))
+
+    def track_for_current_thread(self) -> int:
+        """埋点片段所在的轨道：只有一个任务在运行时放在该任务轨道上，否则按线程划分"""
+        with self._lock:
+            running = list(self._task_started)
+        if len(running) == 1:
+            return self.track(running[0])
+        return self.track(f"thread:{threading.current_thread().name}")
+
+    def add_span(self, name: str, cat: str, start: float, end: float, tid: int,
+                 args: Optional[Dict[str, Any]] = None) -> None:
+        """记录一个完整片段
+
+        Args:
+            name: 片段名称
+            cat: 片段类别
+            start: 开始时间（Unix秒）
+            end: 结束时间（Unix秒）
+            tid: 轨道编号
+            args: 附加参数
+        """
+        event = {
+            "name": name, "cat": cat, "ph": "X", "pid": self._pid, "tid": tid,
+            "ts": round(start * 1e6, 1), "dur": round(max(0.0, end - start) * 1e6, 1),
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            self._events.append(event)
+
+    # ===== crewAI 集成 =====
+
+    def attach(self, crew: Any) -> "TraceRecorder":
+        """挂接到Crew，订阅crewAI事件并启用埋点
+
+        Args:
+            crew: crewAI Crew 实例
+
+        Returns:
+            记录器自身，便于链式调用
+        """
+        for task in crew.tasks:
+            name = getattr(task, "name", None) or str(task.id)
+            self._task_names[str(task.id)] = name
+            if task.agent is not None:
+                self._task_agents[name] = task.agent.role
+        for agent in crew.agents:
+            self._agent_roles[str(agent.id)] = agent.role
+        _EventRouter.get().register(self)
+        with _active_lock:
+            _active.append(self)
+        self._token = _current.set(self)
+        return self
+
+    def detach(self) -> None:
+        """取消事件订阅并停用埋点"""
+        _EventRouter.get().unregister(self)
+        with _active_lock:
+            if self in _active:
+                _active.remove(self)
+        if self._token is not None:
+            try:
+                _current.reset(self._token)
+            except ValueError:
+                # 在其他上下文中分离时无法重置
+                _current.set(None)
+            self._token = None
+
+    def owns(self, event: Any) -> bool:
+        """判断事件是否属于本次运行"""
+        return (getattr(event, "task_id", None) in self._task_names
+                or getattr(event, "agent_id", None) in self._agent_roles)
+
+    def _task_of(self, event: Any) -> Optional[str]:
+        task_id = getattr(event, "task_id", None)
+        return self._task_names.get(task_id) or getattr(event, "task_name", None)
+
+    def _agent_of(self, event: Any) -> Optional[str]:
+        agent_id = getattr(event, "agent_id", None)
+        return self._agent_roles.get(agent_id) or getattr(event, "agent_role", None)
+
+    def handle_event(self, event: Any) -> None:
+        """处理一条crewAI事件"""
+        kind = getattr(event, "type", "")
+        at = event.timestamp.timestamp()
+        task = self._task_of(event)
+        tid = self.track(task or CREW_TRACK)
+        if kind == "task_started" and task:
+            with self._lock:
+                self._task_started[task] = at
+        elif kind == "task_completed" and task:
+            with self._lock:
+                started = self._task_started.pop(task, at)
+            self.add_span(task, "task", started, at, tid,
+                          {"agent": self._agent_of(event) or self._task_agents.get(task)})
+        elif kind == "llm_call_started":
+            self._llm_started[event.call_id] = at
+        elif kind in ("llm_call_completed", "llm_call_failed"):
+            started = self._llm_started.pop(event.call_id, at)
+            args = {"model": getattr(event, "model", None), "agent": self._agent_of(event)}
+            usage = getattr(event, "usage", None)
+            if usage:
+                args["usage"] = {key: value for key, value in usage.items() if isinstance(value, (int, float))}
+            if kind == "llm_call_failed":
+                args["error"] = getattr(event, "error", None)
+            self.add_span("llm_call", "llm", started, at, tid, args)
+        elif kind == "tool_usage_finished":
+            self.add_span(f"tool:{event.tool_name}", "tool", event.started_at.timestamp(),
+                          event.finished_at.timestamp(), tid,
+                          {"from_cache": bool(getattr(event, "from_cache", False))})
+
+    # ===== 导出 =====
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """生成 Chrome trace-event 格式的字典"""
+        with self._lock:
+            events = sorted(self._events, key=lambda event: (event["ts"], -event["dur"]))
+            tracks = dict(self._tracks)
+            now = time.time()
+            # 未结束的任务截止到导出时刻
+            for task, started in self._task_started.items():
+                events.append({
+                    "name": task, "cat": "task", "ph": "X", "pid": self._pid, "tid": tracks[task],
+                    "ts": round(started * 1e6, 1), "dur": round((now - started) * 1e6, 1),
+                    "args": {"unfinished": True},
+                })
+        metadata = [{
+            "name": "process_name", "ph": "M", "pid": self._pid, "tid": 0,
+            "args": {"name": f"coreascher run {self.run_id}"},
+        }]
+        for name, tid in tracks.items():
+            metadata.append({"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid, "args": {"name": name}})
+            metadata.append({"name": "thread_sort_index", "ph": "M", "pid": self._pid, "tid": tid,
+                             "args": {"sort_index": tid}})
+        return {
+            "traceEvents": metadata + events,
+            "displayTimeUnit": "ms",
+            "otherData": {"run_id": self.run_id},
+        }
+
+    def export(self, directory: Path) -> Path:
+        """将时间线写入目录
+
+        Args:
+            directory: 输出目录
+
+        Returns:
+            trace JSON文件路径
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"trace_{self.run_id}.json"
+        tmp_path = path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        logger.info(f"运行时间线已写入: {path}")
+        return path
+
+
+def tracing_enabled() -> bool:
+    """是否通过环境变量 COREASCHER_TRACE 启用了时间线追踪"""
+    return os.getenv("COREASCHER_TRACE", "").lower() in ("1", "true", "yes", "on")
@@ -0,0 +1,268 @@
+"""
+批量综述模块
+
+该模块批量生成多个研究主题的综述，负责：
+1. 从主题文件读取研究主题和各自的任务输入
+2. 以有限的并行度运行文献综述Crew，所有主题共享检索缓存、LLM回复缓存、术语表和片段库
+3. 为每个主题写出综述和运行结果，并生成汇总报告
+
+默认在一个进程内用多个线程运行；指定进程数后每个工作进程运行一个Crew，
+进程之间通过 SQLite WAL 共享存储共享检索结果和LLM回复，相同的远程调用只发生一次。
+每个任务的输出文件写入各自的工作目录，结果文件均为原子写入。
+
+主题文件支持两种格式：
+    topics.txt    每行一个主题，可用制表符分隔关键词：检索增强生成<TAB>RAG, hallucination
+    topics.jsonl  每行一个对象：{"topic": "检索增强生成", "inputs": {"keywords": "RAG"}}
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from coreascher.service.jobs import FAILED, SUCCEEDED, Job, JobQueue, ReviewRunner, execute_job
+from coreascher.tools.shared_store import DEFAULT_SHARED_DB, atomic_write_json, atomic_write_text
+
+logger = logging.getLogger(__name__)
+
+# 批量结果默认输出目录
+DEFAULT_OUTPUT_DIR = Path("output/batch")
+
+_SLUG_PATTERN = re.compile(r"[^\w-]+")
+
+# 工作进程中的任务执行器，由 _init_worker 创建
+_worker_runner: Optional[ReviewRunner] = None
+
+
+def load_topics(path: Path) -> List[Tuple[str, Dict[str, str]]]:
+    """读取主题文件
+
+    Returns:
+        (研究主题, 任务输入) 列表
+
+    Raises:
+        ValueError: 文件内容格式错误时
+    """
+    topics: List[Tuple[str, Dict[str, str]]] = []
+    for number, line in enumerate(Path(path).read_text(encoding="utf-8").splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("{"):
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"主题文件第 {number} 行不是有效的JSON: {str(e)}")
+            if not item.get("topic"):
+                raise ValueError(f"主题文件第 {number} 行缺少 topic")
+            topics.append((str(item["topic"]), {str(k): str(v) for k, v in (item.get("inputs") or {}).items()}))
+        else:
+            topic, _, keywords = line.partition("\t")
+            topics.append((topic.strip(), {"keywords": keywords.strip()} if keywords.strip() else {}))
+    return topics
+
+
+def _write_job(directory: Path, index: int, job: Job) -> Path:
+    """写出单个主题的综述和运行结果"""
+    slug = _SLUG_PATTERN.sub("_", job.topic).strip("_")[:40] or "topic"
+    job_dir = directory / f"{index:03d}_{slug}"
+    job_dir.mkdir(parents=True, exist_ok=True)
+    if job.status == SUCCEEDED:
+        atomic_write_text(job_dir / "review.md", str(job.result.get("review") or ""))
+    atomic_write_json(job_dir / "result.json", job.to_dict())
+    return job_dir
+
+
+def _default_runner() -> ReviewRunner:
+    from crewai.utilities.llm_utils import create_llm
+
+    return ReviewRunner(llm=create_llm(None))
+
+
+def _cache_llm(runner: ReviewRunner) -> None:
+    from coreascher.tools.llm_cache import CachedLLM, get_llm_cache
+
+    if runner.llm is not None and not isinstance(runner.llm, CachedLLM):
+        runner.llm = CachedLLM(runner.llm, get_llm_cache())
+
+
+def _cache_stats() -> Dict[str, Any]:
+    from coreascher.tools.llm_cache import get_llm_cache
+    from coreascher.tools.search_cache import get_search_cache
+
+    store = get_search_cache().store
+    return {
+        "search": get_search_cache().stats(),
+        "llm": get_llm_cache().stats(),
+        "shared": store.stats() if store is not None else None,
+    }
+
+
+def _sum_stats(snapshots: List[Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+    """合并多个进程的缓存统计"""
+    snapshots = [snapshot for snapshot in snapshots if snapshot]
+    if not snapshots:
+        return None
+    merged: Dict[str, Any] = {}
+    for snapshot in snapshots:
+        for name, value in snapshot.items():
+            if name in ("hits", "misses", "waits") or (name == "entries" and "path" not in snapshot):
+                merged[name] = merged.get(name, 0) + value
+            elif name != "hit_rate":
+                merged[name] = value
+    total = merged.get("hits", 0) + merged.get("misses", 0)
+    merged["hit_rate"] = merged.get("hits", 0) / total if total else 0.0
+    return merged
+
+
+def _init_worker(shared_cache: Path, runner_factory: Optional[Callable[[], ReviewRunner]],
+                 workspace_root: Path, cache_llm: bool) -> None:
+    """工作进程初始化：启用共享缓存并创建本进程的任务执行器"""
+    from coreascher.tools.shared_store import configure_shared_caches
+
+    global _worker_runner
+    configure_shared_caches(shared_cache)
+    runner = (runner_factory or _default_runner)()
+    if runner.workspace_root is None:
+        runner.workspace_root = workspace_root
+    if cache_llm:
+        _cache_llm(runner)
+    # 每个进程同一时间只运行一个任务，预留一个Crew供下一个任务直接使用
+    runner.pool_size = runner.pool_size or 1
+    _worker_runner = runner.warm()
+
+
+def _run_in_worker(job_data: Dict[str, Any]) -> Dict[str, Any]:
+    """在工作进程中执行一个任务"""
+    job = execute_job(Job.from_dict(job_data), _worker_runner)
+    return {"job": job.to_dict(), "pid": os.getpid(), "caches": _cache_stats()}
+
+
+def _run_threads(topics: List[Tuple[str, Dict[str, str]]], parallel: int,
+                 runner: ReviewRunner) -> Tuple[List[Job], Dict[str, Any]]:
+    # LLM加上回复缓存之后再启动Crew池，池中的Crew使用缓存后的LLM
+    runner.pool_size = runner.pool_size or parallel
+    runner.warm()
+    jobs = JobQueue(workers=parallel, runner=runner, max_finished=max(len(topics), 1)).start()
+    try:
+        submitted = [jobs.submit(topic, inputs) for topic, inputs in topics]
+        for job in submitted:
+            job.done.wait()
+        caches = _cache_stats()
+        caches["crew_pool"] = runner.pool.stats() if runner.pool is not None else None
+    finally:
+        jobs.stop()
+        runner.close()
+    return submitted, caches
+
+
+def _run_processes(topics: List[Tuple[str, Dict[str, str]]], processes: int, shared_cache: Path,
+                   runner_factory: Optional[Callable[[], ReviewRunner]], workspace_root: Path,
+                   cache_llm: bool) -> Tuple[List[Job], Dict[str, Any]]:
+    submitted = []
+    for topic, inputs in topics:
+        if not topic or not str(topic).strip():
+            raise ValueError("研究主题不能为空")
+        submitted.append(Job(str(topic).strip(), inputs))
+
+    snapshots: Dict[int, Dict[str, Any]] = {}
+    # crewAI 的事件总线和HTTP客户端持有后台线程，fork 出的子进程会在这些线程留下的锁上死锁，
+    # 工作进程一律以 spawn 方式启动
+    with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker,
+                             initargs=(shared_cache, runner_factory, workspace_root, cache_llm)) as pool:
+        futures = [pool.submit(_run_in_worker, job.to_dict()) for job in submitted]
+        for index, future in enumerate(futures):
+            try:
+                data = future.result()
+            except Exception as e:
+                # 工作进程异常退出时任务记为失败，其他任务照常汇总
+                logger.error(f"任务 {submitted[index].id}（{submitted[index].topic}）的工作进程异常: {str(e)}")
+                submitted[index].status = FAILED
+                submitted[index].error = str(e)
+                continue
+            submitted[index] = Job.from_dict(data["job"])
+            snapshots[data["pid"]] = data["caches"]
+
+    caches = {
+        name: _sum_stats([snapshot.get(name) for snapshot in snapshots.values()])
+        for name in ("search", "llm", "shared")
+    }
+    caches["processes"] = len(snapshots)
+    return submitted, caches
+
+
+def run_batch(topics: List[Tuple[str, Dict[str, str]]], output_dir: Path = DEFAULT_OUTPUT_DIR,
+              parallel: int = 2, runner: Optional[ReviewRunner] = None,
+              cache_llm: bool = True, processes: int = 0, shared_cache: Optional[Path] = None,
+              runner_factory: Optional[Callable[[], ReviewRunner]] = None) -> Dict[str, Any]:
+    """批量生成综述
+
+    Args:
+        topics: (研究主题, 任务输入) 列表
+        output_dir: 输出目录
+        parallel: 线程模式下同时运行的Crew数
+        runner: 线程模式下的任务执行器，默认使用环境变量中配置的模型
+        cache_llm: 是否在主题之间共享LLM回复缓存
+        processes: 工作进程数，大于0时使用多进程模式，parallel 和 runner 不再使用
+        shared_cache: 多进程模式下共享存储的路径，默认为 data/cache/shared.sqlite3
+        runner_factory: 多进程模式下在每个工作进程中创建任务执行器的函数，必须是可导入的模块级函数
+
+    Returns:
+        汇总报告
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    workspace_root = output_dir / "workspaces"
+    started = time.perf_counter()
+    if processes > 0:
+        submitted, caches = _run_processes(topics, processes, Path(shared_cache or DEFAULT_SHARED_DB),
+                                           runner_factory, workspace_root, cache_llm)
+    else:
+        runner = runner or _default_runner()
+        if runner.workspace_root is None:
+            runner.workspace_root = workspace_root
+        if cache_llm:
+            _cache_llm(runner)
+        submitted, caches = _run_threads(topics, parallel, runner)
+    elapsed = time.perf_counter() - started
+    if not cache_llm:
+        caches["llm"] = None
+
+    entries = []
+    for index, job in enumerate(submitted, 1):
+        job_dir = _write_job(output_dir, index, job)
+        metrics = (job.result or {}).get("metrics") or {}
+        entries.append({
+            "topic": job.topic,
+            "status": job.status,
+            "error": job.error,
+            "output": str(job_dir),
+            "wall_seconds": metrics.get("wall_seconds"),
+            "llm_calls": metrics.get("llm_calls"),
+            "input_tokens": metrics.get("input_tokens"),
+            "output_tokens": metrics.get("output_tokens"),
+        })
+    sequential = sum(entry["wall_seconds"] or 0.0 for entry in entries)
+    summary = {
+        "topics": len(topics),
+        "succeeded": sum(entry["status"] == SUCCEEDED for entry in entries),
+        "failed": sum(entry["status"] != SUCCEEDED for entry in entries),
+        "parallel": processes if processes > 0 else parallel,
+        "mode": "processes" if processes > 0 else "threads",
+        "elapsed_seconds": round(elapsed, 3),
+        "sum_of_run_seconds": round(sequential, 3),
+        "speedup": round(sequential / elapsed, 2) if elapsed else None,
+        "llm_calls": sum(entry["llm_calls"] or 0 for entry in entries),
+        "caches": caches,
+        "results": entries,
+    }
+    atomic_write_json(output_dir / "summary.json", summary)
+    logger.info(f"批量综述完成: {summary['succeeded']}/{len(topics)} 成功，耗时 {elapsed:.1f} 秒，"
+                f"汇总报告: {output_dir / 'summary.json'}")
+    return summary
@@ -0,0 +1,238 @@
+"""
+Crew实例池模块
+
+该模块在后台预先构建文献综述Crew，负责：
+1. 维持指定数量的Crew，请求到来时直接取出空闲实例，不在请求路径上解析配置和构建Agent
+2. 归还的Crew在后台恢复为构建时的状态后重新放回池中
+3. 实例无法恢复或被丢弃时，在后台补充新的Crew
+
+构建 LiteratureReviewCrew 要执行 @CrewBase 装饰器逻辑、读取并解析 agents.yaml 和 tasks.yaml、
+创建Agent和工具，是服务和批量模式中每个任务固定的启动开销。
+运行会修改任务的描述、输出文件和上下文以及Agent的LLM和工具，池在构建时保存这些状态，归还时逐项恢复。
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 任务上每次运行都会改变的计数和记录，恢复时清零
+_TASK_COUNTERS = {"used_tools": 0, "tools_errors": 0, "delegations": 0, "retry_count": 0}
+
+
+class PooledCrew:
+    """池中的一个Crew及其构建时的状态快照"""
+
+    def __init__(self, base: Any, crew: Any) -> None:
+        """初始化并保存快照
+
+        Args:
+            base: LiteratureReviewCrew 实例，提供Agent和任务配置
+            crew: 由 base 构建的 Crew
+        """
+        self.base = base
+        self.crew = crew
+        self.uses = 0
+        self._tasks = list(crew.tasks)
+        self._task_state = [
+            (task, task.description, task.expected_output, task.output_file, task.create_directory,
+             list(task.context) if isinstance(task.context, list) else task.context)
+            for task in crew.tasks
+        ]
+        self._agent_state = []
+        for agent in crew.agents:
+            tools = list(getattr(agent, "tools", None) or [])
+            tool_state = [(tool, {name: getattr(tool, name) for name in ("client", "stop_reason", "archive", "deadline") if hasattr(tool, name)})
+                          for tool in tools]
+            self._agent_state.append((agent, agent.llm, tools, tool_state))
+
+    def reset(self) -> None:
+        """把运行中改变的任务、Agent和工具状态恢复为构建时的状态"""
+        self.crew.tasks[:] = self._tasks
+        for task, description, expected_output, output_file, create_directory, context in self._task_state:
+            task.description = description
+            task.expected_output = expected_output
+            task.output_file = output_file
+            task.create_directory = create_directory
+            task.context = context
+            task.output = None
+            # crewAI 在首次插值时记下原始文本，清空后下次运行按新的输入重新插值
+            task._original_description = None
+            task._original_expected_output = None
+            task._original_output_file = None
+            for name, value in _TASK_COUNTERS.items():
+                if hasattr(task, name):
+                    setattr(task, name, value)
+            if hasattr(task, "processed_by_agents"):
+                task.processed_by_agents = set()
+        for agent, llm, tools, tool_state in self._agent_state:
+            agent.llm = llm
+            agent.tools = list(tools)
+            agent.agent_executor = None
+            for tool, attributes in tool_state:
+                for name, value in attributes.items():
+                    setattr(tool, name, value)
+        self.crew.usage_metrics = None
+
+
+class CrewPool:
+    """线程安全的Crew实例池，由后台线程补充和恢复实例"""
+
+    def __init__(self, factory: Callable[[], Tuple[Any, Any]], size: int = 2, max_uses: int = 50) -> None:
+        """初始化实例池
+
+        Args:
+            factory: 构建 (LiteratureReviewCrew 实例, Crew) 的函数
+            size: 池管理的Crew总数（空闲与取出中的合计），通常等于同时运行的任务数
+            max_uses: 同一Crew最多使用的次数，超出后丢弃，避免长期运行积累状态
+        """
+        self.factory = factory
+        self.size = size
+        self.max_uses = max_uses
+        self._idle: List[PooledCrew] = []
+        self._returned: List[PooledCrew] = []
+        self._out = 0
+        self._changed = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self.hits = 0
+        self.misses = 0
+        self.built = 0
+        self.reused = 0
+        self.discarded = 0
+        self.build_seconds = 0.0
+
+    def start(self) -> "CrewPool":
+        """启动后台补充线程"""
+        with self._changed:
+            self._stopping = False
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._refill, name="crew-pool", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """停止后台补充线程并清空空闲实例"""
+        with self._changed:
+            self._stopping = True
+            self._changed.notify_all()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+        with self._changed:
+            self._idle.clear()
+            self._returned.clear()
+
+    def checkout(self) -> PooledCrew:
+        """取出一个空闲Crew，没有空闲实例时在当前线程构建
+
+        Returns:
+            池中的Crew，使用完毕后需调用 checkin 归还
+        """
+        with self._changed:
+            self._out += 1
+            if self._idle:
+                self.hits += 1
+                return self._idle.pop()
+            returned = self._returned.pop() if self._returned else None
+        # 后台线程还没来得及恢复刚归还的Crew时，在当前线程恢复，比重新构建快得多
+        if returned is not None and self._reset(returned):
+            with self._changed:
+                self.hits += 1
+            return returned
+        with self._changed:
+            self.misses += 1
+        return self._build()
+
+    def checkin(self, pooled: PooledCrew) -> None:
+        """归还Crew，由后台线程恢复后放回池中"""
+        pooled.uses += 1
+        with self._changed:
+            self._out -= 1
+            if self._thread is None:
+                self.discarded += 1
+                return
+            self._returned.append(pooled)
+            self._changed.notify_all()
+
+    def discard(self, pooled: PooledCrew) -> None:
+        """丢弃不再可用的Crew，例如构建后LLM已被替换或运行出错"""
+        with self._changed:
+            self._out -= 1
+            self.discarded += 1
+            self._changed.notify_all()
+
+    def _build(self) -> PooledCrew:
+        started = time.perf_counter()
+        base, crew = self.factory()
+        elapsed = time.perf_counter() - started
+        with self._changed:
+            self.built += 1
+            self.build_seconds += elapsed
+        return PooledCrew(base, crew)
+
+    def _refill(self) -> None:
+        while True:
+            with self._changed:
+                # 取出中的Crew归还后即可复用，只在总数不足时构建新实例
+                while not self._stopping and not self._returned and len(self._idle) + self._out >= self.size:
+                    self._changed.wait()
+                if self._stopping:
+                    return
+                pooled = self._returned.pop() if self._returned else None
+            if pooled is not None:
+                self._recycle(pooled)
+                continue
+            try:
+                pooled = self._build()
+            except Exception as e:
+                logger.error(f"预先构建Crew失败: {str(e)}")
+                with self._changed:
+                    self._changed.wait(5.0)
+                continue
+            with self._changed:
+                self._idle.append(pooled)
+
+    def _reset(self, pooled: PooledCrew) -> bool:
+        """恢复归还的Crew，使用次数过多或恢复失败时丢弃
+
+        Returns:
+            是否可以继续使用
+        """
+        if pooled.uses < self.max_uses:
+            try:
+                pooled.reset()
+                with self._changed:
+                    self.reused += 1
+                return True
+            except Exception as e:
+                logger.warning(f"恢复Crew状态失败，丢弃该实例: {str(e)}")
+        with self._changed:
+            self.discarded += 1
+        return False
+
+    def _recycle(self, pooled: PooledCrew) -> None:
+        """恢复归还的Crew并放回池中"""
+        if self._reset(pooled):
+            with self._changed:
+                self._idle.append(pooled)
+                self._changed.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """获取实例池统计信息"""
+        with self._changed:
+            total = self.hits + self.misses
+            return {
+                "size": self.size,
+                "idle": len(self._idle),
+                "in_use": self._out,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "built": self.built,
+                "reused": self.reused,
+                "discarded": self.discarded,
+                "avg_build_seconds": round(self.build_seconds / self.built, 4) if self.built else None,
+            }
@@ -0,0 +1,523 @@
+"""
+综述任务队列模块
+
+该模块在常驻进程中排队执行文献综述任务，负责：
+1. 接收研究主题提交并分配任务ID
+2. 在可配置大小的工作线程池中运行文献综述Crew
+3. 记录任务状态、结果和运行指标，供查询接口使用
+4. 记录综述生成过程中逐章节推送的事件，供事件流接口使用
+5. 按任务优先级和租户公平份额决定排队任务的执行顺序
+
+常驻进程中的检索缓存、术语表和arXiv客户端在任务之间共享，不必每次冷启动。
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from coreascher.monitoring.deadline import CancelToken, RunCancelled
+from coreascher.service.scheduler import DEFAULT_PRIORITY, DEFAULT_TENANT, FairScheduler, get_scheduler, job_context
+from coreascher.tools.rate_limit import create_arxiv_client, get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+# 任务状态
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# 最多保留的已结束任务数
+DEFAULT_MAX_FINISHED = 1000
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class Job:
+    """一次文献综述任务"""
+
+    def __init__(self, topic: str, inputs: Optional[Dict[str, str]] = None,
+                 priority: int = DEFAULT_PRIORITY, tenant: str = DEFAULT_TENANT) -> None:
+        """初始化任务
+
+        Args:
+            topic: 研究主题
+            inputs: 额外的任务输入
+            priority: 优先级，数值越大越优先
+            tenant: 提交任务的租户，同优先级的任务在租户之间公平分配
+        """
+        self.id = uuid.uuid4().hex[:12]
+        self.topic = topic
+        self.inputs = dict(inputs or {})
+        self.priority = priority
+        self.tenant = tenant
+        self.status = QUEUED
+        self.submitted_at = _now()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.done = threading.Event()
+        self.cancel_token = CancelToken()
+        self.events: List[Dict[str, Any]] = []
+        self._events_changed = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED, CANCELLED)
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        """记录一条任务事件并唤醒等待者"""
+        with self._events_changed:
+            self.events.append(event)
+            self._events_changed.notify_all()
+
+    def wait_events(self, start: int, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """获取第 start 条之后的事件，没有新事件时最多等待 timeout 秒"""
+        with self._events_changed:
+            if len(self.events) <= start:
+                self._events_changed.wait(timeout)
+            return self.events[start:]
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        """转换为可序列化的字典"""
+        data = {
+            "id": self.id,
+            "topic": self.topic,
+            "inputs": self.inputs,
+            "priority": self.priority,
+            "tenant": self.tenant,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+        if include_result:
+            data["result"] = self.result
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Job":
+        """从 to_dict 的结果恢复任务，用于接收其他进程执行的任务"""
+        job = cls(data["topic"], data.get("inputs"), data.get("priority", DEFAULT_PRIORITY),
+                  data.get("tenant", DEFAULT_TENANT))
+        job.id = data["id"]
+        job.status = data["status"]
+        for name in ("submitted_at", "started_at", "finished_at", "error", "result"):
+            setattr(job, name, data.get(name))
+        if job.finished:
+            job.done.set()
+        return job
+
+
+def redirect_outputs(crew: Any, workspace: Path) -> None:
+    """把Crew各任务的输出文件改写到工作目录下，并发运行的Crew互不覆盖输出"""
+    workspace.mkdir(parents=True, exist_ok=True)
+    for task in crew.tasks:
+        if task.output_file:
+            task.output_file = str(workspace.resolve() / Path(task.output_file).name)
+            task.create_directory = True
+
+
+def execute_job(job: Job, runner: Callable[[Job], Dict[str, Any]]) -> Job:
+    """在当前线程中执行任务并记录状态、结果和失败原因
+
+    任务执行期间的LLM调用和检索以任务的优先级和租户向调度器申请额度。
+    任务被取消或超过期限时状态为 cancelled，结果中保留已完成任务的输出。
+    """
+    job.status = RUNNING
+    job.started_at = _now()
+    started = time.perf_counter()
+    try:
+        with job_context(job.priority, job.tenant):
+            job.result = runner(job)
+        job.status = SUCCEEDED
+    except RunCancelled as e:
+        logger.warning(f"任务 {job.id}（{job.topic}）已取消: {e.reason}")
+        job.result = e.result
+        job.error = e.reason
+        job.status = CANCELLED
+    except Exception as e:
+        logger.error(f"任务 {job.id}（{job.topic}）执行失败: {str(e)}")
+        job.error = str(e)
+        job.status = FAILED
+    job.finished_at = _now()
+    job.publish({"type": "finished", "status": job.status, "error": job.error})
+    logger.info(f"任务 {job.id} 已结束（{job.status}），耗时 {time.perf_counter() - started:.1f} 秒")
+    return job
+
+
+class ReviewRunner:
+    """在当前进程中运行文献综述Crew的任务执行器
+
+    LLM和arXiv客户端在所有任务之间共享；未指定时分别使用环境变量中配置的模型
+    和一个共享的、请求速率受主机范围限速的 arxiv.Client。指定工作目录根后，每个任务的输出文件（如 literature.json）
+    写入各自的 <workspace_root>/<任务ID>/ 目录，并发任务不会写同一个文件。
+    文献综述任务的章节在生成过程中逐个推送为任务事件，并追加写入工作目录中的 literature_review.md。
+    调度器限制了LLM并发时，所有LLM调用都要先申请额度。
+    指定Crew池大小后，Crew在后台预先构建，任务开始时直接取用，结束后恢复状态放回池中。
+    设置了录制或回放的环境变量时，外部调用经由调用归档录制或回放。
+    任务超过 tasks.yaml 中声明的期限或被取消时抛出 RunCancelled，其中带有已完成任务的输出。
+    """
+
+    def __init__(self, llm: Optional[Any] = None, client: Optional[Any] = None,
+                 workspace_root: Optional[Path] = None, scheduler: Optional[FairScheduler] = None,
+                 pool_size: int = 0) -> None:
+        """初始化执行器
+
+        Args:
+            llm: 所有任务共享的LLM
+            client: 所有任务共享的arXiv客户端
+            workspace_root: 各任务工作目录的根目录，为None时输出文件写入当前目录
+            scheduler: 分配LLM并发额度的调度器，默认使用进程内共享的调度器
+            pool_size: 预先构建的空闲Crew数，为0时每个任务各自构建Crew
+        """
+        self.scheduler = scheduler or get_scheduler()
+        self._scheduled = "llm" in self.scheduler.limits
+        if llm is not None and self._scheduled:
+            from coreascher.tools.llm_cache import ScheduledLLM
+
+            # 调度包装放在之后可能加上的回复缓存之内，缓存命中不占用额度
+            llm = ScheduledLLM(llm, self.scheduler)
+        self.llm = llm
+        self._client = client
+        self.workspace_root = Path(workspace_root) if workspace_root else None
+        self.pool_size = pool_size
+        self.pool: Optional[Any] = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = create_arxiv_client()
+        return self._client
+
+    def warm(self) -> "ReviewRunner":
+        """启动Crew池，在后台预先构建Crew
+
+        LLM确定后再调用（如加上回复缓存之后），池中的Crew使用调用时的LLM。
+        """
+        if self.pool_size > 0 and self.pool is None:
+            from coreascher.service.crew_pool import CrewPool
+
+            with self._client_lock:
+                if self.pool is None:
+                    self.pool = CrewPool(self._build_crew, self.pool_size).start()
+        return self
+
+    def close(self) -> None:
+        """停止Crew池"""
+        if self.pool is not None:
+            self.pool.stop()
+            self.pool = None
+
+    def _build_crew(self) -> Tuple[Any, Any]:
+        from coreascher.crew import LiteratureReviewCrew
+
+        crew_base = LiteratureReviewCrew(llm=self.llm)
+        crew = crew_base.literature_review_crew()
+        self._wrap_memory(crew)
+        return crew_base, crew
+
+    def _wrap_memory(self, crew: Any) -> None:
+        """为各Agent记忆用于分析的LLM加上与共享LLM相同的调度和回复缓存包装"""
+        from coreascher.tools.llm_cache import CachedLLM, ScheduledLLM, wrap_memory_llms
+
+        cache = self.llm.cache if isinstance(self.llm, CachedLLM) else None
+        if not self._scheduled and cache is None:
+            return
+
+        def wrap(llm: Any) -> Any:
+            if self._scheduled:
+                llm = ScheduledLLM(llm, self.scheduler)
+            return CachedLLM(llm, cache) if cache is not None else llm
+
+        wrap_memory_llms(crew, wrap, (ScheduledLLM, CachedLLM))
+
+    def __call__(self, job: Job) -> Dict[str, Any]:
+        """运行一次文献综述
+
+        Returns:
+            包含综述正文、各任务输出和运行指标的字典
+        """
+        pool = self.warm().pool
+        if pool is None:
+            return self._run(job, *self._build_crew())
+        pooled = pool.checkout()
+        if pooled.base.llm is not self.llm:
+            # 池中的Crew构建后执行器换了LLM，不再使用
+            pool.discard(pooled)
+            return self._run(job, *self._build_crew())
+        try:
+            result = self._run(job, pooled.base, pooled.crew)
+        except Exception:
+            pool.discard(pooled)
+            raise
+        pool.checkin(pooled)
+        return result
+
+    def _run(self, job: Job, crew_base: Any, crew: Any) -> Dict[str, Any]:
+        from coreascher.main import _inputs
+        from coreascher.monitoring.budget import BudgetEnforcer
+        from coreascher.monitoring.deadline import DeadlineGuard
+        from coreascher.monitoring.metrics import RunMetrics
+        from coreascher.service.reuse import TopicReuse, reuse_enabled
+        from coreascher.service.stream import SectionStream
+        from coreascher.tools.io_archive import recorder_from_env
+        from coreascher.tools.llm_cache import ScheduledLLM
+        from coreascher.tools.term_cache import get_term_cache
+
+        workspace = None
+        if self.workspace_root is not None:
+            workspace = self.workspace_root / job.id
+            redirect_outputs(crew, workspace)
+        for agent in crew.agents:
+            if self._scheduled and self.llm is None:
+                # 各Agent按配置创建了自己的LLM，逐个加上调度包装
+                agent.llm = ScheduledLLM(agent.llm, self.scheduler)
+            for tool in getattr(agent, "tools", None) or []:
+                if hasattr(tool, "client"):
+                    tool.client = self.client
+        inputs = _inputs(job.topic, job.inputs)
+        reuse = TopicReuse() if reuse_enabled() else None
+        if reuse is not None:
+            inputs = reuse.apply(crew, inputs)
+        metrics = RunMetrics().attach(crew)
+        budget = BudgetEnforcer.from_config(metrics, crew_base.agents_config, crew_base.tasks_config).attach(crew)
+        guard = DeadlineGuard.from_config(metrics, crew_base.tasks_config, token=job.cancel_token).attach(crew)
+        # 录制回放包在期限包装之外，回放命中的调用不受期限约束
+        recorder = recorder_from_env()
+        if recorder is not None:
+            recorder.attach(crew)
+        stream_path = workspace / "literature_review.md" if workspace is not None else None
+        stream = SectionStream(path=stream_path).subscribe(job.publish).attach(crew)
+
+        def result(review: Optional[str], tasks: Dict[str, str]) -> Dict[str, Any]:
+            return {
+                "review": review,
+                "tasks": tasks,
+                "metrics": metrics.summary(),
+                "workspace": str(workspace) if workspace is not None else None,
+                "reuse": reuse.summary() if reuse is not None else None,
+                "io_archive": recorder.summary() if recorder is not None else None,
+                "deadline": guard.summary(),
+            }
+
+        try:
+            output = crew.kickoff(inputs=inputs)
+            if reuse is not None:
+                reuse.record(output)
+            for task_output in getattr(output, "tasks_output", None) or []:
+                if getattr(task_output, "name", None) == stream.task:
+                    stream.finish(task_output.raw)
+        except Exception as e:
+            if not guard.token.cancelled:
+                raise
+            # 取消或超时前已完成的任务输出作为部分结果保留
+            tasks = guard.salvage(crew)
+            partial = dict(result(tasks.get(stream.task), tasks), partial=True)
+            raise RunCancelled(guard.token.reason or str(e), partial) from e
+        finally:
+            stream.detach()
+            if recorder is not None:
+                recorder.detach()
+            guard.detach()
+            budget.detach()
+            metrics.detach()
+            # 本次运行学到的术语对照在运行结束时统一保存
+            get_term_cache().save()
+        return result(getattr(output, "raw", str(output)), {
+            getattr(task_output, "name", None) or str(index): getattr(task_output, "raw", str(task_output))
+            for index, task_output in enumerate(getattr(output, "tasks_output", None) or [])
+        })
+
+
+class JobQueue:
+    """带工作线程池的综述任务队列
+
+    空闲的工作线程按调度器的排名取下一个任务：优先级高的先执行，等待越久优先级越高，
+    同优先级时当前运行任务较少的租户优先，最后按提交顺序。
+    """
+
+    def __init__(self, workers: int = 2, runner: Optional[Callable[[Job], Dict[str, Any]]] = None,
+                 max_finished: int = DEFAULT_MAX_FINISHED, scheduler: Optional[FairScheduler] = None) -> None:
+        """初始化任务队列
+
+        Args:
+            workers: 工作线程数，即同时运行的Crew数
+            runner: 任务执行器，默认为 ReviewRunner()
+            max_finished: 最多保留的已结束任务数，超出时丢弃最早结束的任务
+            scheduler: 决定任务顺序的调度器，默认使用进程内共享的调度器
+        """
+        self.workers = workers
+        self.scheduler = scheduler or get_scheduler()
+        self.runner = runner or ReviewRunner(scheduler=self.scheduler)
+        self.max_finished = max_finished
+        self._pending: List[tuple] = []
+        self._running: Dict[str, int] = {}
+        self._available = threading.Condition()
+        self._stopping = False
+        self._seq = 0
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+
+    def start(self) -> "JobQueue":
+        """启动工作线程"""
+        with self._available:
+            self._stopping = False
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"review-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self, wait: bool = True) -> None:
+        """停止工作线程，已排队的任务会先执行完"""
+        with self._available:
+            self._stopping = True
+            self._available.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        self._threads = []
+
+    def submit(self, topic: str, inputs: Optional[Dict[str, str]] = None,
+               priority: int = DEFAULT_PRIORITY, tenant: str = DEFAULT_TENANT) -> Job:
+        """提交一个研究主题
+
+        Args:
+            topic: 研究主题
+            inputs: 额外的任务输入
+            priority: 优先级，数值越大越优先
+            tenant: 提交任务的租户
+
+        Raises:
+            ValueError: 研究主题为空时
+        """
+        if not topic or not str(topic).strip():
+            raise ValueError("研究主题不能为空")
+        job = Job(str(topic).strip(), inputs, priority, tenant or DEFAULT_TENANT)
+        with self._lock:
+            self._jobs[job.id] = job
+        with self._available:
+            self._pending.append((job, time.monotonic(), self._seq))
+            self._seq += 1
+            self._available.notify()
+        logger.info(f"任务 {job.id} 已排队（优先级 {job.priority}，租户 {job.tenant}）: {job.topic}")
+        return job
+
+    def cancel(self, job_id: str, reason: str = "任务已被取消") -> Optional[Job]:
+        """取消任务
+
+        排队中的任务直接移出队列；运行中的任务触发取消标记，正在等待的LLM调用和检索立即返回，
+        已完成的任务输出保留在结果中。
+
+        Returns:
+            被取消的任务，任务不存在时返回None
+        """
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return job
+        with self._available:
+            entry = next((item for item in self._pending if item[0] is job), None)
+            if entry is not None:
+                self._pending.remove(entry)
+        if entry is None:
+            job.cancel_token.cancel(reason)
+            return job
+        job.status = CANCELLED
+        job.error = reason
+        job.finished_at = _now()
+        job.publish({"type": "finished", "status": job.status, "error": job.error})
+        with self._lock:
+            self.cancelled += 1
+        job.done.set()
+        logger.info(f"任务 {job.id} 已在排队中取消")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """按ID获取任务"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> List[Job]:
+        """获取全部任务，按提交顺序排列"""
+        with self._lock:
+            return list(self._jobs.values())
+
+    def stats(self) -> Dict[str, Any]:
+        """获取队列统计信息"""
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        pool = getattr(self.runner, "pool", None)
+        return {
+            "workers": self.workers,
+            "queued": statuses.count(QUEUED),
+            "running": statuses.count(RUNNING),
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "scheduler": self.scheduler.stats(),
+            "crew_pool": pool.stats() if pool is not None else None,
+            "arxiv_rate": get_rate_limiter().stats(),
+        }
+
+    def _next(self) -> Optional[Job]:
+        """取出排名最高的排队任务，队列停止且为空时返回None"""
+        with self._available:
+            while not self._pending:
+                if self._stopping:
+                    return None
+                self._available.wait()
+            now = time.monotonic()
+            entry = min(self._pending, key=lambda item: self.scheduler.rank(
+                item[0].priority, item[0].tenant, item[1], item[2], self._running, now))
+            self._pending.remove(entry)
+            job = entry[0]
+            self._running[job.tenant] = self._running.get(job.tenant, 0) + 1
+            return job
+
+    def _work(self) -> None:
+        while True:
+            job = self._next()
+            if job is None:
+                return
+            self._run(job)
+
+    def _run(self, job: Job) -> None:
+        try:
+            execute_job(job, self.runner)
+        finally:
+            with self._available:
+                self._running[job.tenant] -= 1
+                if not self._running[job.tenant]:
+                    del self._running[job.tenant]
+        with self._lock:
+            if job.status == SUCCEEDED:
+                self.completed += 1
+            elif job.status == CANCELLED:
+                self.cancelled += 1
+            else:
+                self.failed += 1
+            self._evict()
+        job.done.set()
+
+    def _evict(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
@@ -0,0 +1,287 @@
+"""
+相近主题复用模块
+
+该模块记录历次综述的中间产物，为相近的新主题复用，负责：
+1. 持久化保存历次主题的研究框架、框架分析、关键词任务、检索关键词和检索到的文献
+2. 按主题文本的向量相似度查找最相近的历史主题
+3. 新主题与历史主题足够相近时，用已保存的产物代替规划类任务，只检索新增的关键词
+4. 运行结束后把本次主题的产物写回索引
+
+向量使用与片段筛选相同的哈希词袋编码，不依赖外部嵌入服务。
+设置环境变量 COREASCHER_REUSE=1 后启用，相似度阈值可通过 COREASCHER_REUSE_THRESHOLD 调整。
+"""
+
+import functools
+import json
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from coreascher.tools.shared_store import atomic_write_json, file_lock
+
+logger = logging.getLogger(__name__)
+
+# 启用复用的环境变量
+REUSE_ENV = "COREASCHER_REUSE"
+REUSE_THRESHOLD_ENV = "COREASCHER_REUSE_THRESHOLD"
+
+# 主题索引默认存储位置
+DEFAULT_INDEX_FILE = Path("data/cache/topic_index.json")
+
+# 视为相近主题的默认相似度阈值
+DEFAULT_THRESHOLD = 0.8
+
+# 索引最多保留的主题数
+DEFAULT_MAX_TOPICS = 500
+
+# 可直接沿用历史输出的规划类任务，均位于文献检索之前
+SEED_TASKS = ("create_research_framework", "analyze_framework", "keyword_tasks")
+
+# 只检索新增关键词的文献检索任务
+SEARCH_TASK = "search_literature"
+
+# 检索任务中注入历史文献的输入变量
+PRIOR_LITERATURE_KEY = "prior_literature"
+
+_KEYWORD_SEPARATOR = re.compile(r"[,，;；、\n]+")
+
+
+def reuse_enabled() -> bool:
+    """是否通过环境变量 COREASCHER_REUSE 启用了相近主题复用"""
+    return os.getenv(REUSE_ENV, "").lower() in ("1", "true", "yes", "on")
+
+
+def reuse_threshold() -> float:
+    """相近主题的相似度阈值"""
+    try:
+        return float(os.getenv(REUSE_THRESHOLD_ENV, DEFAULT_THRESHOLD))
+    except ValueError:
+        return DEFAULT_THRESHOLD
+
+
+def split_keywords(text: str) -> List[str]:
+    """把逗号、分号或换行分隔的关键词拆分为列表，保持顺序并去重"""
+    keywords: List[str] = []
+    seen = set()
+    for keyword in _KEYWORD_SEPARATOR.split(text or ""):
+        keyword = keyword.strip()
+        if keyword and keyword.lower() not in seen:
+            seen.add(keyword.lower())
+            keywords.append(keyword)
+    return keywords
+
+
+def _normalize_topic(topic: str) -> str:
+    return " ".join(topic.lower().split())
+
+
+class TopicIndex:
+    """历次综述主题及其中间产物的索引
+
+    每个主题保存一条记录：{"topic", "keywords", "outputs": {任务名: 输出}, "updated_at"}。
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_topics: int = DEFAULT_MAX_TOPICS) -> None:
+        """初始化主题索引
+
+        Args:
+            path: 索引文件路径，默认为 data/cache/topic_index.json
+            max_topics: 最多保留的主题数，超出时丢弃最早更新的主题
+        """
+        self.path = Path(path) if path else DEFAULT_INDEX_FILE
+        self.max_topics = max_topics
+        self._lock = threading.Lock()
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        """读取磁盘上的索引"""
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f).get("topics", {})
+        except (OSError, ValueError) as e:
+            logger.error(f"加载主题索引失败: {str(e)}")
+            return {}
+
+    def lookup(self, topic: str, threshold: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """查找与主题最相近的历史主题
+
+        Args:
+            topic: 研究主题
+            threshold: 相似度阈值，默认取 reuse_threshold()
+
+        Returns:
+            相似度不低于阈值的最相近记录，附带 "score" 字段；没有时返回None
+        """
+        from coreascher.tools.mmr import embed_texts
+
+        threshold = reuse_threshold() if threshold is None else threshold
+        with self._lock:
+            records = list(self._read().values())
+        if not records or not topic:
+            return None
+        vectors = embed_texts([topic] + [record["topic"] for record in records])
+        scores = vectors[1:] @ vectors[0]
+        best = int(scores.argmax())
+        if float(scores[best]) < threshold:
+            return None
+        return dict(records[best], score=round(float(scores[best]), 4))
+
+    def record(self, topic: str, keywords: List[str], outputs: Dict[str, str]) -> None:
+        """保存主题的检索关键词和各任务输出，替换同一主题的旧记录"""
+        entry = {"topic": topic, "keywords": list(keywords), "outputs": dict(outputs), "updated_at": time.time()}
+        try:
+            with self._lock, file_lock(self.path):
+                topics = self._read()
+                topics[_normalize_topic(topic)] = entry
+                if len(topics) > self.max_topics:
+                    ordered = sorted(topics.items(), key=lambda item: item[1].get("updated_at", 0))
+                    topics = dict(ordered[len(topics) - self.max_topics:])
+                atomic_write_json(self.path, {"version": 1, "topics": topics})
+        except OSError as e:
+            logger.error(f"保存主题索引失败: {str(e)}")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._read())
+
+
+_default_index: Optional[TopicIndex] = None
+_default_lock = threading.Lock()
+
+
+def get_topic_index() -> TopicIndex:
+    """获取进程内共享的主题索引"""
+    global _default_index
+    if _default_index is None:
+        with _default_lock:
+            if _default_index is None:
+                _default_index = TopicIndex()
+    return _default_index
+
+
+@functools.lru_cache(maxsize=None)
+def _seeded_task_class():
+    # crewAI 依赖较重，真正复用时才导入
+    from crewai import Task
+    from crewai.tasks.task_output import TaskOutput
+
+    class SeededTask(Task):
+        """直接返回历史输出、不调用Agent的任务"""
+
+        seed: Optional[str] = None
+
+        def execute_sync(self, agent=None, context=None, tools=None) -> TaskOutput:
+            self.output = TaskOutput(
+                description=self.description, name=self.name, expected_output=self.expected_output,
+                raw=self.seed or "", agent=getattr(self.agent, "role", "") or "",
+            )
+            return self.output
+
+    return SeededTask
+
+
+class TopicReuse:
+    """一次Crew运行的相近主题复用
+
+    用法：
+        reuse = TopicReuse()
+        inputs = reuse.apply(crew, inputs)
+        output = crew.kickoff(inputs=inputs)
+        reuse.record(output)
+    """
+
+    def __init__(self, index: Optional[TopicIndex] = None, threshold: Optional[float] = None) -> None:
+        """初始化复用
+
+        Args:
+            index: 主题索引，默认使用进程内共享的索引
+            threshold: 相似度阈值，默认取 reuse_threshold()
+        """
+        self.index = index or get_topic_index()
+        self.threshold = threshold
+        self.match: Optional[Dict[str, Any]] = None
+        self.seeded: List[str] = []
+        self.keywords: List[str] = []
+        self.delta_keywords: List[str] = []
+        self._topic: Optional[str] = None
+
+    def apply(self, crew: Any, inputs: Dict[str, str]) -> Dict[str, str]:
+        """查找相近主题，用历史输出代替规划类任务，并把检索限制在新增关键词上
+
+        Returns:
+            本次运行使用的任务输入
+        """
+        self._topic = inputs.get("topic")
+        self.keywords = split_keywords(inputs.get("keywords") or self._topic or "")
+        self.match = self.index.lookup(self._topic or "", self.threshold)
+        if self.match is None:
+            return inputs
+
+        outputs = self.match.get("outputs") or {}
+        known = {keyword.lower() for keyword in self.match.get("keywords") or []}
+        self.delta_keywords = [keyword for keyword in self.keywords if keyword.lower() not in known]
+        seed = {name: outputs[name] for name in SEED_TASKS if outputs.get(name)}
+        prior = outputs.get(SEARCH_TASK)
+        if prior and not self.delta_keywords:
+            seed[SEARCH_TASK] = prior
+
+        SeededTask = _seeded_task_class()
+        for index, task in enumerate(crew.tasks):
+            if task.name in seed:
+                crew.tasks[index] = SeededTask(
+                    name=task.name, description=task.description, expected_output=task.expected_output,
+                    agent=task.agent, seed=seed[task.name],
+                )
+                self.seeded.append(task.name)
+        # 被替换的任务若被其他任务引用为上下文，引用也指向替换后的任务
+        replaced = {task.name: task for task in crew.tasks if task.name in seed}
+        for task in crew.tasks:
+            if isinstance(task.context, list):
+                task.context = [replaced.get(item.name, item) for item in task.context]
+
+        inputs = dict(inputs)
+        if prior and self.delta_keywords:
+            for task in crew.tasks:
+                if task.name == SEARCH_TASK:
+                    task.description += (
+                        f"\n以下文献已在相近主题的综述中检索过，直接沿用，只需检索新增的关键词：\n{{{PRIOR_LITERATURE_KEY}}}"
+                    )
+            inputs["keywords"] = ", ".join(self.delta_keywords)
+            inputs[PRIOR_LITERATURE_KEY] = prior
+        logger.info(f"主题与历史主题「{self.match['topic']}」相近（相似度 {self.match['score']}），"
+                    f"沿用任务 {self.seeded}，新增检索关键词 {self.delta_keywords}")
+        return inputs
+
+    def record(self, output: Any) -> None:
+        """把本次运行的规划类任务和检索任务输出写回索引"""
+        if not self._topic:
+            return
+        outputs = {
+            task_output.name: task_output.raw
+            for task_output in getattr(output, "tasks_output", None) or []
+            if getattr(task_output, "name", None) in SEED_TASKS + (SEARCH_TASK,) and task_output.raw
+        }
+        if self.match is not None and self.delta_keywords and outputs.get(SEARCH_TASK):
+            prior = (self.match.get("outputs") or {}).get(SEARCH_TASK)
+            if prior:
+                outputs[SEARCH_TASK] = f"{prior}\n\n{outputs[SEARCH_TASK]}"
+        keywords = list(self.keywords)
+        if self.match is not None:
+            keywords += [keyword for keyword in self.match.get("keywords") or [] if keyword not in keywords]
+        self.index.record(self._topic, keywords, outputs)
+
+    def summary(self) -> Optional[Dict[str, Any]]:
+        """复用情况摘要，没有相近主题时返回None"""
+        if self.match is None:
+            return None
+        return {
+            "topic": self.match["topic"],
+            "score": self.match["score"],
+            "seeded_tasks": list(self.seeded),
+            "delta_keywords": list(self.delta_keywords),
+        }
@@ -0,0 +1,241 @@
+"""
+综述任务调度模块
+
+该模块在多个并发的综述任务之间分配LLM和文献检索的并发额度，负责：
+1. 按任务优先级和租户公平份额决定排队任务的执行顺序
+2. 限制LLM调用和arXiv检索的并发数，额度释放时交给排名最高的等待者
+3. 按等待时间提升优先级，低优先级的大批量任务不会被持续饿死
+4. 统计各资源的等待次数、等待时间和各租户的使用量
+
+调度在每次LLM调用和每次检索之前进行：高优先级的交互式任务提交后，
+正在运行的批量任务会在下一次调用时让出额度，相当于在调用边界上抢占。
+
+并发上限可通过环境变量 COREASCHER_LLM_CONCURRENCY 和 COREASCHER_SEARCH_CONCURRENCY 设置，
+未设置或为0时不限制。
+"""
+
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 默认优先级，数值越大越优先
+DEFAULT_PRIORITY = 0
+
+# 默认租户
+DEFAULT_TENANT = "default"
+
+# 等待多少秒提升一级优先级
+DEFAULT_AGING_SECONDS = 30.0
+
+# 并发上限的环境变量
+LLM_CONCURRENCY_ENV = "COREASCHER_LLM_CONCURRENCY"
+SEARCH_CONCURRENCY_ENV = "COREASCHER_SEARCH_CONCURRENCY"
+
+# 当前线程正在执行的任务的 (优先级, 租户)
+_current_job: ContextVar[Tuple[int, str]] = ContextVar("coreascher_job", default=(DEFAULT_PRIORITY, DEFAULT_TENANT))
+
+
+@contextmanager
+def job_context(priority: int = DEFAULT_PRIORITY, tenant: str = DEFAULT_TENANT) -> Iterator[None]:
+    """在上下文中以指定的优先级和租户申请资源额度"""
+    token = _current_job.set((priority, tenant))
+    try:
+        yield
+    finally:
+        _current_job.reset(token)
+
+
+def current_job() -> Tuple[int, str]:
+    """获取当前线程的 (优先级, 租户)"""
+    return _current_job.get()
+
+
+class _Waiter:
+    """等待资源额度的一次申请"""
+
+    def __init__(self, priority: int, tenant: str, seq: int) -> None:
+        self.priority = priority
+        self.tenant = tenant
+        self.seq = seq
+        self.since = time.monotonic()
+        self.granted = False
+
+
+class _Resource:
+    """一种资源的额度状态"""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.in_use = 0
+        self.active: Dict[str, int] = defaultdict(int)
+        self.waiting: List[_Waiter] = []
+        self.grants = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.tenant_grants: Dict[str, int] = defaultdict(int)
+
+
+class FairScheduler:
+    """按优先级和租户公平份额分配资源额度的调度器
+
+    额度释放时交给排名最高的等待者：先比较按等待时间提升后的优先级，
+    再比较租户当前占用的额度数（占用少的租户优先），最后按申请顺序。
+    """
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None,
+                 aging_seconds: float = DEFAULT_AGING_SECONDS) -> None:
+        """初始化调度器
+
+        Args:
+            limits: 各资源的并发上限，如 {"llm": 4, "search": 2}；未列出或为0的资源不限制
+            aging_seconds: 等待多少秒提升一级优先级，为0时不提升
+        """
+        self.limits = {name: int(limit) for name, limit in (limits or {}).items() if limit}
+        self.aging_seconds = aging_seconds
+        self._resources = {name: _Resource(limit) for name, limit in self.limits.items()}
+        self._changed = threading.Condition()
+        self._seq = itertools.count()
+
+    def rank(self, priority: int, tenant: str, since: float, seq: int,
+             active: Dict[str, int], now: Optional[float] = None) -> Tuple[int, int, int]:
+        """计算等待者的排名，值越小越先获得额度
+
+        Args:
+            priority: 申请时的优先级
+            tenant: 租户
+            since: 开始等待的 time.monotonic() 时间
+            seq: 申请顺序
+            active: 各租户当前占用的额度数
+            now: 当前 time.monotonic() 时间
+        """
+        effective = priority
+        if self.aging_seconds:
+            now = time.monotonic() if now is None else now
+            effective += int((now - since) // self.aging_seconds)
+        return -effective, active.get(tenant, 0), seq
+
+    @contextmanager
+    def slot(self, resource: str) -> Iterator[None]:
+        """在上下文中占用一个资源额度，没有空闲额度时按排名等待"""
+        state = self._resources.get(resource)
+        if state is None:
+            yield
+            return
+        priority, tenant = current_job()
+        with self._changed:
+            waiter = _Waiter(priority, tenant, next(self._seq))
+            state.waiting.append(waiter)
+            self._grant(state)
+            if not waiter.granted:
+                state.waits += 1
+            try:
+                while not waiter.granted:
+                    self._changed.wait()
+            except BaseException:
+                if waiter.granted:
+                    self._release(state, tenant)
+                else:
+                    state.waiting.remove(waiter)
+                raise
+            state.wait_seconds += time.monotonic() - waiter.since
+        try:
+            yield
+        finally:
+            with self._changed:
+                self._release(state, tenant)
+
+    def _grant(self, state: _Resource) -> None:
+        """把空闲额度交给排名最高的等待者，调用方须持有锁"""
+        granted = False
+        while state.waiting and state.in_use < state.limit:
+            now = time.monotonic()
+            waiter = min(state.waiting,
+                         key=lambda w: self.rank(w.priority, w.tenant, w.since, w.seq, state.active, now))
+            state.waiting.remove(waiter)
+            state.in_use += 1
+            state.active[waiter.tenant] += 1
+            state.grants += 1
+            state.tenant_grants[waiter.tenant] += 1
+            waiter.granted = granted = True
+        if granted:
+            self._changed.notify_all()
+
+    def _release(self, state: _Resource, tenant: str) -> None:
+        state.in_use -= 1
+        state.active[tenant] -= 1
+        if not state.active[tenant]:
+            del state.active[tenant]
+        self._grant(state)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取各资源的调度统计信息"""
+        with self._changed:
+            return {
+                name: {
+                    "limit": state.limit,
+                    "in_use": state.in_use,
+                    "waiting": len(state.waiting),
+                    "grants": state.grants,
+                    "waits": state.waits,
+                    "wait_seconds": round(state.wait_seconds, 3),
+                    "tenants": dict(state.tenant_grants),
+                }
+                for name, state in self._resources.items()
+            }
+
+
+def _limits_from_env() -> Dict[str, int]:
+    limits = {}
+    for name, env in (("llm", LLM_CONCURRENCY_ENV), ("search", SEARCH_CONCURRENCY_ENV)):
+        value = os.environ.get(env)
+        if value:
+            try:
+                limits[name] = int(value)
+            except ValueError:
+                logger.warning(f"环境变量 {env} 不是整数: {value}，不限制 {name} 并发")
+    return limits
+
+
+_default_scheduler: Optional[FairScheduler] = None
+_default_lock = threading.Lock()
+
+
+def get_scheduler() -> FairScheduler:
+    """获取进程内共享的调度器，并发上限取自环境变量"""
+    global _default_scheduler
+    if _default_scheduler is None:
+        with _default_lock:
+            if _default_scheduler is None:
+                _default_scheduler = FairScheduler(_limits_from_env())
+    return _default_scheduler
+
+
+def configure_scheduler(llm: Optional[int] = None, search: Optional[int] = None,
+                        aging_seconds: float = DEFAULT_AGING_SECONDS) -> FairScheduler:
+    """设置进程内共享调度器的并发上限
+
+    Args:
+        llm: LLM调用并发上限，为None时取环境变量
+        search: arXiv检索并发上限，为None时取环境变量
+
+    Returns:
+        新的调度器
+    """
+    global _default_scheduler
+    limits = _limits_from_env()
+    if llm is not None:
+        limits["llm"] = llm
+    if search is not None:
+        limits["search"] = search
+    with _default_lock:
+        _default_scheduler = FairScheduler(limits, aging_seconds=aging_seconds)
+    logger.info(f"调度器并发上限: {_default_scheduler.limits or '不限制'}")
+    return _default_scheduler
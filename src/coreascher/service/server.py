@@ -0,0 +1,198 @@
+"""
+综述HTTP服务模块
+
+该模块提供常驻的HTTP服务，负责：
+1. 接收研究主题提交，放入任务队列后立即返回任务ID
+2. 查询任务状态和综述结果，取消排队中或运行中的任务
+3. 以 server-sent events 推送综述生成过程中已完成的章节
+4. 报告服务健康状态和队列统计
+
+只依赖标准库的 http.server，接口均使用JSON：
+    POST /jobs          {"topic": "大语言模型", "inputs": {"keywords": "RAG"}, "priority": 10, "tenant": "lab-a"}  -> 202
+    GET  /jobs          任务列表（不含结果）
+    GET  /jobs/<id>     任务状态和结果
+    GET  /jobs/<id>/events  事件流（text/event-stream）：section、document 和 finished 事件
+    DELETE /jobs/<id>   取消任务，运行中的任务保留已完成任务的输出  -> 202
+    GET  /health        队列和调度统计
+"""
+
+import json
+import logging
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional, Tuple
+
+from coreascher.service.jobs import Job, JobQueue, ReviewRunner
+from coreascher.service.scheduler import DEFAULT_PRIORITY, DEFAULT_TENANT, configure_scheduler
+
+logger = logging.getLogger(__name__)
+
+# 请求体的最大字节数
+MAX_BODY_BYTES = 1024 * 1024
+
+# 事件流没有新事件时发送保活注释的间隔（秒）
+KEEPALIVE_SECONDS = 15.0
+
+
+class ReviewRequestHandler(BaseHTTPRequestHandler):
+    """综述服务的请求处理器"""
+
+    server: "ReviewServer"
+
+    def _send_json(self, status: HTTPStatus, data: Any) -> None:
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: HTTPStatus, message: str) -> None:
+        self._send_json(status, {"error": message})
+
+    def _read_json(self) -> Tuple[Optional[Any], Optional[str]]:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            return None, "请求体过大"
+        try:
+            return json.loads(self.rfile.read(length) or b"{}"), None
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            return None, f"请求体不是有效的JSON: {str(e)}"
+
+    def do_GET(self) -> None:
+        jobs = self.server.jobs
+        path = self.path.split("?", 1)[0].rstrip("/")
+        if path == "/health":
+            self._send_json(HTTPStatus.OK, {"status": "ok", **jobs.stats()})
+        elif path == "/jobs":
+            self._send_json(HTTPStatus.OK, {"jobs": [job.to_dict(include_result=False) for job in jobs.jobs()]})
+        elif path.startswith("/jobs/") and path.endswith("/events"):
+            job = jobs.get(path[len("/jobs/"):-len("/events")])
+            if job is None:
+                self._error(HTTPStatus.NOT_FOUND, "任务不存在")
+            else:
+                self._stream_events(job)
+        elif path.startswith("/jobs/"):
+            job = jobs.get(path[len("/jobs/"):])
+            if job is None:
+                self._error(HTTPStatus.NOT_FOUND, "任务不存在")
+            else:
+                self._send_json(HTTPStatus.OK, job.to_dict())
+        else:
+            self._error(HTTPStatus.NOT_FOUND, "接口不存在")
+
+    def _stream_events(self, job: Job) -> None:
+        """以 server-sent events 推送任务事件，任务结束后关闭连接
+
+        连接建立前已产生的事件会先补发，客户端随时连接都能得到完整的章节序列。
+        """
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        sent = 0
+        try:
+            while True:
+                events = job.wait_events(sent, timeout=KEEPALIVE_SECONDS)
+                if not events:
+                    self.wfile.write(b": keepalive\n\n")
+                    self.wfile.flush()
+                    continue
+                for event in events:
+                    data = json.dumps(event, ensure_ascii=False)
+                    self.wfile.write(f"event: {event.get('type', 'message')}\ndata: {data}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                sent += len(events)
+                if any(event.get("type") == "finished" for event in events):
+                    return
+        except (BrokenPipeError, ConnectionResetError):
+            logger.debug(f"事件流客户端已断开: 任务 {job.id}")
+
+    def do_POST(self) -> None:
+        if self.path.split("?", 1)[0].rstrip("/") != "/jobs":
+            self._error(HTTPStatus.NOT_FOUND, "接口不存在")
+            return
+        data, error = self._read_json()
+        if error:
+            self._error(HTTPStatus.BAD_REQUEST, error)
+            return
+        if not isinstance(data, dict):
+            self._error(HTTPStatus.BAD_REQUEST, "请求体应为JSON对象")
+            return
+        inputs = data.get("inputs") or {}
+        if not isinstance(inputs, dict):
+            self._error(HTTPStatus.BAD_REQUEST, "inputs 应为对象")
+            return
+        priority = data.get("priority", DEFAULT_PRIORITY)
+        if not isinstance(priority, int) or isinstance(priority, bool):
+            self._error(HTTPStatus.BAD_REQUEST, "priority 应为整数")
+            return
+        tenant = data.get("tenant") or DEFAULT_TENANT
+        if not isinstance(tenant, str):
+            self._error(HTTPStatus.BAD_REQUEST, "tenant 应为字符串")
+            return
+        try:
+            job = self.server.jobs.submit(data.get("topic"), {str(k): str(v) for k, v in inputs.items()},
+                                          priority=priority, tenant=tenant)
+        except ValueError as e:
+            self._error(HTTPStatus.BAD_REQUEST, str(e))
+            return
+        self._send_json(HTTPStatus.ACCEPTED, job.to_dict(include_result=False))
+
+    def do_DELETE(self) -> None:
+        path = self.path.split("?", 1)[0].rstrip("/")
+        if not path.startswith("/jobs/"):
+            self._error(HTTPStatus.NOT_FOUND, "接口不存在")
+            return
+        job = self.server.jobs.cancel(path[len("/jobs/"):])
+        if job is None:
+            self._error(HTTPStatus.NOT_FOUND, "任务不存在")
+        else:
+            self._send_json(HTTPStatus.ACCEPTED, job.to_dict(include_result=False))
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+class ReviewServer(ThreadingHTTPServer):
+    """持有任务队列的HTTP服务"""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], jobs: JobQueue) -> None:
+        """初始化服务
+
+        Args:
+            address: 监听地址 (host, port)，端口为0时随机分配
+            jobs: 任务队列
+        """
+        super().__init__(address, ReviewRequestHandler)
+        self.jobs = jobs
+
+
+def serve(host: str = "127.0.0.1", port: int = 8000, workers: int = 2,
+          llm_concurrency: Optional[int] = None, search_concurrency: Optional[int] = None) -> None:
+    """启动综述服务并阻塞运行，收到中断信号后等待已排队任务结束再退出
+
+    Args:
+        host: 监听地址
+        port: 监听端口
+        workers: 同时运行的Crew数
+        llm_concurrency: 所有任务合计的LLM调用并发上限，为None时取环境变量
+        search_concurrency: 所有任务合计的arXiv检索并发上限，为None时取环境变量
+    """
+    scheduler = configure_scheduler(llm=llm_concurrency, search=search_concurrency)
+    # 每个工作线程预留一个构建好的Crew，任务开始时不再现场构建
+    runner = ReviewRunner(scheduler=scheduler, pool_size=workers).warm()
+    jobs = JobQueue(workers=workers, runner=runner, scheduler=scheduler).start()
+    server = ReviewServer((host, port), jobs)
+    logger.info(f"综述服务已启动: http://{host}:{server.server_address[1]}（{workers} 个工作线程）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("正在停止综述服务")
+    finally:
+        server.server_close()
+        jobs.stop()
+        runner.close()
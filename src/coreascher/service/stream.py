@@ -0,0 +1,294 @@
+"""
+综述流式输出模块
+
+该模块在文献综述任务生成过程中逐章节输出结果，负责：
+1. 从LLM的流式输出中识别最终答案，并按Markdown标题切分出已完成的章节
+2. 每完成一个章节就追加写入输出文件，并推送给订阅者（如HTTP服务的事件流）
+3. 任务结束后用完整的综述原子地替换输出文件
+
+LLM启用流式输出（stream=True）时章节随生成逐个推送；未启用流式输出或回复来自缓存时，
+在最终回答完成后一次性按章节推送。Crew构建时为执行流式输出任务的Agent的LLM开启流式输出，
+可用环境变量 COREASCHER_STREAM=0 关闭。
+"""
+
+import logging
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from coreascher.monitoring.metrics import _EventRouter
+from coreascher.tools.shared_store import atomic_write_text
+
+logger = logging.getLogger(__name__)
+
+# 默认流式输出的任务
+DEFAULT_STREAM_TASK = "literature_review"
+
+# 控制是否为流式输出任务开启LLM流式输出的环境变量
+STREAM_ENV = "COREASCHER_STREAM"
+
+# ReAct 格式中最终答案和工具调用的标记
+FINAL_ANSWER_MARKER = "Final Answer:"
+ACTION_MARKER = "Action:"
+
+_HEADING_PATTERN = re.compile(r"^#{1,3}\s+\S")
+_HEADING_PREFIX_PATTERN = re.compile(r"^#{1,3}\s+")
+
+
+class SectionSplitter:
+    """把增量到达的回复文本切分为章节
+
+    只处理最终答案部分：遇到 "Final Answer:" 标记之后的文本，或以Markdown标题开头的回复。
+    标记之前出现工具调用（"Action:"）的回复会被crewAI判为格式错误并重试，不作处理。
+    一个章节在下一个一至三级标题出现时完成，最后一个章节在 finish 时完成。
+    """
+
+    def __init__(self, require_marker: bool = True) -> None:
+        """初始化切分器
+
+        Args:
+            require_marker: 是否只处理最终答案标记之后的文本
+        """
+        self._started = not require_marker
+        self._pending = ""
+        self._line = ""
+        self._lines: List[str] = []
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """输入一段文本
+
+        Returns:
+            本段文本使之完成的章节列表
+        """
+        if not self._started:
+            self._pending += text
+            index = self._pending.find(FINAL_ANSWER_MARKER)
+            if index >= 0 and ACTION_MARKER in self._pending[:index]:
+                return []
+            if index >= 0:
+                text = self._pending[index + len(FINAL_ANSWER_MARKER):].lstrip(" ")
+            elif self._pending.lstrip().startswith("#"):
+                text = self._pending
+            else:
+                return []
+            self._started = True
+            self._pending = ""
+
+        sections = []
+        *lines, self._line = (self._line + text).split("\n")
+        for line in lines:
+            section = self._add_line(line)
+            if section is not None:
+                sections.append(section)
+        return sections
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """结束输入，返回剩余的章节
+
+        没有遇到最终答案标记、也不以标题开头的回复（如中间的思考或原生函数调用）不产生章节。
+        """
+        if not self._started:
+            self._pending = ""
+            return []
+        sections = []
+        for line in self._line.split("\n"):
+            section = self._add_line(line)
+            if section is not None:
+                sections.append(section)
+        self._line = ""
+        section = self._section()
+        self._lines = []
+        if section is not None:
+            sections.append(section)
+        return sections
+
+    def _add_line(self, line: str) -> Optional[Dict[str, Any]]:
+        section = None
+        if _HEADING_PATTERN.match(line):
+            section = self._section()
+            self._lines = []
+        self._lines.append(line)
+        return section
+
+    def _section(self) -> Optional[Dict[str, Any]]:
+        text = "\n".join(self._lines).strip("\n")
+        if not text.strip():
+            return None
+        first = self._lines[0] if self._lines else ""
+        title = _HEADING_PREFIX_PATTERN.sub("", first).strip() if _HEADING_PATTERN.match(first) else None
+        return {"title": title, "text": text}
+
+
+def stream_enabled() -> bool:
+    """是否为流式输出任务开启LLM流式输出，默认开启，COREASCHER_STREAM=0 时关闭"""
+    return os.getenv(STREAM_ENV, "1").lower() not in ("0", "false", "no", "off")
+
+
+def enable_streaming(crew: Any, task: str = DEFAULT_STREAM_TASK) -> int:
+    """为执行指定任务的Agent的LLM开启流式输出
+
+    只修改该Agent独有的LLM；多个Agent共用的LLM（如调用方统一传入的LLM）由调用方决定是否流式输出，
+    不在这里修改。
+
+    Args:
+        crew: crewAI Crew 实例
+        task: 流式输出的任务名称
+
+    Returns:
+        开启了流式输出的LLM数
+    """
+    enabled = 0
+    agents = [t.agent for t in crew.tasks if getattr(t, "name", None) == task and t.agent is not None]
+    for agent in agents:
+        llm = agent.llm
+        if llm is None or getattr(llm, "stream", True):
+            continue
+        if any(other is not agent and other.llm is llm for other in crew.agents):
+            logger.debug(f"任务 {task} 的LLM由多个Agent共用，不修改其流式输出设置")
+            continue
+        llm.stream = True
+        enabled += 1
+    return enabled
+
+
+def split_sections(text: str) -> List[Dict[str, Any]]:
+    """把完整的综述切分为章节"""
+    splitter = SectionSplitter(require_marker=False)
+    return splitter.feed(text) + splitter.finish()
+
+
+class SectionStream:
+    """订阅一次Crew运行中指定任务的LLM输出，逐章节写出和推送
+
+    推送给订阅者的事件：
+        {"type": "section", "task": ..., "index": 0, "title": "摘要", "text": "..."}
+        {"type": "document", "task": ..., "sections": 4, "text": "完整综述"}
+    """
+
+    # 除运行指标使用的事件外，还需要LLM流式输出的分块
+    EXTRA_EVENT_TYPES = ("LLMStreamChunkEvent",)
+
+    def __init__(self, task: str = DEFAULT_STREAM_TASK, path: Optional[Path] = None) -> None:
+        """初始化流式输出
+
+        Args:
+            task: 流式输出的任务名称
+            path: 章节追加写入的文件，任务结束后替换为完整综述；为None时只推送给订阅者
+        """
+        self.task = task
+        self.path = Path(path) if path else None
+        self.sections: List[Dict[str, Any]] = []
+        self.document: Optional[str] = None
+        self._subscribers: List[Callable[[Dict[str, Any]], Any]] = []
+        self._splitters: Dict[str, SectionSplitter] = {}
+        self._live_call: Optional[str] = None
+        self._task_ids: set = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback: Callable[[Dict[str, Any]], Any]) -> "SectionStream":
+        """添加订阅者，每个章节和最终综述都会回调一次"""
+        self._subscribers.append(callback)
+        return self
+
+    def attach(self, crew: Any) -> "SectionStream":
+        """挂接到Crew，只处理名称为 task 的任务产生的事件"""
+        self._task_ids = {str(task.id) for task in crew.tasks if getattr(task, "name", None) == self.task}
+        if not self._task_ids:
+            logger.warning(f"Crew中没有任务 {self.task}，不会输出流式结果")
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text("", encoding="utf-8")
+        _EventRouter.get().register(self)
+        return self
+
+    def detach(self) -> None:
+        """取消事件订阅"""
+        _EventRouter.get().unregister(self)
+
+    def owns(self, event: Any) -> bool:
+        """判断事件是否属于流式输出的任务"""
+        return getattr(event, "task_id", None) in self._task_ids
+
+    def handle_event(self, event: Any) -> None:
+        """处理一条crewAI事件"""
+        if not self.owns(event):
+            return
+        kind = getattr(event, "type", "")
+        if kind == "llm_stream_chunk":
+            with self._lock:
+                if self.document is not None:
+                    return
+                splitter = self._splitters.setdefault(event.call_id, SectionSplitter())
+                self._emit_call(event.call_id, splitter.feed(event.chunk or ""))
+        elif kind == "llm_call_completed":
+            with self._lock:
+                if self.document is not None:
+                    return
+                splitter = self._splitters.pop(event.call_id, None)
+                if splitter is None:
+                    # 未启用流式输出，整段回复一次到达
+                    splitter = SectionSplitter()
+                    sections = splitter.feed(str(event.response or ""))
+                else:
+                    sections = []
+                self._emit_call(event.call_id, sections + splitter.finish())
+        elif kind == "task_completed":
+            self.finish(getattr(getattr(event, "output", None), "raw", None))
+
+    def finish(self, document: Optional[str]) -> None:
+        """结束流式输出，写出完整综述并推送
+
+        任务完成事件会自动调用；事件由后台线程处理，Crew结束后可再次调用以确保完成，
+        重复调用不会产生重复输出。
+        """
+        with self._lock:
+            if self.document is not None:
+                return
+            splitter = self._splitters.get(self._live_call)
+            if splitter is not None:
+                self._emit_call(self._live_call, splitter.finish())
+            self._splitters.clear()
+            document = document if document is not None else "\n\n".join(s["text"] for s in self.sections)
+            if not self.sections:
+                # 回复来自缓存等情况下没有收到LLM事件，按最终结果补发章节
+                for section in split_sections(document):
+                    self._emit_section(section)
+            self.document = document
+            if self.path is not None:
+                atomic_write_text(self.path, document)
+            self._publish({"type": "document", "task": self.task, "sections": len(self.sections), "text": document})
+
+    def _emit_call(self, call_id: str, sections: List[Dict[str, Any]]) -> None:
+        """推送一次LLM调用产生的章节
+
+        一个任务只推送第一个给出最终答案的调用的章节；之后的调用（如格式错误后的重试）
+        不再推送，避免章节重复，完整综述以任务结果为准。
+        """
+        if not sections:
+            return
+        if self._live_call is None:
+            self._live_call = call_id
+        if call_id != self._live_call:
+            logger.debug(f"任务 {self.task} 的LLM调用 {call_id} 再次给出最终答案，不重复推送章节")
+            return
+        for section in sections:
+            self._emit_section(section)
+
+    def _emit_section(self, section: Dict[str, Any]) -> None:
+        section = dict(section, type="section", task=self.task, index=len(self.sections))
+        self.sections.append(section)
+        if self.path is not None:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(section["text"] + "\n\n")
+                f.flush()
+                os.fsync(f.fileno())
+        self._publish(section)
+
+    def _publish(self, event: Dict[str, Any]) -> None:
+        for callback in self._subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"推送流式结果失败: {str(e)}")
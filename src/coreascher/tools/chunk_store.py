@@ -0,0 +1,228 @@
+"""
+本地文献片段库模块
+
+该模块基于 SQLite 实现本地文献正文片段的存储，负责：
+1. 保存论文正文切分后的片段，供综述撰写时按片段引用
+2. 记录已入库文件的路径、大小和修改时间，支持断点续传
+3. 提供片段查询接口
+
+数据库使用 WAL 模式，入库进程写入时多个综述进程仍可同时检索。
+"""
+
+import logging
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 片段库默认存储位置
+DEFAULT_CHUNK_DB = Path("data/knowledge/chunks.sqlite3")
+
+_CJK_CHAR_PATTERN = re.compile(r"[㐀-鿿]")
+_WORD_PATTERN = re.compile(r"[A-Za-z0-9]+")
+_QUERY_TERM_PATTERN = re.compile(r"[A-Za-z0-9]{2,}|[㐀-鿿]+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    paper_id TEXT PRIMARY KEY,
+    source_path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    n_chunks INTEGER NOT NULL,
+    ingested_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    paper_id TEXT NOT NULL,
+    chunk_index INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    n_tokens INTEGER NOT NULL,
+    PRIMARY KEY (paper_id, chunk_index)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5(
+    text, paper_id UNINDEXED, chunk_index UNINDEXED
+);
+"""
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估计文本的token数量
+
+    中文按每字一个token计算，英文单词按1.3个token计算。
+    """
+    cjk = len(_CJK_CHAR_PATTERN.findall(text))
+    words = len(_WORD_PATTERN.findall(text))
+    return cjk + int(words * 1.3 + 0.5)
+
+
+class ChunkStore:
+    """本地文献片段库"""
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        """初始化片段库
+
+        Args:
+            path: SQLite数据库路径，默认为 data/knowledge/chunks.sqlite3
+        """
+        self.path = Path(path) if path else DEFAULT_CHUNK_DB
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        self._conn.close()
+
+    def __enter__(self) -> "ChunkStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def is_ingested(self, paper_id: str, size: int, mtime: float) -> bool:
+        """判断文件是否已经入库且未被修改"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime FROM documents WHERE paper_id = ?", (paper_id,)
+            ).fetchone()
+        return row is not None and row[0] == size and abs(row[1] - mtime) < 1e-6
+
+    def ingested_documents(self) -> Dict[str, Tuple[int, float]]:
+        """获取全部已入库文件的大小和修改时间"""
+        with self._lock:
+            rows = self._conn.execute("SELECT paper_id, size, mtime FROM documents").fetchall()
+        return {paper_id: (size, mtime) for paper_id, size, mtime in rows}
+
+    def add_document(self, paper_id: str, source_path: str, size: int, mtime: float,
+                     chunks: List[str], commit: bool = True) -> None:
+        """写入一篇论文的全部片段，替换该论文已有的片段
+
+        Args:
+            paper_id: 论文ID
+            source_path: 源文件路径
+            size: 源文件大小
+            mtime: 源文件修改时间
+            chunks: 片段文本列表
+            commit: 是否立即提交事务
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM chunks WHERE paper_id = ?", (paper_id,))
+            self._conn.execute("DELETE FROM chunks_fts WHERE paper_id = ?", (paper_id,))
+            self._conn.executemany(
+                "INSERT INTO chunks (paper_id, chunk_index, text, n_tokens) VALUES (?, ?, ?, ?)",
+                [(paper_id, i, text, estimate_tokens(text)) for i, text in enumerate(chunks)]
+            )
+            self._conn.executemany(
+                "INSERT INTO chunks_fts (text, paper_id, chunk_index) VALUES (?, ?, ?)",
+                [(text, paper_id, i) for i, text in enumerate(chunks)]
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?, ?)",
+                (paper_id, source_path, size, mtime, len(chunks), time.time())
+            )
+            if commit:
+                self._conn.commit()
+
+    def commit(self) -> None:
+        """提交事务"""
+        with self._lock:
+            self._conn.commit()
+
+    def get_chunks(self, paper_id: str) -> List[Dict]:
+        """获取一篇论文的全部片段
+
+        Args:
+            paper_id: 论文ID
+
+        Returns:
+            片段字典列表，按片段序号排列
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT chunk_index, text, n_tokens FROM chunks WHERE paper_id = ? ORDER BY chunk_index",
+                (paper_id,)
+            ).fetchall()
+        return [
+            {"paper_id": paper_id, "chunk_index": index, "text": text, "n_tokens": n_tokens}
+            for index, text, n_tokens in rows
+        ]
+
+    def iter_chunks(self, paper_ids: Optional[Iterable[str]] = None) -> List[Dict]:
+        """获取多篇论文的片段，未指定论文时返回全部片段"""
+        with self._lock:
+            if paper_ids is None:
+                rows = self._conn.execute(
+                    "SELECT paper_id, chunk_index, text, n_tokens FROM chunks"
+                ).fetchall()
+            else:
+                ids = list(paper_ids)
+                placeholders = ",".join("?" * len(ids))
+                rows = self._conn.execute(
+                    f"SELECT paper_id, chunk_index, text, n_tokens FROM chunks WHERE paper_id IN ({placeholders})",
+                    ids
+                ).fetchall() if ids else []
+        return [
+            {"paper_id": paper_id, "chunk_index": index, "text": text, "n_tokens": n_tokens}
+            for paper_id, index, text, n_tokens in rows
+        ]
+
+    def search(self, query: str, limit: int = 100) -> List[Dict]:
+        """按全文索引检索与查询相关的片段
+
+        Args:
+            query: 检索词
+            limit: 最多返回的片段数
+
+        Returns:
+            按BM25相关度排序的片段字典列表
+        """
+        terms = _QUERY_TERM_PATTERN.findall(query)
+        if not terms:
+            return []
+        match = " OR ".join(f'"{term}"' for term in dict.fromkeys(terms))
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT f.paper_id, f.chunk_index, f.text, c.n_tokens FROM chunks_fts f "
+                "JOIN chunks c ON c.paper_id = f.paper_id AND c.chunk_index = f.chunk_index "
+                "WHERE chunks_fts MATCH ? ORDER BY bm25(chunks_fts) LIMIT ?",
+                (match, limit)
+            ).fetchall()
+        return [
+            {"paper_id": paper_id, "chunk_index": index, "text": text, "n_tokens": n_tokens}
+            for paper_id, index, text, n_tokens in rows
+        ]
+
+    def count(self) -> Tuple[int, int]:
+        """统计已入库的论文数和片段数"""
+        with self._lock:
+            documents = self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+            chunks = self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+        return documents, chunks
+
+
+_shared_store: Optional[ChunkStore] = None
+_shared_lock = threading.Lock()
+
+
+def get_chunk_store(path: Optional[Path] = None) -> Optional[ChunkStore]:
+    """获取进程内共享的片段库，用于检索
+
+    片段库文件尚不存在（还没有入库过）时返回None，不创建空库。
+
+    Args:
+        path: 数据库路径，默认为 data/knowledge/chunks.sqlite3
+    """
+    global _shared_store
+    path = (Path(path) if path else DEFAULT_CHUNK_DB).resolve()
+    if _shared_store is None or _shared_store.path != path:
+        with _shared_lock:
+            if _shared_store is None or _shared_store.path != path:
+                if not path.exists():
+                    return None
+                _shared_store = ChunkStore(path)
+    return _shared_store
@@ -41,16 +41,32 @@
 #         logger.error(f"论文查询失败: {str(e)}")
 #         return f"查询失败: {str(e)}"
 from crewai.tools import BaseTool
-from typing import Type
+from typing import Any, List, Optional, Type
 from pydantic import BaseModel, Field
-import arxiv
 import json
 import logging
+from coreascher.monitoring.deadline import RunCancelled
+from coreascher.monitoring.trace import trace_span
+from coreascher.service.scheduler import get_scheduler
+from coreascher.tools.chunk_store import get_chunk_store
+from coreascher.tools.mmr import select_chunks
+from coreascher.tools.paper_table import PaperTable
+from coreascher.tools.rate_limit import create_arxiv_client
+from coreascher.tools.search_cache import get_search_cache
+from coreascher.tools.term_cache import contains_cjk, get_term_cache
+from coreascher.tools.venue_index import FacetIndex, normalize_venue
 
-# 设置日志
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 返回给智能体的论文字段
+SEARCH_RESULT_FIELDS = ("title", "authors", "summary", "published", "pdf_url", "entry_id", "venue")
+
+# 每次检索返回给智能体的论文数
+SEARCH_RESULT_LIMIT = 10
+
+# 指定会议或年份时远程检索的候选数，标注了会议的论文只占少数，在较大的候选集中过滤后才有足够的结果
+FILTER_CANDIDATES = 200
+
 class TestToolInput(BaseModel):
     """Input schema for TestTool."""
     argument: str = Field(..., description="搜索关键词")
@@ -68,39 +84,143 @@ class TestTool(BaseTool):
 
 class LiteratureSearchInput(BaseModel):
     """Input schema for LiteratureSearchTool."""
-    query: str = Field(..., description="搜索关键词")
+    query: str = Field(..., description="搜索关键词，已收录的中文关键词会自动转换为英文检索词")
+    source_term: Optional[str] = Field(None, description="翻译前的原始关键词（如中文关键词），用于积累术语对照表")
+    venues: Optional[List[str]] = Field(None, description="只保留指定会议的论文，如 ['ICML', 'NeurIPS']")
+    min_year: Optional[int] = Field(None, description="只保留该年份及之后发表的论文")
 
 class LiteratureSearch(BaseTool):
     name: str = "LiteratureSearch"
     description: str = "使用arXiv API搜索学术论文"
     args_schema: Type[BaseModel] = LiteratureSearchInput
+    # 预算用尽时由预算控制器设置，设置后不再发起检索
+    stop_reason: Optional[str] = None
+    # arXiv客户端，默认每次检索新建受主机范围限速的 arxiv.Client，基准测试时可替换为离线客户端
+    client: Optional[Any] = None
+    # 录制回放（IORecorder），挂载后检索结果经由调用归档录制或回放
+    archive: Optional[Any] = None
+    # 期限控制器（DeadlineGuard），挂载后检索受单次超时和运行取消约束
+    deadline: Optional[Any] = None
     
-    def _run(self, query: str) -> str:
+    def search(self, query: str, max_results: int = SEARCH_RESULT_LIMIT) -> PaperTable:
+        """执行arXiv检索并以论文表形式返回结果
+
+        Args:
+            query: 英文检索词
+            max_results: 最大返回结果数量
+
+        Returns:
+            论文表
+        """
+        if self.archive is not None:
+            # 回放不经过检索缓存，结果只取决于归档
+            text = self.archive.call("arxiv", {"query": query, "max_results": max_results},
+                                     lambda: self._search(query, max_results).to_json(indent=None))
+            return PaperTable.from_json(text)
+        return self._search(query, max_results)
+
+    def _search(self, query: str, max_results: int) -> PaperTable:
+        """先查检索缓存，未命中时请求arXiv"""
+        cache = get_search_cache()
+        with trace_span("search_cache.get", cat="cache", query=query) as span:
+            cached = cache.get((query, max_results))
+            span["hit"] = cached is not None
+        if cached is not None:
+            return cached
+
+        return cache.fetch((query, max_results), lambda: self._fetch(query, max_results))
+
+    def _fetch(self, query: str, max_results: int) -> PaperTable:
+        """请求arXiv并构建论文表"""
+        # arxiv 依赖 feedparser 和 requests，首次检索时才导入
+        import arxiv
+
+        # 创建搜索客户端，请求速率由同一台机器上的所有进程共同限制
+        client = self.client or create_arxiv_client()
+
+        # 构建搜索查询
+        search = arxiv.Search(
+            query=query,
+            max_results=max_results,
+            sort_by=arxiv.SortCriterion.Relevance
+        )
+
+        # 执行搜索，arXiv的分页请求和退避重试都发生在迭代过程中，整个过程占用一个检索额度
+        table = PaperTable()
+        with get_scheduler().slot("search"), \
+                trace_span("arxiv.search", cat="network", query=query, max_results=max_results) as span:
+            if self.deadline is not None:
+                papers = self.deadline.call(lambda: list(client.results(search)), "arXiv检索")
+            else:
+                papers = list(client.results(search))
+            span["results"] = len(papers)
+        for paper in papers:
+            table.append({
+                "title": paper.title,
+                "authors": [author.name for author in paper.authors],
+                "summary": paper.summary,
+                "published": paper.published.strftime("%Y-%m-%d"),
+                "pdf_url": paper.pdf_url,
+                "entry_id": paper.entry_id,
+                "venue": normalize_venue(paper.journal_ref, paper.comment) or paper.journal_ref,
+                "primary_category": paper.primary_category
+            })
+        return table
+
+    def _run(self, query: str, source_term: Optional[str] = None,
+             venues: Optional[List[str]] = None, min_year: Optional[int] = None) -> str:
         """执行arXiv文献搜索"""
+        if self.stop_reason:
+            return f"检索已停止（{self.stop_reason}），请基于已有检索结果继续完成任务"
         try:
-            # 创建搜索客户端
-            client = arxiv.Client()
-            
-            # 构建搜索查询
-            search = arxiv.Search(
-                query=query,
-                max_results=10,
-                sort_by=arxiv.SortCriterion.Relevance
-            )
-            
-            # 执行搜索
-            results = []
-            for paper in client.results(search):
-                results.append({
-                    "title": paper.title,
-                    "authors": [author.name for author in paper.authors],
-                    "summary": paper.summary,
-                    "published": paper.published.strftime("%Y-%m-%d"),
-                    "pdf_url": paper.pdf_url,
-                    "entry_id": paper.entry_id
-                })
-            
-            return json.dumps({"papers": results}, ensure_ascii=False, indent=2)
+            # 规范化检索词，同一概念的不同写法和中英文关键词使用同一个检索词
+            term_cache = get_term_cache()
+            if source_term:
+                term_cache.learn(source_term, query)
+            query = term_cache.canonicalize(query)
+            if contains_cjk(query):
+                return f"术语表中没有关键词的英文对照: {query}，请翻译为英文后重新检索，并通过source_term传入原始关键词"
+
+            # 会议和年份在本地过滤，远程查询保持简单以便缓存复用
+            if not (venues or min_year):
+                return self.search(query).to_json(fields=SEARCH_RESULT_FIELDS)
+            table = self.search(query, max_results=FILTER_CANDIDATES)
+            facets = get_search_cache().facets((query, FILTER_CANDIDATES)) or FacetIndex(table)
+            filtered = facets.filter(venues=venues, min_year=min_year)
+            return filtered[:SEARCH_RESULT_LIMIT].to_json(fields=SEARCH_RESULT_FIELDS)
+        except RunCancelled:
+            raise
         except Exception as e:
             logger.error(f"arXiv文献搜索失败: {str(e)}")
-            return f"搜索失败: {str(e)}"
\ No newline at end of file
+            return f"搜索失败: {str(e)}"
+
+class KnowledgeBaseSearchInput(BaseModel):
+    """Input schema for KnowledgeBaseSearch."""
+    query: str = Field(..., description="章节研究任务对应的英文检索词")
+    token_budget: int = Field(3000, description="返回片段的总token预算")
+
+class KnowledgeBaseSearch(BaseTool):
+    name: str = "KnowledgeBaseSearch"
+    description: str = "检索本地知识库中的论文正文片段，返回与章节相关且互不重复的片段，引用格式为[paperID-chunkX]"
+    args_schema: Type[BaseModel] = KnowledgeBaseSearchInput
+    candidate_limit: int = 100
+
+    def _run(self, query: str, token_budget: int = 3000) -> str:
+        """检索候选片段并按最大边际相关性筛选"""
+        try:
+            store = get_chunk_store()
+            if store is None:
+                return "知识库中未找到相关片段"
+            with trace_span("chunk_store.search", cat="knowledge", query=query) as span:
+                candidates = store.search(query, limit=self.candidate_limit)
+                span["candidates"] = len(candidates)
+            with trace_span("mmr.select", cat="knowledge", token_budget=token_budget):
+                chunks = select_chunks(query, candidates, token_budget=token_budget)
+            if not chunks:
+                return "知识库中未找到相关片段"
+            return "\n\n".join(
+                f"[{chunk['paper_id']}-chunk{chunk['chunk_index']}] {chunk['text']}" for chunk in chunks
+            )
+        except Exception as e:
+            logger.error(f"知识库检索失败: {str(e)}")
+            return f"检索失败: {str(e)}"
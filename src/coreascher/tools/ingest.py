@@ -0,0 +1,258 @@
+"""
+本地全文入库模块
+
+该模块将已下载到本地的论文全文（PDF或文本文件）写入片段库，负责：
+1. 在进程池中并行抽取和规范化正文文本
+2. 将正文切分为带重叠的片段
+3. 写入本地片段库，输出进度并支持断点续传
+
+用法：
+    python -m coreascher.tools.ingest <目录> [--workers N] [--db 路径]
+"""
+
+import argparse
+import logging
+import os
+import re
+import sys
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from coreascher.monitoring.logs import setup_logging
+from coreascher.tools.chunk_store import ChunkStore, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# 支持入库的文件类型
+SUPPORTED_SUFFIXES = (".pdf", ".txt", ".md")
+
+_HYPHEN_BREAK_PATTERN = re.compile(r"(\w)-\n(\w)")
+_CONTROL_PATTERN = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
+_SPACE_PATTERN = re.compile(r"[ \t ]+")
+_PARAGRAPH_PATTERN = re.compile(r"\n\s*\n+")
+_SENTENCE_PATTERN = re.compile(r"(?<=[。！？!?])|(?<=[.;])\s+")
+
+
+def extract_text(path: Path) -> str:
+    """抽取文件正文
+
+    Args:
+        path: PDF或文本文件路径
+
+    Returns:
+        原始正文文本
+
+    Raises:
+        RuntimeError: 未安装PDF解析依赖时
+    """
+    if path.suffix.lower() != ".pdf":
+        return path.read_text(encoding="utf-8", errors="ignore")
+
+    try:
+        from pypdf import PdfReader
+    except ImportError as e:
+        raise RuntimeError("解析PDF需要安装 pypdf：pip install 'coreascher[pdf]'") from e
+    reader = PdfReader(str(path))
+    return "\n\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def normalize_text(text: str) -> str:
+    """规范化正文：统一全半角、合并断行连字符、去除控制字符和多余空白"""
+    text = unicodedata.normalize("NFKC", text)
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    text = _HYPHEN_BREAK_PATTERN.sub(r"\1\2", text)
+    text = _CONTROL_PATTERN.sub("", text)
+    paragraphs = []
+    for paragraph in _PARAGRAPH_PATTERN.split(text):
+        paragraph = _SPACE_PATTERN.sub(" ", paragraph.replace("\n", " ")).strip()
+        if paragraph:
+            paragraphs.append(paragraph)
+    return "\n\n".join(paragraphs)
+
+
+def chunk_text(text: str, chunk_tokens: int = 400, overlap_tokens: int = 50) -> List[str]:
+    """按句子边界将正文切分为带重叠的片段
+
+    Args:
+        text: 规范化后的正文
+        chunk_tokens: 每个片段的目标token数
+        overlap_tokens: 相邻片段之间重叠的token数
+
+    Returns:
+        片段文本列表
+    """
+    sentences = []
+    for paragraph in text.split("\n\n"):
+        for sentence in _SENTENCE_PATTERN.split(paragraph):
+            sentence = sentence.strip()
+            if not sentence:
+                continue
+            # 超长句子按单词硬切分
+            words = sentence.split(" ")
+            while estimate_tokens(sentence) > chunk_tokens and len(words) > 1:
+                head_size = max(1, int(len(words) * chunk_tokens / estimate_tokens(sentence)))
+                sentences.append(" ".join(words[:head_size]))
+                words = words[head_size:]
+                sentence = " ".join(words)
+            sentences.append(sentence)
+
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for sentence in sentences:
+        tokens = estimate_tokens(sentence)
+        if current and current_tokens + tokens > chunk_tokens:
+            chunks.append(" ".join(current))
+            # 保留末尾若干句作为下一个片段的重叠部分
+            overlap: List[str] = []
+            overlap_size = 0
+            for previous in reversed(current):
+                size = estimate_tokens(previous)
+                if overlap_size + size > overlap_tokens:
+                    break
+                overlap.insert(0, previous)
+                overlap_size += size
+            current, current_tokens = overlap, overlap_size
+        current.append(sentence)
+        current_tokens += tokens
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def process_file(path: str, chunk_tokens: int = 400, overlap_tokens: int = 50) -> Tuple[str, List[str]]:
+    """进程池任务：抽取、规范化并切分单个文件
+
+    Returns:
+        (文件路径, 片段列表)
+    """
+    text = normalize_text(extract_text(Path(path)))
+    return path, chunk_text(text, chunk_tokens, overlap_tokens)
+
+
+def discover_files(directory: Path) -> Iterator[Path]:
+    """递归查找目录下所有支持的文件"""
+    for path in sorted(directory.rglob("*")):
+        if path.is_file() and path.suffix.lower() in SUPPORTED_SUFFIXES:
+            yield path
+
+
+def paper_id_for(path: Path, directory: Path) -> str:
+    """以文件相对入库目录的路径（不含扩展名）作为论文ID，如 2301.00001v2 或 nlp/2301.00001v2
+
+    不同子目录中的同名文件使用不同的ID。
+
+    Args:
+        path: 论文文件路径
+        directory: 入库目录
+    """
+    return path.relative_to(directory).with_suffix("").as_posix()
+
+
+def ingest_directory(directory: Path, store: ChunkStore, workers: Optional[int] = None,
+                     chunk_tokens: int = 400, overlap_tokens: int = 50,
+                     force: bool = False, commit_every: int = 50) -> dict:
+    """将目录下的论文全文并行写入片段库
+
+    Args:
+        directory: 论文文件所在目录
+        store: 片段库
+        workers: 进程数，默认为CPU核数
+        chunk_tokens: 每个片段的目标token数
+        overlap_tokens: 相邻片段重叠的token数
+        force: 是否忽略已入库记录重新处理全部文件
+        commit_every: 每写入多少篇论文提交一次事务
+
+    Returns:
+        入库统计字典
+    """
+    directory = Path(directory)
+    if not directory.is_dir():
+        raise ValueError(f"目录不存在: {directory}")
+
+    done = {} if force else store.ingested_documents()
+    pending = []
+    skipped = 0
+    chosen = {}
+    for path in discover_files(directory):
+        paper_id = paper_id_for(path, directory)
+        other = chosen.get(paper_id)
+        if other is not None:
+            # 同一论文有多种格式时（如 x.pdf 和 x.txt）按 SUPPORTED_SUFFIXES 的顺序只入库一个
+            keep, drop = sorted((other, path), key=lambda p: SUPPORTED_SUFFIXES.index(p.suffix.lower()))
+            logger.warning(f"{drop} 与 {keep} 对应同一论文ID {paper_id}，只入库后者")
+            chosen[paper_id] = keep
+        else:
+            chosen[paper_id] = path
+    for paper_id, path in sorted(chosen.items()):
+        stat = path.stat()
+        if done.get(paper_id) == (stat.st_size, stat.st_mtime):
+            skipped += 1
+            continue
+        pending.append((path, paper_id, stat.st_size, stat.st_mtime))
+
+    total = len(pending)
+    logger.info(f"待入库 {total} 篇，已跳过 {skipped} 篇已入库文件")
+    stats = {"total": total, "skipped": skipped, "ingested": 0, "failed": 0, "chunks": 0}
+    if not pending:
+        return stats
+
+    meta = {str(path): (paper_id, size, mtime) for path, paper_id, size, mtime in pending}
+    started = time.perf_counter()
+    last_report = started
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        futures = [
+            executor.submit(process_file, str(path), chunk_tokens, overlap_tokens)
+            for path, _, _, _ in pending
+        ]
+        for completed, future in enumerate(as_completed(futures), 1):
+            try:
+                path, chunks = future.result()
+            except Exception as e:
+                stats["failed"] += 1
+                logger.error(f"处理文件失败: {str(e)}")
+                continue
+
+            paper_id, size, mtime = meta[path]
+            store.add_document(paper_id, path, size, mtime, chunks, commit=False)
+            stats["ingested"] += 1
+            stats["chunks"] += len(chunks)
+            if stats["ingested"] % commit_every == 0:
+                store.commit()
+
+            now = time.perf_counter()
+            if now - last_report >= 2 or completed == total:
+                rate = completed / (now - started)
+                logger.info(f"入库进度 {completed}/{total}（{rate:.1f} 篇/秒）")
+                last_report = now
+    store.commit()
+    stats["seconds"] = round(time.perf_counter() - started, 2)
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="将本地论文全文并行写入片段库")
+    parser.add_argument("directory", type=Path, help="论文PDF或文本文件所在目录")
+    parser.add_argument("--db", type=Path, default=None, help="片段库路径，默认为 data/knowledge/chunks.sqlite3")
+    parser.add_argument("--workers", type=int, default=None, help="进程数，默认为CPU核数")
+    parser.add_argument("--chunk-tokens", type=int, default=400, help="每个片段的目标token数")
+    parser.add_argument("--overlap-tokens", type=int, default=50, help="相邻片段重叠的token数")
+    parser.add_argument("--force", action="store_true", help="忽略已入库记录，重新处理全部文件")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    with ChunkStore(args.db) as store:
+        stats = ingest_directory(
+            args.directory, store, workers=args.workers,
+            chunk_tokens=args.chunk_tokens, overlap_tokens=args.overlap_tokens, force=args.force
+        )
+    logger.info(f"入库完成: {stats}")
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
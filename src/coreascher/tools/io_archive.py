@@ -0,0 +1,266 @@
+"""
+外部调用录制与回放模块
+
+该模块录制一次Crew运行中的全部外部调用，并在之后的运行中按原样回放，负责：
+1. 以请求内容的摘要为键，把LLM回复和arXiv检索结果保存到压缩的内容寻址归档中
+2. 回放时按相同请求的出现次序返回录制的结果，不访问网络
+3. 回放中遇到归档里没有的请求（如修改了提示的任务）时照常调用并补录，其余任务仍然回放
+4. 在Crew的Agent和检索工具上挂载和卸载录制回放，挂载期间关闭Agent记忆
+
+归档文件为 gzip 压缩的JSON：{"version", "calls": {请求摘要: [结果摘要, ...]}, "blobs": {结果摘要: 结果}}，
+相同的结果只保存一份。多个进程写同一归档时在文件锁内合并。
+设置环境变量 COREASCHER_RECORD=<归档路径> 录制，COREASCHER_REPLAY=<归档路径> 回放。
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from coreascher.tools.shared_store import atomic_write_bytes, file_lock
+
+logger = logging.getLogger(__name__)
+
+# 录制和回放的环境变量，值为归档路径
+RECORD_ENV = "COREASCHER_RECORD"
+REPLAY_ENV = "COREASCHER_REPLAY"
+
+RECORD = "record"
+REPLAY = "replay"
+
+
+def _digest(value: Any) -> str:
+    payload = json.dumps(value, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def request_key(kind: str, request: Dict[str, Any]) -> str:
+    """计算外部请求的摘要
+
+    Args:
+        kind: 调用类型，如 "llm" 或 "arxiv"
+        request: 决定结果的全部请求参数
+    """
+    return _digest({"kind": kind, "request": request})
+
+
+class IOArchive:
+    """内容寻址的外部调用归档"""
+
+    def __init__(self, path: Path) -> None:
+        """初始化并加载归档
+
+        Args:
+            path: 归档文件路径，不存在时视为空归档
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._calls: Dict[str, List[str]] = {}
+        self._blobs: Dict[str, Any] = {}
+        self._dirty: Dict[str, List[str]] = {}
+        data = self._read()
+        self._calls.update(data.get("calls", {}))
+        self._blobs.update(data.get("blobs", {}))
+
+    def _read(self) -> Dict[str, Any]:
+        """读取磁盘上的归档"""
+        if not self.path.exists():
+            return {}
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"加载调用归档失败: {str(e)}")
+            return {}
+
+    def lookup(self, key: str, position: int) -> Optional[Any]:
+        """读取请求第 position 次出现时录制的结果
+
+        请求出现的次数多于录制次数时返回最后一次录制的结果；未录制时返回None。
+        """
+        with self._lock:
+            blobs = self._calls.get(key)
+            if not blobs:
+                return None
+            return self._blobs[blobs[min(position, len(blobs) - 1)]]
+
+    def store(self, key: str, position: int, value: Any) -> None:
+        """保存请求第 position 次出现时的结果"""
+        blob = _digest(value)
+        with self._lock:
+            self._blobs[blob] = value
+            blobs = self._calls.setdefault(key, [])
+            if position < len(blobs):
+                blobs[position] = blob
+            else:
+                blobs.extend([blob] * (position + 1 - len(blobs)))
+            self._dirty[key] = list(blobs)
+
+    def save(self) -> None:
+        """把本进程新录制的结果合并写入归档文件"""
+        with self._lock:
+            if not self._dirty:
+                return
+            dirty, self._dirty = self._dirty, {}
+            blobs = {blob: self._blobs[blob] for blob_list in dirty.values() for blob in blob_list}
+        try:
+            with file_lock(self.path):
+                data = self._read()
+                calls = data.get("calls", {})
+                calls.update(dirty)
+                stored = data.get("blobs", {})
+                stored.update(blobs)
+                # 只保留仍被引用的结果
+                used = {blob for blob_list in calls.values() for blob in blob_list}
+                data = {"version": 1, "calls": calls, "blobs": {blob: stored[blob] for blob in used if blob in stored}}
+                payload = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                atomic_write_bytes(self.path, gzip.compress(payload, mtime=0))
+        except OSError as e:
+            logger.error(f"保存调用归档失败: {str(e)}")
+            with self._lock:
+                for key, blob_list in dirty.items():
+                    self._dirty.setdefault(key, blob_list)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(blobs) for blobs in self._calls.values())
+
+
+class IORecorder:
+    """一次Crew运行的录制或回放
+
+    用法：
+        recorder = IORecorder(get_io_archive(path), mode=REPLAY).attach(crew)
+        try:
+            crew.kickoff(inputs=inputs)
+        finally:
+            recorder.detach()
+    """
+
+    def __init__(self, archive: IOArchive, mode: str = RECORD) -> None:
+        """初始化录制回放
+
+        Args:
+            archive: 调用归档
+            mode: RECORD 时全部调用照常执行并录制；REPLAY 时优先返回归档中的结果
+        """
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"未知的录制回放模式: {mode}")
+        self.archive = archive
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._positions: Dict[str, int] = {}
+        self._attached: List[tuple] = []
+        self._memories: List[tuple] = []
+        self.recorded = 0
+        self.replayed = 0
+        self.skipped = 0
+
+    def call(self, kind: str, request: Dict[str, Any], compute: Callable[[], Any]) -> Any:
+        """执行或回放一次外部调用
+
+        Args:
+            kind: 调用类型
+            request: 决定结果的全部请求参数
+            compute: 实际发起调用的函数，返回值需可序列化为JSON，否则不录制
+
+        Returns:
+            调用结果
+        """
+        key = request_key(kind, request)
+        with self._lock:
+            position = self._positions.get(key, 0)
+            self._positions[key] = position + 1
+        if self.mode == REPLAY:
+            value = self.archive.lookup(key, position)
+            if value is not None:
+                with self._lock:
+                    self.replayed += 1
+                return value
+        value = compute()
+        try:
+            json.dumps(value)
+        except (TypeError, ValueError):
+            with self._lock:
+                self.skipped += 1
+            logger.warning(f"{kind} 调用结果无法序列化，未录制")
+            return value
+        self.archive.store(key, position, value)
+        with self._lock:
+            self.recorded += 1
+        return value
+
+    def attach(self, crew: Any) -> "IORecorder":
+        """为Crew中各Agent的LLM和检索工具挂载录制回放，并在挂载期间关闭Agent记忆
+
+        记忆的检索结果取决于本地向量库中已保存的内容，保存和检索时还会直接调用记忆自己的LLM和
+        嵌入模型，录制回放无法重现，因此录制和回放时都不使用记忆。
+        """
+        from coreascher.tools.llm_cache import RecordedLLM
+
+        for agent in crew.agents:
+            llm = agent.llm
+            if llm is not None and not isinstance(llm, RecordedLLM):
+                agent.llm = RecordedLLM(llm, self)
+            tools = [tool for tool in getattr(agent, "tools", None) or [] if hasattr(tool, "archive")]
+            for tool in tools:
+                tool.archive = self
+            self._attached.append((agent, llm, tools))
+        for owner, attribute in [(crew, "_memory")] + [(agent, "memory") for agent in crew.agents]:
+            memory = getattr(owner, attribute, None)
+            if memory is not None:
+                self._memories.append((owner, attribute, memory))
+                setattr(owner, attribute, None)
+        return self
+
+    def detach(self) -> None:
+        """卸载录制回放，恢复Agent记忆，并把新录制的结果写入归档"""
+        for agent, llm, tools in self._attached:
+            agent.llm = llm
+            for tool in tools:
+                tool.archive = None
+        for owner, attribute, memory in self._memories:
+            setattr(owner, attribute, memory)
+        self._attached = []
+        self._memories = []
+        self.archive.save()
+        logger.info(f"调用归档 {self.archive.path}: 回放 {self.replayed} 次，录制 {self.recorded} 次")
+
+    def summary(self) -> Dict[str, Any]:
+        """录制回放情况摘要"""
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "archive": str(self.archive.path),
+                "replayed": self.replayed,
+                "recorded": self.recorded,
+                "skipped": self.skipped,
+            }
+
+
+_archives: Dict[Path, IOArchive] = {}
+_archives_lock = threading.Lock()
+
+
+def get_io_archive(path: Path) -> IOArchive:
+    """获取进程内共享的调用归档，同一路径只加载一次"""
+    path = Path(path)
+    with _archives_lock:
+        if path not in _archives:
+            _archives[path] = IOArchive(path)
+        return _archives[path]
+
+
+def recorder_from_env() -> Optional[IORecorder]:
+    """按环境变量 COREASCHER_REPLAY 或 COREASCHER_RECORD 创建录制回放，均未设置时返回None"""
+    replay = os.getenv(REPLAY_ENV)
+    if replay:
+        return IORecorder(get_io_archive(Path(replay)), mode=REPLAY)
+    record = os.getenv(RECORD_ENV)
+    if record:
+        return IORecorder(get_io_archive(Path(record)), mode=RECORD)
+    return None
@@ -0,0 +1,318 @@
+"""
+LLM回复缓存模块
+
+该模块在进程内缓存LLM回复，负责：
+1. 以模型、消息、工具和停止词的摘要为键缓存回复，相同提示不再重复调用LLM
+2. 相同提示被并发请求时只调用一次LLM，其余调用等待同一结果
+3. 统计缓存命中率
+4. 配置了跨进程共享存储时，内存未命中的提示由共享存储去重，多个进程共享同一份回复
+5. 提供向调度器申请并发额度的LLM包装，缓存未命中的调用才占用额度
+6. 提供录制和回放LLM调用的包装
+7. 提供受单次超时和运行取消约束的LLM包装
+8. 为Agent记忆用于分析的LLM加上同样的包装
+
+批量生成多个相关主题的综述时，重复的框架制定、关键词生成等提示可以直接复用回复。
+只有在LLM输出可以视为确定性（如 temperature=0）时才应启用。
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from crewai.llms.base_llm import BaseLLM
+from pydantic import PrivateAttr
+
+from coreascher.service.scheduler import get_scheduler
+from coreascher.tools.shared_store import get_shared_store
+
+logger = logging.getLogger(__name__)
+
+
+class LLMResponseCache:
+    """线程安全的LRU回复缓存，相同键的并发请求只计算一次"""
+
+    def __init__(self, maxsize: int = 2048, store: Optional[Any] = None) -> None:
+        """初始化缓存
+
+        Args:
+            maxsize: 最多缓存的回复数
+            store: 跨进程共享存储（SharedStore），为None时只使用内存缓存
+        """
+        self.maxsize = maxsize
+        self.store = store
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._pending: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key: str, compute) -> Any:
+        """获取缓存的回复，没有时调用 compute 计算并缓存
+
+        compute 抛出异常时不缓存结果，等待中的调用会各自重新计算。
+        """
+        while True:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._entries[key]
+                pending = self._pending.get(key)
+                if pending is None:
+                    pending = self._pending[key] = threading.Event()
+                    self.misses += 1
+                    break
+            pending.wait()
+
+        try:
+            value = compute() if self.store is None else self.store.get_or_compute("llm", key, compute)
+            with self._lock:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+            return value
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+            pending.set()
+
+    def clear(self) -> None:
+        """清空缓存和统计"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _tool_names(tools: Optional[list]) -> list:
+    names = []
+    for tool in tools or []:
+        if isinstance(tool, dict):
+            names.append(tool.get("name") or (tool.get("function") or {}).get("name") or repr(sorted(tool)))
+        else:
+            names.append(getattr(tool, "name", repr(tool)))
+    return names
+
+
+class _WrappedLLM(BaseLLM):
+    """包装内部LLM的基类，子类通过 _invoke 决定如何执行对内部LLM的调用"""
+
+    inner: Any = None
+
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    def __init__(self, inner: BaseLLM, **data: Any) -> None:
+        data.setdefault("model", getattr(inner, "model", type(self).__name__))
+        super().__init__(inner=inner, **data)
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None, **kwargs) -> Any:
+        """通过 _invoke 调用内部LLM"""
+        # crewAI 的执行器把停止词设置在它持有的LLM上，这里同步给内部LLM
+        if self.stop and list(getattr(self.inner, "stop", None) or []) != list(self.stop):
+            with self._lock:
+                self.inner.stop = list(self.stop)
+
+        def compute():
+            return self.inner.call(messages, tools=tools, callbacks=callbacks,
+                                   available_functions=available_functions, from_task=from_task,
+                                   from_agent=from_agent, response_model=response_model, **kwargs)
+
+        return self._invoke(compute, messages, tools, response_model)
+
+    def _invoke(self, compute, messages: Any, tools: Optional[list], response_model: Any) -> Any:
+        """执行对内部LLM的调用，compute 为实际调用内部LLM的函数"""
+        raise NotImplementedError
+
+    def supports_function_calling(self) -> bool:
+        return self.inner.supports_function_calling()
+
+    def supports_stop_words(self) -> bool:
+        return self.inner.supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        return self.inner.get_context_window_size()
+
+
+class CachedLLM(_WrappedLLM):
+    """为内部LLM加上回复缓存的包装
+
+    缓存命中时不调用内部LLM，也不产生LLM调用事件和token消耗；
+    未命中时由内部LLM照常发出事件。
+    """
+
+    cache: Any = None
+
+    def __init__(self, inner: BaseLLM, cache: Optional[LLMResponseCache] = None, **data: Any) -> None:
+        """初始化缓存包装
+
+        Args:
+            inner: 实际调用的LLM
+            cache: 回复缓存，默认新建一个
+        """
+        super().__init__(inner, cache=cache if cache is not None else LLMResponseCache(), **data)
+
+    def cache_key(self, messages: Any, tools: Optional[list] = None) -> str:
+        """计算提示的缓存键"""
+        payload = json.dumps(
+            {"model": self.model, "messages": messages, "tools": _tool_names(tools), "stop": self.stop},
+            ensure_ascii=False, sort_keys=True, default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _invoke(self, compute, messages: Any, tools: Optional[list], response_model: Any) -> Any:
+        """返回缓存的回复，未命中时调用内部LLM"""
+        if response_model is not None:
+            return compute()
+        return self.cache.get_or_compute(self.cache_key(messages, tools), compute)
+
+
+class ScheduledLLM(_WrappedLLM):
+    """每次调用前向调度器申请 "llm" 额度的LLM包装
+
+    与 CachedLLM 组合时应放在缓存之内，缓存命中不占用额度。
+    """
+
+    scheduler: Any = None
+
+    def __init__(self, inner: BaseLLM, scheduler: Optional[Any] = None, **data: Any) -> None:
+        """初始化调度包装
+
+        Args:
+            inner: 实际调用的LLM
+            scheduler: 调度器，默认使用进程内共享的调度器
+        """
+        super().__init__(inner, scheduler=scheduler, **data)
+
+    def _invoke(self, compute, messages: Any, tools: Optional[list], response_model: Any) -> Any:
+        """占用一个LLM额度后调用内部LLM"""
+        with (self.scheduler or get_scheduler()).slot("llm"):
+            return compute()
+
+
+class GuardedLLM(_WrappedLLM):
+    """通过期限控制器（DeadlineGuard）调用内部LLM的包装
+
+    调用超过单次超时或运行被取消时立即返回，不再等待内部LLM。
+    """
+
+    guard: Any = None
+
+    def __init__(self, inner: BaseLLM, guard: Any, **data: Any) -> None:
+        """初始化期限包装
+
+        Args:
+            inner: 实际调用的LLM
+            guard: 期限控制器
+        """
+        super().__init__(inner, guard=guard, **data)
+
+    def _invoke(self, compute, messages: Any, tools: Optional[list], response_model: Any) -> Any:
+        """在期限内调用内部LLM"""
+        return self.guard.call(compute, "LLM调用")
+
+
+class RecordedLLM(_WrappedLLM):
+    """通过录制回放（IORecorder）调用内部LLM的包装
+
+    应放在最外层，回放命中时不查询回复缓存，也不占用调度额度。
+    """
+
+    recorder: Any = None
+
+    def __init__(self, inner: BaseLLM, recorder: Any, **data: Any) -> None:
+        """初始化录制回放包装
+
+        Args:
+            inner: 实际调用的LLM
+            recorder: 录制回放
+        """
+        super().__init__(inner, recorder=recorder, **data)
+
+    def _invoke(self, compute, messages: Any, tools: Optional[list], response_model: Any) -> Any:
+        """返回录制的回复，没有录制时调用内部LLM并录制"""
+        if response_model is not None:
+            return compute()
+        request = {"model": self.model, "messages": messages, "tools": _tool_names(tools), "stop": self.stop}
+        return self.recorder.call("llm", request, compute)
+
+
+def crew_memories(crew: Any) -> List[Any]:
+    """获取Crew及其各Agent启用的记忆（crewAI Memory），作用域视图解析为底层记忆，每个记忆只返回一次"""
+    memories: List[Any] = []
+    for memory in [getattr(crew, "_memory", None)] + [getattr(agent, "memory", None) for agent in crew.agents]:
+        # MemoryScope 和 MemorySlice 是底层记忆的视图
+        memory = getattr(memory, "_memory", memory)
+        if hasattr(memory, "_llm_instance") and not any(memory is known for known in memories):
+            memories.append(memory)
+    return memories
+
+
+def _wrapped_by(llm: Any, kinds: Any) -> bool:
+    """判断LLM或它包装的任一层LLM是否为 kinds 类型"""
+    while llm is not None:
+        if isinstance(llm, kinds):
+            return True
+        llm = getattr(llm, "inner", None)
+    return False
+
+
+def wrap_memory_llms(crew: Any, wrap: Callable[[BaseLLM], BaseLLM], kinds: Any) -> List[Tuple[Any, Any]]:
+    """用 wrap 包装Crew中各记忆用于分析的LLM
+
+    记忆在保存和检索时直接调用自己的LLM，不经过Agent的LLM，因此Agent的LLM包装需要在这里再加一次。
+    记忆由Agent的LLM创建时，其中已经带有 kinds 类型的包装，不再重复包装（重复占用调度额度会死锁）。
+
+    Args:
+        crew: crewAI Crew 实例
+        wrap: 接收原LLM、返回包装后LLM的函数
+        kinds: wrap 加上的包装类型
+
+    Returns:
+        (记忆, 包装前的LLM实例) 列表，用于恢复
+    """
+    wrapped = []
+    for memory in crew_memories(crew):
+        original = memory._llm_instance
+        try:
+            llm = memory._llm
+        except RuntimeError as e:
+            logger.warning(f"记忆的LLM无法创建，未加包装: {str(e).splitlines()[0]}")
+            continue
+        if _wrapped_by(llm, kinds):
+            continue
+        memory._llm_instance = wrap(llm)
+        wrapped.append((memory, original))
+    return wrapped
+
+
+_default_cache: Optional[LLMResponseCache] = None
+_default_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """获取进程内共享的LLM回复缓存"""
+    global _default_cache
+    if _default_cache is None:
+        with _default_lock:
+            if _default_cache is None:
+                _default_cache = LLMResponseCache(store=get_shared_store())
+    return _default_cache
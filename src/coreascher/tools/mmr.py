@@ -0,0 +1,124 @@
+"""
+片段多样性筛选模块
+
+该模块实现基于最大边际相关性（MMR）的片段筛选，负责：
+1. 将片段文本编码为哈希词袋向量
+2. 在token预算内选出与章节任务相关且彼此不重复的片段
+3. 减少同一论文或相近工作的冗余片段对上下文的占用
+"""
+
+import re
+import zlib
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from coreascher.tools.chunk_store import estimate_tokens
+
+# 哈希向量维度
+DEFAULT_DIM = 2048
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+|[㐀-鿿]")
+
+
+def _features(text: str) -> List[str]:
+    """提取文本特征：英文单词和中文字符二元组"""
+    tokens = _TOKEN_PATTERN.findall(text.lower())
+    features = [token for token in tokens if len(token) > 1 or not token.isascii()]
+    features.extend(a + b for a, b in zip(tokens, tokens[1:]) if not a.isascii() and not b.isascii())
+    return features
+
+
+def embed_texts(texts: Sequence[str], dim: int = DEFAULT_DIM) -> np.ndarray:
+    """将文本编码为L2归一化的哈希词袋向量
+
+    Args:
+        texts: 文本序列
+        dim: 向量维度
+
+    Returns:
+        形状为 (len(texts), dim) 的矩阵
+    """
+    matrix = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        features = _features(text)
+        if not features:
+            continue
+        indices = np.fromiter((zlib.crc32(f.encode("utf-8")) % dim for f in features), dtype=np.int64, count=len(features))
+        np.add.at(matrix[row], indices, 1.0)
+    # 次线性词频缩放后归一化
+    np.log1p(matrix, out=matrix)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def mmr_select(query_vector: np.ndarray, candidate_vectors: np.ndarray, lambda_mult: float = 0.7,
+               k: Optional[int] = None, token_counts: Optional[Sequence[int]] = None,
+               token_budget: Optional[int] = None) -> List[int]:
+    """按最大边际相关性选出候选下标
+
+    每一轮选择 λ·相关性 − (1−λ)·与已选片段的最大相似度 最高的候选，
+    相似度均由矩阵运算一次算出。
+
+    Args:
+        query_vector: 查询向量
+        candidate_vectors: 候选向量矩阵
+        lambda_mult: 相关性与多样性的权衡系数，越大越偏向相关性
+        k: 最多选择的数量
+        token_counts: 每个候选的token数
+        token_budget: token预算，超出预算的候选会被跳过
+
+    Returns:
+        按选择顺序排列的候选下标
+    """
+    n = candidate_vectors.shape[0]
+    if n == 0:
+        return []
+    k = n if k is None else min(k, n)
+    relevance = candidate_vectors @ query_vector
+    max_similarity = np.zeros(n, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    costs = np.asarray(token_counts if token_counts is not None else np.zeros(n), dtype=np.int64)
+    remaining = token_budget if token_budget is not None else None
+
+    selected: List[int] = []
+    while len(selected) < k:
+        if remaining is not None:
+            available &= costs <= remaining
+        if not available.any():
+            break
+        scores = lambda_mult * relevance
+        if selected:
+            scores = scores - (1 - lambda_mult) * max_similarity
+        scores = np.where(available, scores, -np.inf)
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        if remaining is not None:
+            remaining -= int(costs[best])
+        np.maximum(max_similarity, candidate_vectors @ candidate_vectors[best], out=max_similarity)
+    return selected
+
+
+def select_chunks(query: str, chunks: Sequence[Dict], token_budget: int = 3000,
+                  lambda_mult: float = 0.7, k: Optional[int] = None) -> List[Dict]:
+    """从候选片段中选出多样化的子集
+
+    Args:
+        query: 章节研究任务或检索词
+        chunks: 候选片段字典，需包含 text 字段，可包含 n_tokens 字段
+        token_budget: 选出片段的总token预算
+        lambda_mult: 相关性与多样性的权衡系数
+        k: 最多选择的片段数
+
+    Returns:
+        选中的片段，按选择顺序排列
+    """
+    if not chunks:
+        return []
+    vectors = embed_texts([chunk["text"] for chunk in chunks])
+    query_vector = embed_texts([query])[0]
+    token_counts = [chunk.get("n_tokens") or estimate_tokens(chunk["text"]) for chunk in chunks]
+    indices = mmr_select(query_vector, vectors, lambda_mult, k, token_counts, token_budget)
+    return [chunks[i] for i in indices]
@@ -0,0 +1,378 @@
+"""
+论文列式存储模块
+
+该模块实现了一个面向大批量检索结果的紧凑论文表，负责：
+1. 以列式结构存储论文，作者、会议和分类等重复字符串统一驻留
+2. 年份和引用数使用数组存储，避免逐条字典的内存开销
+3. 提供零拷贝的切片、过滤和排序视图，在各处理阶段之间直接传递
+"""
+
+import json
+import re
+from array import array
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+_YEAR_PATTERN = re.compile(r"(19|20)\d{2}")
+
+# 论文字典中的字段顺序，与 LiteratureSearch 的输出格式保持一致
+PAPER_FIELDS = (
+    "title", "authors", "summary", "published", "pdf_url", "entry_id",
+    "venue", "primary_category", "year", "citations",
+)
+
+
+class StringPool:
+    """字符串驻留池，相同字符串只保存一份"""
+
+    __slots__ = ("_ids", "_values")
+
+    def __init__(self) -> None:
+        self._ids: Dict[str, int] = {}
+        self._values: List[str] = []
+
+    def intern(self, value: Optional[str]) -> int:
+        """登记字符串并返回编号，空值统一编号为0"""
+        if not value:
+            return 0
+        index = self._ids.get(value)
+        if index is None:
+            index = len(self._values) + 1
+            self._ids[value] = index
+            self._values.append(value)
+        return index
+
+    def lookup(self, index: int) -> str:
+        """根据编号取回字符串"""
+        return self._values[index - 1] if index else ""
+
+    def find(self, value: str) -> int:
+        """查询字符串编号，不存在时返回-1"""
+        if not value:
+            return 0
+        return self._ids.get(value, -1)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+class _Columns:
+    """论文表的底层列存储，多个视图共享同一份列"""
+
+    __slots__ = (
+        "titles", "summaries", "published", "pdf_urls", "entry_ids",
+        "author_ids", "author_offsets", "venue_ids", "category_ids",
+        "years", "citations", "authors", "venues", "categories", "entry_index",
+    )
+
+    def __init__(self) -> None:
+        self.titles: List[str] = []
+        self.summaries: List[str] = []
+        self.published: List[str] = []
+        self.pdf_urls: List[str] = []
+        self.entry_ids: List[str] = []
+        self.author_ids = array("I")
+        self.author_offsets = array("I", [0])
+        self.venue_ids = array("I")
+        self.category_ids = array("I")
+        self.years = array("H")
+        self.citations = array("I")
+        self.authors = StringPool()
+        self.venues = StringPool()
+        self.categories = StringPool()
+        self.entry_index: Dict[str, int] = {}
+
+
+class PaperRow:
+    """论文表中一行的只读视图，兼容字典式访问"""
+
+    __slots__ = ("_columns", "_index")
+
+    def __init__(self, columns: _Columns, index: int) -> None:
+        self._columns = columns
+        self._index = index
+
+    @property
+    def title(self) -> str:
+        return self._columns.titles[self._index]
+
+    @property
+    def summary(self) -> str:
+        return self._columns.summaries[self._index]
+
+    @property
+    def published(self) -> str:
+        return self._columns.published[self._index]
+
+    @property
+    def pdf_url(self) -> str:
+        return self._columns.pdf_urls[self._index]
+
+    @property
+    def entry_id(self) -> str:
+        return self._columns.entry_ids[self._index]
+
+    @property
+    def authors(self) -> List[str]:
+        columns = self._columns
+        start = columns.author_offsets[self._index]
+        end = columns.author_offsets[self._index + 1]
+        return [columns.authors.lookup(i) for i in columns.author_ids[start:end]]
+
+    @property
+    def venue(self) -> str:
+        return self._columns.venues.lookup(self._columns.venue_ids[self._index])
+
+    @property
+    def primary_category(self) -> str:
+        return self._columns.categories.lookup(self._columns.category_ids[self._index])
+
+    @property
+    def year(self) -> int:
+        return self._columns.years[self._index]
+
+    @property
+    def citations(self) -> int:
+        return self._columns.citations[self._index]
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in PAPER_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """字典式取值"""
+        return getattr(self, key) if key in PAPER_FIELDS else default
+
+    def keys(self) -> Sequence[str]:
+        return PAPER_FIELDS
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为普通字典"""
+        return {field: getattr(self, field) for field in PAPER_FIELDS}
+
+    def __repr__(self) -> str:
+        return f"PaperRow(title={self.title!r}, year={self.year})"
+
+
+class PaperTable:
+    """紧凑的列式论文表
+
+    表本身只保存行号序列，切片、过滤和排序都返回共享底层列的新视图，
+    不复制任何论文数据。向视图追加论文时会写入共享列。
+    """
+
+    __slots__ = ("_columns", "_rows", "_members")
+
+    def __init__(self, papers: Optional[Iterable[Dict[str, Any]]] = None) -> None:
+        """初始化论文表
+
+        Args:
+            papers: 论文字典序列，字段与 LiteratureSearch 的输出一致
+        """
+        self._columns = _Columns()
+        self._rows: Union[range, array] = range(0)
+        # 行号不连续的视图按需建立的行号集合，追加时同步更新
+        self._members: Optional[set] = None
+        if papers is not None:
+            self.extend(papers)
+
+    @classmethod
+    def _view(cls, columns: _Columns, rows: Union[range, array]) -> "PaperTable":
+        table = cls.__new__(cls)
+        table._columns = columns
+        table._rows = rows
+        table._members = None
+        return table
+
+    @classmethod
+    def from_json(cls, text: str) -> "PaperTable":
+        """从 LiteratureSearch 输出的JSON字符串构建论文表"""
+        data = json.loads(text)
+        papers = data.get("papers", []) if isinstance(data, dict) else data
+        return cls(papers)
+
+    def append(self, paper: Dict[str, Any]) -> bool:
+        """追加一篇论文，按 entry_id 去重
+
+        Args:
+            paper: 论文字典
+
+        Returns:
+            是否为新论文
+        """
+        columns = self._columns
+        entry_id = paper.get("entry_id") or paper.get("url") or ""
+        existing = columns.entry_index.get(entry_id) if entry_id else None
+        if existing is not None:
+            if entry_id in self:
+                return False
+            self._add_row(existing)
+            return True
+
+        index = len(columns.titles)
+        published = paper.get("published") or paper.get("published_date") or ""
+        year = paper.get("year")
+        if not year:
+            match = _YEAR_PATTERN.search(published)
+            year = int(match.group(0)) if match else 0
+
+        columns.titles.append(paper.get("title") or "")
+        columns.summaries.append(paper.get("summary") or paper.get("abstract") or "")
+        columns.published.append(published)
+        columns.pdf_urls.append(paper.get("pdf_url") or "")
+        columns.entry_ids.append(entry_id)
+        columns.author_ids.extend(columns.authors.intern(name) for name in paper.get("authors") or [])
+        columns.author_offsets.append(len(columns.author_ids))
+        columns.venue_ids.append(columns.venues.intern(paper.get("venue")))
+        columns.category_ids.append(columns.categories.intern(paper.get("primary_category")))
+        columns.years.append(int(year))
+        columns.citations.append(int(paper.get("citations") or 0))
+        if entry_id:
+            columns.entry_index[entry_id] = index
+        self._add_row(index)
+        return True
+
+    def _add_row(self, index: int) -> None:
+        """将底层列中的一行加入当前视图"""
+        rows = self._rows
+        if isinstance(rows, range):
+            if rows.step == 1 and (rows.stop == index or not rows):
+                start = rows.start if rows else index
+                self._rows = range(start, index + 1)
+                return
+            self._rows = rows = array("I", rows)
+        rows.append(index)
+        if self._members is not None:
+            self._members.add(index)
+
+    def extend(self, papers: Iterable[Dict[str, Any]]) -> int:
+        """批量追加论文
+
+        Returns:
+            新增论文数量
+        """
+        added = 0
+        for paper in papers:
+            if isinstance(paper, PaperRow):
+                paper = paper.to_dict()
+            added += self.append(paper)
+        return added
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __iter__(self) -> Iterator[PaperRow]:
+        columns = self._columns
+        for index in self._rows:
+            yield PaperRow(columns, index)
+
+    def __getitem__(self, item: Union[int, slice]) -> Union[PaperRow, "PaperTable"]:
+        if isinstance(item, slice):
+            return self._view(self._columns, self._rows[item])
+        return PaperRow(self._columns, self._rows[item])
+
+    def take(self, positions: Iterable[int]) -> "PaperTable":
+        """按位置取出若干行，返回共享底层列的新视图
+
+        Args:
+            positions: 行在当前视图中的位置
+        """
+        rows = self._rows
+        return self._view(self._columns, array("I", (rows[position] for position in positions)))
+
+    def __contains__(self, entry_id: object) -> bool:
+        index = self._columns.entry_index.get(entry_id)
+        if index is None:
+            return False
+        if isinstance(self._rows, range):
+            return index in self._rows
+        if self._members is None:
+            self._members = set(self._rows)
+        return index in self._members
+
+    def column(self, name: str) -> Sequence[Any]:
+        """按当前视图的行顺序取出一列
+
+        年份和引用数返回数组，其余字段返回列表。
+        """
+        columns = self._columns
+        if name in ("year", "citations"):
+            source = columns.years if name == "year" else columns.citations
+            if isinstance(self._rows, range) and self._rows == range(len(source)):
+                return source
+            return array(source.typecode, (source[i] for i in self._rows))
+        return [getattr(row, name) for row in self]
+
+    def filter(self, predicate: Optional[Callable[[PaperRow], bool]] = None, *,
+               min_year: Optional[int] = None, max_year: Optional[int] = None,
+               min_citations: Optional[int] = None, venue: Optional[str] = None) -> "PaperTable":
+        """过滤论文，返回共享底层列的新视图
+
+        Args:
+            predicate: 自定义过滤函数，接收行视图
+            min_year: 最早年份
+            max_year: 最晚年份
+            min_citations: 最少引用数
+            venue: 会议或期刊名称
+
+        Returns:
+            过滤后的论文表视图
+        """
+        columns = self._columns
+        years, citations, venue_ids = columns.years, columns.citations, columns.venue_ids
+        venue_id = columns.venues.find(venue) if venue is not None else None
+        if venue_id == -1:
+            return self._view(columns, array("I"))
+
+        selected = array("I")
+        for index in self._rows:
+            if min_year is not None and years[index] < min_year:
+                continue
+            if max_year is not None and years[index] > max_year:
+                continue
+            if min_citations is not None and citations[index] < min_citations:
+                continue
+            if venue_id is not None and venue_ids[index] != venue_id:
+                continue
+            if predicate is not None and not predicate(PaperRow(columns, index)):
+                continue
+            selected.append(index)
+        return self._view(columns, selected)
+
+    def sort_by(self, name: str, reverse: bool = False) -> "PaperTable":
+        """按列排序，返回共享底层列的新视图
+
+        Args:
+            name: 排序字段，year、citations 使用数组列，其余字段按字符串比较
+            reverse: 是否降序
+
+        Returns:
+            排序后的论文表视图
+        """
+        columns = self._columns
+        if name == "year":
+            key = columns.years.__getitem__
+        elif name == "citations":
+            key = columns.citations.__getitem__
+        elif name in PAPER_FIELDS:
+            key = lambda index: getattr(PaperRow(columns, index), name)
+        else:
+            raise KeyError(name)
+        return self._view(columns, array("I", sorted(self._rows, key=key, reverse=reverse)))
+
+    def to_dicts(self, fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """转换为论文字典列表
+
+        Args:
+            fields: 需要输出的字段，默认输出全部字段
+        """
+        if fields is None:
+            return [row.to_dict() for row in self]
+        return [{field: getattr(row, field) for field in fields} for row in self]
+
+    def to_json(self, fields: Optional[Sequence[str]] = None, indent: Optional[int] = 2) -> str:
+        """序列化为与 LiteratureSearch 输出一致的JSON字符串"""
+        return json.dumps({"papers": self.to_dicts(fields)}, ensure_ascii=False, indent=indent)
+
+    def __repr__(self) -> str:
+        return f"PaperTable(rows={len(self)}, authors={len(self._columns.authors)}, venues={len(self._columns.venues)})"
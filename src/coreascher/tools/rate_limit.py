@@ -0,0 +1,272 @@
+"""
+arXiv请求限速模块
+
+该模块在同一台机器的所有进程之间协调arXiv请求，负责：
+1. 按主机维度限制请求间隔，多个进程和线程合计不超过arXiv允许的请求速率
+2. 收到 429/503 响应时记录退避截止时间，所有进程在截止前都不再发起请求
+3. 连续被限流时按指数增加退避时间，请求成功后恢复正常间隔
+4. 为每次请求设置超时，服务端无响应时不会无限等待
+
+每个 arxiv.Client 只对自身的请求执行间隔限制，多个进程同时运行时请求速率会成倍增加，
+被限流后各进程又各自重试，进一步加重限流。限速状态保存在共享文件中：
+每次请求前在文件锁内预约下一个可用时刻，再在锁外等待到该时刻；
+等待结束后在锁内确认期间没有进程被限流，否则在退避截止后重新预约。
+请求间隔可通过环境变量 COREASCHER_ARXIV_INTERVAL 调整，状态文件位置可通过 COREASCHER_ARXIV_RATE_FILE 调整，
+请求超时可通过 COREASCHER_HTTP_TIMEOUT 调整。
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from coreascher.tools.shared_store import atomic_write_json, file_lock
+
+logger = logging.getLogger(__name__)
+
+# 请求间隔、状态文件和单次HTTP请求超时的环境变量
+INTERVAL_ENV = "COREASCHER_ARXIV_INTERVAL"
+RATE_FILE_ENV = "COREASCHER_ARXIV_RATE_FILE"
+HTTP_TIMEOUT_ENV = "COREASCHER_HTTP_TIMEOUT"
+
+
+
+def _default_rate_file() -> Path:
+    """限速状态的默认存储位置
+
+    使用当前用户的缓存目录，与工作目录无关，同一用户在不同目录下启动的进程共用同一份状态；
+    无法确定用户主目录时退回到系统临时目录。
+    """
+    cache_home = os.getenv("XDG_CACHE_HOME")
+    if not cache_home:
+        try:
+            cache_home = str(Path.home() / ".cache")
+        except RuntimeError:
+            user = os.getuid() if hasattr(os, "getuid") else "user"
+            cache_home = str(Path(tempfile.gettempdir()) / f"coreascher-{user}")
+    return Path(cache_home).absolute() / "coreascher" / "arxiv_rate.json"
+
+
+# 限速状态默认存储位置
+DEFAULT_RATE_FILE = _default_rate_file()
+
+# arXiv API 使用条款要求的请求间隔（秒）
+DEFAULT_INTERVAL = 3.0
+
+# 首次被限流时的退避时间和退避上限（秒）
+DEFAULT_BACKOFF = 10.0
+DEFAULT_MAX_BACKOFF = 300.0
+
+# 表示服务端限流的状态码
+THROTTLE_STATUS = (429, 503)
+
+# 单次HTTP请求的默认超时（秒），arxiv.Client 自身不设超时，服务端无响应时会一直等待
+DEFAULT_HTTP_TIMEOUT = 30.0
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析以秒为单位的 Retry-After 响应头，无法解析时返回None"""
+    try:
+        seconds = float(value) if value is not None else None
+    except ValueError:
+        return None
+    return seconds if seconds is not None and seconds >= 0 else None
+
+
+class HostRateLimiter:
+    """主机范围的arXiv请求限速器
+
+    状态文件内容：{"next_at": 下一个可预约时刻, "backoff_until": 退避截止时刻,
+    "backoff_started": 本轮退避开始时刻, "failures": 连续被限流次数}，时刻均为 time.time()。
+    """
+
+    def __init__(self, path: Optional[Path] = None, interval: Optional[float] = None,
+                 backoff: float = DEFAULT_BACKOFF, max_backoff: float = DEFAULT_MAX_BACKOFF) -> None:
+        """初始化限速器
+
+        Args:
+            path: 状态文件路径，默认为用户缓存目录下的 coreascher/arxiv_rate.json
+            interval: 相邻两次请求的最小间隔，默认取环境变量或3秒
+            backoff: 首次被限流且响应未给出 Retry-After 时的退避时间
+            max_backoff: 退避时间上限
+        """
+        self.path = Path(path) if path else DEFAULT_RATE_FILE
+        if interval is None:
+            try:
+                interval = float(os.getenv(INTERVAL_ENV, DEFAULT_INTERVAL))
+            except ValueError:
+                interval = DEFAULT_INTERVAL
+        self.interval = interval
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._stats_lock = threading.Lock()
+        self.requests = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.throttled = 0
+
+    def _read(self) -> Dict[str, float]:
+        """读取磁盘上的限速状态，调用方需持有文件锁"""
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取arXiv限速状态失败，按空状态处理: {str(e)}")
+            return {}
+
+    def acquire(self) -> float:
+        """预约一次请求并等待到预约时刻
+
+        等待期间其他进程被限流时，预约作废，在退避截止后重新预约并继续等待。
+
+        Returns:
+            预约到的请求时刻，用于之后的 report
+        """
+        slot = self._reserve()
+        waited = 0.0
+        while True:
+            delay = slot - time.time()
+            if delay <= 0:
+                break
+            time.sleep(delay)
+            waited += delay
+            with file_lock(self.path):
+                state = self._read()
+                if state.get("backoff_until", 0.0) <= slot:
+                    break
+                slot = self._reserve_locked(state)
+        with self._stats_lock:
+            self.requests += 1
+            if waited > 0:
+                self.waits += 1
+                self.wait_seconds += waited
+        return slot
+
+    def _reserve(self) -> float:
+        """在文件锁内预约下一个可用时刻"""
+        with file_lock(self.path):
+            return self._reserve_locked(self._read())
+
+    def _reserve_locked(self, state: Dict[str, float]) -> float:
+        """预约不早于上一个预约和退避截止时刻的请求时刻，调用方需持有文件锁"""
+        slot = max(time.time(), state.get("next_at", 0.0), state.get("backoff_until", 0.0))
+        state["next_at"] = slot + self.interval
+        atomic_write_json(self.path, state)
+        return slot
+
+    def report(self, issued_at: float, status: int, retry_after: Optional[str] = None) -> None:
+        """报告请求结果，被限流时让所有进程一起退避
+
+        同一轮退避开始前发出的请求再被限流时不再加倍退避时间，
+        避免多个进程的在途请求同时失败后把退避时间推得过长。
+
+        Args:
+            issued_at: acquire 返回的请求时刻
+            status: HTTP状态码
+            retry_after: 响应的 Retry-After 头
+        """
+        throttled = status in THROTTLE_STATUS
+        with file_lock(self.path):
+            state = self._read()
+            if not throttled:
+                if not state.get("failures"):
+                    return
+                state["failures"] = 0
+            else:
+                failures = state.get("failures", 0)
+                if issued_at >= state.get("backoff_started", 0.0):
+                    failures += 1
+                delay = _parse_retry_after(retry_after)
+                if delay is None:
+                    delay = self.backoff * 2 ** (max(failures, 1) - 1)
+                delay = min(delay, self.max_backoff)
+                now = time.time()
+                state["failures"] = failures
+                state["backoff_started"] = now
+                state["backoff_until"] = max(state.get("backoff_until", 0.0), now + delay)
+            atomic_write_json(self.path, state)
+        if throttled:
+            with self._stats_lock:
+                self.throttled += 1
+            logger.warning(f"arXiv返回 {status}，所有进程暂停请求至 "
+                           f"{time.strftime('%H:%M:%S', time.localtime(state['backoff_until']))}")
+
+    def stats(self) -> Dict[str, Any]:
+        """获取本进程的限速统计信息"""
+        with self._stats_lock:
+            return {
+                "path": str(self.path),
+                "interval": self.interval,
+                "requests": self.requests,
+                "waits": self.waits,
+                "wait_seconds": round(self.wait_seconds, 3),
+                "throttled": self.throttled,
+            }
+
+
+def http_timeout() -> float:
+    """单次HTTP请求超时，取环境变量 COREASCHER_HTTP_TIMEOUT"""
+    try:
+        return float(os.getenv(HTTP_TIMEOUT_ENV, DEFAULT_HTTP_TIMEOUT))
+    except ValueError:
+        return DEFAULT_HTTP_TIMEOUT
+
+
+class RateLimitedSession:
+    """为 requests.Session 的每次请求加上主机范围的限速、退避和超时"""
+
+    def __init__(self, session: Any, limiter: HostRateLimiter, timeout: Optional[float] = None) -> None:
+        self.session = session
+        self.limiter = limiter
+        self.timeout = timeout if timeout is not None else http_timeout()
+
+    def get(self, url: str, **kwargs: Any) -> Any:
+        kwargs.setdefault("timeout", self.timeout)
+        issued_at = self.limiter.acquire()
+        response = self.session.get(url, **kwargs)
+        self.limiter.report(issued_at, response.status_code, response.headers.get("Retry-After"))
+        return response
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.session, name)
+
+
+_default_limiter: Optional[HostRateLimiter] = None
+_default_lock = threading.Lock()
+
+
+def get_rate_limiter() -> HostRateLimiter:
+    """获取状态文件由环境变量 COREASCHER_ARXIV_RATE_FILE 指定的共享限速器"""
+    global _default_limiter
+    path = Path(os.getenv(RATE_FILE_ENV) or DEFAULT_RATE_FILE)
+    if _default_limiter is None or _default_limiter.path != path:
+        with _default_lock:
+            if _default_limiter is None or _default_limiter.path != path:
+                _default_limiter = HostRateLimiter(path)
+    return _default_limiter
+
+
+def create_arxiv_client(limiter: Optional[HostRateLimiter] = None, **kwargs: Any) -> Any:
+    """创建由主机范围限速器控制请求速率的 arxiv.Client
+
+    客户端自身的请求间隔设为0，间隔和重试前的退避都由限速器统一执行。
+
+    Args:
+        limiter: 限速器，默认使用共享限速器
+        **kwargs: 传给 arxiv.Client 的其他参数
+
+    Returns:
+        arxiv.Client
+    """
+    import arxiv
+
+    kwargs.setdefault("delay_seconds", 0.0)
+    client = arxiv.Client(**kwargs)
+    client._session = RateLimitedSession(client._session, limiter or get_rate_limiter())
+    return client
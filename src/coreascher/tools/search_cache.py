@@ -0,0 +1,129 @@
+"""
+检索结果缓存模块
+
+该模块在进程内缓存文献检索结果，负责：
+1. 以规范化后的检索词为键缓存论文表，避免重复请求arXiv
+2. 按最近最少使用策略淘汰旧结果
+3. 统计缓存命中率
+4. 与论文表一起缓存其分面索引，同一检索结果的会议和年份过滤不必重复建立索引
+5. 配置了跨进程共享存储时，内存未命中的检索由共享存储去重，多个进程不会重复请求同一检索
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from coreascher.tools.paper_table import PaperTable
+from coreascher.tools.shared_store import get_shared_store
+from coreascher.tools.venue_index import FacetIndex
+
+
+class SearchCache:
+    """线程安全的LRU检索结果缓存"""
+
+    def __init__(self, maxsize: int = 512, store: Optional[Any] = None) -> None:
+        """初始化缓存
+
+        Args:
+            maxsize: 最多缓存的检索结果数
+            store: 跨进程共享存储（SharedStore），为None时只使用内存缓存
+        """
+        self.maxsize = maxsize
+        self.store = store
+        self._entries: "OrderedDict[Hashable, PaperTable]" = OrderedDict()
+        self._facets: Dict[Hashable, FacetIndex] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[PaperTable]:
+        """查询缓存，未命中时返回None"""
+        with self._lock:
+            table = self._entries.get(key)
+            if table is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return table
+
+    def put(self, key: Hashable, table: PaperTable) -> None:
+        """写入缓存"""
+        with self._lock:
+            self._entries[key] = table
+            self._entries.move_to_end(key)
+            self._facets.pop(key, None)
+            while len(self._entries) > self.maxsize:
+                evicted, _ = self._entries.popitem(last=False)
+                self._facets.pop(evicted, None)
+
+    def facets(self, key: Hashable) -> Optional[FacetIndex]:
+        """获取缓存的检索结果的分面索引，首次使用时建立并与论文表一起缓存
+
+        Returns:
+            分面索引，检索结果不在缓存中时返回None
+        """
+        with self._lock:
+            table = self._entries.get(key)
+            index = self._facets.get(key)
+        if table is None:
+            return None
+        if index is not None and index.table is table:
+            return index
+        index = FacetIndex(table)
+        with self._lock:
+            if self._entries.get(key) is table:
+                self._facets[key] = index
+        return index
+
+    def fetch(self, key: Hashable, compute: Callable[[], PaperTable]) -> PaperTable:
+        """在内存未命中后获取检索结果并写入缓存
+
+        配置了共享存储时先查询共享存储，其他进程正在执行同一检索时等待其结果；
+        否则直接调用 compute。
+        """
+        if self.store is None:
+            table = compute()
+        else:
+            text = self.store.get_or_compute(
+                "search", json.dumps(key, ensure_ascii=False, default=str), lambda: compute().to_json(indent=None)
+            )
+            table = PaperTable.from_json(text)
+        self.put(key, table)
+        return table
+
+    def clear(self) -> None:
+        """清空缓存和统计"""
+        with self._lock:
+            self._entries.clear()
+            self._facets.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, float]:
+        """返回命中统计"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_default_cache: Optional[SearchCache] = None
+_default_lock = threading.Lock()
+
+
+def get_search_cache() -> SearchCache:
+    """获取进程内共享的检索结果缓存"""
+    global _default_cache
+    if _default_cache is None:
+        with _default_lock:
+            if _default_cache is None:
+                _default_cache = SearchCache(store=get_shared_store())
+    return _default_cache
@@ -0,0 +1,329 @@
+"""
+跨进程共享存储模块
+
+该模块为多进程运行提供磁盘上的共享存储，负责：
+1. 基于 SQLite WAL 的键值存储，多个进程可同时读写检索结果、LLM回复和知识库条目
+2. 跨进程的单飞计算：相同键只由一个进程计算，其余进程等待结果，避免重复的远程调用
+3. 文件锁和原子写入，多个进程写同一文件时不会产生半截文件或相互覆盖
+4. 条目按写入时间过期，打开存储时清理过期条目，数据库不会无限增长
+
+设置环境变量 COREASCHER_SHARED_CACHE 为数据库路径后，检索缓存和LLM回复缓存会在
+内存缓存未命中时查询共享存储。条目有效期默认为7天，可用 COREASCHER_SHARED_CACHE_TTL（秒）调整，0表示不过期。
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows 上没有 fcntl，文件锁退化为进程内锁
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# 启用共享缓存的环境变量，值为数据库路径
+SHARED_CACHE_ENV = "COREASCHER_SHARED_CACHE"
+
+# 共享缓存默认存储位置
+DEFAULT_SHARED_DB = Path("data/cache/shared.sqlite3")
+
+# 条目有效期的环境变量和默认值（秒），过期的检索结果和LLM回复不再复用
+SHARED_CACHE_TTL_ENV = "COREASCHER_SHARED_CACHE_TTL"
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600.0
+
+# 计算者租约时长（秒），持有租约的进程崩溃后其他进程在租约过期后接手
+DEFAULT_LEASE_SECONDS = 600.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS entries_created_at ON entries (created_at);
+CREATE TABLE IF NOT EXISTS claims (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+"""
+
+
+_process_lock = threading.RLock()
+
+
+@contextmanager
+def file_lock(path: Union[str, Path]) -> Iterator[None]:
+    """持有文件的排他锁
+
+    锁文件为 <path>.lock，同一台机器上的所有进程互斥。
+    """
+    lock_path = Path(str(path) + ".lock")
+    if fcntl is None:
+        with _process_lock:
+            yield
+        return
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def atomic_write_bytes(path: Union[str, Path], data: bytes) -> None:
+    """原子地写入二进制文件
+
+    先写入同目录下唯一命名的临时文件再替换目标文件，读者只会看到完整的旧文件或新文件，
+    多个进程同时写入时也不会共用临时文件。
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_text(path: Union[str, Path], text: str) -> None:
+    """原子地写入文本文件"""
+    atomic_write_bytes(path, text.encode("utf-8"))
+
+
+def atomic_write_json(path: Union[str, Path], data: Any) -> None:
+    """原子地写入JSON文件"""
+    atomic_write_text(path, json.dumps(data, ensure_ascii=False, indent=2))
+
+
+class SharedStore:
+    """基于 SQLite WAL 的跨进程键值存储
+
+    每个线程使用独立的连接；fork 出的子进程会重新建立连接。值以JSON保存。
+    """
+
+    def __init__(self, path: Optional[Path] = None, lease_seconds: float = DEFAULT_LEASE_SECONDS,
+                 poll_interval: float = 0.05, ttl_seconds: Optional[float] = None) -> None:
+        """初始化共享存储
+
+        Args:
+            path: SQLite数据库路径，默认为 data/cache/shared.sqlite3
+            lease_seconds: 计算者租约时长
+            poll_interval: 等待其他进程计算结果时的轮询间隔
+            ttl_seconds: 条目有效期，默认取环境变量或7天，0表示不过期
+        """
+        self.path = Path(path) if path else DEFAULT_SHARED_DB
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lease_seconds = lease_seconds
+        if ttl_seconds is None:
+            try:
+                ttl_seconds = float(os.getenv(SHARED_CACHE_TTL_ENV, DEFAULT_TTL_SECONDS))
+            except ValueError:
+                ttl_seconds = DEFAULT_TTL_SECONDS
+        self.ttl_seconds = ttl_seconds
+        self.poll_interval = poll_interval
+        self._local = threading.local()
+        self._pid = os.getpid()
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        with self._conn() as conn:
+            conn.executescript(_SCHEMA)
+        self.prune()
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._pid != os.getpid():
+            self._local = threading.local()
+            self._pid = os.getpid()
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _owner(self) -> str:
+        return f"{os.getpid()}:{threading.get_ident()}"
+
+    def _cutoff(self) -> float:
+        """早于该时刻写入的条目已过期"""
+        return time.time() - self.ttl_seconds if self.ttl_seconds > 0 else float("-inf")
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """读取条目，不存在或已过期时返回None"""
+        row = self._conn().execute(
+            "SELECT value FROM entries WHERE namespace = ? AND key = ? AND created_at >= ?",
+            (namespace, key, self._cutoff())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def prune(self) -> int:
+        """删除过期条目和已过期的计算者租约
+
+        Returns:
+            删除的条目数
+        """
+        conn = self._conn()
+        removed = conn.execute("DELETE FROM entries WHERE created_at < ?", (self._cutoff(),)).rowcount
+        conn.execute("DELETE FROM claims WHERE expires_at < ?", (time.time(),))
+        if removed:
+            logger.info(f"共享存储 {self.path} 已清理 {removed} 个过期条目")
+        return removed
+
+    def put(self, namespace: str, key: str, value: Any) -> None:
+        """写入条目，替换已有的值"""
+        self._conn().execute(
+            "INSERT OR REPLACE INTO entries (namespace, key, value, created_at) VALUES (?, ?, ?, ?)",
+            (namespace, key, json.dumps(value, ensure_ascii=False), time.time())
+        )
+
+    def delete(self, namespace: str, key: str) -> None:
+        """删除条目"""
+        self._conn().execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def _claim(self, namespace: str, key: str) -> tuple:
+        """尝试成为键的计算者
+
+        Returns:
+            (是否获得租约, 已存在的值)
+        """
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT value FROM entries WHERE namespace = ? AND key = ? AND created_at >= ?",
+                (namespace, key, self._cutoff())
+            ).fetchone()
+            if row:
+                return False, json.loads(row[0])
+            conn.execute("DELETE FROM claims WHERE namespace = ? AND key = ? AND expires_at < ?",
+                         (namespace, key, now))
+            claimed = conn.execute(
+                "INSERT OR IGNORE INTO claims (namespace, key, owner, expires_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, self._owner(), now + self.lease_seconds)
+            ).rowcount == 1
+            return claimed, None
+        finally:
+            conn.execute("COMMIT")
+
+    def _release(self, namespace: str, key: str) -> None:
+        self._conn().execute("DELETE FROM claims WHERE namespace = ? AND key = ? AND owner = ?",
+                             (namespace, key, self._owner()))
+
+    def get_or_compute(self, namespace: str, key: str, compute: Callable[[], Any]) -> Any:
+        """读取条目，不存在时由一个进程调用 compute 计算并写入
+
+        其他进程在计算期间轮询等待同一结果。compute 抛出异常时不写入结果，
+        等待者会重新争夺租约。compute 的返回值必须可以序列化为JSON。
+        """
+        waited = False
+        while True:
+            value = self.get(namespace, key)
+            if value is None:
+                claimed, value = self._claim(namespace, key)
+                if claimed:
+                    break
+            if value is not None:
+                with self._stats_lock:
+                    self.hits += 1
+                    self.waits += waited
+                return value
+            waited = True
+            time.sleep(self.poll_interval)
+
+        with self._stats_lock:
+            self.misses += 1
+        try:
+            value = compute()
+            if value is not None:
+                try:
+                    self.put(namespace, key, value)
+                except (TypeError, ValueError) as e:
+                    logger.warning(f"共享存储无法保存 {namespace} 条目: {str(e)}")
+            return value
+        finally:
+            self._release(namespace, key)
+
+    def count(self, namespace: Optional[str] = None) -> int:
+        """统计条目数"""
+        if namespace is None:
+            return self._conn().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return self._conn().execute("SELECT COUNT(*) FROM entries WHERE namespace = ?", (namespace,)).fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """获取本进程的共享存储统计信息"""
+        with self._stats_lock:
+            total = self.hits + self.misses
+            return {
+                "path": str(self.path),
+                "entries": self.count(),
+                "hits": self.hits,
+                "misses": self.misses,
+                "waits": self.waits,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def close(self) -> None:
+        """关闭当前线程的连接"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+_default_store: Optional[SharedStore] = None
+_default_lock = threading.Lock()
+
+
+def get_shared_store() -> Optional[SharedStore]:
+    """获取由环境变量 COREASCHER_SHARED_CACHE 指定的共享存储，未设置时返回None"""
+    global _default_store
+    path = os.environ.get(SHARED_CACHE_ENV)
+    if not path:
+        return None
+    if _default_store is None or _default_store.path != Path(path):
+        with _default_lock:
+            if _default_store is None or _default_store.path != Path(path):
+                _default_store = SharedStore(Path(path))
+    return _default_store
+
+
+def configure_shared_caches(path: Optional[Path] = None) -> SharedStore:
+    """让本进程的检索缓存和LLM回复缓存使用共享存储
+
+    设置 COREASCHER_SHARED_CACHE 环境变量，之后启动的子进程也会继承该设置。
+
+    Returns:
+        共享存储
+    """
+    from coreascher.tools.llm_cache import get_llm_cache
+    from coreascher.tools.search_cache import get_search_cache
+
+    os.environ[SHARED_CACHE_ENV] = str(Path(path) if path else DEFAULT_SHARED_DB)
+    store = get_shared_store()
+    get_search_cache().store = store
+    get_llm_cache().store = store
+    logger.info(f"检索缓存和LLM回复缓存已启用共享存储: {store.path}")
+    return store
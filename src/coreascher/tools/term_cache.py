@@ -0,0 +1,247 @@
+"""
+检索术语缓存模块
+
+该模块维护一个持久化的中英文术语对照表，负责：
+1. 将同义词、拼写变体和中英文等价术语规范化为统一的英文检索词
+2. 记录历次运行中智能体明确给出的翻译结果（source_term 到检索词的对照）
+3. 在内存中提供查询服务，避免每次检索都依赖大模型翻译
+
+未登记的检索词原样使用，不写入术语表；引号、字段前缀、括号和 AND/OR/ANDNOT 等arXiv检索语法
+保留在查表的键中，不同语义的检索式不会被规范化为同一个检索词。
+术语表在运行结束时保存一次，多个进程共用同一术语表文件时，保存前在文件锁内合并其他进程已写入的术语。
+"""
+
+import json
+import logging
+import re
+import threading
+import unicodedata
+from pathlib import Path
+from typing import Dict, Optional
+
+from coreascher.tools.shared_store import atomic_write_json, file_lock
+
+logger = logging.getLogger(__name__)
+
+# 术语表默认存储位置
+DEFAULT_TERM_FILE = Path("data/terms/term_table.json")
+
+# 常用术语的初始对照，运行过程中学习到的术语会覆盖或补充这些条目
+_SEED_TERMS = {
+    "大语言模型": "large language model",
+    "大型语言模型": "large language model",
+    "语言模型": "language model",
+    "深度学习": "deep learning",
+    "机器学习": "machine learning",
+    "强化学习": "reinforcement learning",
+    "自然语言处理": "natural language processing",
+    "计算机视觉": "computer vision",
+    "知识图谱": "knowledge graph",
+    "图神经网络": "graph neural network",
+    "检索增强生成": "retrieval augmented generation",
+    "提示工程": "prompt engineering",
+    "指令微调": "instruction tuning",
+    "多智能体": "multi-agent",
+    "智能体": "agent",
+    "注意力机制": "attention mechanism",
+    "预训练": "pre-training",
+    "微调": "fine-tuning",
+    "文本生成": "text generation",
+    "多模态": "multimodal",
+    "LLM": "large language model",
+    "LLMs": "large language model",
+    "RAG": "retrieval augmented generation",
+    "GNN": "graph neural network",
+    "NLP": "natural language processing",
+}
+
+# 英式拼写到美式拼写的转换规则
+_SPELLING_VARIANTS = (
+    (re.compile(r"isation\b"), "ization"),
+    (re.compile(r"\b(optim|minim|maxim|normal|regular|general|summar|token|visual|real|util)is(e|ed|es|er|ers|ing)\b"), r"\1iz\2"),
+    (re.compile(r"\b(analy|paraly)s(e|ed|es|ing)\b"), r"\1z\2"),
+    (re.compile(r"\b(colo|behavio|favo|hono|labo|neighbo)ur"), r"\1r"),
+    (re.compile(r"\b(model|label|travel|cancel)l(ed|ing)\b"), r"\1\2"),
+)
+
+_CJK_PATTERN = re.compile(r"[㐀-鿿]")
+_SEPARATOR_PATTERN = re.compile(r"[\s\-_/]+")
+_STRIP_PATTERN = re.compile(r"[\"'“”‘’`()（）\[\]【】,，。.;；:：]+")
+
+# arXiv检索语法：短语引号、括号、字段前缀和布尔运算符，归一化时原样保留
+_OPERATOR_PATTERN = re.compile(r'("|\(|\)|\b(?:ti|au|abs|co|jr|cat|rn|id|all):|\b(?:ANDNOT|AND|OR)\b)')
+
+
+def contains_cjk(text: str) -> bool:
+    """判断文本中是否包含中文字符"""
+    return bool(_CJK_PATTERN.search(text))
+
+
+def normalize_term(term: str) -> str:
+    """将术语归一化为查表使用的键
+
+    Args:
+        term: 原始术语
+
+    Returns:
+        归一化后的键：统一全半角和大小写、合并分隔符、
+        统一英美拼写并去掉英文词尾的复数形式；arXiv检索语法原样保留
+    """
+    text = unicodedata.normalize("NFKC", term or "")
+    parts = [part.strip() if index % 2 else _normalize_words(part)
+             for index, part in enumerate(_OPERATOR_PATTERN.split(text))]
+    return " ".join(part for part in parts if part)
+
+
+def _normalize_words(text: str) -> str:
+    """归一化不含检索语法的一段术语"""
+    text = _STRIP_PATTERN.sub(" ", text.casefold())
+    text = _SEPARATOR_PATTERN.sub(" ", text).strip()
+    if not text or contains_cjk(text):
+        return text.replace(" ", "")
+
+    words = []
+    for word in text.split(" "):
+        for pattern, replacement in _SPELLING_VARIANTS:
+            word = pattern.sub(replacement, word)
+        if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+            word = word[:-1]
+        words.append(word)
+    return " ".join(words)
+
+
+class TermCache:
+    """中英文术语对照表，将检索词规范化为统一的英文形式"""
+
+    def __init__(self, path: Optional[Path] = None, seed: bool = True) -> None:
+        """初始化术语缓存
+
+        Args:
+            path: 术语表文件路径，默认为 data/terms/term_table.json
+            seed: 是否加载内置的常用术语
+        """
+        self.path = Path(path) if path else DEFAULT_TERM_FILE
+        self._terms: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+
+        if seed:
+            for source, canonical in _SEED_TERMS.items():
+                self._terms[normalize_term(source)] = canonical
+        self._load()
+
+    def _read(self) -> Dict[str, str]:
+        """读取磁盘上的术语表"""
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data.get("terms", {})
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error(f"加载术语表失败: {str(e)}")
+            return {}
+
+    def _load(self) -> None:
+        """从磁盘加载历次运行积累的术语"""
+        self._terms.update(self._read())
+
+    def save(self) -> bool:
+        """将术语表写回磁盘，仅在有新术语时写入
+
+        写入前在文件锁内合并其他进程保存的术语，本进程学到的术语优先。
+
+        Returns:
+            是否写入成功
+        """
+        with self._lock:
+            if not self._dirty:
+                return True
+            learned = dict(self._terms)
+            self._dirty = False
+        try:
+            with file_lock(self.path):
+                terms = self._read()
+                terms.update(learned)
+                atomic_write_json(self.path, {"version": 1, "terms": dict(sorted(terms.items()))})
+            with self._lock:
+                for key, canonical in terms.items():
+                    self._terms.setdefault(key, canonical)
+            return True
+        except OSError as e:
+            logger.error(f"保存术语表失败: {str(e)}")
+            with self._lock:
+                self._dirty = True
+            return False
+
+    def lookup(self, term: str) -> Optional[str]:
+        """查询术语对应的规范英文形式
+
+        Args:
+            term: 原始术语
+
+        Returns:
+            规范英文术语，如果不存在则返回None
+        """
+        return self._terms.get(normalize_term(term))
+
+    def learn(self, source: str, canonical: str) -> None:
+        """记录一条术语对照
+
+        Args:
+            source: 原始术语（中文关键词或变体写法）
+            canonical: 对应的英文检索词
+        """
+        if not source or not canonical or contains_cjk(canonical):
+            return
+        canonical = self.canonicalize(canonical)
+        with self._lock:
+            for key in (normalize_term(source), normalize_term(canonical)):
+                if key and self._terms.get(key) != canonical:
+                    self._terms[key] = canonical
+                    self._dirty = True
+
+    def canonicalize(self, term: str) -> str:
+        """将术语规范化为统一的英文检索词
+
+        已登记的术语直接返回对照表中的形式；未登记的术语只合并多余的空白后原样返回，
+        不写入术语表，术语表只随 learn 记录的对照增长。
+
+        Args:
+            term: 原始术语
+
+        Returns:
+            规范化后的检索词
+        """
+        key = normalize_term(term)
+        if not key:
+            return term
+        canonical = self._terms.get(key)
+        if canonical is not None:
+            self.hits += 1
+            return canonical
+
+        self.misses += 1
+        display = " ".join(unicodedata.normalize("NFKC", term).split())
+        if contains_cjk(display):
+            logger.warning(f"术语表中没有中文术语的英文对照: {display}")
+        return display
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+
+_default_cache: Optional[TermCache] = None
+_default_lock = threading.Lock()
+
+
+def get_term_cache() -> TermCache:
+    """获取进程内共享的术语缓存实例"""
+    global _default_cache
+    if _default_cache is None:
+        with _default_lock:
+            if _default_cache is None:
+                _default_cache = TermCache()
+    return _default_cache
@@ -0,0 +1,142 @@
+"""
+会议归一化与分面索引模块
+
+该模块在本地完成会议和年份过滤，负责：
+1. 将 comment、journal_ref 中各种写法的会议名称归一化为标准简称
+2. 在论文表上建立会议、年份和主分类的分面索引
+3. 提供本地分面过滤，使远程检索只需发送简单、可缓存的查询
+"""
+
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+from coreascher.tools.paper_table import PaperTable
+
+# 会议标准简称及其常见写法
+VENUE_ALIASES = {
+    "ICML": [r"\bICML\b", r"International Conference on Machine Learning"],
+    "NeurIPS": [r"\bNeur\s?IPS\b", r"\bNIPS\b", r"Neural Information Processing Systems"],
+    "ICLR": [r"\bICLR\b", r"International Conference on Learning Representations"],
+    "AAAI": [r"\bAAAI\b", r"Association for the Advancement of Artificial Intelligence"],
+    "IJCAI": [r"\bIJCAI\b", r"International Joint Conference on Artificial Intelligence"],
+    "ACL": [r"\bACL\b(?!\s*Findings)", r"Annual Meeting of the Association for Computational Linguistics"],
+    "EMNLP": [r"\bEMNLP\b", r"Empirical Methods in Natural Language Processing"],
+    "NAACL": [r"\bNAACL\b"],
+    "CVPR": [r"\bCVPR\b", r"Computer Vision and Pattern Recognition"],
+    "ICCV": [r"\bICCV\b", r"International Conference on Computer Vision"],
+    "ECCV": [r"\bECCV\b", r"European Conference on Computer Vision"],
+    "KDD": [r"\bKDD\b", r"Knowledge Discovery and Data Mining"],
+}
+
+# 默认的四大顶会
+TOP_CONFERENCES = ("ICML", "NeurIPS", "ICLR", "AAAI")
+
+_VENUE_PATTERN = re.compile(
+    "|".join(
+        f"(?P<{name}>{'|'.join(patterns)})"
+        for name, patterns in VENUE_ALIASES.items()
+    ),
+    re.IGNORECASE,
+)
+_CANONICAL_NAMES = {name.casefold(): name for name in VENUE_ALIASES}
+
+
+@lru_cache(maxsize=4096)
+def _match_venue(text: str) -> Optional[str]:
+    match = _VENUE_PATTERN.search(text)
+    return match.lastgroup if match else None
+
+
+def normalize_venue(*texts: Optional[str]) -> Optional[str]:
+    """从 journal_ref、comment 等文本中识别会议标准简称
+
+    Args:
+        texts: 依次尝试的文本，先匹配到的优先
+
+    Returns:
+        会议标准简称，无法识别时返回None
+    """
+    for text in texts:
+        if not text:
+            continue
+        canonical = _CANONICAL_NAMES.get(text.strip().casefold())
+        if canonical:
+            return canonical
+        venue = _match_venue(text)
+        if venue:
+            return venue
+    return None
+
+
+class FacetIndex:
+    """论文表上的会议、年份和主分类分面索引"""
+
+    def __init__(self, table: PaperTable) -> None:
+        """建立分面索引
+
+        Args:
+            table: 论文表，索引中保存的是论文在该表中的位置
+        """
+        self.table = table
+        self.venues: Dict[str, array] = {}
+        self.categories: Dict[str, array] = {}
+        self.years: Dict[int, array] = {}
+        for position, row in enumerate(table):
+            venue = normalize_venue(row.venue) or row.venue
+            self.venues.setdefault(venue, array("I")).append(position)
+            self.categories.setdefault(row.primary_category, array("I")).append(position)
+            self.years.setdefault(row.year, array("I")).append(position)
+        self._sorted_years = sorted(self.years)
+
+    def counts(self, facet: str) -> Dict:
+        """统计某个分面下每个取值的论文数
+
+        Args:
+            facet: venue、year 或 category
+        """
+        buckets = {"venue": self.venues, "year": self.years, "category": self.categories}[facet]
+        return {value: len(positions) for value, positions in buckets.items()}
+
+    def _union(self, buckets: Dict, values: Iterable) -> set:
+        positions = set()
+        for value in values:
+            positions.update(buckets.get(value, ()))
+        return positions
+
+    def filter(self, venues: Optional[Iterable[str]] = None, min_year: Optional[int] = None,
+               max_year: Optional[int] = None, categories: Optional[Iterable[str]] = None) -> PaperTable:
+        """按分面过滤论文
+
+        Args:
+            venues: 会议列表，支持任意写法，会先归一化
+            min_year: 最早年份
+            max_year: 最晚年份
+            categories: arXiv主分类列表，如 cs.CL
+
+        Returns:
+            过滤后的论文表视图，保持原表顺序
+        """
+        selected: Optional[set] = None
+        if venues is not None:
+            names = [normalize_venue(venue) or venue for venue in venues]
+            selected = self._union(self.venues, names)
+        if min_year is not None or max_year is not None:
+            low = bisect_left(self._sorted_years, min_year) if min_year is not None else 0
+            high = bisect_right(self._sorted_years, max_year) if max_year is not None else len(self._sorted_years)
+            in_range = self._union(self.years, self._sorted_years[low:high])
+            selected = in_range if selected is None else selected & in_range
+        if categories is not None:
+            in_categories = self._union(self.categories, categories)
+            selected = in_categories if selected is None else selected & in_categories
+        if selected is None:
+            return self.table
+        return self.table.take(sorted(selected))
+
+
+def filter_papers(table: PaperTable, venues: Optional[List[str]] = None, min_year: Optional[int] = None,
+                  max_year: Optional[int] = None, categories: Optional[List[str]] = None) -> PaperTable:
+    """对论文表做一次性的分面过滤"""
+    return FacetIndex(table).filter(venues, min_year, max_year, categories)
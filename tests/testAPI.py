@@ -2,18 +2,14 @@ import arxiv
 import datetime
 import logging
 import time
+from coreascher.tools.venue_index import TOP_CONFERENCES, normalize_venue
 
 # 设置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# 定义四大顶会关键词
-TOP_CONF = {
-    'ICML': 'International Conference on Machine Learning',
-    'NeurIPS': ['Neural Information Processing Systems', 'NeurIPS'],
-    'ICLR': 'International Conference on Learning Representations',
-    'AAAI': 'Association for the Advancement of Artificial Intelligence'
-}
+# 远程检索的候选上限，会议过滤在本地完成，凑够结果后停止翻页
+CANDIDATE_LIMIT = 2000
 
 def search_top_conf_papers(query: str, max_results: int = 10, sort_by: str = "submittedDate", 
                           sort_order: str = "descending", conferences: list = None) -> list:
@@ -40,25 +36,12 @@ def search_top_conf_papers(query: str, max_results: int = 10, sort_by: str = "su
         
         # 如果未指定会议，则搜索所有顶会
         if conferences is None:
-            conferences = list(TOP_CONF.keys())
+            conferences = list(TOP_CONFERENCES)
             
-        # 构建会议查询字符串
-        conf_queries = []
-        for conf in conferences:
-            if conf in TOP_CONF:
-                if isinstance(TOP_CONF[conf], list):
-                    # 如果会议有多个名称变体
-                    conf_parts = [f'"{name}"' for name in TOP_CONF[conf]]
-                    conf_queries.extend(conf_parts)
-                else:
-                    conf_queries.append(f'"{TOP_CONF[conf]}"')
-        
-        # 构建完整的查询字符串
+        # 构建完整的查询字符串，会议过滤不再拼接到远程查询中
         # 限制在 cs.AI, cs.LG, cs.CL, cs.CV 等相关类别中搜索
         query_str = (
             f'abs:"{query}" AND ('
-            + ' OR '.join(conf_queries)
-            + ') AND ('
             + ' OR '.join(['cat:cs.AI', 'cat:cs.LG', 'cat:cs.CL', 'cat:cs.CV', 'cat:cs.NE'])
             + ')'
         )
@@ -68,25 +51,27 @@ def search_top_conf_papers(query: str, max_results: int = 10, sort_by: str = "su
         # 构建搜索查询
         search = arxiv.Search(
             query=query_str,
-            max_results=min(max_results, 2000),
+            max_results=CANDIDATE_LIMIT,
             sort_by=arxiv.SortCriterion.SubmittedDate,
             sort_order=arxiv.SortOrder.Descending if sort_order == "descending" else arxiv.SortOrder.Ascending
         )
         
         papers = []
         try:
-            # 获取结果
-            results = list(client.results(search))
-            logger.info(f"找到 {len(results)} 篇论文")
-            
-            for result in results:
+            # 逐页获取结果，标注了会议的论文只占少数，过滤出足够的论文后不再请求后续页
+            scanned = 0
+            for result in client.results(search):
+                scanned += 1
                 try:
-                    # 提取会议信息（通常在comment或journal_ref中）
+                    # 提取会议信息（通常在comment或journal_ref中），在本地归一化后过滤
                     conference_info = None
                     if hasattr(result, 'comment') and result.comment:
                         conference_info = result.comment
                     if hasattr(result, 'journal_ref') and result.journal_ref:
                         conference_info = result.journal_ref
+                    venue = normalize_venue(result.journal_ref, result.comment)
+                    if venue not in conferences:
+                        continue
                     
                     paper = {
                         "title": result.title,
@@ -99,17 +84,21 @@ def search_top_conf_papers(query: str, max_results: int = 10, sort_by: str = "su
                         "categories": result.categories,
                         "primary_category": result.primary_category,
                         "conference_info": conference_info,
+                        "venue": venue,
                         "comment": result.comment if hasattr(result, 'comment') else None,
                         "journal_ref": result.journal_ref if hasattr(result, 'journal_ref') else None,
                         "doi": result.doi if hasattr(result, 'doi') else None
                     }
                     papers.append(paper)
                     logger.debug(f"成功处理论文: {paper['title'][:50]}...")
+                    if len(papers) >= max_results:
+                        break
                     
                 except Exception as e:
                     logger.error(f"处理单篇论文时发生错误: {str(e)}")
                     continue
                     
+            logger.info(f"扫描 {scanned} 篇候选，找到 {len(papers)} 篇论文")
             return papers
             
         except Exception as e:
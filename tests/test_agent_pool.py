@@ -0,0 +1,88 @@
+"""
+测试Agent实例池模块
+"""
+
+import threading
+import unittest
+from unittest.mock import Mock, patch
+from src.coreascher.agents.pool import AgentPool, pool_key
+
+
+class TestAgentPool(unittest.TestCase):
+    """AgentPool测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.pool = AgentPool(max_idle=2)
+        self.created = []
+
+    def factory(self):
+        """记录构建次数的实例工厂"""
+        agent = object()
+        self.created.append(agent)
+        return agent
+
+    def test_reuse_after_release(self):
+        """测试归还后的实例被再次租借"""
+        with self.pool.lease("k", self.factory) as first:
+            pass
+        with self.pool.lease("k", self.factory) as second:
+            self.assertIs(first, second)
+        self.assertEqual(len(self.created), 1)
+        self.assertEqual(self.pool.stats()["hits"], 1)
+
+    def test_concurrent_leases_get_distinct_instances(self):
+        """测试同时租借时每个线程拿到不同的实例"""
+        barrier = threading.Barrier(3)
+        leased = []
+
+        def worker():
+            with self.pool.lease("k", self.factory) as agent:
+                leased.append(agent)
+                barrier.wait(timeout=5)
+
+        threads = [threading.Thread(target=worker) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(set(map(id, leased))), 3)
+        # 超出 max_idle 的实例被丢弃
+        self.assertEqual(self.pool.stats()["idle"], 2)
+
+    def test_keys_are_isolated(self):
+        """测试不同配置使用不同的实例"""
+        key_a = pool_key("phd", {"role": "a", "memory": True})
+        key_b = pool_key("phd", {"role": "b", "memory": True})
+        self.assertEqual(key_a, pool_key("phd", {"memory": True, "role": "a"}))
+        with self.pool.lease(key_a, self.factory) as a:
+            pass
+        with self.pool.lease(key_b, self.factory) as b:
+            self.assertIsNot(a, b)
+
+    def test_release_on_error(self):
+        """测试执行出错时实例仍被归还"""
+        with self.assertRaises(RuntimeError):
+            with self.pool.lease("k", self.factory):
+                raise RuntimeError("boom")
+        self.assertEqual(self.pool.stats()["idle"], 1)
+
+    def test_wrapper_reuses_agent(self):
+        """测试Agent封装类多次调用只构建一次Agent"""
+        from src.coreascher.agents import postdoc_agent
+
+        shared_pool = postdoc_agent.get_agent_pool()
+        shared_pool.clear()
+        self.addCleanup(shared_pool.clear)
+        agent = Mock()
+        agent.execute.return_value = "{}"
+        postdoc = postdoc_agent.PostDocAgent()
+        with patch.object(postdoc, "postdoc_agent", return_value=agent) as factory:
+            postdoc.assign_tasks("检索增强生成")
+            postdoc.assign_tasks("大语言模型")
+        self.assertEqual(factory.call_count, 1)
+        self.assertEqual(agent.execute.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
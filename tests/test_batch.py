@@ -0,0 +1,87 @@
+"""
+测试批量综述模块
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from src.coreascher.benchmark.fake_llm import FakeArxivClient, FakeLLM
+from src.coreascher.benchmark.pipeline import DEFAULT_RESPONSES
+from src.coreascher.service.batch import load_topics, run_batch
+from src.coreascher.service.jobs import ReviewRunner
+# 与Crew使用同一份进程内缓存；工作进程以 spawn 启动，执行器工厂须可按包名导入
+from coreascher.benchmark.pipeline import offline_runner
+from coreascher.tools.llm_cache import get_llm_cache
+from coreascher.tools.search_cache import get_search_cache
+
+
+class TestBatch(unittest.TestCase):
+    """批量综述测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.original_cwd = os.getcwd()
+        self.test_dir = Path(tempfile.mkdtemp())
+        os.chdir(self.test_dir)
+        get_search_cache().clear()
+        get_llm_cache().clear()
+
+    def tearDown(self):
+        """测试后清理"""
+        os.chdir(self.original_cwd)
+        shutil.rmtree(self.test_dir)
+        get_llm_cache().clear()
+
+    def test_load_topics(self):
+        """测试读取文本和JSON行两种格式的主题"""
+        path = self.test_dir / "topics.txt"
+        path.write_text("# 注释\n检索增强生成\tRAG, hallucination\n图神经网络\n"
+                        '{"topic": "代码生成", "inputs": {"keywords": "code"}}\n', encoding="utf-8")
+        self.assertEqual(load_topics(path), [
+            ("检索增强生成", {"keywords": "RAG, hallucination"}),
+            ("图神经网络", {}),
+            ("代码生成", {"keywords": "code"}),
+        ])
+        path.write_text('{"inputs": {}}\n', encoding="utf-8")
+        with self.assertRaises(ValueError):
+            load_topics(path)
+
+    def test_run_batch_shares_caches(self):
+        """测试批量运行写出各主题结果，重复主题命中共享的LLM和检索缓存"""
+        client = FakeArxivClient()
+        runner = ReviewRunner(llm=FakeLLM(responses=DEFAULT_RESPONSES), client=client)
+        topics = [("检索增强生成", {"keywords": "RAG"}), ("检索增强生成", {"keywords": "RAG"})]
+        summary = run_batch(topics, self.test_dir / "out", parallel=1, runner=runner)
+
+        self.assertEqual((summary["succeeded"], summary["failed"]), (2, 0))
+        self.assertGreater(summary["caches"]["llm"]["hits"], 0)
+        # 第二个主题的LLM调用全部命中缓存
+        self.assertEqual(summary["results"][1]["llm_calls"], 0)
+        self.assertEqual(client.calls, 2)
+        output = Path(summary["results"][0]["output"])
+        self.assertTrue((output / "review.md").exists())
+        with open(self.test_dir / "out" / "summary.json", encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["topics"], 2)
+
+    def test_run_batch_processes(self):
+        """测试多进程模式下各任务使用独立工作目录，并通过共享存储复用检索结果和LLM回复"""
+        topics = [("检索增强生成", {"keywords": "RAG"}), ("检索增强生成", {"keywords": "RAG"})]
+        summary = run_batch(topics, self.test_dir / "out", processes=2, runner_factory=offline_runner,
+                            shared_cache=self.test_dir / "shared.sqlite3")
+
+        self.assertEqual((summary["succeeded"], summary["failed"]), (2, 0), summary["results"])
+        self.assertEqual(summary["mode"], "processes")
+        self.assertGreater(summary["caches"]["shared"]["hits"], 0)
+        workspaces = {json.loads((Path(entry["output"]) / "result.json").read_text(encoding="utf-8"))
+                      ["result"]["workspace"] for entry in summary["results"]}
+        self.assertEqual(len(workspaces), 2)
+        for workspace in workspaces:
+            self.assertTrue((Path(workspace) / "literature.json").exists())
+        self.assertFalse((self.test_dir / "literature.json").exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
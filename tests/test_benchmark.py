@@ -0,0 +1,86 @@
+"""
+测试模拟LLM与离线基准测试模块
+"""
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from src.coreascher.benchmark.fake_llm import FakeArxivClient, FakeLLM
+from src.coreascher.benchmark.pipeline import percentile, run_benchmark
+from src.coreascher.tools.custom_tool import LiteratureSearch
+from coreascher.tools.search_cache import get_search_cache
+
+
+class TestFakeLLM(unittest.TestCase):
+    """FakeLLM测试类"""
+
+    def test_scripted_responses(self):
+        """测试按任务依次返回预设回复，取完后重复最后一条"""
+        llm = FakeLLM(responses={"search": [{"tool": "LiteratureSearch", "input": {"query": "rag"}}, "完成"]})
+        task = SimpleNamespace(id="t1", name="search")
+        first = llm.call("检索文献", from_task=task)
+        self.assertIn("Action: LiteratureSearch", first)
+        self.assertIn('"query": "rag"', first)
+        self.assertIn("Final Answer: 完成", llm.call("检索文献", from_task=task))
+        self.assertIn("Final Answer: 完成", llm.call("检索文献", from_task=task))
+        self.assertEqual(llm.call_count, 3)
+
+    def test_deterministic_template(self):
+        """测试模板回复可重复"""
+        first = FakeLLM(output_tokens=32).call("写综述", from_task=SimpleNamespace(id="t2", name="review"))
+        second = FakeLLM(output_tokens=32).call("写综述", from_task=SimpleNamespace(id="t2", name="review"))
+        self.assertEqual(first, second)
+        self.assertIn("【review】", first)
+
+
+class TestFakeArxivClient(unittest.TestCase):
+    """FakeArxivClient测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        get_search_cache().clear()
+
+    def test_offline_search(self):
+        """测试检索工具使用离线客户端并命中缓存"""
+        client = FakeArxivClient()
+        tool = LiteratureSearch(client=client)
+        table = tool.search("graph neural network", max_results=5)
+        self.assertEqual(len(table), 5)
+        self.assertEqual(table[0].title, "graph neural network study 1")
+        self.assertEqual(table[0].venue, "NeurIPS")
+        tool.search("graph neural network", max_results=5)
+        self.assertEqual(client.calls, 1)
+
+
+class TestPipelineBenchmark(unittest.TestCase):
+    """离线流水线基准测试类"""
+
+    def test_percentile(self):
+        """测试分位数计算"""
+        self.assertEqual(percentile([], 0.5), 0.0)
+        self.assertEqual(percentile([1, 2, 3, 4], 0.5), 2.5)
+        self.assertEqual(percentile([1, 2, 3, 4], 1.0), 4)
+
+    def test_run_benchmark(self):
+        """测试离线完整运行文献综述Crew"""
+        result = run_benchmark(runs=2)
+        self.assertEqual(result["runs"], 2)
+        self.assertGreater(result["llm_calls"], 0)
+        self.assertEqual(result["tool_calls"], 4)
+        # 第二次运行的检索全部命中缓存
+        self.assertEqual(result["arxiv_requests"], 2)
+
+    def test_run_benchmark_workdir(self):
+        """测试并发运行的输出写入各自的目录，不切换进程的工作目录"""
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp:
+            run_benchmark(runs=2, concurrency=2, workdir=Path(tmp))
+            self.assertEqual(os.getcwd(), cwd)
+            self.assertTrue((Path(tmp) / "run-0" / "literature.json").exists())
+            self.assertTrue((Path(tmp) / "run-1" / "literature.json").exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
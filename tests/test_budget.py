@@ -0,0 +1,119 @@
+"""
+测试运行预算控制模块
+"""
+
+import unittest
+from types import SimpleNamespace
+from src.coreascher.benchmark.fake_llm import FakeArxivClient
+from src.coreascher.monitoring.budget import Budget, BudgetEnforcer
+from src.coreascher.monitoring.metrics import RunMetrics
+from src.coreascher.tools.custom_tool import LiteratureSearch
+
+
+def make_crew():
+    """构造只包含预算控制所需属性的模拟Crew"""
+    tool = LiteratureSearch()
+    executor = SimpleNamespace(max_iter=3, llm="glm-4-plus")
+    phd = SimpleNamespace(role="phd", tools=[tool], max_iter=3, llm="glm-4-plus", agent_executor=executor)
+    task = SimpleNamespace(name="search_literature", id="t1", agent=phd)
+    return SimpleNamespace(agents=[phd], tasks=[task]), phd, tool, executor
+
+
+class TestBudget(unittest.TestCase):
+    """Budget测试类"""
+
+    def test_from_config(self):
+        """测试从配置解析预算"""
+        self.assertIsNone(Budget.from_config(None))
+        budget = Budget.from_config({"max_tokens": 100, "on_exceed": "finish"})
+        self.assertEqual(budget.on_exceed, ("finish",))
+        with self.assertRaises(ValueError):
+            Budget.from_config({"max_tokens": 100, "on_exceed": ["crash"]})
+
+    def test_ratio(self):
+        """测试用量比例取各项上限中最紧的一项"""
+        budget = Budget(max_tokens=1000, max_llm_calls=4)
+        ratio, reason = budget.ratio({"tokens": 500, "llm_calls": 3, "wall_seconds": 0})
+        self.assertEqual(ratio, 0.75)
+        self.assertIn("llm_calls", reason)
+
+
+class TestBudgetEnforcer(unittest.TestCase):
+    """BudgetEnforcer测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.metrics = RunMetrics(run_id="test")
+        self.crew, self.phd, self.tool, self.executor = make_crew()
+
+    def test_from_config(self):
+        """测试从agents.yaml和tasks.yaml配置创建"""
+        enforcer = BudgetEnforcer.from_config(
+            self.metrics,
+            {"phd": {"role": "计算机科学博士生", "budget": {"max_tokens": 10}}, "professor": {"role": "教授"}},
+            {"run_budget": {"max_wall_seconds": 60}, "search_literature": {"budget": {"max_llm_calls": 2}}},
+        )
+        self.assertIn("计算机科学博士生", enforcer.agent_budgets)
+        self.assertIn("search_literature", enforcer.task_budgets)
+        self.assertEqual(enforcer.run_budget.max_wall_seconds, 60)
+
+    def test_task_budget_stops_search_and_restores(self):
+        """测试任务预算超出后停止检索，任务结束后恢复迭代上限"""
+        enforcer = BudgetEnforcer(self.metrics, task_budgets={
+            "search_literature": Budget(max_llm_calls=2),
+        }).attach(self.crew)
+        self.metrics.record_task_start("search_literature", "phd")
+        self.metrics.record_llm_call("search_literature", "phd", 10, 10)
+        self.assertIsNone(self.tool.stop_reason)
+        self.metrics.record_llm_call("search_literature", "phd", 10, 10)
+
+        self.assertIn("预算", self.tool.stop_reason)
+        self.assertIn("检索已停止", self.tool._run("transformer"))
+        self.assertEqual(self.executor.max_iter, 0)
+        self.assertEqual([action["action"] for action in enforcer.actions], ["stop_search", "finish"])
+
+        self.metrics.record_task_end("search_literature", "phd")
+        self.assertEqual(self.executor.max_iter, 3)
+        enforcer.detach()
+        self.assertIsNone(self.tool.stop_reason)
+
+    def test_task_budget_search_restored_for_next_task(self):
+        """测试任务预算停止的检索只影响当前任务，下一个任务可以继续检索"""
+        enforcer = BudgetEnforcer(self.metrics, task_budgets={
+            "search_literature": Budget(max_llm_calls=1),
+        }).attach(self.crew)
+        self.metrics.record_task_start("search_literature", "phd")
+        self.metrics.record_llm_call("search_literature", "phd", 10, 10)
+        self.assertIn("检索已停止", self.tool._run("transformer"))
+        self.metrics.record_task_end("search_literature", "phd")
+
+        self.metrics.record_task_start("literature_review", "phd")
+        self.assertIsNone(self.tool.stop_reason)
+        self.tool.client = FakeArxivClient()
+        self.assertNotIn("检索已停止", self.tool._run("transformer"))
+        enforcer.detach()
+        self.assertIsNone(self.tool.stop_reason)
+
+    def test_agent_budget_switches_model(self):
+        """测试用量接近上限时切换模型，并在分离时恢复"""
+        enforcer = BudgetEnforcer(self.metrics, agent_budgets={
+            "phd": Budget(max_tokens=100, fallback_model="openai/glm-4-flash", degrade_at=0.5),
+        })
+        enforcer._fallback_llms["openai/glm-4-flash"] = "glm-4-flash"
+        enforcer.attach(self.crew)
+        self.metrics.record_task_start("search_literature", "phd")
+        self.metrics.record_llm_call("search_literature", "phd", 30, 30)
+
+        self.assertEqual(self.phd.llm, "glm-4-flash")
+        self.assertEqual(self.executor.llm, "glm-4-flash")
+        self.assertEqual(self.phd.max_iter, 3)
+
+        self.metrics.record_llm_call("search_literature", "phd", 30, 30)
+        self.assertEqual(self.phd.max_iter, 0)
+        enforcer.detach()
+        self.assertEqual(self.phd.llm, "glm-4-plus")
+        self.assertEqual(self.phd.max_iter, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+"""
+测试命令行入口模块
+"""
+
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from src.coreascher.cli import _parse_inputs, build_parser, validate_config
+
+
+class TestCli(unittest.TestCase):
+    """命令行入口测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.test_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.test_dir)
+
+    def write_config(self, agents: str, tasks: str) -> Path:
+        (self.test_dir / "agents.yaml").write_text(agents, encoding="utf-8")
+        (self.test_dir / "tasks.yaml").write_text(tasks, encoding="utf-8")
+        return self.test_dir
+
+    def test_repo_config_is_valid(self):
+        """测试仓库自带的配置通过校验"""
+        self.assertEqual(validate_config(), [])
+
+    def test_validate_reports_errors(self):
+        """测试校验能发现缺失字段、错误引用和无效预算"""
+        config_dir = self.write_config(
+            "phd:\n  role: r\n  goal: g\n  backstory: b\n  budget:\n    on_exceed: crash\n",
+            "search:\n  description: d\n  agent: professor\n  context: [missing]\n",
+        )
+        errors = validate_config(config_dir)
+        self.assertTrue(any("expected_output" in error for error in errors))
+        self.assertTrue(any("professor" in error for error in errors))
+        self.assertTrue(any("missing" in error for error in errors))
+        self.assertTrue(any("预算" in error for error in errors))
+
+    def test_parse_inputs(self):
+        """测试解析 key=value 任务输入"""
+        self.assertEqual(_parse_inputs(["keywords=RAG, LLM", "a=b=c"]), {"keywords": "RAG, LLM", "a": "b=c"})
+        with self.assertRaises(Exception):
+            _parse_inputs(["keywords"])
+
+    def test_parser(self):
+        """测试子命令解析"""
+        args = build_parser().parse_args(["train", "3", "out.pkl", "--topic", "RAG"])
+        self.assertEqual((args.n_iterations, args.filename, args.topic), (3, "out.pkl", "RAG"))
+
+    def test_cli_import_is_lightweight(self):
+        """测试导入命令行模块和主模块不会导入 crewAI"""
+        code = ("import sys, coreascher.cli, coreascher.main; "
+                "print(any(name.split('.')[0] in ('crewai', 'arxiv', 'dotenv') for name in sys.modules))")
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), "False")
+
+
+if __name__ == '__main__':
+    unittest.main()
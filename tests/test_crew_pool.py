@@ -0,0 +1,119 @@
+"""
+测试Crew实例池模块
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from src.coreascher.benchmark.fake_llm import FakeArxivClient, FakeLLM
+from src.coreascher.benchmark.pipeline import DEFAULT_INPUTS, DEFAULT_RESPONSES
+from src.coreascher.crew import LiteratureReviewCrew
+from src.coreascher.service.crew_pool import CrewPool, PooledCrew
+from src.coreascher.service.jobs import SUCCEEDED, Job, ReviewRunner, execute_job
+from coreascher.tools.search_cache import get_search_cache
+
+
+def build_crew():
+    """构建一个离线Crew"""
+    base = LiteratureReviewCrew(llm=FakeLLM(responses=DEFAULT_RESPONSES))
+    return base, base.literature_review_crew()
+
+
+class TestCrewPool(unittest.TestCase):
+    """CrewPool测试类"""
+
+    def wait_idle(self, pool, count):
+        """等待空闲实例数达到 count"""
+        deadline = time.monotonic() + 10
+        while pool.stats()["idle"] < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_checkout_from_warm_pool(self):
+        """测试预热后取出的Crew来自池中，归还后恢复复用而不重新构建"""
+        built = []
+
+        def factory():
+            built.append(1)
+            return build_crew()
+
+        pool = CrewPool(factory, size=1).start()
+        try:
+            self.wait_idle(pool, 1)
+            pooled = pool.checkout()
+            pool.checkin(pooled)
+            self.wait_idle(pool, 1)
+            self.assertIs(pool.checkout(), pooled)
+        finally:
+            pool.stop()
+        stats = pool.stats()
+        self.assertEqual(stats["hits"], 2)
+        self.assertEqual(stats["misses"], 0)
+        self.assertEqual(stats["reused"], 1)
+        self.assertEqual(len(built), 1)
+
+    def test_checkout_without_idle(self):
+        """测试没有空闲实例时在当前线程构建"""
+        pool = CrewPool(build_crew, size=1)
+        pooled = pool.checkout()
+        self.assertIsInstance(pooled, PooledCrew)
+        self.assertEqual(pool.stats()["misses"], 1)
+        pool.checkin(pooled)
+        self.assertEqual(pool.stats()["discarded"], 1)
+
+    def test_reset(self):
+        """测试恢复运行中修改的任务和Agent状态"""
+        pooled = PooledCrew(*build_crew())
+        crew = pooled.crew
+        task = crew.tasks[0]
+        description, output_file = task.description, task.output_file
+        llm = crew.agents[0].llm
+        task.description = "changed"
+        task.output_file = "elsewhere/out.md"
+        crew.agents[0].llm = FakeLLM()
+        crew.tasks.pop()
+
+        pooled.reset()
+        self.assertEqual(task.description, description)
+        self.assertEqual(task.output_file, output_file)
+        self.assertIs(crew.agents[0].llm, llm)
+        self.assertEqual(len(crew.tasks), len(pooled._tasks))
+
+
+class TestPooledRunner(unittest.TestCase):
+    """使用Crew池的任务执行器测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.original_cwd = os.getcwd()
+        self.test_dir = tempfile.mkdtemp()
+        os.chdir(self.test_dir)
+        get_search_cache().clear()
+
+    def tearDown(self):
+        """测试后清理"""
+        os.chdir(self.original_cwd)
+        shutil.rmtree(self.test_dir)
+
+    def test_reuse_crew_between_jobs(self):
+        """测试前后两个任务复用同一个Crew，输出保持一致"""
+        runner = ReviewRunner(llm=FakeLLM(responses=DEFAULT_RESPONSES), client=FakeArxivClient(),
+                              pool_size=1).warm()
+        try:
+            results = []
+            for _ in range(2):
+                get_search_cache().clear()
+                job = execute_job(Job(DEFAULT_INPUTS["topic"], DEFAULT_INPUTS), runner)
+                self.assertEqual(job.status, SUCCEEDED, job.error)
+                results.append(job.result)
+            stats = runner.pool.stats()
+        finally:
+            runner.close()
+        self.assertEqual(results[0]["tasks"], results[1]["tasks"])
+        self.assertGreaterEqual(stats["reused"], 1)
+        self.assertGreaterEqual(stats["hits"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+"""
+测试运行期限与取消模块
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from typing import Any
+from unittest.mock import patch
+from pydantic import PrivateAttr
+from src.coreascher.benchmark.fake_llm import FakeArxivClient, FakeLLM
+from src.coreascher.benchmark.pipeline import DEFAULT_INPUTS, DEFAULT_RESPONSES
+from src.coreascher.crew import LiteratureReviewCrew
+from src.coreascher.monitoring.deadline import CallTimeout, CancelToken, DeadlineGuard, RunCancelled
+from src.coreascher.monitoring.metrics import RunMetrics, StageStats
+from src.coreascher.service.jobs import CANCELLED, JobQueue, ReviewRunner
+from coreascher.tools.llm_cache import GuardedLLM
+from coreascher.tools.search_cache import get_search_cache
+
+
+class HangingLLM(FakeLLM):
+    """执行到指定任务时不再返回的模拟LLM，相当于LLM服务无响应"""
+
+    hang_task: str = "literature_review"
+
+    _reached: Any = PrivateAttr(default_factory=threading.Event)
+    _release: Any = PrivateAttr(default_factory=threading.Event)
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None, **kwargs):
+        if getattr(from_task, "name", None) == self.hang_task:
+            self._reached.set()
+            self._release.wait(30)
+        return super().call(messages, tools=tools, callbacks=callbacks, available_functions=available_functions,
+                            from_task=from_task, from_agent=from_agent, response_model=response_model, **kwargs)
+
+
+class TestDeadlineGuard(unittest.TestCase):
+    """DeadlineGuard测试类"""
+
+    def test_call_timeout(self):
+        """测试单次调用超过超时后立即返回"""
+        guard = DeadlineGuard(RunMetrics(), call_timeout=0.1)
+        started = time.time()
+        with self.assertRaises(CallTimeout):
+            guard.call(lambda: time.sleep(5), "检索")
+        self.assertLess(time.time() - started, 1.0)
+        self.assertEqual(guard.call(lambda: "ok"), "ok")
+        self.assertEqual(guard.summary()["call_timeouts"], 1)
+
+    def test_cancel_wakes_call(self):
+        """测试取消后正在等待的调用立即返回，之后的调用不再发起"""
+        token = CancelToken()
+        guard = DeadlineGuard(RunMetrics(), call_timeout=30, token=token)
+        threading.Timer(0.1, token.cancel, args=("手动取消",)).start()
+        started = time.time()
+        with self.assertRaises(RunCancelled):
+            guard.call(lambda: time.sleep(5))
+        self.assertLess(time.time() - started, 1.0)
+        calls = []
+        with self.assertRaises(RunCancelled):
+            guard.call(lambda: calls.append(1))
+        self.assertEqual(calls, [])
+        self.assertEqual(guard.summary()["reason"], "手动取消")
+
+    def test_task_deadline(self):
+        """测试任务超过期限时取消运行"""
+        guard = DeadlineGuard(RunMetrics(), task_timeouts={"search_literature": 1})
+        stats = StageStats("search_literature", "phd")
+        stats.started_at = time.time() - 0.5
+        guard.on_stage(stats)
+        guard.check()
+        self.assertFalse(guard.token.cancelled)
+        stats.started_at -= 1
+        guard._running.clear()
+        guard.on_stage(stats)
+        guard.check()
+        self.assertTrue(guard.token.cancelled)
+        self.assertIn("search_literature", guard.token.reason)
+
+    def test_memory_llm_guarded(self):
+        """测试Agent记忆的LLM同样受期限约束，卸载后恢复"""
+        crew = LiteratureReviewCrew(llm=FakeLLM()).literature_review_crew()
+        memory_llm = FakeLLM()
+        for agent in crew.agents:
+            agent.memory._llm_instance = memory_llm
+        guard = DeadlineGuard(RunMetrics(), call_timeout=30).attach(crew)
+        try:
+            llms = [agent.memory._llm for agent in crew.agents]
+            self.assertTrue(all(isinstance(llm, GuardedLLM) and llm.inner is memory_llm for llm in llms))
+            guard.token.cancel("手动取消")
+            with self.assertRaises(RunCancelled):
+                llms[0].call([{"role": "user", "content": "提取记忆"}])
+        finally:
+            guard.detach()
+        self.assertEqual(memory_llm.call_count, 0)
+        self.assertTrue(all(agent.memory._llm is memory_llm for agent in crew.agents))
+
+    def test_from_config(self):
+        """测试从tasks.yaml的配置读取任务期限、运行期限和单次调用超时"""
+        config = {
+            "run_budget": {"max_tokens": 1000, "timeout_seconds": 60, "call_timeout_seconds": 5},
+            "search_literature": {"description": "d", "timeout_seconds": 10},
+            "literature_review": {"description": "d"},
+        }
+        with patch.dict(os.environ):
+            os.environ.pop("COREASCHER_CALL_TIMEOUT", None)
+            guard = DeadlineGuard.from_config(RunMetrics(), config)
+        self.assertEqual(guard.task_timeouts, {"search_literature": 10.0})
+        self.assertEqual(guard.run_timeout, 60)
+        self.assertEqual(guard.call_timeout, 5.0)
+
+
+class TestJobCancel(unittest.TestCase):
+    """任务取消测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.original_cwd = os.getcwd()
+        self.test_dir = tempfile.mkdtemp()
+        os.chdir(self.test_dir)
+        get_search_cache().clear()
+
+    def tearDown(self):
+        """测试后清理"""
+        os.chdir(self.original_cwd)
+        shutil.rmtree(self.test_dir)
+
+    def test_cancel_running_job(self):
+        """测试取消LLM无响应的运行中任务，已完成任务的输出作为部分结果保留"""
+        llm = HangingLLM(responses=DEFAULT_RESPONSES)
+        runner = ReviewRunner(llm=llm, client=FakeArxivClient())
+        jobs = JobQueue(workers=1, runner=runner).start()
+        try:
+            job = jobs.submit(DEFAULT_INPUTS["topic"], DEFAULT_INPUTS)
+            self.assertTrue(llm._reached.wait(120))
+            started = time.time()
+            jobs.cancel(job.id, "手动取消")
+            self.assertTrue(job.done.wait(10))
+            self.assertLess(time.time() - started, 10)
+        finally:
+            llm._release.set()
+            jobs.stop()
+        self.assertEqual(job.status, CANCELLED)
+        self.assertEqual(job.error, "手动取消")
+        self.assertTrue(job.result["partial"])
+        self.assertIn("search_literature", job.result["tasks"])
+        self.assertNotIn("literature_review", job.result["tasks"])
+        self.assertTrue(job.result["deadline"]["cancelled"])
+        self.assertEqual(jobs.stats()["cancelled"], 1)
+
+    def test_cancel_queued_job(self):
+        """测试取消排队中的任务后不再执行"""
+        release = threading.Event()
+        ran = []
+
+        def runner(job):
+            ran.append(job.topic)
+            release.wait(10)
+            return {}
+
+        jobs = JobQueue(workers=1, runner=runner).start()
+        try:
+            first = jobs.submit("first", {})
+            second = jobs.submit("second", {})
+            self.assertEqual(jobs.cancel(second.id).status, CANCELLED)
+            release.set()
+            self.assertTrue(first.done.wait(10))
+        finally:
+            release.set()
+            jobs.stop()
+        self.assertEqual(ran, ["first"])
+        self.assertIsNone(jobs.cancel("missing"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+测试本地全文入库模块
+"""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from src.coreascher.tools.chunk_store import ChunkStore, estimate_tokens, get_chunk_store
+from src.coreascher.tools.ingest import chunk_text, ingest_directory, normalize_text
+
+
+class TestIngest(unittest.TestCase):
+    """全文入库测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.paper_dir = self.test_dir / "papers"
+        self.paper_dir.mkdir()
+        sentence = "Large language models learn in context from a few demonstrations. "
+        for i in range(3):
+            (self.paper_dir / f"2301.0000{i}.txt").write_text(sentence * 60, encoding="utf-8")
+        self.store = ChunkStore(self.test_dir / "chunks.sqlite3")
+
+    def tearDown(self):
+        """测试后清理"""
+        self.store.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_normalize_text(self):
+        """测试正文规范化"""
+        text = normalize_text("Trans-\nformer  models\r\nwork.\n\n\n第二段\x0c")
+        self.assertEqual(text, "Transformer models work.\n\n第二段")
+
+    def test_chunk_text(self):
+        """测试片段切分和重叠"""
+        text = " ".join(f"Sentence number {i} is here." for i in range(100))
+        chunks = chunk_text(text, chunk_tokens=60, overlap_tokens=15)
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(estimate_tokens(chunk) <= 60 for chunk in chunks))
+        last_sentence = chunks[0].rsplit(". ", 1)[-1]
+        self.assertIn(last_sentence, chunks[1])
+
+    def test_ingest_and_resume(self):
+        """测试入库和断点续传"""
+        stats = ingest_directory(self.paper_dir, self.store, workers=2, chunk_tokens=100)
+        self.assertEqual(stats["ingested"], 3)
+        documents, chunks = self.store.count()
+        self.assertEqual(documents, 3)
+        self.assertEqual(chunks, stats["chunks"])
+        self.assertEqual(self.store.get_chunks("2301.00000")[0]["chunk_index"], 0)
+
+        stats = ingest_directory(self.paper_dir, self.store, workers=2, chunk_tokens=100)
+        self.assertEqual(stats["ingested"], 0)
+        self.assertEqual(stats["skipped"], 3)
+
+    def test_paper_ids_from_relative_path(self):
+        """测试子目录中的同名文件使用不同的ID，同一论文的多种格式只入库一个"""
+        sentence = "Retrieval augmented generation grounds answers in documents. "
+        (self.paper_dir / "nlp").mkdir()
+        (self.paper_dir / "nlp" / "2301.00000.txt").write_text(sentence * 20, encoding="utf-8")
+        (self.paper_dir / "2301.00001.md").write_text(sentence * 20, encoding="utf-8")
+        stats = ingest_directory(self.paper_dir, self.store, workers=1, chunk_tokens=100)
+        self.assertEqual(stats["ingested"], 4)
+        self.assertIn("Retrieval", self.store.get_chunks("nlp/2301.00000")[0]["text"])
+        self.assertIn("Large language", self.store.get_chunks("2301.00000")[0]["text"])
+        self.assertIn("Large language", self.store.get_chunks("2301.00001")[0]["text"])
+
+        stats = ingest_directory(self.paper_dir, self.store, workers=1, chunk_tokens=100)
+        self.assertEqual(stats["skipped"], 4)
+
+    def test_search(self):
+        """测试片段全文检索"""
+        ingest_directory(self.paper_dir, self.store, workers=1, chunk_tokens=100)
+        results = self.store.search("language demonstrations", limit=5)
+        self.assertEqual(len(results), 5)
+        self.assertIn("demonstrations", results[0]["text"])
+        self.assertEqual(self.store.search("quantum chromodynamics"), [])
+
+
+    def test_shared_store(self):
+        """测试检索共用进程内的片段库，库文件不存在时不创建"""
+        missing = self.test_dir / "missing" / "chunks.sqlite3"
+        self.assertIsNone(get_chunk_store(missing))
+        self.assertFalse(missing.parent.exists())
+
+        ingest_directory(self.paper_dir, self.store, workers=1, chunk_tokens=100)
+        shared = get_chunk_store(self.store.path)
+        self.assertIs(get_chunk_store(self.store.path), shared)
+        self.assertEqual(len(shared.search("language", limit=2)), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
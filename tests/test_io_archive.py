@@ -0,0 +1,131 @@
+"""
+测试外部调用录制与回放模块
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from src.coreascher.benchmark.fake_llm import FakeArxivClient, FakeLLM
+from src.coreascher.benchmark.pipeline import DEFAULT_INPUTS, DEFAULT_RESPONSES
+from src.coreascher.service.jobs import SUCCEEDED, Job, ReviewRunner, execute_job
+from src.coreascher.tools.io_archive import (RECORD_ENV, REPLAY, REPLAY_ENV, IOArchive, IORecorder,
+                                             request_key)
+from coreascher.tools.search_cache import get_search_cache
+
+
+class TestIOArchive(unittest.TestCase):
+    """IOArchive和IORecorder测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.path = self.test_dir / "run.json.gz"
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.test_dir)
+
+    def test_save_and_load(self):
+        """测试保存后重新加载，相同结果只保存一份"""
+        archive = IOArchive(self.path)
+        archive.store(request_key("llm", {"prompt": "a"}), 0, "answer")
+        archive.store(request_key("llm", {"prompt": "b"}), 0, "answer")
+        archive.store(request_key("llm", {"prompt": "a"}), 1, "second")
+        archive.save()
+
+        loaded = IOArchive(self.path)
+        self.assertEqual(len(loaded), 3)
+        self.assertEqual(loaded.lookup(request_key("llm", {"prompt": "a"}), 1), "second")
+        self.assertEqual(loaded.lookup(request_key("llm", {"prompt": "a"}), 5), "second")
+        self.assertEqual(len(loaded._blobs), 2)
+        self.assertIsNone(loaded.lookup(request_key("llm", {"prompt": "c"}), 0))
+
+    def test_replay_in_order(self):
+        """测试相同请求按出现次序回放，归档中没有的请求照常调用并补录"""
+        archive = IOArchive(self.path)
+        recorder = IORecorder(archive)
+        for answer in ("first", "second"):
+            recorder.call("llm", {"prompt": "a"}, lambda answer=answer: answer)
+
+        replay = IORecorder(archive, mode=REPLAY)
+        live = []
+        self.assertEqual(replay.call("llm", {"prompt": "a"}, lambda: live.append(1)), "first")
+        self.assertEqual(replay.call("llm", {"prompt": "a"}, lambda: live.append(1)), "second")
+        self.assertEqual(replay.call("llm", {"prompt": "new"}, lambda: "fresh"), "fresh")
+        self.assertEqual(live, [])
+        self.assertEqual(replay.summary()["replayed"], 2)
+        self.assertEqual(replay.summary()["recorded"], 1)
+
+
+class MemoryRunner(ReviewRunner):
+    """为每个Agent的记忆设置单独的模拟LLM的执行器，用于检查记忆是否调用了LLM"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.memory_llms = []
+
+    def _build_crew(self):
+        crew_base, crew = super()._build_crew()
+        for agent in crew.agents:
+            agent.memory._llm_instance = FakeLLM()
+            self.memory_llms.append(agent.memory._llm_instance)
+        return crew_base, crew
+
+
+class TestCrewReplay(unittest.TestCase):
+    """Crew运行的录制回放测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.original_cwd = os.getcwd()
+        self.test_dir = tempfile.mkdtemp()
+        os.chdir(self.test_dir)
+        self.archive = str(Path(self.test_dir) / "review.json.gz")
+
+    def tearDown(self):
+        """测试后清理"""
+        os.chdir(self.original_cwd)
+        shutil.rmtree(self.test_dir)
+
+    def run_review(self, env):
+        """离线运行一次综述，返回结果、LLM、各Agent记忆的LLM和arXiv客户端"""
+        get_search_cache().clear()
+        llm, client = FakeLLM(responses=DEFAULT_RESPONSES), FakeArxivClient()
+        runner = MemoryRunner(llm=llm, client=client)
+        with patch.dict(os.environ, env):
+            job = execute_job(Job(DEFAULT_INPUTS["topic"], DEFAULT_INPUTS), runner)
+        self.assertEqual(job.status, SUCCEEDED, job.error)
+        self.assertEqual(len(runner.memory_llms), 3)
+        return job.result, llm, runner.memory_llms, client
+
+    def test_record_then_replay(self):
+        """测试回放录制的运行时不调用任何LLM（包括Agent记忆的LLM）和arXiv，输出与录制时一致"""
+        recorded, llm, memory_llms, client = self.run_review({RECORD_ENV: self.archive})
+        self.assertGreater(llm._total_calls, 0)
+        self.assertGreater(client.calls, 0)
+        self.assertGreater(recorded["io_archive"]["recorded"], 0)
+        # 记忆的检索结果无法重现，录制时同样不使用记忆
+        self.assertEqual([memory_llm._total_calls for memory_llm in memory_llms], [0, 0, 0])
+
+        replayed, llm, memory_llms, client = self.run_review({REPLAY_ENV: self.archive})
+        self.assertEqual(llm._total_calls, 0)
+        self.assertEqual([memory_llm._total_calls for memory_llm in memory_llms], [0, 0, 0])
+        self.assertEqual(client.calls, 0)
+        self.assertEqual(replayed["tasks"], recorded["tasks"])
+        self.assertEqual(replayed["io_archive"]["recorded"], 0)
+
+    def test_memory_restored(self):
+        """测试卸载录制回放后恢复Agent记忆"""
+        crew_base, crew = MemoryRunner(llm=FakeLLM())._build_crew()
+        memories = [agent.memory for agent in crew.agents]
+        recorder = IORecorder(IOArchive(Path(self.archive))).attach(crew)
+        self.assertEqual([agent.memory for agent in crew.agents], [None, None, None])
+        recorder.detach()
+        self.assertEqual([agent.memory for agent in crew.agents], memories)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+测试LLM回复缓存模块
+"""
+
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from src.coreascher.benchmark.fake_llm import FakeLLM
+from src.coreascher.tools.llm_cache import CachedLLM, LLMResponseCache
+
+
+class TestLLMResponseCache(unittest.TestCase):
+    """LLMResponseCache测试类"""
+
+    def test_single_flight(self):
+        """测试相同键的并发请求只计算一次"""
+        cache = LLMResponseCache()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.05)
+            return "回复"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute)))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, ["回复"] * 4)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.stats()["hits"], 3)
+
+    def test_error_not_cached(self):
+        """测试计算失败时不缓存"""
+        cache = LLMResponseCache()
+        with self.assertRaises(RuntimeError):
+            cache.get_or_compute("k", lambda: (_ for _ in ()).throw(RuntimeError("boom")))
+        self.assertEqual(cache.get_or_compute("k", lambda: "ok"), "ok")
+
+    def test_lru_eviction(self):
+        """测试超出容量时淘汰最久未使用的回复"""
+        cache = LLMResponseCache(maxsize=2)
+        for key in ("a", "b", "a", "c"):
+            cache.get_or_compute(key, lambda: key)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get_or_compute("b", lambda: "new"), "new")
+
+
+class TestCachedLLM(unittest.TestCase):
+    """CachedLLM测试类"""
+
+    def test_cached_call(self):
+        """测试相同提示只调用一次内部LLM，不同提示和停止词分别缓存"""
+        inner = FakeLLM()
+        llm = CachedLLM(inner)
+        task = SimpleNamespace(id="t1", name="review")
+        first = llm.call("写综述", from_task=task)
+        self.assertEqual(llm.call("写综述", from_task=task), first)
+        self.assertEqual(inner.call_count, 1)
+        llm.call("写另一篇综述", from_task=task)
+        llm.stop = ["\nObservation:"]
+        llm.call("写综述", from_task=task)
+        self.assertEqual(inner.call_count, 3)
+        self.assertEqual(inner.stop, ["\nObservation:"])
+        self.assertEqual(llm.model, inner.model)
+
+    def test_shared_cache(self):
+        """测试传入的空缓存被共享而不是另建"""
+        cache = LLMResponseCache()
+        first, second = CachedLLM(FakeLLM(), cache), CachedLLM(FakeLLM(), cache)
+        first.call("写综述")
+        second.call("写综述")
+        self.assertIs(second.cache, cache)
+        self.assertEqual((cache.hits, second.inner.call_count), (1, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
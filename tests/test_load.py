@@ -0,0 +1,57 @@
+"""
+测试多主题并发负载测试模块
+"""
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.coreascher.benchmark.load import arrival_offsets, run_load_test, topic_request
+
+
+class TestLoadTest(unittest.TestCase):
+    """负载测试模块测试类"""
+
+    def test_topic_request(self):
+        """测试按关键词生成检索工具调用"""
+        inputs, responses = topic_request("图神经网络", "graph neural network, message passing")
+        self.assertEqual(inputs["topic"], "图神经网络")
+        queries = [step["input"]["query"] for step in responses["search_literature"] if isinstance(step, dict)]
+        self.assertEqual(queries, ["graph neural network", "message passing"])
+
+    def test_arrival_offsets(self):
+        """测试到达时刻可重复且平均间隔接近 1/速率"""
+        self.assertEqual(arrival_offsets(3, None), [0.0, 0.0, 0.0])
+        offsets = arrival_offsets(2000, 10.0, seed=1)
+        self.assertEqual(offsets, arrival_offsets(2000, 10.0, seed=1))
+        self.assertEqual(offsets, sorted(offsets))
+        self.assertAlmostEqual(offsets[-1] / len(offsets), 0.1, delta=0.01)
+
+    def test_run_load_test(self):
+        """测试并发运行重复主题时统计吞吐量、缓存命中和内存"""
+        result = run_load_test(requests=3, concurrency=2, topics=[("检索增强生成", "retrieval augmented generation")])
+        self.assertEqual((result["completed"], result["failed"]), (3, 0))
+        self.assertGreater(result["reviews_per_hour"], 0)
+        self.assertGreaterEqual(result["latency_seconds"]["p95"], result["latency_seconds"]["p50"])
+        self.assertGreater(result["search_cache"]["hits"], 0)
+        self.assertLess(result["arxiv_requests"], 3)
+        self.assertGreater(result["memory_mb"]["process_peak_rss"], 0)
+
+    def test_run_load_test_through_job_queue(self):
+        """测试请求经任务队列和Crew池执行，各请求的输出写入独立的工作目录"""
+        with tempfile.TemporaryDirectory() as tmp:
+            cwd = os.getcwd()
+            result = run_load_test(requests=4, concurrency=2, workdir=Path(tmp), llm_concurrency=2,
+                                   topics=[("检索增强生成", "retrieval augmented generation"),
+                                           ("图神经网络", "graph neural network")])
+            self.assertEqual(os.getcwd(), cwd)
+            self.assertEqual(len(list(Path(tmp).glob("*/literature.json"))), 4)
+        self.assertEqual((result["completed"], result["failed"]), (4, 0))
+        self.assertEqual(result["crew_pool"]["size"], 2)
+        self.assertGreater(result["scheduler"]["llm"]["grants"], 0)
+        self.assertIsNotNone(result["llm_cache"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+测试日志配置模块
+"""
+
+import logging
+import queue
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from src.coreascher.monitoring.logs import (
+    LazyQueueHandler, TruncatingFormatter, parse_levels, setup_logging, shutdown_logging
+)
+
+
+class TestLogs(unittest.TestCase):
+    """日志配置测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.test_dir = Path(tempfile.mkdtemp())
+        root = logging.getLogger()
+        self.saved = (root.level, list(root.handlers))
+
+    def tearDown(self):
+        """测试后清理"""
+        shutdown_logging()
+        root = logging.getLogger()
+        root.setLevel(self.saved[0])
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        for handler in self.saved[1]:
+            root.addHandler(handler)
+        logging.getLogger("coreascher.test.noisy").setLevel(logging.NOTSET)
+        shutil.rmtree(self.test_dir)
+
+    def test_truncate_payload(self):
+        """测试超长消息被截断"""
+        formatter = TruncatingFormatter("%(message)s", max_payload=10)
+        record = logging.LogRecord("x", logging.INFO, __file__, 1, "a" * 25, None, None)
+        self.assertEqual(formatter.format(record), "a" * 10 + "…（已截断 15 个字符）")
+
+    def test_parse_levels(self):
+        """测试解析组件日志级别"""
+        self.assertEqual(parse_levels("coreascher.tools=debug, crewai=WARNING"),
+                         {"coreascher.tools": logging.DEBUG, "crewai": logging.WARNING})
+        with self.assertRaises(ValueError):
+            parse_levels("crewai=LOUD")
+
+    def test_handler_merges_args_in_caller(self):
+        """测试队列处理器在调用线程中合并消息参数，队列满时丢弃而不阻塞"""
+        log_queue = queue.Queue(1)
+        handler = LazyQueueHandler(log_queue)
+        papers = ["a"]
+        record = logging.LogRecord("x", logging.INFO, __file__, 1, "论文: %s", (papers,), None)
+        handler.handle(record)
+        papers.append("b")
+        handler.handle(record)
+        queued = log_queue.get_nowait()
+        self.assertEqual(queued.getMessage(), "论文: ['a']")
+        self.assertIsNone(queued.args)
+        self.assertEqual(handler.dropped, 1)
+
+    def test_background_writer(self):
+        """测试日志由后台线程写出到文件并应用组件级别"""
+        log_file = self.test_dir / "app.log"
+        setup_logging("INFO", levels={"coreascher.test.noisy": "ERROR"}, log_file=log_file, max_payload=20)
+        logging.getLogger("coreascher.test").info("结果: %s %s", "payload", "x" * 50)
+        logging.getLogger("coreascher.test.noisy").warning("不应输出")
+        try:
+            raise RuntimeError("boom")
+        except RuntimeError:
+            logging.getLogger("coreascher.test").exception("出错")
+        shutdown_logging()
+
+        text = log_file.read_text(encoding="utf-8")
+        self.assertIn("已截断", text)
+        self.assertIn("RuntimeError: boom", text)
+        self.assertNotIn("不应输出", text)
+
+
+if __name__ == '__main__':
+    unittest.main()
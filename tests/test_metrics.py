@@ -0,0 +1,128 @@
+"""
+测试运行指标采集模块
+"""
+
+import json
+import shutil
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from src.coreascher.monitoring.metrics import RunMetrics, _EventRouter
+
+
+def make_event(kind: str, at: datetime, **fields) -> SimpleNamespace:
+    """构造模拟的crewAI事件"""
+    return SimpleNamespace(type=kind, timestamp=at, **fields)
+
+
+class TestRunMetrics(unittest.TestCase):
+    """RunMetrics测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.test_dir = Path("test_metrics_output")
+        self.metrics = RunMetrics(run_id="test")
+        self.t0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    def tearDown(self):
+        """测试后清理"""
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def test_event_accounting(self):
+        """测试事件统计"""
+        self.metrics._task_names["t1"] = "search_literature"
+        self.metrics._agent_roles["a1"] = "phd"
+        events = [
+            make_event("task_started", self.t0, task_id="t1", agent_id="a1"),
+            make_event("llm_call_started", self.t0, call_id="c1", task_id="t1", agent_id="a1"),
+            make_event("llm_call_completed", self.t0 + timedelta(seconds=2), call_id="c1", task_id="t1",
+                       agent_id="a1", usage={"prompt_tokens": 100, "completion_tokens": 20}),
+            make_event("tool_usage_finished", self.t0 + timedelta(seconds=3), task_id="t1", agent_id="a1",
+                       tool_name="LiteratureSearch", started_at=self.t0 + timedelta(seconds=2),
+                       finished_at=self.t0 + timedelta(seconds=3), from_cache=True),
+            make_event("task_completed", self.t0 + timedelta(seconds=5), task_id="t1", agent_id="a1"),
+        ]
+        for event in events:
+            self.assertTrue(self.metrics.owns(event))
+            self.metrics.handle_event(event)
+
+        summary = self.metrics.summary()
+        task = summary["tasks"]["search_literature"]
+        self.assertEqual(task["wall_seconds"], 5.0)
+        self.assertEqual(task["llm_calls"], 1)
+        self.assertEqual(task["llm_seconds"], 2.0)
+        self.assertEqual(task["input_tokens"], 100)
+        self.assertEqual(task["output_tokens"], 20)
+        self.assertEqual(summary["agents"]["phd"]["tool_calls"], 1)
+        self.assertEqual(summary["stages"][0]["tools"]["LiteratureSearch"]["calls"], 1)
+        self.assertEqual(summary["stages"][0]["tool_cache_hits"], 1)
+
+    def test_attach_wraps_callbacks(self):
+        """测试挂接和恢复回调"""
+        calls = []
+        agent = SimpleNamespace(id="a1", role="phd", step_callback=None)
+        task = SimpleNamespace(id="t1", name="literature_review", agent=agent, callback=calls.append)
+        crew = SimpleNamespace(tasks=[task], agents=[agent])
+
+        self.metrics.attach(crew)
+        self.metrics.record_task_start("literature_review", "phd")
+        agent.step_callback("step")
+        task.callback("output")
+        self.metrics.detach()
+
+        self.assertEqual(calls, ["output"])
+        self.assertIs(agent.step_callback, None)
+        self.assertEqual(task.callback, calls.append)
+        self.assertEqual(self.metrics.summary()["tasks"]["literature_review"]["steps"], 1)
+
+    def test_export(self):
+        """测试导出JSON和Prometheus格式"""
+        self.metrics.record_task_start("keyword_tasks", "postdoc", at=10.0)
+        self.metrics.record_llm_call("keyword_tasks", "postdoc", 50, 5, 1.5)
+        self.metrics.record_task_end("keyword_tasks", "postdoc", at=12.5)
+        json_path, prom_path = self.metrics.export(self.test_dir)
+
+        data = json.loads(json_path.read_text(encoding="utf-8"))
+        self.assertEqual(data["wall_seconds"], 2.5)
+        text = prom_path.read_text(encoding="utf-8")
+        self.assertIn('coreascher_stage_input_tokens_total{run="test",task="keyword_tasks",agent="postdoc"} 50', text)
+        self.assertIn("# TYPE coreascher_stage_wall_seconds gauge", text)
+        # 两个文件都经临时文件原子替换，不留下临时文件
+        self.assertEqual(sorted(path.name for path in self.test_dir.iterdir()), [json_path.name, prom_path.name])
+
+    def test_stream_chunks_not_routed_to_metrics(self):
+        """测试LLM流式输出分块只分发给声明需要它的采集器"""
+        class Collector:
+            EXTRA_EVENT_TYPES = ()
+
+            def __init__(self):
+                self.events = []
+
+            def owns(self, event):
+                return True
+
+            def handle_event(self, event):
+                self.events.append(event)
+
+        class StreamCollector(Collector):
+            EXTRA_EVENT_TYPES = ("LLMStreamChunkEvent",)
+
+        router = _EventRouter.get()
+        metrics, stream = Collector(), StreamCollector()
+        router.register(metrics)
+        router.register(stream)
+        try:
+            router._dispatch(None, type("LLMStreamChunkEvent", (), {})())
+            router._dispatch(None, type("LLMCallCompletedEvent", (), {})())
+        finally:
+            router.unregister(metrics)
+            router.unregister(stream)
+        self.assertEqual([type(event).__name__ for event in metrics.events], ["LLMCallCompletedEvent"])
+        self.assertEqual([type(event).__name__ for event in stream.events],
+                         ["LLMStreamChunkEvent", "LLMCallCompletedEvent"])
+
+
+if __name__ == "__main__":
+    unittest.main()
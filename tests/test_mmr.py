@@ -0,0 +1,52 @@
+"""
+测试片段多样性筛选模块
+"""
+
+import unittest
+import numpy as np
+from src.coreascher.tools.mmr import embed_texts, mmr_select, select_chunks
+
+
+class TestMMR(unittest.TestCase):
+    """MMR筛选测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        base = "retrieval augmented generation improves factual accuracy of language models"
+        self.chunks = [
+            {"paper_id": "p1", "chunk_index": 0, "text": base, "n_tokens": 10},
+            {"paper_id": "p1", "chunk_index": 1, "text": base + " significantly", "n_tokens": 11},
+            {"paper_id": "p2", "chunk_index": 0, "text": "retrieval augmented generation with knowledge graphs", "n_tokens": 8},
+            {"paper_id": "p3", "chunk_index": 0, "text": "image segmentation with convolutional networks", "n_tokens": 6},
+        ]
+
+    def test_embed_texts(self):
+        """测试向量编码"""
+        vectors = embed_texts(["large language model", "大语言模型", ""])
+        self.assertEqual(vectors.shape, (3, 2048))
+        np.testing.assert_allclose(np.linalg.norm(vectors[:2], axis=1), [1.0, 1.0], rtol=1e-5)
+        self.assertEqual(float(np.abs(vectors[2]).sum()), 0.0)
+
+    def test_diversity(self):
+        """测试冗余片段被排在后面"""
+        selected = select_chunks("retrieval augmented generation", self.chunks, k=2, lambda_mult=0.5)
+        ids = [(chunk["paper_id"], chunk["chunk_index"]) for chunk in selected]
+        self.assertEqual(len(ids), 2)
+        self.assertNotEqual(ids[0][0], ids[1][0])
+
+    def test_token_budget(self):
+        """测试token预算"""
+        selected = select_chunks("retrieval augmented generation", self.chunks, token_budget=18)
+        self.assertLessEqual(sum(chunk["n_tokens"] for chunk in selected), 18)
+        self.assertGreater(len(selected), 0)
+
+    def test_pure_relevance(self):
+        """测试λ=1时退化为相关性排序"""
+        query = embed_texts(["retrieval augmented generation"])[0]
+        vectors = embed_texts([chunk["text"] for chunk in self.chunks])
+        order = mmr_select(query, vectors, lambda_mult=1.0)
+        self.assertEqual(order, list(np.argsort(-(vectors @ query), kind="stable")))
+
+
+if __name__ == "__main__":
+    unittest.main()
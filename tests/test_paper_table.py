@@ -0,0 +1,83 @@
+"""
+测试论文列式存储模块
+"""
+
+import json
+import unittest
+from src.coreascher.tools.paper_table import PaperTable
+
+
+def make_paper(index: int, year: int, citations: int = 0, venue: str = "") -> dict:
+    """构造测试论文"""
+    return {
+        "title": f"Paper {index}",
+        "authors": ["Alice", "Bob"] if index % 2 else ["Alice"],
+        "summary": f"Summary {index}",
+        "published": f"{year}-01-01",
+        "pdf_url": f"http://arxiv.org/pdf/{index}",
+        "entry_id": f"http://arxiv.org/abs/{index}",
+        "venue": venue,
+        "citations": citations,
+    }
+
+
+class TestPaperTable(unittest.TestCase):
+    """PaperTable测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.table = PaperTable(
+            make_paper(i, 2018 + i, citations=i * 10, venue="ICML" if i % 2 else "NeurIPS")
+            for i in range(6)
+        )
+
+    def test_append_and_dedupe(self):
+        """测试追加和去重"""
+        self.assertEqual(len(self.table), 6)
+        self.assertFalse(self.table.append(make_paper(0, 2018)))
+        self.assertIn("http://arxiv.org/abs/3", self.table)
+        self.assertEqual(len(self.table._columns.authors), 2)
+
+    def test_row_access(self):
+        """测试行视图访问"""
+        row = self.table[1]
+        self.assertEqual(row.title, "Paper 1")
+        self.assertEqual(row["authors"], ["Alice", "Bob"])
+        self.assertEqual(row.year, 2019)
+        self.assertEqual(row.get("missing", "x"), "x")
+        self.assertEqual(row.to_dict()["venue"], "ICML")
+
+    def test_slice_filter_sort(self):
+        """测试切片、过滤和排序视图"""
+        view = self.table[2:5]
+        self.assertEqual([row.title for row in view], ["Paper 2", "Paper 3", "Paper 4"])
+        self.assertIs(view._columns, self.table._columns)
+
+        recent = self.table.filter(min_year=2021, venue="ICML")
+        self.assertEqual([row.year for row in recent], [2021, 2023])
+
+        ordered = self.table.sort_by("citations", reverse=True)
+        self.assertEqual(list(ordered.column("citations")), [50, 40, 30, 20, 10, 0])
+        self.assertEqual(len(self.table.filter(venue="AAAI")), 0)
+
+    def test_view_membership(self):
+        """测试行号不连续的视图追加已有论文时的去重"""
+        view = self.table.filter(venue="ICML")
+        self.assertNotIn("http://arxiv.org/abs/0", view)
+        self.assertTrue(view.append(make_paper(0, 2018)))
+        self.assertIn("http://arxiv.org/abs/0", view)
+        self.assertFalse(view.append(make_paper(0, 2018)))
+        self.assertEqual(len(view), 4)
+
+    def test_json_roundtrip(self):
+        """测试JSON序列化"""
+        text = self.table.filter(lambda row: "Bob" in row.authors).to_json(fields=("title", "year"))
+        data = json.loads(text)
+        self.assertEqual(data["papers"][0], {"title": "Paper 1", "year": 2019})
+
+        restored = PaperTable.from_json(self.table.to_json())
+        self.assertEqual(restored.to_dicts(), self.table.to_dicts())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+"""
+测试分阶段性能剖析模块
+"""
+
+import os
+import pstats
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+from src.coreascher.monitoring import profiling
+
+
+def busy(n: int) -> int:
+    """消耗少量CPU的函数"""
+    return sum(i * i for i in range(n))
+
+
+class TestProfiling(unittest.TestCase):
+    """分阶段剖析测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.test_dir = Path(tempfile.mkdtemp())
+        profiling.disable_profiling()
+
+    def tearDown(self):
+        """测试后清理"""
+        profiling.disable_profiling()
+        shutil.rmtree(self.test_dir)
+
+    def test_disabled_is_noop(self):
+        """测试未启用剖析时返回共享的空上下文且不记录数据"""
+        self.assertIs(profiling.profile_stage("stage"), profiling._NULL_STAGE)
+
+        @profiling.profiled()
+        def work():
+            return busy(100)
+
+        self.assertEqual(work(), busy(100))
+        self.assertEqual(profiling.dump_profiles(self.test_dir), [])
+
+    def test_enable_from_env(self):
+        """测试通过环境变量启用剖析"""
+        with patch.dict(os.environ, {profiling.PROFILE_ENV: "0"}):
+            self.assertFalse(profiling.enable_from_env())
+        with patch.dict(os.environ, {profiling.PROFILE_ENV: str(self.test_dir)}):
+            self.assertTrue(profiling.enable_from_env())
+        self.assertTrue(profiling.profiling_enabled())
+        self.assertEqual(profiling._output_dir, self.test_dir)
+
+    def test_nested_stages_are_separate(self):
+        """测试嵌套阶段分别计时并导出 pstats 和折叠栈文件"""
+        profiling.enable_profiling(self.test_dir)
+
+        @profiling.profiled("PhDAgent.search_literature")
+        def inner():
+            return busy(20000)
+
+        with profiling.profile_stage("task:search_literature"):
+            busy(1000)
+            inner()
+        written = profiling.dump_profiles()
+
+        names = sorted(path.name for path in written)
+        self.assertEqual(names, [
+            "PhDAgent.search_literature.folded", "PhDAgent.search_literature.pstats",
+            "task_search_literature.folded", "task_search_literature.pstats",
+        ])
+        # 外层阶段执行内层阶段期间暂停计时，不会重复统计 busy 的内层调用
+        outer = pstats.Stats(str(self.test_dir / "task_search_literature.pstats"))
+        busy_calls = [value[1] for func, value in outer.stats.items() if func[2] == "busy"]
+        self.assertEqual(busy_calls, [1])
+        folded = (self.test_dir / "PhDAgent.search_literature.folded").read_text(encoding="utf-8")
+        self.assertTrue(any("busy" in line and line.rsplit(" ", 1)[1].isdigit()
+                            for line in folded.splitlines()))
+
+    def test_profile_crew_wraps_tasks(self):
+        """测试为Crew中每个Agent的任务执行按任务名分阶段"""
+        profiling.enable_profiling(self.test_dir)
+        agent = SimpleNamespace(execute_task=lambda task, context=None: busy(1000))
+        profiling.profile_crew(SimpleNamespace(agents=[agent]))
+        agent.execute_task(SimpleNamespace(name="literature_review"), context="c")
+        agent.execute_task(SimpleNamespace(name="literature_review"))
+        stats = profiling._merged_stats()
+        self.assertEqual(list(stats), ["task:literature_review"])
+        busy_calls = [value[1] for func, value in stats["task:literature_review"].stats.items()
+                      if func[2] == "busy"]
+        self.assertEqual(busy_calls, [2])
+
+
+    def run_concurrent_stages(self):
+        """两个线程同时执行各自的阶段，返回各线程抛出的异常"""
+        barrier = threading.Barrier(2)
+        errors = []
+
+        def work(name):
+            try:
+                with profiling.profile_stage(f"task:{name}"):
+                    barrier.wait(5)
+                    with profiling.profile_stage("nested"):
+                        busy(5000)
+                    barrier.wait(5)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=work, args=(name,)) for name in ("a", "b")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        return errors
+
+    def test_concurrent_stages(self):
+        """测试多个线程同时进入阶段时不抛出异常"""
+        profiling.enable_profiling(self.test_dir)
+        self.assertEqual(self.run_concurrent_stages(), [])
+        self.assertIn("nested", profiling._merged_stats())
+
+    def test_process_wide_profiler_single_owner(self):
+        """测试剖析器为进程范围时只剖析先进入阶段的线程，其余线程的阶段跳过"""
+        profiling.enable_profiling(self.test_dir)
+        with patch.object(profiling, "_PROCESS_WIDE", True):
+            self.assertEqual(self.run_concurrent_stages(), [])
+            self.assertIsNone(profiling._owner)
+            stages = set(profiling._merged_stats())
+            self.assertEqual(len(stages & {"task:a", "task:b"}), 1)
+            self.assertIn("nested", stages)
+            self.assertEqual(profiling._skipped, 1)
+
+            with profiling.profile_stage("task:c"):
+                busy(1000)
+        self.assertIn("task:c", profiling._merged_stats())
+
+
+if __name__ == '__main__':
+    unittest.main()
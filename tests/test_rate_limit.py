@@ -0,0 +1,140 @@
+"""
+测试arXiv请求限速模块
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from src.coreascher.tools.rate_limit import HostRateLimiter, RateLimitedSession, _default_rate_file, get_rate_limiter
+
+
+class FakeResponse:
+    """只包含状态码和响应头的HTTP响应"""
+
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class FakeSession:
+    """按顺序返回预设响应的会话，记录每次请求的时刻"""
+
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.times = []
+
+    def get(self, url, **kwargs):
+        self.times.append(time.time())
+        status = self.statuses.pop(0) if self.statuses else 200
+        return FakeResponse(status, {"Retry-After": "0.3"} if status == 429 else {})
+
+
+class TestHostRateLimiter(unittest.TestCase):
+    """HostRateLimiter测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.path = self.test_dir / "arxiv_rate.json"
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.test_dir)
+
+    def test_default_file_per_user(self):
+        """测试默认状态文件位于用户缓存目录，与工作目录无关"""
+        original_cwd = os.getcwd()
+        with patch.dict(os.environ, {"XDG_CACHE_HOME": str(self.test_dir)}):
+            os.environ.pop("COREASCHER_ARXIV_RATE_FILE", None)
+            try:
+                first = _default_rate_file()
+                os.chdir(self.test_dir)
+                second = _default_rate_file()
+            finally:
+                os.chdir(original_cwd)
+        self.assertEqual(first, second)
+        self.assertTrue(first.is_absolute())
+        self.assertEqual(first, self.test_dir / "coreascher" / "arxiv_rate.json")
+        with patch.dict(os.environ, {"COREASCHER_ARXIV_RATE_FILE": str(self.path)}):
+            self.assertEqual(get_rate_limiter().path, self.path)
+
+    def test_interval_across_limiters(self):
+        """测试共用状态文件的多个限速器（相当于多个进程）合计遵守请求间隔"""
+        limiters = [HostRateLimiter(self.path, interval=0.05) for _ in range(3)]
+        slots = []
+        lock = threading.Lock()
+
+        def work(limiter):
+            for _ in range(3):
+                slot = limiter.acquire()
+                with lock:
+                    slots.append(slot)
+
+        threads = [threading.Thread(target=work, args=(limiter,)) for limiter in limiters]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        slots.sort()
+        self.assertEqual(len(slots), 9)
+        for earlier, later in zip(slots, slots[1:]):
+            self.assertGreaterEqual(later - earlier, 0.05 - 1e-6)
+        self.assertEqual(sum(limiter.stats()["requests"] for limiter in limiters), 9)
+
+    def test_backoff_shared(self):
+        """测试一个限速器收到429后，其他限速器在退避截止前不发起请求"""
+        first = HostRateLimiter(self.path, interval=0.0)
+        second = HostRateLimiter(self.path, interval=0.0)
+        issued = first.acquire()
+        first.report(issued, 429, "0.3")
+        started = time.time()
+        second.acquire()
+        self.assertGreaterEqual(time.time() - started, 0.25)
+        self.assertEqual(first.stats()["throttled"], 1)
+
+    def test_backoff_during_pending_acquire(self):
+        """测试等待预约时刻期间其他进程被限流，已预约的请求推迟到退避结束后"""
+        first = HostRateLimiter(self.path, interval=0.2)
+        second = HostRateLimiter(self.path, interval=0.2)
+        issued = first.acquire()
+        slots = []
+        waiting = threading.Thread(target=lambda: slots.append((second.acquire(), time.time())))
+        waiting.start()
+        time.sleep(0.05)
+        first.report(issued, 429, "0.5")
+        waiting.join(5)
+        backoff_until = first._read()["backoff_until"]
+        slot, fired = slots[0]
+        self.assertGreaterEqual(slot, backoff_until)
+        self.assertGreaterEqual(fired, backoff_until)
+
+    def test_backoff_grows_once_per_round(self):
+        """测试连续被限流时退避加倍，同一轮中在途请求的失败不重复加倍"""
+        limiter = HostRateLimiter(self.path, interval=0.0, backoff=1.0)
+        issued = time.time()
+        limiter.report(issued, 503)
+        limiter.report(issued, 503)
+        self.assertEqual(limiter._read()["failures"], 1)
+        limiter.report(time.time(), 503)
+        state = limiter._read()
+        self.assertEqual(state["failures"], 2)
+        self.assertGreater(state["backoff_until"] - time.time(), 1.5)
+        limiter.report(time.time(), 200)
+        self.assertEqual(limiter._read()["failures"], 0)
+
+    def test_session(self):
+        """测试会话在重试前等待退避结束"""
+        session = FakeSession([429, 200])
+        limited = RateLimitedSession(session, HostRateLimiter(self.path, interval=0.0))
+        self.assertEqual(limited.get("http://export.arxiv.org/api/query").status_code, 429)
+        self.assertEqual(limited.get("http://export.arxiv.org/api/query").status_code, 200)
+        self.assertGreaterEqual(session.times[1] - session.times[0], 0.25)
+
+
+if __name__ == '__main__':
+    unittest.main()
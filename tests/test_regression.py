@@ -0,0 +1,90 @@
+"""
+测试性能回归门禁模块
+"""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from src.coreascher.benchmark.regression import (
+    _parse_tolerances, compare, format_report, load_baseline, mann_whitney_p, run_suites, save_baseline
+)
+
+
+def entry(kind, samples):
+    """构造指标样本"""
+    return {"kind": kind, "samples": samples}
+
+
+class TestRegressionGate(unittest.TestCase):
+    """回归门禁测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.test_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.test_dir)
+
+    def test_mann_whitney(self):
+        """测试单侧检验：明显变慢时p值很小，分布相同时p值较大"""
+        self.assertLess(mann_whitney_p([1.0, 1.1, 0.9, 1.05, 0.95], [2.0, 2.1, 1.9, 2.05, 1.95]), 0.01)
+        self.assertGreater(mann_whitney_p([1.0, 1.1, 0.9], [1.0, 1.1, 0.9]), 0.3)
+        self.assertGreater(mann_whitney_p([2.0, 2.1, 1.9], [1.0, 1.1, 0.9]), 0.9)
+
+    def test_compare(self):
+        """测试按指标类型判定回归"""
+        baseline = {
+            "pipeline.wall_seconds": entry("latency", [1.0, 1.02, 0.98, 1.01, 0.99]),
+            "pipeline.llm_calls": entry("count", [8, 8, 8]),
+            "search.warm_seconds": entry("latency", [0.0001, 0.0001, 0.0001]),
+            "memory.pipeline_peak_alloc_mb": entry("memory", [10.0, 10.5, 9.5]),
+        }
+        current = {
+            "pipeline.wall_seconds": entry("latency", [1.5, 1.52, 1.48, 1.51, 1.49]),
+            "pipeline.llm_calls": entry("count", [9, 9, 9]),
+            # 相对增幅很大但低于绝对噪声下限
+            "search.warm_seconds": entry("latency", [0.0003, 0.0003, 0.0003]),
+            "memory.pipeline_peak_alloc_mb": entry("memory", [10.2, 9.8, 10.1]),
+            "startup.help_seconds": entry("latency", [0.05]),
+        }
+        rows = {row["metric"]: row for row in compare(baseline, current)}
+        self.assertEqual(rows["pipeline.wall_seconds"]["status"], "回归")
+        self.assertEqual(rows["pipeline.llm_calls"]["status"], "回归")
+        self.assertEqual(rows["search.warm_seconds"]["status"], "通过")
+        self.assertEqual(rows["memory.pipeline_peak_alloc_mb"]["status"], "通过")
+        self.assertEqual(rows["startup.help_seconds"]["status"], "无基线")
+        # 放宽容差后不再判定回归
+        relaxed = {row["metric"]: row for row in compare(baseline, current, {"latency": 0.6, "count": 0.2})}
+        self.assertEqual(relaxed["pipeline.wall_seconds"]["status"], "通过")
+        self.assertEqual(relaxed["pipeline.llm_calls"]["status"], "通过")
+        report = format_report(list(rows.values()))
+        self.assertIn("+50.0%", report)
+        self.assertIn("发现 2 项回归", report)
+
+    def test_baseline_roundtrip(self):
+        """测试写入基线时保留未重新测量的指标"""
+        path = self.test_dir / "baseline.json"
+        self.assertEqual(load_baseline(path), {})
+        save_baseline(path, {"a": entry("count", [1])}, trials=1)
+        save_baseline(path, {"b": entry("count", [2])}, trials=1)
+        self.assertEqual(sorted(load_baseline(path)), ["a", "b"])
+
+    def test_parse_tolerances(self):
+        """测试解析容差参数"""
+        self.assertEqual(_parse_tolerances("0.3"), {"latency": 0.3, "memory": 0.3})
+        self.assertEqual(_parse_tolerances("latency=0.2,count=0"), {"latency": 0.2, "count": 0.0})
+        with self.assertRaises(Exception):
+            _parse_tolerances("speed=1")
+
+    def test_search_suite(self):
+        """测试运行检索层套件"""
+        metrics = run_suites(["search"], trials=2)
+        self.assertEqual(len(metrics["search.cold_seconds"]["samples"]), 2)
+        with self.assertRaises(ValueError):
+            run_suites(["gpu"])
+
+
+if __name__ == '__main__':
+    unittest.main()
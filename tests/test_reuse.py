@@ -0,0 +1,94 @@
+"""
+测试相近主题复用模块
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from src.coreascher.benchmark.fake_llm import FakeArxivClient, FakeLLM
+from src.coreascher.benchmark.pipeline import DEFAULT_INPUTS, DEFAULT_RESPONSES
+from src.coreascher.service.jobs import SUCCEEDED, Job, ReviewRunner, execute_job
+from src.coreascher.service.reuse import REUSE_ENV, TopicIndex, split_keywords
+from coreascher.tools.search_cache import get_search_cache
+
+
+class TestTopicIndex(unittest.TestCase):
+    """TopicIndex测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.index = TopicIndex(self.test_dir / "topics.json")
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.test_dir)
+
+    def test_split_keywords(self):
+        """测试关键词拆分和去重"""
+        self.assertEqual(split_keywords("RAG, rag；检索增强、 hallucination\n"), ["RAG", "检索增强", "hallucination"])
+
+    def test_lookup_similar_topic(self):
+        """测试按相似度查找历史主题，记录在新实例中依然可见"""
+        self.index.record("retrieval augmented generation for large language models", ["RAG"],
+                          {"create_research_framework": "{}"})
+        index = TopicIndex(self.test_dir / "topics.json")
+        match = index.lookup("retrieval augmented generation for language models", threshold=0.8)
+        self.assertIsNotNone(match)
+        self.assertEqual(match["keywords"], ["RAG"])
+        self.assertGreater(match["score"], 0.8)
+        self.assertIsNone(index.lookup("graph neural networks for drug discovery", threshold=0.8))
+
+    def test_max_topics(self):
+        """测试超出上限时丢弃最早更新的主题"""
+        index = TopicIndex(self.test_dir / "topics.json", max_topics=2)
+        for topic in ("topic one", "topic two", "topic three"):
+            index.record(topic, [], {})
+        self.assertEqual(len(index), 2)
+        self.assertIsNone(index.lookup("topic one", threshold=0.99))
+
+
+class TestTopicReuse(unittest.TestCase):
+    """Crew运行中复用相近主题的测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.original_cwd = os.getcwd()
+        self.test_dir = tempfile.mkdtemp()
+        os.chdir(self.test_dir)
+        get_search_cache().clear()
+
+    def tearDown(self):
+        """测试后清理"""
+        os.chdir(self.original_cwd)
+        shutil.rmtree(self.test_dir)
+
+    def run_topic(self, topic, keywords):
+        """离线运行一次综述"""
+        runner = ReviewRunner(llm=FakeLLM(responses=DEFAULT_RESPONSES), client=FakeArxivClient())
+        inputs = dict(DEFAULT_INPUTS, keywords=keywords)
+        del inputs["topic"]
+        job = execute_job(Job(topic, inputs), runner)
+        self.assertEqual(job.status, SUCCEEDED, job.error)
+        return job.result
+
+    def test_seed_near_repeat_topic(self):
+        """测试相近主题沿用规划类任务输出，只检索新增关键词"""
+        with patch.dict(os.environ, {REUSE_ENV: "1"}):
+            first = self.run_topic(DEFAULT_INPUTS["topic"], DEFAULT_INPUTS["keywords"])
+            second = self.run_topic(DEFAULT_INPUTS["topic"] + "综述", DEFAULT_INPUTS["keywords"] + ", hallucination")
+
+        self.assertIsNone(first["reuse"])
+        self.assertEqual(second["reuse"]["topic"], DEFAULT_INPUTS["topic"])
+        self.assertEqual(second["reuse"]["seeded_tasks"],
+                         ["create_research_framework", "analyze_framework", "keyword_tasks"])
+        self.assertEqual(second["reuse"]["delta_keywords"], ["hallucination"])
+        self.assertEqual(second["tasks"]["keyword_tasks"], first["tasks"]["keyword_tasks"])
+        self.assertLess(second["metrics"]["llm_calls"], first["metrics"]["llm_calls"])
+
+
+if __name__ == '__main__':
+    unittest.main()
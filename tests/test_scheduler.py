@@ -0,0 +1,172 @@
+"""
+测试综述任务调度模块
+"""
+
+import os
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from src.coreascher.benchmark.fake_llm import FakeLLM
+from src.coreascher.service.jobs import JobQueue, ReviewRunner
+from src.coreascher.service.scheduler import FairScheduler, job_context
+from src.coreascher.tools.llm_cache import ScheduledLLM
+from coreascher.tools.llm_cache import CachedLLM, LLMResponseCache
+from coreascher.tools.llm_cache import ScheduledLLM as RunnerScheduledLLM
+
+
+class TestFairScheduler(unittest.TestCase):
+    """FairScheduler测试类"""
+
+    def acquire_later(self, scheduler, order, name, waiting, priority=0, tenant="default"):
+        """在新线程中申请一个LLM额度，获得后记录名称；返回前等待队列长度达到 waiting"""
+        def work():
+            with job_context(priority, tenant):
+                with scheduler.slot("llm"):
+                    order.append(name)
+
+        thread = threading.Thread(target=work)
+        thread.start()
+        # 等待线程进入等待队列，保证申请顺序
+        deadline = time.monotonic() + 5
+        while scheduler.stats()["llm"]["waiting"] < waiting and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return thread
+
+    def test_unlimited_resource(self):
+        """测试未设置上限的资源不等待"""
+        scheduler = FairScheduler({"llm": 1})
+        with scheduler.slot("search"), scheduler.slot("search"):
+            pass
+        self.assertNotIn("search", scheduler.stats())
+
+    def test_priority_first(self):
+        """测试额度释放后先交给高优先级的等待者"""
+        scheduler = FairScheduler({"llm": 1})
+        order = []
+        with scheduler.slot("llm"):
+            low = self.acquire_later(scheduler, order, "batch", 1, priority=0)
+            high = self.acquire_later(scheduler, order, "interactive", 2, priority=10)
+        low.join(5)
+        high.join(5)
+        self.assertEqual(order, ["interactive", "batch"])
+        self.assertEqual(scheduler.stats()["llm"]["waits"], 2)
+
+    def test_fair_share_between_tenants(self):
+        """测试同优先级时占用额度少的租户优先"""
+        scheduler = FairScheduler({"llm": 2})
+        order = []
+        release = threading.Event()
+
+        def hold():
+            with job_context(0, "lab-a"), scheduler.slot("llm"):
+                release.wait(5)
+
+        holder = threading.Thread(target=hold)
+        holder.start()
+        while scheduler.stats()["llm"]["in_use"] < 1:
+            time.sleep(0.01)
+        with job_context(0, "lab-c"), scheduler.slot("llm"):
+            first = self.acquire_later(scheduler, order, "lab-a", 1, tenant="lab-a")
+            second = self.acquire_later(scheduler, order, "lab-b", 2, tenant="lab-b")
+        second.join(5)
+        release.set()
+        first.join(5)
+        holder.join(5)
+        self.assertEqual(order, ["lab-b", "lab-a"])
+        self.assertEqual(scheduler.stats()["llm"]["tenants"], {"lab-a": 2, "lab-b": 1, "lab-c": 1})
+
+    def test_aging(self):
+        """测试等待时间提升优先级"""
+        scheduler = FairScheduler({"llm": 1}, aging_seconds=10)
+        now = time.monotonic()
+        waited = scheduler.rank(0, "a", now - 25, 0, {}, now)
+        fresh = scheduler.rank(1, "b", now, 1, {}, now)
+        self.assertLess(waited, fresh)
+
+    def test_scheduled_llm(self):
+        """测试LLM包装在调用期间占用额度"""
+        scheduler = FairScheduler({"llm": 2})
+        llm = ScheduledLLM(FakeLLM(responses={"task": ["ok"]}), scheduler)
+        self.assertIn("ok", llm.call([{"role": "user", "content": "hi"}]))
+        self.assertEqual(scheduler.stats()["llm"]["grants"], 1)
+        self.assertEqual(scheduler.stats()["llm"]["in_use"], 0)
+
+    def test_memory_llm_scheduled(self):
+        """测试Agent记忆的LLM与共享LLM一样占用额度、使用同一个回复缓存，且不重复占用额度"""
+        scheduler, cache = FairScheduler({"llm": 1}), LLMResponseCache()
+        runner = ReviewRunner(llm=FakeLLM(responses={"task": ["ok"]}), scheduler=scheduler)
+        runner.llm = CachedLLM(runner.llm, cache)
+        _, crew = runner._build_crew()
+        for agent in crew.agents:
+            self.assertIs(agent.memory._llm.cache, cache)
+        # 记忆由共享LLM创建，已带有调度包装，额度为1时调用也不会死锁
+        self.assertIn("ok", crew.agents[0].memory._llm.call([{"role": "user", "content": "hi"}]))
+        self.assertEqual(scheduler.stats()["llm"]["grants"], 1)
+
+        # 各Agent按配置创建LLM时，记忆按模型名创建的LLM单独加上调度包装
+        with patch.dict(os.environ, {"MODEL": "openai/gpt-4o-mini", "OPENAI_API_KEY": "sk-test"}):
+            _, crew = ReviewRunner(scheduler=scheduler)._build_crew()
+        for agent in crew.agents:
+            self.assertIsInstance(agent.memory._llm, RunnerScheduledLLM)
+            self.assertIs(agent.memory._llm.scheduler, scheduler)
+
+
+class TestJobQueueOrder(unittest.TestCase):
+    """任务队列调度顺序测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.order = []
+        self.gates = {}
+
+    def runner(self, job):
+        """主题有对应的闸门时等待闸门打开，结束时记录主题"""
+        gate = self.gates.get(job.topic)
+        if gate is not None:
+            gate.wait(5)
+        self.order.append(job.topic)
+        return {}
+
+    def wait_running(self, jobs, count):
+        """等待运行中的任务数达到 count"""
+        deadline = time.monotonic() + 5
+        while jobs.stats()["running"] < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_priority_order(self):
+        """测试排队任务按优先级执行"""
+        self.gates["blocker"] = threading.Event()
+        jobs = JobQueue(workers=1, runner=self.runner, scheduler=FairScheduler()).start()
+        try:
+            submitted = [jobs.submit("blocker")]
+            self.wait_running(jobs, 1)
+            submitted += [jobs.submit("batch"), jobs.submit("interactive", priority=10)]
+            self.gates["blocker"].set()
+            for job in submitted:
+                self.assertTrue(job.done.wait(5))
+        finally:
+            jobs.stop()
+        self.assertEqual(self.order, ["blocker", "interactive", "batch"])
+        self.assertEqual(submitted[2].to_dict()["priority"], 10)
+
+    def test_fair_share_order(self):
+        """测试同优先级时运行任务少的租户优先"""
+        self.gates = {"long": threading.Event(), "short": threading.Event()}
+        jobs = JobQueue(workers=2, runner=self.runner, scheduler=FairScheduler()).start()
+        try:
+            submitted = [jobs.submit("long", tenant="lab-a"), jobs.submit("short", tenant="lab-a")]
+            self.wait_running(jobs, 2)
+            submitted += [jobs.submit("a-next", tenant="lab-a"), jobs.submit("b-next", tenant="lab-b")]
+            self.gates["short"].set()
+            for job in submitted[1:]:
+                self.assertTrue(job.done.wait(5))
+            self.gates["long"].set()
+            self.assertTrue(submitted[0].done.wait(5))
+        finally:
+            jobs.stop()
+        self.assertEqual(self.order, ["short", "b-next", "a-next", "long"])
+
+
+if __name__ == '__main__':
+    unittest.main()
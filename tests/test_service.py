@@ -0,0 +1,138 @@
+"""
+测试综述任务队列和HTTP服务模块
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from src.coreascher.benchmark.fake_llm import FakeArxivClient, FakeLLM
+from src.coreascher.benchmark.pipeline import DEFAULT_INPUTS, DEFAULT_RESPONSES
+from src.coreascher.service.jobs import FAILED, SUCCEEDED, JobQueue, ReviewRunner
+from src.coreascher.service.server import ReviewServer
+from coreascher.tools.search_cache import get_search_cache
+
+
+def echo_runner(job):
+    """返回主题的模拟执行器，主题为 fail 时抛出异常"""
+    if job.topic == "fail":
+        raise RuntimeError("boom")
+    return {"review": f"关于{job.topic}的综述", "inputs": job.inputs}
+
+
+class TestJobQueue(unittest.TestCase):
+    """JobQueue测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.jobs = JobQueue(workers=2, runner=echo_runner, max_finished=2).start()
+
+    def tearDown(self):
+        """测试后清理"""
+        self.jobs.stop()
+
+    def test_submit_and_finish(self):
+        """测试任务排队执行并记录结果和失败原因"""
+        ok = self.jobs.submit("图神经网络", {"keywords": "gnn"})
+        bad = self.jobs.submit("fail")
+        self.assertTrue(ok.done.wait(5) and bad.done.wait(5))
+        self.assertEqual(ok.status, SUCCEEDED)
+        self.assertEqual(ok.result["review"], "关于图神经网络的综述")
+        self.assertEqual(bad.status, FAILED)
+        self.assertEqual(bad.error, "boom")
+        self.assertEqual((self.jobs.stats()["completed"], self.jobs.stats()["failed"]), (1, 1))
+        with self.assertRaises(ValueError):
+            self.jobs.submit("  ")
+
+    def test_evict_finished(self):
+        """测试只保留最近结束的任务"""
+        submitted = [self.jobs.submit(f"主题{i}") for i in range(4)]
+        for job in submitted:
+            job.done.wait(5)
+        self.assertEqual(len(self.jobs.jobs()), 2)
+        self.assertIsNone(self.jobs.get(submitted[0].id))
+
+
+class TestReviewServer(unittest.TestCase):
+    """ReviewServer测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.jobs = JobQueue(workers=1, runner=echo_runner).start()
+        self.server = ReviewServer(("127.0.0.1", 0), self.jobs)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        """测试后清理"""
+        self.server.shutdown()
+        self.server.server_close()
+        self.jobs.stop()
+
+    def request(self, path, data=None):
+        """发送请求并解析JSON响应"""
+        body = json.dumps(data).encode("utf-8") if data is not None else None
+        request = urllib.request.Request(self.base + path, data=body, method="POST" if body else "GET")
+        try:
+            with urllib.request.urlopen(request, timeout=5) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read())
+
+    def test_submit_and_query(self):
+        """测试提交主题后查询任务状态和结果"""
+        status, job = self.request("/jobs", {"topic": "检索增强生成", "inputs": {"keywords": "RAG"}})
+        self.assertEqual(status, 202)
+        self.jobs.get(job["id"]).done.wait(5)
+        status, job = self.request(f"/jobs/{job['id']}")
+        self.assertEqual(status, 200)
+        self.assertEqual(job["status"], SUCCEEDED)
+        self.assertEqual(job["result"]["inputs"], {"keywords": "RAG"})
+        status, listing = self.request("/jobs")
+        self.assertNotIn("result", listing["jobs"][0])
+        self.assertEqual(self.request("/health")[1]["completed"], 1)
+
+    def test_bad_requests(self):
+        """测试无效请求返回错误"""
+        self.assertEqual(self.request("/jobs", {"inputs": {}})[0], 400)
+        self.assertEqual(self.request("/jobs", ["topic"])[0], 400)
+        self.assertEqual(self.request("/jobs/missing")[0], 404)
+
+
+class TestReviewRunner(unittest.TestCase):
+    """ReviewRunner测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.original_cwd = os.getcwd()
+        self.test_dir = tempfile.mkdtemp()
+        os.chdir(self.test_dir)
+        get_search_cache().clear()
+
+    def tearDown(self):
+        """测试后清理"""
+        os.chdir(self.original_cwd)
+        shutil.rmtree(self.test_dir)
+
+    def test_run_crew_with_shared_client(self):
+        """测试执行器运行完整Crew并在任务之间共享arXiv客户端"""
+        client = FakeArxivClient()
+        jobs = JobQueue(workers=1, runner=ReviewRunner(llm=FakeLLM(responses=DEFAULT_RESPONSES), client=client))
+        jobs.start()
+        try:
+            job = jobs.submit(DEFAULT_INPUTS["topic"], {k: v for k, v in DEFAULT_INPUTS.items() if k != "topic"})
+            self.assertTrue(job.done.wait(120))
+        finally:
+            jobs.stop()
+        self.assertEqual(job.status, SUCCEEDED, job.error)
+        self.assertIn("search_literature", job.result["tasks"])
+        self.assertGreater(job.result["metrics"]["llm_calls"], 0)
+        self.assertGreater(client.calls, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+"""
+测试跨进程共享存储模块
+"""
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from src.coreascher.agents.phd_agent import PhDAgent
+from src.coreascher.tools.search_cache import SearchCache
+from src.coreascher.tools.paper_table import PaperTable
+from src.coreascher.tools.shared_store import SharedStore, atomic_write_text
+
+
+def compute_in_process(path, log_path, results):
+    """在子进程中争夺同一个键，计算时记录一行日志"""
+    def compute():
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write("computed\n")
+        time.sleep(0.3)
+        return {"answer": 42}
+
+    results.put(SharedStore(path, poll_interval=0.01).get_or_compute("llm", "key", compute))
+
+
+class TestSharedStore(unittest.TestCase):
+    """SharedStore测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.store = SharedStore(self.test_dir / "shared.sqlite3")
+
+    def tearDown(self):
+        """测试后清理"""
+        self.store.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_put_and_get(self):
+        """测试按命名空间读写条目"""
+        self.store.put("knowledge", "p1", {"title": "论文"})
+        self.assertEqual(self.store.get("knowledge", "p1"), {"title": "论文"})
+        self.assertIsNone(self.store.get("search", "p1"))
+        self.assertEqual(self.store.count("knowledge"), 1)
+
+    def test_expired_entries(self):
+        """测试过期条目不再返回，重新打开存储时被清理"""
+        store = SharedStore(self.test_dir / "shared.sqlite3", ttl_seconds=60)
+        store.put("search", "old", {"papers": []})
+        store.put("search", "new", {"papers": [1]})
+        store._conn().execute("UPDATE entries SET created_at = created_at - 120 WHERE key = 'old'")
+        self.assertIsNone(store.get("search", "old"))
+        self.assertEqual(store.get_or_compute("search", "old", lambda: {"papers": [2]}), {"papers": [2]})
+        store._conn().execute("UPDATE entries SET created_at = created_at - 120 WHERE key = 'old'")
+        store.close()
+
+        reopened = SharedStore(self.test_dir / "shared.sqlite3", ttl_seconds=60)
+        self.assertEqual(reopened.count("search"), 1)
+        self.assertEqual(reopened.get("search", "new"), {"papers": [1]})
+        reopened.close()
+
+    def test_knowledge_base_not_expired(self):
+        """测试知识库条目不受缓存有效期限制，重新打开后仍然保留"""
+        original_cwd = os.getcwd()
+        os.chdir(self.test_dir)
+        try:
+            with patch.dict(os.environ, {"COREASCHER_SHARED_CACHE_TTL": "60"}):
+                knowledge_base = PhDAgent().knowledge_base
+                knowledge_base.put("knowledge", "paper", {"title": "旧文献"})
+                knowledge_base._conn().execute("UPDATE entries SET created_at = created_at - 365 * 24 * 3600")
+                knowledge_base.close()
+
+                reopened = PhDAgent().knowledge_base
+                self.assertEqual(reopened.get("knowledge", "paper"), {"title": "旧文献"})
+                reopened.close()
+        finally:
+            os.chdir(original_cwd)
+
+    def test_single_flight_across_processes(self):
+        """测试多个进程请求同一个键时只计算一次"""
+        log_path = self.test_dir / "computed.log"
+        results = multiprocessing.Queue()
+        workers = [
+            multiprocessing.Process(target=compute_in_process, args=(self.store.path, log_path, results))
+            for _ in range(3)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(30)
+        self.assertEqual([results.get(timeout=5) for _ in workers], [{"answer": 42}] * 3)
+        self.assertEqual(log_path.read_text(encoding="utf-8").count("computed"), 1)
+
+    def test_failed_compute_not_stored(self):
+        """测试计算失败时不写入结果并释放租约"""
+        def fail():
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            self.store.get_or_compute("llm", "key", fail)
+        self.assertEqual(self.store.get_or_compute("llm", "key", lambda: "ok"), "ok")
+
+    def test_search_cache_uses_store(self):
+        """测试检索缓存在内存未命中时复用其他进程写入的结果"""
+        table = PaperTable([{"title": "RAG", "entry_id": "1", "authors": ["A"]}])
+        SearchCache(store=self.store).fetch(("rag", 10), lambda: table)
+        other = SearchCache(store=self.store)
+        fetched = other.fetch(("rag", 10), lambda: self.fail("不应重复检索"))
+        self.assertEqual(fetched[0]["title"], "RAG")
+        self.assertIsNotNone(other.get(("rag", 10)))
+
+    def test_atomic_write(self):
+        """测试原子写入不留下临时文件"""
+        path = self.test_dir / "out" / "review.md"
+        atomic_write_text(path, "第一版")
+        atomic_write_text(path, "第二版")
+        self.assertEqual(path.read_text(encoding="utf-8"), "第二版")
+        self.assertEqual([p.name for p in path.parent.iterdir()], ["review.md"])
+
+
+if __name__ == '__main__':
+    unittest.main()
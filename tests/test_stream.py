@@ -0,0 +1,202 @@
+"""
+测试综述流式输出模块
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+from src.coreascher.benchmark.fake_llm import FakeArxivClient, FakeLLM
+from src.coreascher.benchmark.pipeline import DEFAULT_INPUTS, DEFAULT_RESPONSES
+from src.coreascher.service.jobs import JobQueue, ReviewRunner
+from src.coreascher.service.server import ReviewServer
+from src.coreascher.crew import LiteratureReviewCrew
+from src.coreascher.service.stream import SectionSplitter, SectionStream, split_sections
+from coreascher.tools.search_cache import get_search_cache
+
+REVIEW = "# 摘要\n本文综述检索增强生成。\n\n## 综述正文\n检索器与生成器[2301.00001-chunk0]。\n\n## 未来趋势展望\n多模态检索。"
+
+
+class TestSectionSplitter(unittest.TestCase):
+    """SectionSplitter测试类"""
+
+    def test_incremental_sections(self):
+        """测试章节在下一个标题到达时即完成，且忽略最终答案之前的思考"""
+        splitter = SectionSplitter()
+        text = "Thought: I now can give a great answer\nFinal Answer: " + REVIEW
+        emitted = []
+        for i in range(0, len(text), 7):
+            for section in splitter.feed(text[i:i + 7]):
+                emitted.append((i, section["title"]))
+        self.assertEqual([title for _, title in emitted], ["摘要", "综述正文"])
+        self.assertEqual([section["title"] for section in splitter.finish()], ["未来趋势展望"])
+
+    def test_tool_call_ignored(self):
+        """测试工具调用回复不产生章节"""
+        splitter = SectionSplitter()
+        self.assertEqual(splitter.feed("Thought: 需要检索\nAction: LiteratureSearch\n"), [])
+        self.assertEqual(splitter.finish(), [])
+
+    def test_intermediate_reply_ignored(self):
+        """测试没有最终答案标记的中间回复和带工具调用的格式错误回复不产生章节"""
+        splitter = SectionSplitter()
+        self.assertEqual(splitter.feed("Thought: 先检索相关文献，再按框架撰写综述。"), [])
+        self.assertEqual(splitter.finish(), [])
+        splitter = SectionSplitter()
+        self.assertEqual(splitter.feed("Action: LiteratureSearch\nFinal Answer: " + REVIEW), [])
+        self.assertEqual(splitter.finish(), [])
+
+    def test_retry_not_duplicated(self):
+        """测试同一任务中只推送第一个给出最终答案的调用的章节，中间回复不写入输出"""
+        stream = SectionStream()
+        stream._task_ids = {"task"}
+        sections = []
+        stream.subscribe(sections.append)
+        for call_id, response in [("c1", "Thought: 需要检索"), ("c2", "Final Answer: " + REVIEW),
+                                  ("c3", "Final Answer: " + REVIEW)]:
+            stream.handle_event(SimpleNamespace(type="llm_call_completed", task_id="task", call_id=call_id,
+                                                response=response))
+        stream.finish(REVIEW)
+        self.assertEqual([event["title"] for event in sections if event["type"] == "section"],
+                         ["摘要", "综述正文", "未来趋势展望"])
+        self.assertEqual(sections[-1]["type"], "document")
+
+    def test_split_document(self):
+        """测试完整综述切分"""
+        sections = split_sections("前言\n" + REVIEW)
+        self.assertEqual([section["title"] for section in sections], [None, "摘要", "综述正文", "未来趋势展望"])
+        self.assertEqual(sections[1]["text"], "# 摘要\n本文综述检索增强生成。")
+
+
+class TestStreamingReview(unittest.TestCase):
+    """逐章节推送综述的集成测试"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.original_cwd = os.getcwd()
+        self.test_dir = Path(tempfile.mkdtemp())
+        os.chdir(self.test_dir)
+        get_search_cache().clear()
+        responses = dict(DEFAULT_RESPONSES, literature_review=[REVIEW])
+        llm = FakeLLM(responses=responses, stream=True, per_token_latency=0.01)
+        self.jobs = JobQueue(workers=1, runner=ReviewRunner(llm=llm, client=FakeArxivClient(),
+                                                            workspace_root=self.test_dir / "workspaces")).start()
+        self.server = ReviewServer(("127.0.0.1", 0), self.jobs)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        """测试后清理"""
+        self.server.shutdown()
+        self.server.server_close()
+        self.jobs.stop()
+        os.chdir(self.original_cwd)
+        shutil.rmtree(self.test_dir)
+
+    def test_sections_before_finish(self):
+        """测试章节在任务结束前经事件流推送，结束后输出完整综述"""
+        job = self.jobs.submit(DEFAULT_INPUTS["topic"], {k: v for k, v in DEFAULT_INPUTS.items() if k != "topic"})
+        events = []
+        with urllib.request.urlopen(f"{self.base}/jobs/{job.id}/events", timeout=120) as response:
+            self.assertTrue(response.headers["Content-Type"].startswith("text/event-stream"))
+            for line in response:
+                line = line.decode("utf-8").strip()
+                if line.startswith("data: "):
+                    events.append((json.loads(line[len("data: "):]), time.monotonic()))
+        kinds = [event["type"] for event, _ in events]
+        self.assertEqual(kinds[-2:], ["document", "finished"], job.error)
+        sections = [event for event, _ in events if event["type"] == "section"]
+        self.assertEqual([section["title"] for section in sections], ["摘要", "综述正文", "未来趋势展望"])
+        # 章节随生成逐个到达，而不是在回复结束后一次性到达
+        self.assertGreater(events[len(sections) - 1][1] - events[0][1], 0.05)
+
+        workspace = Path(job.result["workspace"])
+        self.assertEqual((workspace / "literature_review.md").read_text(encoding="utf-8"), REVIEW)
+
+
+class ChatCompletionsHandler(BaseHTTPRequestHandler):
+    """以SSE分块返回综述的OpenAI兼容接口，记录请求是否要求流式输出"""
+
+    requests = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.requests.append(body)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        text = "Thought: I now can give a great answer\nFinal Answer: " + REVIEW
+        for i in range(0, len(text), 8):
+            self._send({"content": text[i:i + 8]}, None)
+        self._send({}, "stop")
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def _send(self, delta, finish_reason):
+        chunk = {"id": "chunk", "object": "chat.completion.chunk", "created": 0, "model": "gpt-4o-mini",
+                 "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+        self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+    def log_message(self, *args):
+        pass
+
+
+class TestStreamingLLM(unittest.TestCase):
+    """Crew构建时为综述任务开启LLM流式输出的测试类"""
+
+    def setUp(self):
+        """测试前准备，Agent使用按环境变量创建的真实LLM，请求发往本地接口"""
+        ChatCompletionsHandler.requests = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), ChatCompletionsHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        # 其他测试可能在进程内设置了 OPENAI_API_BASE，crewAI 优先使用它，这里一并指向本地接口
+        base_url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+        self.env = patch.dict(os.environ, {
+            "MODEL": "openai/gpt-4o-mini",
+            "OPENAI_API_KEY": "sk-test",
+            "OPENAI_API_BASE": base_url,
+            "OPENAI_BASE_URL": base_url,
+        })
+        self.env.start()
+        os.environ.pop("COREASCHER_STREAM", None)
+
+    def tearDown(self):
+        """测试后清理"""
+        self.env.stop()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_review_agent_streams(self):
+        """测试只有执行综述任务的Agent的LLM开启流式输出，章节随流式分块推送"""
+        crew = LiteratureReviewCrew().literature_review_crew()
+        task = next(task for task in crew.tasks if task.name == "literature_review")
+        self.assertTrue(task.agent.llm.stream)
+        self.assertEqual([agent.llm.stream for agent in crew.agents if agent is not task.agent], [False, False])
+
+        sections = []
+        stream = SectionStream().subscribe(sections.append).attach(crew)
+        try:
+            task.agent.llm.call([{"role": "user", "content": "写综述"}], from_task=task, from_agent=task.agent)
+        finally:
+            stream.detach()
+        self.assertTrue(ChatCompletionsHandler.requests[0]["stream"])
+        # 前两个章节在下一个标题的分块到达时即完成，最后一个章节在调用完成事件中推送
+        self.assertEqual([section["title"] for section in sections[:2]], ["摘要", "综述正文"])
+
+    def test_stream_disabled(self):
+        """测试 COREASCHER_STREAM=0 时不开启流式输出"""
+        with patch.dict(os.environ, {"COREASCHER_STREAM": "0"}):
+            crew = LiteratureReviewCrew().literature_review_crew()
+        self.assertEqual([agent.llm.stream for agent in crew.agents], [False, False, False])
+
+
+if __name__ == '__main__':
+    unittest.main()
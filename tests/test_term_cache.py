@@ -0,0 +1,86 @@
+"""
+测试检索术语缓存模块
+"""
+
+import shutil
+import unittest
+from pathlib import Path
+from src.coreascher.tools.term_cache import TermCache, normalize_term
+
+
+class TestTermCache(unittest.TestCase):
+    """TermCache测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.test_dir = Path("test_term_store")
+        self.path = self.test_dir / "term_table.json"
+        self.cache = TermCache(path=self.path)
+
+    def tearDown(self):
+        """测试后清理"""
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def test_normalize_variants(self):
+        """测试拼写变体归一化"""
+        self.assertEqual(normalize_term("Large-Language  Models"), normalize_term("large language model"))
+        self.assertEqual(normalize_term("optimisation"), normalize_term("Optimization"))
+        self.assertEqual(normalize_term("“大语言模型”"), "大语言模型")
+
+    def test_seed_terms(self):
+        """测试内置术语"""
+        self.assertEqual(self.cache.canonicalize("大语言模型"), "large language model")
+        self.assertEqual(self.cache.canonicalize("LLMs"), "large language model")
+
+    def test_learn_and_persist(self):
+        """测试术语学习和持久化"""
+        self.cache.learn("思维链推理", "chain-of-thought reasoning")
+        self.assertEqual(self.cache.canonicalize("思维链推理"), "chain-of-thought reasoning")
+        self.assertEqual(self.cache.canonicalize("Chain of Thought Reasoning"), "chain-of-thought reasoning")
+        self.assertTrue(self.cache.save())
+
+        reloaded = TermCache(path=self.path)
+        self.assertEqual(reloaded.lookup("思维链推理"), "chain-of-thought reasoning")
+
+    def test_save_merges_other_writers(self):
+        """测试两个实例先后保存时保留对方写入的术语"""
+        other = TermCache(path=self.path)
+        self.cache.learn("思维链推理", "chain-of-thought reasoning")
+        other.learn("混合专家", "mixture of experts")
+        self.assertTrue(self.cache.save())
+        self.assertTrue(other.save())
+
+        reloaded = TermCache(path=self.path)
+        self.assertEqual(reloaded.lookup("思维链推理"), "chain-of-thought reasoning")
+        self.assertEqual(reloaded.lookup("混合专家"), "mixture of experts")
+        self.assertEqual(other.lookup("思维链推理"), "chain-of-thought reasoning")
+
+    def test_unknown_terms_not_learned(self):
+        """测试未登记的检索词原样使用，不写入术语表"""
+        size = len(self.cache)
+        self.assertEqual(self.cache.canonicalize("Vision  Transformers"), "Vision Transformers")
+        self.assertEqual(self.cache.canonicalize("vision-transformer"), "vision-transformer")
+        self.assertEqual(len(self.cache), size)
+        self.assertEqual(self.cache.misses, 2)
+        self.assertFalse(self.cache._dirty)
+
+    def test_query_syntax_preserved(self):
+        """测试arXiv检索语法保留在键中，不同语义的检索式不会相互改写"""
+        self.assertNotEqual(normalize_term('"graph neural network"'), normalize_term("graph neural network"))
+        self.assertNotEqual(normalize_term("ti:transformer"), normalize_term("ti transformer"))
+        self.assertNotEqual(normalize_term("rag AND llm"), normalize_term("rag and llm"))
+        self.assertEqual(normalize_term('ti:"Graph Neural Networks"'), normalize_term('ti: "graph-neural network"'))
+        self.cache.learn("图神经网络", "graph neural network")
+        self.assertEqual(self.cache.canonicalize('"graph neural network"'), '"graph neural network"')
+
+    def test_unknown_chinese_term(self):
+        """测试未收录的中文术语"""
+        self.assertIsNone(self.cache.lookup("未知术语"))
+        self.assertEqual(self.cache.canonicalize("未知术语"), "未知术语")
+        self.cache.learn("未知术语", "未知")
+        self.assertIsNone(self.cache.lookup("未知术语"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+测试运行时间线追踪模块
+"""
+
+import json
+import shutil
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from src.coreascher.monitoring.trace import TraceRecorder, _NULL_SPAN, trace_span
+
+
+def make_event(kind: str, at: datetime, **fields) -> SimpleNamespace:
+    """构造模拟的crewAI事件"""
+    return SimpleNamespace(type=kind, timestamp=at, **fields)
+
+
+def make_crew():
+    """构造包含两个任务的模拟Crew"""
+    phd = SimpleNamespace(id="a1", role="phd")
+    tasks = [
+        SimpleNamespace(id="t1", name="search_literature", agent=phd),
+        SimpleNamespace(id="t2", name="literature_review", agent=phd),
+    ]
+    return SimpleNamespace(agents=[phd], tasks=tasks)
+
+
+class TestTraceRecorder(unittest.TestCase):
+    """TraceRecorder测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.test_dir = Path("test_trace_output")
+        self.recorder = TraceRecorder("test").attach(make_crew())
+        self.t0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    def tearDown(self):
+        """测试后清理"""
+        self.recorder.detach()
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def test_disabled_span_is_noop(self):
+        """测试未启用追踪时返回共享的空片段"""
+        self.recorder.detach()
+        self.assertIs(trace_span("search_cache.get"), _NULL_SPAN)
+        with trace_span("search_cache.get") as span:
+            span["hit"] = True
+
+    def test_events_become_nested_spans(self):
+        """测试任务、LLM调用和工具调用按任务轨道记录"""
+        events = [
+            make_event("task_started", self.t0, task_id="t1"),
+            make_event("llm_call_started", self.t0 + timedelta(seconds=1), call_id="c1", task_id="t1", agent_id="a1"),
+            make_event("llm_call_completed", self.t0 + timedelta(seconds=2), call_id="c1", task_id="t1",
+                       agent_id="a1", model="fake", usage={"prompt_tokens": 10}),
+            make_event("tool_usage_finished", self.t0 + timedelta(seconds=3), task_id="t1", agent_id="a1",
+                       tool_name="LiteratureSearch", started_at=self.t0 + timedelta(seconds=2),
+                       finished_at=self.t0 + timedelta(seconds=3)),
+            make_event("task_started", self.t0 + timedelta(seconds=1), task_id="t2"),
+            make_event("task_completed", self.t0 + timedelta(seconds=4), task_id="t1"),
+        ]
+        for event in events:
+            self.assertTrue(self.recorder.owns(event))
+            self.recorder.handle_event(event)
+
+        trace = self.recorder.to_chrome_trace()
+        spans = {event["name"]: event for event in trace["traceEvents"] if event["ph"] == "X"}
+        task = spans["search_literature"]
+        self.assertEqual(task["dur"], 4e6)
+        self.assertEqual(task["args"]["agent"], "phd")
+        self.assertEqual(spans["llm_call"]["tid"], task["tid"])
+        self.assertEqual(spans["llm_call"]["args"]["usage"], {"prompt_tokens": 10})
+        self.assertEqual(spans["tool:LiteratureSearch"]["dur"], 1e6)
+        # 并发执行的任务在不同轨道上，未结束的任务也会导出
+        self.assertNotEqual(spans["literature_review"]["tid"], task["tid"])
+        self.assertTrue(spans["literature_review"]["args"]["unfinished"])
+
+    def test_trace_span_on_running_task_track(self):
+        """测试埋点片段记录在正在运行的任务轨道上"""
+        self.recorder.handle_event(make_event("task_started", self.t0, task_id="t1"))
+        with trace_span("arxiv.search", cat="network", query="rag") as span:
+            span["results"] = 3
+        trace = self.recorder.to_chrome_trace()
+        span = next(event for event in trace["traceEvents"] if event["name"] == "arxiv.search")
+        self.assertEqual(span["tid"], self.recorder.track("search_literature"))
+        self.assertEqual(span["args"], {"query": "rag", "results": 3})
+
+    def test_export(self):
+        """测试导出Chrome trace JSON"""
+        with trace_span("search_cache.get", cat="cache"):
+            pass
+        path = self.recorder.export(self.test_dir)
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        names = [event["name"] for event in data["traceEvents"]]
+        self.assertIn("process_name", names)
+        self.assertIn("search_cache.get", names)
+
+
+if __name__ == '__main__':
+    unittest.main()
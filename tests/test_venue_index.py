@@ -0,0 +1,95 @@
+"""
+测试会议归一化与分面索引模块
+"""
+
+import json
+import unittest
+from src.coreascher.benchmark.fake_llm import FakeArxivClient
+from src.coreascher.tools.custom_tool import SEARCH_RESULT_LIMIT, LiteratureSearch
+from src.coreascher.tools.paper_table import PaperTable
+from src.coreascher.tools.search_cache import SearchCache
+from src.coreascher.tools.venue_index import FacetIndex, normalize_venue
+from coreascher.tools.search_cache import get_search_cache
+
+
+class TestVenueIndex(unittest.TestCase):
+    """会议分面索引测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        papers = [
+            ("Advances in Neural Information Processing Systems 36", 2023, "cs.LG"),
+            ("Accepted at NIPS 2017", 2017, "cs.LG"),
+            ("ICML 2022", 2022, "cs.LG"),
+            ("Published as a conference paper at ICLR 2024", 2024, "cs.CL"),
+            ("10 pages, 3 figures", 2023, "cs.CV"),
+        ]
+        self.table = PaperTable(
+            {
+                "title": f"Paper {i}",
+                "entry_id": str(i),
+                "venue": normalize_venue(venue) or "",
+                "year": year,
+                "primary_category": category,
+            }
+            for i, (venue, year, category) in enumerate(papers)
+        )
+        self.index = FacetIndex(self.table)
+
+    def test_normalize_venue(self):
+        """测试会议名称归一化"""
+        self.assertEqual(normalize_venue("Proceedings of the 40th International Conference on Machine Learning"), "ICML")
+        self.assertEqual(normalize_venue(None, "NeurIPS 2023 camera-ready"), "NeurIPS")
+        self.assertEqual(normalize_venue("neurips"), "NeurIPS")
+        self.assertEqual(normalize_venue("Findings of NAACL 2024"), "NAACL")
+        self.assertIsNone(normalize_venue("10 pages, 3 figures"))
+
+    def test_facet_filter(self):
+        """测试分面过滤"""
+        neurips = self.index.filter(venues=["Neural Information Processing Systems"])
+        self.assertEqual([row.title for row in neurips], ["Paper 0", "Paper 1"])
+
+        recent = self.index.filter(venues=["NeurIPS", "ICML", "ICLR"], min_year=2022, categories=["cs.LG"])
+        self.assertEqual([row.year for row in recent], [2023, 2022])
+        self.assertEqual(len(self.index.filter(max_year=2016)), 0)
+        self.assertEqual(self.index.counts("venue")["NeurIPS"], 2)
+
+    def test_search_cache(self):
+        """测试检索结果缓存"""
+        cache = SearchCache(maxsize=1)
+        self.assertIsNone(cache.get(("llm", 10)))
+        cache.put(("llm", 10), self.table)
+        self.assertIs(cache.get(("llm", 10)), self.table)
+        cache.put(("rag", 10), self.table)
+        self.assertIsNone(cache.get(("llm", 10)))
+        self.assertAlmostEqual(cache.stats()["hit_rate"], 1 / 3)
+
+    def test_cached_facets(self):
+        """测试分面索引与检索结果一起缓存，结果被替换或淘汰后重新建立"""
+        cache = SearchCache(maxsize=1)
+        self.assertIsNone(cache.facets(("llm", 200)))
+        cache.put(("llm", 200), self.table)
+        index = cache.facets(("llm", 200))
+        self.assertIs(cache.facets(("llm", 200)), index)
+        self.assertEqual(len(index.filter(venues=["ICML"])), 1)
+        cache.put(("llm", 200), PaperTable(self.table))
+        self.assertIsNot(cache.facets(("llm", 200)), index)
+        cache.put(("rag", 200), self.table)
+        self.assertIsNone(cache.facets(("llm", 200)))
+
+
+    def test_tool_filters_candidate_pool(self):
+        """测试检索工具指定会议时在较大的候选集中过滤，凑够返回数量"""
+        get_search_cache().clear()
+        tool = LiteratureSearch(client=FakeArxivClient())
+        papers = json.loads(tool._run("graph neural network", venues=["ICML"]))["papers"]
+        self.assertEqual(len(papers), SEARCH_RESULT_LIMIT)
+        self.assertEqual({paper["venue"] for paper in papers}, {"ICML"})
+        recent = json.loads(tool._run("graph neural network", venues=["ICLR"], min_year=2022))["papers"]
+        self.assertTrue(recent)
+        self.assertTrue(all(paper["published"] >= "2022" for paper in recent))
+        self.assertEqual(tool.client.calls, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()